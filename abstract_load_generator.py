@@ -1,11 +1,58 @@
 from abc import abstractmethod
+import logging as log
 import shutil
+import subprocess
+
+# Capabilities probed for every load generator backend:
+#  * rate_control - the load generator can send requests at a fixed rate (open loop), required in the latency phase
+#  * closed_loop - the load generator can send requests as fast as the application responds, required in the warmup and throughput phases
+#  * http2 - the load generator can send HTTP/2 requests
+#  * lua - the load generator can execute Lua scripts
+#  * histogram - the load generator reports a full latency histogram, used to merge the latencies of all the iterations
+LOAD_GENERATOR_CAPABILITIES = ["rate_control", "closed_loop", "http2", "lua", "histogram"]
 
 def cmd_exists(cmd, path=None):
     ''' Checks if a command exists'''
     return shutil.which(cmd, path=path) is not None
 
+def run_probe_command(command, env):
+    '''Runs a command printing the version or the usage of a load generator and returns its output'''
+    if not cmd_exists(command[0], path=env.get("PATH", "")):
+        raise FileNotFoundError(f"{command[0]} command not found in PATH.")
+    process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=False, env=env)
+    return process.stdout.decode("utf-8", errors="replace")
+
+def error_rate(errors):
+    '''Returns the fraction of the requests of an iteration that failed with a non-2xx or 3xx response or a socket error'''
+    socket_errors = errors["connect"] + errors["read"] + errors["write"] + errors["timeout"]
+    attempts = errors["requests"] + socket_errors
+    return (errors["non_2xx_3xx"] + socket_errors) / attempts if attempts > 0 else 0
+
+def exceeds_error_rate(result, max_error_rate, fail_on_error_rate, description):
+    '''
+    Checks whether the error rate of an iteration exceeds the maximum error rate, in which case its throughput is
+    inflated by the errors. Raises ValueError instead if the benchmark should fail on such iterations.
+    '''
+    if max_error_rate is None or result.get("error_rate") is None or result["error_rate"] <= max_error_rate:
+        return False
+    message = f"Error rate of {description} is {result['error_rate'] * 100:.2f}%, exceeding the maximum error rate of {max_error_rate * 100:.2f}%. Errors: {result['errors']}"
+    if fail_on_error_rate:
+        raise ValueError(message)
+    log.warning(message)
+    return True
+
 class AbstractLoadGenerator:
+    @classmethod
+    @abstractmethod
+    def probe(cls, env):
+        '''
+        Probes the installed load generator. Called only once per harness run.
+        Returns a pair of the version of the load generator and a map of its capabilities, containing a boolean for
+        each of LOAD_GENERATOR_CAPABILITIES and possibly tool-specific command-line options detected while probing.
+        Raises FileNotFoundError or ValueError if the load generator is not installed or is not usable.
+        '''
+        pass
+
     @abstractmethod
     def measure(self):
         '''
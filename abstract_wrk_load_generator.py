@@ -1,6 +1,12 @@
-from abstract_load_generator import AbstractLoadGenerator
+from abstract_load_generator import AbstractLoadGenerator, error_rate
+from load_sampler import write_sampling_script, parse_time_series, strip_samples
+from load_generator_monitor import LoadGeneratorMonitor, merge_cpu_usage
+import subprocess
 import re
 import logging as log
+import math
+import os
+import time
 
 class AbstractWrkLoadGenerator(AbstractLoadGenerator):
     def load_parser(self, measurement):
@@ -21,6 +27,198 @@ class AbstractWrkLoadGenerator(AbstractLoadGenerator):
             }
         }
 
+    def parse_request_stats(self, measurement):
+        """Parses the request errors, the transfer rate and the per-thread throughput reported by wrk/wrk2.
+
+        :param str measurement: The wrk/wrk2 output.
+        :return: Map of the parsed statistics, stored next to the throughput/latency results of the iteration.
+        :rtype: dict
+        """
+        errors = self.parse_errors(measurement)
+        return {
+            "errors": errors,
+            "error_rate": error_rate(errors),
+            "transfer_per_second": self.parse_transfer_rate(measurement),
+            "requests_per_thread": self.parse_thread_throughput(measurement),
+        }
+
+    def parse_errors(self, measurement):
+        """Parses the number of completed requests, of responses with a non-2xx or 3xx status and of socket errors.
+
+        wrk counts the responses with an error status as completed requests, so they are included in Requests/sec.
+        The "Socket errors" and "Non-2xx or 3xx responses" lines are only printed if such errors occurred.
+        """
+        errors = {"requests": self.parse_total_requests(measurement) or 0, "non_2xx_3xx": 0, "connect": 0, "read": 0, "write": 0, "timeout": 0}
+        non_success = re.findall(r"Non-2xx or 3xx responses: (\d+)", measurement)
+        if len(non_success) == 1:
+            errors["non_2xx_3xx"] = int(non_success[0])
+        socket_errors = re.findall(r"Socket errors: connect (\d+), read (\d+), write (\d+), timeout (\d+)", measurement)
+        if len(socket_errors) == 1:
+            errors["connect"], errors["read"], errors["write"], errors["timeout"] = [int(count) for count in socket_errors[0]]
+        return errors
+
+    def parse_transfer_rate(self, measurement):
+        """Parses the Transfer/sec line, returning the number of bytes read per second, or None if it is missing."""
+        transfer = re.findall(r"Transfer/sec: +(\d+\.?\d*)([KMGTP]?)B", measurement)
+        if len(transfer) != 1:
+            return None
+        number, unit = transfer[0]
+        return float(number) * (1024 ** " KMGTP".index(unit or " "))
+
+    def parse_thread_throughput(self, measurement):
+        """Parses the per-thread Req/Sec statistics, or returns None if they are missing."""
+        thread_stats = re.findall(r"\s\s\s\sReq/Sec\s+(\d+\.?\d*\w*)\s+(\d+\.?\d*\w*)\s+(\d+\.?\d*\w*)\s+(\d+\.?\d*)%", measurement)
+        if len(thread_stats) != 1:
+            return None
+        avg, stdev, max_throughput, within_stdev = thread_stats[0]
+        return {
+            "avg": self.throughput_to_unit(avg),
+            "stdev": self.throughput_to_unit(stdev),
+            "max": self.throughput_to_unit(max_throughput),
+            "+/- stdev": float(within_stdev),
+        }
+
+    def parse_total_requests(self, measurement):
+        total_requests = re.findall(r"(\d+) requests in", measurement)
+        if len(total_requests) != 1:
+            return None
+        return int(total_requests[0])
+
+    def fan_out(self, threads, connections, rate=None):
+        """Splits the threads, connections and request rate among the wrk processes run side by side, each pinned to a disjoint set of CPUs.
+
+        :param number threads: Total number of threads.
+        :param number connections: Total number of connections.
+        :param number rate: Total request rate (wrk2 only).
+        :return: List of (threads, connections, rate, cpus) tuples, one per wrk process. cpus is None if the process is not pinned.
+        :rtype: list
+        """
+        processes = getattr(self._config, "load_generator_processes", 1)
+        cpus = getattr(self._config, "load_generator_cpus", None)
+        shares = []
+        for i in range(processes):
+            process_connections = self._share(int(connections), processes, i)
+            # wrk requires at least one connection per thread
+            process_threads = min(max(1, self._share(int(threads), processes, i)), process_connections)
+            process_rate = None if rate is None else max(1, self._share(int(rate), processes, i))
+            process_cpus = None if cpus is None else cpus[i * len(cpus) // processes:(i + 1) * len(cpus) // processes]
+            shares.append((process_threads, process_connections, process_rate, process_cpus))
+        return shares
+
+    def _share(self, total, parts, index):
+        """Returns the share of the part with the given index when splitting the total into (almost) equal integer parts."""
+        return total // parts + (1 if index < total % parts else 0)
+
+    def run_processes(self, build_command, threads, connections, rate=None, script=None):
+        """Runs the wrk processes of an iteration side by side and waits for all of them to finish.
+
+        If sampling is enabled, the benchmark script is wrapped by the sampling script (see `load_sampler`).
+
+        :param function build_command: Builds the command of a single wrk process from its number of threads, connections, request rate and script.
+        :param number threads: Total number of threads.
+        :param number connections: Total number of connections.
+        :param number rate: Total request rate (wrk2 only).
+        :param os.path script: The benchmark script, None if the benchmark has no script.
+        :return: The commands, outputs and exit codes of the wrk processes, the number of threads of each process, the
+            recorded time series (None if sampling is disabled) and the CPU usage of the load generator (None if it could not be monitored).
+        :rtype: (list, list, list, list, list, dict)
+        """
+        shares = self.fan_out(threads, connections, rate)
+        sampling_script = None
+        if self._sampling_interval > 0:
+            max_outstanding = max(math.ceil(share_connections / share_threads) for share_threads, share_connections, _, _ in shares)
+            sampling_script = write_sampling_script(self._output_dir, self._sampling_interval, max_outstanding, script)
+        commands = []
+        process_threads = []
+        for share_threads, share_connections, share_rate, share_cpus in shares:
+            command = build_command(share_threads, share_connections, share_rate, sampling_script or script)
+            if share_cpus is not None:
+                command = ["taskset", "-c", ",".join(str(cpu) for cpu in share_cpus)] + command
+            commands.append(command)
+            process_threads.append(share_threads)
+        try:
+            ts_start = time.time()
+            self._wrk_processes = []
+            for command in commands:
+                log.info(f"Running load generator command:\n{' '.join(command)}")
+                self._wrk_processes.append(subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=False, env=self._env))
+            outputs, cpu_usage = self.wait_for_completion(self._wrk_processes)
+            ts_end = time.time()
+        finally:
+            if sampling_script is not None:
+                os.remove(sampling_script)
+        time_series = None
+        if sampling_script is not None:
+            time_series = parse_time_series(outputs, self._sampling_interval, ts_start, ts_end)
+            outputs = [strip_samples(output) for output in outputs]
+        exit_codes = [process.returncode for process in self._wrk_processes]
+        return commands, outputs, exit_codes, process_threads, time_series, cpu_usage
+
+    def wait_for_completion(self, processes):
+        """Waits for the wrk processes to finish, monitoring their CPU usage during the iteration.
+
+        :param list processes: The wrk processes (subprocess.Popen) running side by side.
+        :return: The outputs of the wrk processes and the CPU usage of the wrk processes (None if it could not be monitored).
+        :rtype: (list, dict)
+        """
+        monitors = [LoadGeneratorMonitor(process, self._tool_name(process)) for process in processes]
+        for monitor in monitors:
+            monitor.start()
+        outputs = [process.stdout.read().decode("utf-8") for process in processes]
+        # The monitors finish once the processes exit, before they are reaped
+        for monitor in monitors:
+            monitor.join()
+        for process in processes:
+            process.wait()
+        return outputs, merge_cpu_usage([monitor.cpu_usage() for monitor in monitors])
+
+    def _tool_name(self, process):
+        """Returns the name of the load generator run by the process, skipping the taskset prefix."""
+        return process.args[3] if process.args[0] == "taskset" else process.args[0]
+
+    def join_commands(self, commands):
+        """Joins the commands of the wrk processes run side by side into a single string."""
+        return " & ".join(" ".join(command) for command in commands)
+
+    def join_outputs(self, commands, outputs):
+        """Joins the outputs of the wrk processes run side by side, preceding each output with the command of its process."""
+        if len(outputs) == 1:
+            return outputs[0]
+        return "\n".join(f"# Process {i+1}/{len(outputs)}: {' '.join(command)}\n{output}" for i, (command, output) in enumerate(zip(commands, outputs)))
+
+    def merge_request_stats(self, request_stats, process_threads):
+        """Merges the request statistics of the wrk processes run side by side.
+
+        The errors and transfer rates are summed up. The per-thread throughput statistics are pooled over all the threads
+        of all the processes, apart from the percentage of threads within one standard deviation, which cannot be pooled.
+
+        :param list request_stats: Request statistics of each wrk process, as returned by parse_request_stats.
+        :param list process_threads: Number of threads of each wrk process.
+        :rtype: dict
+        """
+        if len(request_stats) == 1:
+            return request_stats[0]
+        errors = {key: sum(stats["errors"][key] for stats in request_stats) for key in request_stats[0]["errors"]}
+        transfer_rates = [stats["transfer_per_second"] for stats in request_stats]
+        thread_stats = [stats["requests_per_thread"] for stats in request_stats]
+        requests_per_thread = None
+        if None not in thread_stats:
+            total_threads = sum(process_threads)
+            avg = sum(threads * stats["avg"] for threads, stats in zip(process_threads, thread_stats)) / total_threads
+            second_moment = sum(threads * (stats["stdev"] ** 2 + stats["avg"] ** 2) for threads, stats in zip(process_threads, thread_stats)) / total_threads
+            requests_per_thread = {
+                "avg": avg,
+                "stdev": max(0, second_moment - avg ** 2) ** 0.5,
+                "max": max(stats["max"] for stats in thread_stats),
+                "+/- stdev": None,
+            }
+        return {
+            "errors": errors,
+            "error_rate": error_rate(errors),
+            "transfer_per_second": None if None in transfer_rates else sum(transfer_rates),
+            "requests_per_thread": requests_per_thread,
+        }
+
     def throughput_to_unit(self, str_number):
         number, unit = re.findall(r"(\d+\.?\d*)(\w*)", str_number)[0]
         if unit == 'k':
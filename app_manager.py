@@ -60,15 +60,19 @@ class AppManager:
         self._app_process = None
         self._start_ts = None
 
-    def start_app(self, cmd_app_prefix=None, cmd_app_prefix_init_sleep=None, dummy_run_after_memory_refresh=False, lazy_app_process_detection=False):
+    def start_app(self, cmd_app_prefix=None, cmd_app_prefix_init_sleep=None, dummy_run_after_memory_refresh=False, lazy_app_process_detection=False, app_port=None):
         """Starts the application process by instantiating a subprocess invoking the app JAR/executable.
 
+        The port the app should serve on is passed to it as the ${BARISTA_APP_PORT} variable, which is replaced in the
+        command and set in the environment of the app.
+
         :param list cmd_app_prefix: Prefix to be prepended to the command starting the application process.
         :param number cmd_app_prefix_init_sleep: Sleep time, in seconds, for the prefix command to start the application process.
         :param boolean lazy_app_process_detection: Whether the `app_process` property should be initialized
             during this method invocation. Should be set to `True` if the property will not be accessed.
         :param boolean dummy_run_after_memory_refresh: Whether to run a dummy iteration after memory refresh to prevent
             side effects (e.g., page faults) caused by the command prefix to be measured during benchmark execution.
+        :param number app_port: The port the app should serve on. Defaults to the endpoint port.
         """
         if self.config.memory_refresh:
             self._memory_refresh()
@@ -106,8 +110,10 @@ class AppManager:
             # Check for bad cases
             raise ValueError(f"{self.config.mode} flag not supported")
 
+        app_port = str(app_port if app_port is not None else self.config.endpoint_port)
         expanded_command = replace_env_vars(command, {
-            "BENCHMARK_HOME": self._config.benchmark_directory()
+            "BENCHMARK_HOME": self._config.benchmark_directory(),
+            "BARISTA_APP_PORT": app_port,
         })
 
         if dummy_run_after_memory_refresh and self.config.memory_refresh and cmd_app_prefix is not None:
@@ -120,7 +126,7 @@ class AppManager:
         self._app_command = expanded_command[cmd_app_prefix_length:]
 
         self._start_ts = time.perf_counter()
-        self._root_process = subprocess.Popen(expanded_command, start_new_session=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,shell = False)
+        self._root_process = subprocess.Popen(expanded_command, start_new_session=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,shell = False, env=dict(os.environ, BARISTA_APP_PORT=app_port))
 
         if lazy_app_process_detection:
             self._app_process = None
@@ -201,18 +207,13 @@ class AppManager:
         time_limit = 5
 
         tree_root = process_info.get_process(root_pid)
+        proc_tree = [tree_root]
         while time.time() < start_time + time_limit:
             try:
                 proc_tree = [tree_root] + tree_root.children(recursive=True)
-                # Look for exact match
-                for p in proc_tree:
-                    if p.cmdline() == cmdline:
-                        return p.pid
-                # Look for executable match
-                for p in proc_tree:
-                    process_cmdline = p.cmdline()
-                    if len(process_cmdline) > 0 and process_cmdline[0] == cmdline[0]:
-                        return p.pid
+                pid = self._match_cmdline_proc(proc_tree, cmdline)
+                if pid is not None:
+                    return pid
             except (FileNotFoundError, ProcessLookupError):
                 pass
             # Sleep before retrying
@@ -223,6 +224,41 @@ class AppManager:
             p.terminate()
         raise AppProcessFinishedUnexpectedly(f"Could not find app process using expected cmdline: \"{' '.join(cmdline)}\" after trying for {time_limit} seconds! Terminated all spawned processes!")
 
+    def _match_cmdline_proc(self, proc_tree, cmdline):
+        """Returns the process ID of the process matching the command-line in the process tree, None if there is none.
+
+        :param list proc_tree: Processes of the process tree.
+        :param list cmdline: Command-line of the process to be found.
+        :rtype: number
+        """
+        # Look for exact match
+        for p in proc_tree:
+            if p.cmdline() == cmdline:
+                return p.pid
+        # Look for executable match
+        for p in proc_tree:
+            process_cmdline = p.cmdline()
+            if len(process_cmdline) > 0 and process_cmdline[0] == cmdline[0]:
+                return p.pid
+        return None
+
+    def poll_app_process(self):
+        """Looks for the app process in the process tree of the root process once, without waiting for the root process to start it.
+
+        Sets the `app_process` property to the process found, so it can be used to detect when the app process was executed.
+
+        :return: The app process, None if it was not executed yet.
+        """
+        if self._app_process is None:
+            try:
+                tree_root = process_info.get_process(self.root_process.pid)
+                app_pid = self._match_cmdline_proc([tree_root] + tree_root.children(recursive=True), self._app_command)
+            except (FileNotFoundError, ProcessLookupError):
+                return None
+            if app_pid is not None:
+                self._app_process = process_info.get_process(app_pid)
+        return self._app_process
+
     @property
     def config(self):
         return self._config
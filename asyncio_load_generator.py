@@ -0,0 +1,315 @@
+"""Implements a pure-Python load generator based on asyncio.
+
+The load generator is intended for hosts on which the wrk/wrk2 tools cannot be built and for low-rate measurements,
+as its maximum request rate is bounded by the Python interpreter (usually to a few thousand requests per second).
+Requests are sent over a pool of keep-alive HTTP/1.1 connections, in one of two modes:
+ * closed loop (no rate given) - every connection sends a new request as soon as it receives the previous response,
+   equivalent to the load generated by wrk
+ * open loop (rate given) - requests are scheduled at a constant rate or with Poisson arrivals, independently of the
+   responses, equivalent to the load generated by wrk2. The latency of each request is measured from the time it was
+   scheduled to be sent, so the time a request waits for a free connection is included, correcting for coordinated omission
+"""
+from abstract_load_generator import AbstractLoadGenerator, error_rate
+from load_generator_monitor import summarize_cpu_usage
+from results import LatencyHistogram, LATENCY_PERCENTILES
+from urllib.parse import urlsplit
+import asyncio
+import logging as log
+import platform
+import random
+import ssl
+import time
+
+CONSTANT_ARRIVALS = "constant"
+POISSON_ARRIVALS = "poisson"
+# Time after which a request without a response is recorded as a timeout, in seconds (the same as the wrk default)
+REQUEST_TIMEOUT = 2
+
+class AsyncioLoadGenerator(AbstractLoadGenerator):
+    def __init__(self, config, output_dir, endpoint, env, sampling_interval=0, capabilities=None):
+        self._config = config
+        self._output_dir = output_dir
+        self._endpoint = endpoint
+        self._url = urlsplit(endpoint if "://" in endpoint else f"http://{endpoint}")
+        self._connections = int(config.connections)
+        self._arrival_distribution = getattr(config, "arrival_distribution", CONSTANT_ARRIVALS)
+        self._sampling_interval = sampling_interval
+        self._env = env
+
+    @classmethod
+    def probe(cls, env):
+        # The load generator is a part of the harness, so it is always available
+        capabilities = {"rate_control": True, "closed_loop": True, "http2": False, "lua": False, "histogram": True}
+        return f"asyncio (Python {platform.python_version()})", capabilities
+
+    def measure(self, rate=None, duration=None, script=None):
+        if script is not None:
+            raise ValueError(f"The asyncio load generator does not support Lua scripts! Got script '{script}'.")
+        if duration is None:
+            duration = self._config.iteration_duration
+
+        if rate is None:
+            log.info(f"Measuring throughput with the asyncio load generator for {duration}s over {self._connections} connections")
+        else:
+            log.info(f"Measuring latency with the asyncio load generator for {duration}s at {rate} requests/sec ({self._arrival_distribution} arrivals) over {self._connections} connections")
+        run = _LoadRun(self._url, self._connections, rate, duration, self._arrival_distribution, self._sampling_interval)
+        # The event loop runs in the current thread, which is saturated if it is busy for the whole iteration
+        start_cpu_time, start_time = time.thread_time(), time.perf_counter()
+        asyncio.run(run.execute())
+        cpu_percent = 100.0 * (time.thread_time() - start_cpu_time) / (time.perf_counter() - start_time)
+
+        command = self.describe_command(rate, duration)
+        output = run.report(command)
+        result = {
+            "throughput": {"throughput": run.throughput},
+            "p_values": run.histogram.p_values(),
+            "histogram": run.histogram,
+            "command": command,
+            "stdout": output,
+            "exit_code": 0,
+            "errors": run.errors,
+            "error_rate": error_rate(run.errors),
+            "load_generator_cpu": summarize_cpu_usage(cpu_percent, cpu_percent, 1, 1, "asyncio"),
+        }
+        if self._sampling_interval > 0:
+            result["time_series"] = run.time_series
+        return result
+
+    def describe_command(self, rate, duration):
+        """Returns a command-line-like description of the load generated, reported in place of the wrk/wrk2 command."""
+        description = f"asyncio -d {duration}s -c {self._connections}"
+        if rate is not None:
+            description += f" -R {rate} --arrivals {self._arrival_distribution}"
+        return f"{description} {self._endpoint}"
+
+    def parse_measurements(self, measurement):
+        return measurement["throughput"]
+
+    def dump_stdout(self, output_folder, output, name):
+        output_file = f"{output_folder}/{name}-dump.txt"
+        log.info(f"Dumping asyncio load generator outputs to file '{output_file}' and to stdout:\n{output}")
+        with open(output_file, "w") as file:
+            file.write(output)
+
+    def cleanup(self):
+        log.debug("no cleanup needed for asyncio load generator")
+
+class _LoadRun:
+    """State of a single load-testing iteration of the asyncio load generator."""
+    def __init__(self, url, connections, rate, duration, arrival_distribution, sampling_interval):
+        self._url = url
+        self._connections = connections
+        self._rate = rate
+        self._duration = duration
+        self._arrival_distribution = arrival_distribution
+        self._sampling_interval = sampling_interval
+        path = url.path if url.path else "/"
+        if url.query:
+            path += f"?{url.query}"
+        self._request = f"GET {path} HTTP/1.1\r\nHost: {url.netloc}\r\n\r\n".encode("ascii")
+        self._histogram = LatencyHistogram()
+        self._completed = 0
+        self._non_success = 0
+        self._errors = {"connect": 0, "read": 0, "write": 0, "timeout": 0}
+        self._unsent = 0
+        self._elapsed = 0
+        self._window = None
+        self._time_series = []
+
+    async def execute(self):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        end = start + self._duration
+        self._window = [time.time(), 0, []]
+        if self._rate is None:
+            workers = [self._closed_loop_worker(end) for _ in range(self._connections)]
+        else:
+            queue = asyncio.Queue()
+            workers = [self._schedule(queue, start, end)] + [self._open_loop_worker(queue, end) for _ in range(self._connections)]
+        await asyncio.gather(*workers)
+        self._elapsed = loop.time() - start
+        self._close_window(time.time())
+
+    async def _schedule(self, queue, start, end):
+        """Puts the intended send time of every request into the queue, following the arrival distribution."""
+        loop = asyncio.get_running_loop()
+        intended = start
+        while intended < end:
+            delay = intended - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # Enqueue every request that is due, the event loop may have woken up late
+            now = loop.time()
+            while intended <= now and intended < end:
+                queue.put_nowait(intended)
+                intended += self._next_interarrival_time()
+        for _ in range(self._connections):
+            queue.put_nowait(None)
+
+    def _next_interarrival_time(self):
+        if self._arrival_distribution == POISSON_ARRIVALS:
+            return random.expovariate(self._rate)
+        return 1 / self._rate
+
+    async def _open_loop_worker(self, queue, end):
+        loop = asyncio.get_running_loop()
+        connection = None
+        while True:
+            intended = await queue.get()
+            if intended is None:
+                break
+            if loop.time() >= end:
+                # The request was still waiting for a free connection at the end of the test: it is recorded with the time it
+                # waited, otherwise the latencies of a saturated app would only include the requests that got through
+                self._unsent += 1
+                self._histogram.record(round((end - intended) * 1000 * 1000))
+                continue
+            connection = await self._send(connection, intended)
+        await self._close(connection)
+
+    async def _closed_loop_worker(self, end):
+        loop = asyncio.get_running_loop()
+        connection = None
+        while loop.time() < end:
+            connection = await self._send(connection, loop.time())
+        await self._close(connection)
+
+    async def _send(self, connection, intended):
+        """Sends a request and records its latency measured from the intended send time. Returns the connection to reuse."""
+        loop = asyncio.get_running_loop()
+        if connection is None:
+            try:
+                ssl_context = None
+                if self._url.scheme == "https":
+                    # Certificates are not verified, the same as with wrk
+                    ssl_context = ssl.create_default_context()
+                    ssl_context.check_hostname = False
+                    ssl_context.verify_mode = ssl.CERT_NONE
+                port = self._url.port if self._url.port else (443 if self._url.scheme == "https" else 80)
+                connection = await asyncio.open_connection(self._url.hostname, port, ssl=ssl_context)
+            except OSError:
+                self._errors["connect"] += 1
+                await asyncio.sleep(0.001)
+                return None
+        reader, writer = connection
+        try:
+            writer.write(self._request)
+            await writer.drain()
+        except OSError:
+            self._errors["write"] += 1
+            await self._close(connection)
+            return None
+        try:
+            status, keep_alive = await asyncio.wait_for(self._read_response(reader), REQUEST_TIMEOUT)
+        except asyncio.TimeoutError:
+            self._errors["timeout"] += 1
+            await self._close(connection)
+            return None
+        except (OSError, EOFError, asyncio.IncompleteReadError, ValueError):
+            self._errors["read"] += 1
+            await self._close(connection)
+            return None
+        latency_us = (loop.time() - intended) * 1000 * 1000
+        self._record(latency_us, status)
+        if not keep_alive:
+            await self._close(connection)
+            return None
+        return connection
+
+    async def _read_response(self, reader):
+        """Reads a single HTTP/1.1 response. Returns the status code and whether the connection can be reused."""
+        status_line = await reader.readline()
+        if not status_line:
+            raise EOFError("Connection closed by the server")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        keep_alive = headers.get("connection", "").lower() != "close"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                chunk_size = int((await reader.readline()).split(b";")[0], 16)
+                await reader.readexactly(chunk_size + 2)
+                if chunk_size == 0:
+                    break
+        elif "content-length" in headers:
+            await reader.readexactly(int(headers["content-length"]))
+        elif status >= 200 and status not in (204, 304):
+            # The body is delimited by the end of the connection
+            await reader.read()
+            keep_alive = False
+        return status, keep_alive
+
+    async def _close(self, connection):
+        if connection is None:
+            return
+        writer = connection[1]
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    def _record(self, latency_us, status):
+        self._histogram.record(round(latency_us))
+        self._completed += 1
+        if status >= 400:
+            self._non_success += 1
+        if self._sampling_interval > 0:
+            now = time.time()
+            if now - self._window[0] >= self._sampling_interval:
+                self._close_window(now)
+            self._window[1] += 1
+            self._window[2].append(latency_us / 1000)
+
+    def _close_window(self, now):
+        """Records the sample of the current sampling interval and starts the next one."""
+        window_start, count, latencies = self._window
+        if self._sampling_interval > 0 and now > window_start and (count or not self._time_series):
+            self._time_series.append({
+                "time": now * 1000,
+                "duration": now - window_start,
+                "requests": count,
+                "requests_per_second": count / (now - window_start),
+                "latency_avg": sum(latencies) / len(latencies) if latencies else None,
+                "latency_max": max(latencies) if latencies else None,
+            })
+        self._window = [now, 0, []]
+
+    @property
+    def histogram(self):
+        return self._histogram
+
+    @property
+    def throughput(self):
+        return self._completed / self._elapsed if self._elapsed > 0 else 0
+
+    @property
+    def time_series(self):
+        return self._time_series
+
+    @property
+    def errors(self):
+        return {"requests": self._completed, "non_2xx_3xx": self._non_success, **self._errors}
+
+    def report(self, command):
+        """Returns a report of the iteration, in a format resembling the wrk2 output."""
+        lines = [f"Running {self._duration}s test @ {self._url.geturl()}", f"  {command}"]
+        if self._completed:
+            lines.append("  Latency Distribution (HdrHistogram - Recorded Latency)")
+            for percentile, latency in self._histogram.p_values(LATENCY_PERCENTILES).items():
+                lines.append(f"{percentile:7.3f}% {latency:8.2f}ms")
+        lines.append("----------------------------------------------------------")
+        lines.append(f"  {self._completed} requests in {self._elapsed:.2f}s")
+        if any(self._errors.values()):
+            lines.append(f"  Socket errors: connect {self._errors['connect']}, read {self._errors['read']}, write {self._errors['write']}, timeout {self._errors['timeout']}")
+        if self._non_success:
+            lines.append(f"  Non-2xx or 3xx responses: {self._non_success}")
+        if self._unsent:
+            lines.append(f"  {self._unsent} scheduled requests could not be sent before the end of the test, their latency is the time they waited")
+        lines.append(f"Requests/sec: {self.throughput:.2f}")
+        return "\n".join(lines) + "\n"
@@ -14,6 +14,12 @@ The interface offers an extensive set of options, enabling easy configuration of
 from benchmark_registry import BenchmarkRegistry
 from configuration import Configuration, ServiceMode
 from load_tester import Benchmark
+from load_generators import verify_load_generators
+from jvm_archive import JvmArchiveSupplier
+from native_pgo import NativePgoSupplier
+from native_layers import NativeLayerSupplier
+from results import compile_jvm_archive_comparison, compile_native_pgo_comparison, compile_native_layer_comparison, comparison_to_csv, dump_result_json, GENERAL_RESULTS_JSON_FILE, JVM_ARCHIVE_COMPARISON_FILE, NATIVE_PGO_COMPARISON_FILE, NATIVE_LAYER_COMPARISON_FILE
+from logging_formatting import log_comparison
 import subprocess_runner
 import process_info
 import logging as log
@@ -28,10 +34,25 @@ class AppExecutableSupplier:
     """Supplies the app executable, fetching, and possibly building, the executable file, depending on the execution mode."""
     artifact_group = "artifact"
     image_name_group = "image_name"
+    base_layer_group = "base_layer"
+    base_layer_library_group = "base_layer_library"
+    app_layer_group = "app_layer"
 
     def __init__(self, config, vm):
         self._config = config
         self._vm = vm
+        self._archive_dict = None
+        self._build_times = {}
+
+    @property
+    def nib_file(self):
+        """Path to the fetched app Native Image Bundle, None if it was not fetched."""
+        return self._archive_dict[AppExecutableSupplier.artifact_group] if self._archive_dict is not None else None
+
+    @property
+    def build_times(self):
+        """Durations of the native image builds, in seconds, by image name."""
+        return self._build_times
 
     def supply_executable(self):
         """Supplies the app executable, fetching, and possibly building, the executable file, depending on the execution mode.
@@ -39,13 +60,52 @@ class AppExecutableSupplier:
         :return: Path to the app executable.
         :rtype: os.path
         """
-        archive_dict = self._fetch_build_artifact()
+        self._archive_dict = self._fetch_build_artifact()
         if self._config.mode == ServiceMode.JVM:
-            return archive_dict[AppExecutableSupplier.artifact_group]
-        image_path = self._build_native_image(archive_dict)
+            return self._archive_dict[AppExecutableSupplier.artifact_group]
+        return self.build_image(self._config.bench_name, self._config.build_options)
+
+    def build_image(self, image_name, build_options):
+        """Builds an app native image from the previously fetched Native Image Bundle.
+
+        :param string image_name: Name of the image to build.
+        :param list build_options: Options to be propagated to the native image build command.
+        :return: Path to the app image.
+        :rtype: os.path
+        """
+        image_path = self._build_native_image(self._archive_dict, image_name, build_options)
+        # The duration of the build that produced the image, even if the image was restored from the image cache
+        self._build_times[image_name] = self._vm.builds[-1]["build_duration"]
         self._verify_app_image_file(image_path)
         return image_path
 
+    def fetch_layer_nibs(self):
+        """Executes the layer nibs fetch command of the "build.sh" script of the microservice app.
+
+        :return: Dictionary containing the paths to the base layer and app layer Native Image Bundles, and the name of the base layer shared library.
+        :rtype: dict
+        """
+        app_dir = self._config.benchmark_registry.get_benchmark_dir(self._config.bench_name)
+        app_build_script = os.path.join(app_dir, "build.sh")
+        # Build scripts ignore options they do not know, so the support of the option is checked in the help message first
+        if "--get-layer-nibs" not in subprocess_runner.run([app_build_script, "--help"]).stdout.decode("utf-8"):
+            raise ValueError(f"The '{self._config.bench_name}' benchmark does not support layered native images!")
+        cmd = [app_build_script, "--get-layer-nibs"]
+        output_pattern = (f"base layer nib file path is: (?P<{AppExecutableSupplier.base_layer_group}>[^\n]+)\n"
+                          f"base layer library name is: (?P<{AppExecutableSupplier.base_layer_library_group}>[^\n]+)\n"
+                          f"app layer nib file path is: (?P<{AppExecutableSupplier.app_layer_group}>[^\n]+)\n")
+        log.info(f"Locating the app layer nibs with command \"{' '.join(cmd)}\"")
+        proc = subprocess_runner.run(cmd)
+        output_match = re.search(output_pattern, proc.stdout.decode("utf-8"))
+        if not output_match:
+            raise ValueError(f"Could not extract the app layer nibs from the command output! Expected to match pattern {repr(output_pattern)}.")
+        layer_dict = output_match.groupdict()
+        for nib_file in [layer_dict[AppExecutableSupplier.base_layer_group], layer_dict[AppExecutableSupplier.app_layer_group]]:
+            if not os.path.isfile(nib_file):
+                barista_build_script = os.path.abspath(os.path.join(os.path.dirname(__file__), "build"))
+                raise FileNotFoundError(f"App layer nib could not be found at \"{nib_file}\". Make sure you've previously built the application, you can use the command:\n\t{barista_build_script} {self._config.bench_name}")
+        return layer_dict
+
     def _fetch_build_artifact(self):
         """Executes a fetch command of the "build.sh" script of the microservice app and returns a dictionary containing the path to the build artifact and potentially application specific information.
 
@@ -73,17 +133,19 @@ class AppExecutableSupplier:
             raise FileNotFoundError(f"App build artifact could not be found at \"{app_exec_path}\". Make sure you've previously built the application, you can use the command:\n\t{barista_build_script} {self._config.bench_name}")
         return match_dict
 
-    def _build_native_image(self, nib_dict):
+    def _build_native_image(self, nib_dict, image_name, build_options):
         """Builds the app native image from the app Native Image Bundle file.
 
         Potentially copies the built app image as a workaround to a known GraalVM Native Image bug.
 
         :param os.path nib_dict: Dictionary containing path of the Native Image Bundle to build and potentially a hard-coded image name.
+        :param string image_name: Name of the image to build.
+        :param list build_options: Options to be propagated to the native image build command.
         :return: Absolute path to the newly built native image.
         :rtype: os.path
         """
         assert isinstance(self._vm, NativeImageVM)
-        image_path = self._vm.native_image_build(nib_dict[AppExecutableSupplier.artifact_group], self._config.bench_name, build_options=self._config.build_options, verify_app_image_existance=False)
+        image_path = self._vm.native_image_build(nib_dict[AppExecutableSupplier.artifact_group], image_name, build_options=build_options, verify_app_image_existance=False)
         if nib_dict.get(AppExecutableSupplier.image_name_group) is None:
             return image_path
 
@@ -146,6 +208,27 @@ class BenchmarkHarness:
     also by the 'barista-execution-context' file, if one is present in the
     directory of the currently running benchmark.
 
+    In the JVM archive sub-mode (see '--jvm-archive'), the execution step first
+    supplies the archive, training it if it is not cached yet, then runs the startup and warmup phases of the app without the archive, saving
+    their results to the 'jvm-baseline' subdirectory of the output directory,
+    and then benchmarks the app with the archive. The startup, startup RSS and
+    warmup results of both runs are reported side by side.
+
+    In the native PGO sub-mode (see '--native-pgo'), the execution step first
+    supplies the image optimized with profile-guided optimization, collecting
+    the profile with an instrumented image if it is not cached yet, then
+    benchmarks the image built without the profile, saving its results to the
+    'native-baseline' subdirectory of the output directory, and then
+    benchmarks the optimized image. The throughput, latency and RSS results of
+    both images are reported side by side.
+
+    In the native layered sub-mode (see '--native-layered'), the execution step
+    first supplies the app layer image, building the base layer if it is not
+    cached yet, then runs the startup and warmup phases of the monolithic
+    image, saving their results to the 'native-monolithic' subdirectory of the
+    output directory, and then benchmarks the layered image. The build time,
+    image size, startup and RSS of both images are reported side by side.
+
     The cleanup step is performed last, as long as the 'cleanup.sh' script
     exists in the benchmark directory. The cleanup step is skipped if no such
     script exists or if the '--skip-cleanup' CLI option is set. The purpose of
@@ -154,9 +237,16 @@ class BenchmarkHarness:
     should be released (e.g. the auxilliary services should be stopped, the
     'barista-execution-context' file should be deleted).
     """
-    def __init__(self, config):
+    def __init__(self, config, jvm_archive_supplier=None, native_pgo_supplier=None, native_layer_supplier=None):
         self._config = config
+        self._jvm_archive_supplier = jvm_archive_supplier
+        self._jvm_archive = None
+        self._native_pgo_supplier = native_pgo_supplier
+        self._native_pgo = None
+        self._native_layer_supplier = native_layer_supplier
+        self._native_layers = None
         self._benchmark = None
+        self._baseline = None
 
     def run(self):
         self.run_prepare_if_exists()
@@ -174,13 +264,43 @@ class BenchmarkHarness:
             self._config.update_after_benchmark_prepare()
 
     def execute_benchmark(self):
+        if self._jvm_archive_supplier is not None:
+            self._jvm_archive = self._jvm_archive_supplier.supply_archive(self._config.app_executable)
+            log.info("Running the startup and warmup phases without the JVM archive")
+            baseline_folder = os.path.join(self._config.output_folder, "jvm-baseline")
+            os.makedirs(baseline_folder, exist_ok=True)
+            self._baseline = Benchmark(self._config, baseline_folder, load_phases=False)
+            self._run_with_cleanup_on_sigint(self._baseline)
+            log.info(f"Benchmarking with the {self._jvm_archive['kind']} archive at \"{self._jvm_archive['path']}\"")
+            self._config.vm_options = self._config.vm_options + self._jvm_archive["vm_options"]
+        if self._native_pgo_supplier is not None:
+            self._native_pgo = self._native_pgo_supplier.supply_image()
+            log.info("Benchmarking the app image built without the profile")
+            baseline_folder = os.path.join(self._config.output_folder, "native-baseline")
+            os.makedirs(baseline_folder, exist_ok=True)
+            self._baseline = Benchmark(self._config, baseline_folder)
+            self._run_with_cleanup_on_sigint(self._baseline)
+            log.info(f"Benchmarking the app image optimized with the profile at \"{self._native_pgo['profile']}\"")
+            self._config.app_executable = self._native_pgo["image"]
+        if self._native_layer_supplier is not None:
+            self._native_layers = self._native_layer_supplier.supply_image()
+            log.info("Running the startup and warmup phases of the monolithic image")
+            baseline_folder = os.path.join(self._config.output_folder, "native-monolithic")
+            os.makedirs(baseline_folder, exist_ok=True)
+            self._baseline = Benchmark(self._config, baseline_folder, load_phases=False)
+            self._run_with_cleanup_on_sigint(self._baseline)
+            log.info(f"Benchmarking the app layer image built on top of the base layer at \"{self._native_layers['base_layer']}\"")
+            self._config.app_executable = self._native_layers["image"]
         self._benchmark = Benchmark(self._config)
+        self._run_with_cleanup_on_sigint(self._benchmark)
+
+    def _run_with_cleanup_on_sigint(self, benchmark):
         def _signal_handler(sig, frame):
             log.info("SIGINT detected cleaning up...")
-            self._benchmark._cleanup()
+            benchmark._cleanup()
             sys.exit(0)
         signal.signal(signal.SIGINT, _signal_handler)
-        self._benchmark.run()
+        benchmark.run()
 
     def run_cleanup_if_exists(self):
         cleanup_script = os.path.join(self._config.benchmark_registry.get_benchmark_dir(self._config.bench_name), "cleanup.sh")
@@ -190,6 +310,37 @@ class BenchmarkHarness:
 
     def final_report(self):
         self._benchmark.print_final_report_to_stdout()
+        if self._baseline is None:
+            return
+        if self._baseline.results is None or self._benchmark.results is None:
+            log.warning("Cannot compare the baseline run with the benchmarked run, as one of them did not finish")
+            return
+        if self._jvm_archive is not None:
+            comparison = compile_jvm_archive_comparison(self._baseline.results, self._benchmark.results)
+            archive_origin = "cached" if self._jvm_archive["cache_hit"] else f"trained in {self._jvm_archive['training_time']:.1f}s"
+            log.info(f"JVM archive results ({self._jvm_archive['kind']}, {archive_origin}), compared to the JVM without the archive:")
+            log_comparison(comparison, "jvm", self._jvm_archive["kind"].lower())
+            comparison_to_csv(self._config.output_folder, JVM_ARCHIVE_COMPARISON_FILE, comparison, "jvm", "jvm_archive")
+        if self._native_pgo is not None:
+            comparison = compile_native_pgo_comparison(self._baseline.results, self._benchmark.results)
+            profile_origin = "cached" if self._native_pgo["cache_hit"] else f"collected in {self._native_pgo['training_time']:.1f}s"
+            log.info(f"Profile-guided optimization results (profile {profile_origin}), compared to the image built without the profile:")
+            log_comparison(comparison, "native", "native-pgo")
+            comparison_to_csv(self._config.output_folder, NATIVE_PGO_COMPARISON_FILE, comparison, "native", "native_pgo")
+            # Attach the comparison to the results of the benchmarked run, so that both images are reported in one result
+            self._benchmark.results["native_pgo"] = dict(self._native_pgo, baseline=os.path.join("native-baseline", GENERAL_RESULTS_JSON_FILE), comparison=comparison)
+            dump_result_json(self._config.output_folder, self._benchmark.results)
+        if self._native_layers is not None:
+            comparison = compile_native_layer_comparison(self._baseline.results, self._benchmark.results, self._native_layers)
+            base_layer_origin = "cached" if self._native_layers["cache_hit"] else f"built in {self._native_layers['base_layer_build_time']:.1f}s"
+            log.info(f"Layered image results (base layer {base_layer_origin}), compared to the monolithic image:")
+            log_comparison(comparison, "monolithic", "layered")
+            monolithic_build_time = self._native_layers["monolithic_build_time"]
+            if monolithic_build_time is not None:
+                log.info(f"Building the app layer on top of the cached base layer saves {monolithic_build_time - self._native_layers['app_layer_build_time']:.1f}s of the {monolithic_build_time:.1f}s monolithic build")
+            comparison_to_csv(self._config.output_folder, NATIVE_LAYER_COMPARISON_FILE, comparison, "monolithic", "layered")
+            self._benchmark.results["native_layers"] = dict(self._native_layers, monolithic=os.path.join("native-monolithic", GENERAL_RESULTS_JSON_FILE), comparison=comparison)
+            dump_result_json(self._config.output_folder, self._benchmark.results)
 
 def main():
     benchmark_registry = BenchmarkRegistry()
@@ -199,11 +350,15 @@ def main():
     # verify process management setup
     process_info.get_process(os.getpid())
 
+    # probe the installed load generators once, verifying the ones used in the load-testing phases
+    verify_load_generators(config)
+
     # verify JVM distribution
     # provided with --java-home option or JAVA_HOME environment variable
     try:
         vm = get_vm(config.java_home)
         log.info(f"Version of the available JVM at java home:\n{vm.version}")
+        config.vm_version = vm.version
     except Exception:
         # If the user provided a natively-executable app, then no VM is necessary
         if config.mode != ServiceMode.NATIVE or config.app_executable is None:
@@ -214,10 +369,25 @@ def main():
         raise ValueError("'native-image' not found in your java home! In order to benchmark the app in the 'native' execution mode please provide a GraalVM distribution by using the '--java-home' option or setting the JAVA_HOME environment variable. Alternatively, you could provide the app executable using the '--app-executable' option.")
 
     if not config.app_executable:
+        if config.mode == ServiceMode.NATIVE:
+            if config.native_image_cache_enabled:
+                vm.enable_image_cache(config.native_image_cache_dir, config.native_image_cache_size)
+            config.native_image_builds = vm.builds
         supplier = AppExecutableSupplier(config, vm)
         config.app_executable = supplier.supply_executable()
 
-    harness = BenchmarkHarness(config)
+    native_pgo_supplier = None
+    if config.native_pgo:
+        native_pgo_supplier = NativePgoSupplier(config, vm, supplier)
+    native_layer_supplier = None
+    if config.native_layered:
+        native_layer_supplier = NativeLayerSupplier(config, vm, supplier)
+
+    jvm_archive_supplier = None
+    if config.jvm_archive is not None:
+        jvm_archive_supplier = JvmArchiveSupplier(config, vm)
+
+    harness = BenchmarkHarness(config, jvm_archive_supplier, native_pgo_supplier, native_layer_supplier)
     harness.run()
 
 if __name__ == "__main__":
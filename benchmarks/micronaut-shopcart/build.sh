@@ -15,13 +15,16 @@
 
 set -euxo pipefail
 if [ $# -gt 0 ] && [ $1 = "--help" ]; then
-  echo -e "Builds the project jar and then uses GraalVM to generate a nib file (Native Image Bundle)\n\nusage: build.sh [--help] [--skip-nib-generation] [--get-jar] [--get-nib] [--maven-options=MAVEN_OPTIONS]\n\noptions:\n\t--help\t\t\t\tshows this help message and exits\n\t--skip-nib-generation\t\tskips building the application nib (Native Image Bundle) file, only builds the jar\n\t--get-jar\t\t\tprints the path of the built jar without building anything. The path will be printed in the pattern of 'application jar file path is: <path>\\\n'\n\t--get-nib\t\t\tprints the path of the built nib (Native Image Bundle) file without building anything. The path will be printed in the pattern of 'application nib file path is: <path>\\\n'\n\t--maven-options=MAVEN_OPTIONS\tadditional options to pass to mvn when building maven projects"
+  echo -e "Builds the project jar and then uses GraalVM to generate a nib file (Native Image Bundle)\n\nusage: build.sh [--help] [--skip-nib-generation] [--get-jar] [--get-nib] [--get-layer-nibs] [--maven-options=MAVEN_OPTIONS]\n\noptions:\n\t--help\t\t\t\tshows this help message and exits\n\t--skip-nib-generation\t\tskips building the application nib (Native Image Bundle) file, only builds the jar\n\t--get-jar\t\t\tprints the path of the built jar without building anything. The path will be printed in the pattern of 'application jar file path is: <path>\\\n'\n\t--get-nib\t\t\tprints the path of the built nib (Native Image Bundle) file without building anything. The path will be printed in the pattern of 'application nib file path is: <path>\\\n'\n\t--get-layer-nibs\t\tprints the paths of the built base layer and app layer nib files and the name of the base layer shared library without building anything. They will be printed in the pattern of 'base layer nib file path is: <path>\\\nbase layer library name is: <name>\\\napp layer nib file path is: <path>\\\n'\n\t--maven-options=MAVEN_OPTIONS\tadditional options to pass to mvn when building maven projects"
   exit 0
 fi;
 DIR="$( cd -P "$( dirname "${BASH_SOURCE}" )" && pwd )"
 VERSION=0.3.10
 JAR="$DIR/target/shopcart-$VERSION.jar"
 NIB="$DIR/target/shopcart-$VERSION.nib"
+BASE_LAYER_NIB="$DIR/base-layer-target/layer0-shopcart-$VERSION.nib"
+BASE_LAYER_LIBRARY=libshopcartbaselayer
+APP_LAYER_NIB="$DIR/app-layer-target/layer1-shopcart-$VERSION.nib"
 if [ $# -gt 0 ] && [ $1 = "--get-jar" ]; then
   echo "application jar file path is: $JAR"
   exit 0
@@ -30,6 +33,12 @@ if [ $# -gt 0 ] && [ $1 = "--get-nib" ]; then
   echo "application nib file path is: $NIB"
   exit 0
 fi;
+if [ $# -gt 0 ] && [ $1 = "--get-layer-nibs" ]; then
+  echo "base layer nib file path is: $BASE_LAYER_NIB"
+  echo "base layer library name is: $BASE_LAYER_LIBRARY"
+  echo "app layer nib file path is: $APP_LAYER_NIB"
+  exit 0
+fi;
 maven_options=""
 for arg in "$@"
 do
@@ -43,3 +52,6 @@ if [ $# -gt 0 ] && [ $1 = "--skip-nib-generation" ]; then
 fi;
 "$DIR/mvnw" package -Dpackaging=native-image -f "$DIR/pom.xml" $maven_options
 "$DIR/mvnw" install -Dpackaging=native-image -f "$DIR/pom.xml" $maven_options
+# the base layer build installs the base layer jar the app layer build depends on
+"$DIR/mvnw" install -Dpackaging=native-image -Pbase-layer -f "$DIR/pom.xml" $maven_options
+"$DIR/mvnw" package -Dpackaging=native-image -Papp-layer -f "$DIR/pom.xml" $maven_options
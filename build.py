@@ -1,17 +1,141 @@
-"""Builds the Barista benchmarks."""
+"""Builds the Barista benchmarks.
+
+Benchmarks can be built concurrently, by a scheduler that runs up to a number of builds at a time, as long as the memory
+reserved for the running builds fits into a memory budget. Builds sharing a dependency cache (e.g. '~/.m2') that its
+build tool does not lock are never run at the same time. The output of each build is written to a log file of its own,
+and also streamed to the console if the builds run one at a time.
+Benchmarks whose sources and build inputs did not change since their last successful build, and whose artifacts still
+exist, are skipped.
+"""
 from argparse import ArgumentParser
+import hashlib
+import json
 import logging as log
 import os
+import re
+import subprocess
+import sys
+import time
+from threading import Thread
 import subprocess_runner
 from vm import get_vm
 from benchmark_registry import BenchmarkRegistry
 
+# Directories of a benchmark that do not affect its build: build outputs, tool caches, IDE settings and workloads
+IGNORED_DIRS = {"target", "build", ".gradle", ".kotlin", ".bsp", ".idea", ".settings", ".vscode", "__pycache__", "workloads"}
+IGNORED_DIR_SUFFIXES = ("-target", ".output")
+# File recording the fingerprints of the last successful builds, in the benchmarks directory
+BUILD_STATE_FILE = ".barista-build-state.json"
+# Interval between two polls of the running builds, in seconds
+POLL_INTERVAL = 0.5
+LOG_TAIL_LINES = 20
+# Maven locks its local repository with these options since version 3.9
+MAVEN_LOCKING_VERSION = (3, 9)
+MAVEN_LOCKING_OPTIONS = "-Daether.syncContext.named.factory=file-lock -Daether.syncContext.named.nameMapper=file-gav"
+
+def available_memory_gb(meminfo_file="/proc/meminfo"):
+    """Returns the memory available to start new processes, in GB.
+
+    On Linux, this is the 'MemAvailable' estimate of the kernel, which includes the reclaimable page cache. Elsewhere, only
+    the free memory is known.
+
+    :param os.path meminfo_file: Path to the memory statistics of the kernel.
+    :rtype: float
+    """
+    try:
+        with open(meminfo_file, "r") as file:
+            for line in file:
+                if line.startswith("MemAvailable:"):
+                    # The value is given in kB
+                    return int(line.split()[1]) / (1024 ** 2)
+    except FileNotFoundError:
+        pass
+    return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / (1024 ** 3)
+
+def tee_output(output, log_file):
+    """Copies the output of a build to the console and to its log file, until the output is closed.
+
+    :param output: The binary stdout of the build process.
+    :param os.path log_file: The log file of the build.
+    """
+    with open(log_file, "wb") as file:
+        for line in iter(output.readline, b""):
+            sys.stdout.buffer.write(line)
+            sys.stdout.buffer.flush()
+            file.write(line)
+    output.close()
+
+def source_files(bench_dir):
+    """Returns the files of a benchmark that its build depends on, relative to its directory.
+
+    The files are listed by git, so that the files ignored by the benchmark (e.g. build outputs) are left out. If the
+    benchmark is not in a git repository, all its files are listed. In both cases, the files in directories that do not
+    affect the build are left out.
+
+    :param os.path bench_dir: Root directory of the benchmark.
+    :rtype: list
+    """
+    try:
+        proc = subprocess.run(["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"], cwd=bench_dir, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except FileNotFoundError:
+        proc = None
+    if proc is not None and proc.returncode == 0:
+        files = [name for name in proc.stdout.decode("utf-8").split("\0") if name and os.path.isfile(os.path.join(bench_dir, name))]
+    else:
+        files = []
+        for root, dirs, names in os.walk(bench_dir):
+            dirs[:] = [d for d in dirs if d != ".git"]
+            files += [os.path.relpath(os.path.join(root, name), bench_dir) for name in names]
+    ignored = lambda name: any(d in IGNORED_DIRS or d.endswith(IGNORED_DIR_SUFFIXES) for d in name.split(os.sep)[:-1])
+    return sorted(name for name in files if not ignored(name))
+
+def sources_fingerprint(bench_dir, build_inputs):
+    """Returns the fingerprint of the sources of a benchmark and the inputs of its build.
+
+    :param os.path bench_dir: Root directory of the benchmark.
+    :param dict build_inputs: Inputs of the build other than the sources, e.g. the build options and the JDK version.
+    :rtype: str
+    """
+    digest = hashlib.sha256(json.dumps(build_inputs, sort_keys=True).encode("utf-8"))
+    for name in source_files(bench_dir):
+        digest.update(name.encode("utf-8"))
+        with open(os.path.join(bench_dir, name), "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+def dependency_cache(bench_dir):
+    """Returns the dependency cache shared by the builds of a benchmark's build tool, and whether the tool locks it.
+
+    Gradle locks its user home, and Maven its local repository since 3.9 if given MAVEN_LOCKING_OPTIONS. The caches of
+    older Maven versions and of sbt are not safe to be written by concurrent builds.
+
+    :param os.path bench_dir: Root directory of the benchmark.
+    :return: The name of the cache, None if the benchmark does not use a known build tool, and whether the cache is locked.
+    :rtype: (str, boolean)
+    """
+    project_dirs = [bench_dir] + [entry.path for entry in os.scandir(bench_dir) if entry.is_dir()]
+    if any(os.path.isfile(os.path.join(d, "gradlew")) for d in project_dirs):
+        return "gradle", True
+    if any(os.path.isfile(os.path.join(d, "build.sbt")) for d in project_dirs):
+        return "sbt", False
+    for d in project_dirs:
+        if os.path.isfile(os.path.join(d, "mvnw")):
+            wrapper_properties = os.path.join(d, ".mvn", "wrapper", "maven-wrapper.properties")
+            version_match = None
+            if os.path.isfile(wrapper_properties):
+                with open(wrapper_properties, "r") as file:
+                    version_match = re.search(r"apache-maven-(\d+)\.(\d+)", file.read())
+            return "maven", version_match is not None and (int(version_match.group(1)), int(version_match.group(2))) >= MAVEN_LOCKING_VERSION
+    return None, True
+
 class Builder:
     """Builds the Barista benchmarks."""
-    def __init__(self, benchmark_registry):
+    def __init__(self, benchmark_registry, vm_version=None):
         self._benchmark_registry = benchmark_registry
+        self._vm_version = vm_version
 
-    def build(self, selection, skip_nib_generation, get_jar, get_nib, maven_options):
+    def build(self, selection, skip_nib_generation, get_jar, get_nib, maven_options, jobs=1, memory_budget=None, memory_per_build=4, log_dir=None, force=False):
         """Builds a selection of Barista benchmarks.
 
         :param list selection: User specified list of Barista benchmark names that should be built, can be empty which means all benchmarks should be built.
@@ -19,30 +143,111 @@ class Builder:
         :param boolean get_jar: Whether to just print the path of the built jar without building anything.
         :param boolean get_nib: Whether to just print the path of the built nib (Native Image Bundle) file without building anything.
         :param str maven_options: Additional options to pass to mvn when building maven projects.
+        :param int jobs: Maximum number of benchmarks built at the same time.
+        :param float memory_budget: Memory, in GB, the concurrent builds may reserve. Defaults to the memory available when the builds start.
+        :param float memory_per_build: Memory, in GB, reserved for each build.
+        :param os.path log_dir: Directory the output of each build is written to. Defaults to the 'build-logs' directory next to this script.
+        :param boolean force: Whether to build the benchmarks even if their sources and build inputs did not change since their last successful build.
         """
         selection = selection if selection else self._benchmark_registry.benchmark_names
-        success_count = 0
-        failure_list = []
+        if get_jar or get_nib:
+            # Nothing is built, the build scripts only print the paths of the artifacts
+            failure_list = [bench_name for bench_name in selection if not self._build_benchmark(bench_name, skip_nib_generation, get_jar, get_nib, maven_options)]
+            if failure_list:
+                raise ChildProcessError(f"Following benchmarks could not be built: {', '.join(failure_list)}")
+            return
+
+        log_dir = log_dir if log_dir is not None else os.path.join(os.path.dirname(os.path.abspath(__file__)), "build-logs")
+        os.makedirs(log_dir, exist_ok=True)
+        memory_budget = memory_budget if memory_budget is not None else available_memory_gb()
+        build_inputs = {"skip_nib_generation": skip_nib_generation, "maven_options": maven_options, "vm_version": self._vm_version}
+        state = self._load_build_state()
+        summary = {}
+        pending = []
         for bench_name in selection:
-            build_successful = self._build_benchmark(bench_name, skip_nib_generation, get_jar, get_nib, maven_options)
-            if build_successful:
-                success_count += 1
+            fingerprint = sources_fingerprint(self._benchmark_registry.get_benchmark_dir(bench_name), build_inputs)
+            if not force and state.get(bench_name, {}).get("fingerprint") == fingerprint and self._artifacts_exist(bench_name, skip_nib_generation):
+                log.info(f"Skipping benchmark {bench_name}, its sources and build inputs did not change since its last successful build")
+                summary[bench_name] = {"status": "skipped", "duration": None, "log": state[bench_name].get("log")}
             else:
-                failure_list.append(bench_name)
-        log.info(f"{success_count}/{len(selection)} successfully built")
+                pending.append((bench_name, fingerprint, dependency_cache(self._benchmark_registry.get_benchmark_dir(bench_name))))
+
+        log.info(f"Building {len(pending)} benchmark(s), running up to {jobs} build(s) at a time within a memory budget of {memory_budget:.1f}GB ({memory_per_build:.1f}GB per build)")
+        running = {}
+        while pending or running:
+            # Start builds while there are free jobs and their memory fits into the budget, one build always runs
+            while pending and len(running) < jobs and (not running or (len(running) + 1) * memory_per_build <= memory_budget):
+                startable = [build for build in pending if self._can_share_cache(build[2], [cache for _, _, cache, _, _, _ in running.values()])]
+                if not startable:
+                    break
+                pending.remove(startable[0])
+                bench_name, fingerprint, cache = startable[0]
+                log_file = os.path.join(log_dir, f"{bench_name}.log")
+                build_maven_options = maven_options
+                if jobs > 1 and cache == ("maven", True):
+                    build_maven_options = f"{maven_options} {MAVEN_LOCKING_OPTIONS}" if maven_options else MAVEN_LOCKING_OPTIONS
+                cmd = self._build_command(bench_name, skip_nib_generation, False, False, build_maven_options)
+                log.info(f"Building benchmark {bench_name} by running \"{' '.join(cmd)}\", logging to \"{log_file}\"")
+                tee = None
+                if jobs == 1:
+                    # A single build at a time streams its output to the console, as well as to its log file
+                    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+                    tee = Thread(target=tee_output, args=(proc.stdout, log_file))
+                    tee.start()
+                else:
+                    with open(log_file, "w") as file:
+                        proc = subprocess.Popen(cmd, stdout=file, stderr=subprocess.STDOUT)
+                running[bench_name] = (proc, fingerprint, cache, log_file, time.perf_counter(), tee)
+            time.sleep(POLL_INTERVAL)
+            for bench_name, (proc, fingerprint, _, log_file, ts_start, tee) in list(running.items()):
+                if proc.poll() is None:
+                    continue
+                del running[bench_name]
+                duration = time.perf_counter() - ts_start
+                if tee is not None:
+                    tee.join()
+                if proc.returncode == 0:
+                    log.info(f"Build of benchmark {bench_name} succeeded in {duration:.1f}s!")
+                    summary[bench_name] = {"status": "built", "duration": duration, "log": log_file}
+                    state[bench_name] = {"fingerprint": fingerprint, "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"), "duration": duration, "log": log_file}
+                    self._save_build_state(state)
+                else:
+                    if tee is not None:
+                        log.error(f"Build of benchmark {bench_name} failed with return code {proc.returncode} after {duration:.1f}s! See \"{log_file}\"")
+                    else:
+                        log.error(f"Build of benchmark {bench_name} failed with return code {proc.returncode} after {duration:.1f}s! Last lines of \"{log_file}\":")
+                        with open(log_file, "r", errors="replace") as file:
+                            for line in file.readlines()[-LOG_TAIL_LINES:]:
+                                log.error(f"\t{line.rstrip()}")
+                    summary[bench_name] = {"status": "failed", "duration": duration, "log": log_file}
+
+        self._log_summary(selection, summary)
+        failure_list = [bench_name for bench_name in selection if summary[bench_name]["status"] == "failed"]
+        log.info(f"{len(selection) - len(failure_list)}/{len(selection)} successfully built")
         if failure_list:
             raise ChildProcessError(f"Following benchmarks could not be built: {', '.join(failure_list)}")
 
-    def _build_benchmark(self, bench_name, skip_nib_generation, get_jar, get_nib, maven_options):
-        """Builds a Barista benchmark, by invoking its "build.sh" script.
+    def _can_share_cache(self, cache, running_caches):
+        """Returns whether a build can run next to the running builds without concurrent writes to an unlocked dependency cache.
+
+        :param tuple cache: The dependency cache of the build and whether it is locked, as returned by `dependency_cache`.
+        :param list running_caches: The dependency caches of the running builds.
+        :rtype: boolean
+        """
+        name, locked = cache
+        if name is None:
+            return True
+        return all(running_name != name or (locked and running_locked) for running_name, running_locked in running_caches)
+
+    def _build_command(self, bench_name, skip_nib_generation, get_jar, get_nib, maven_options):
+        """Returns the command invoking the "build.sh" script of a Barista benchmark.
 
         :param string bench_name: Name of the Barista benchmark that should be built.
         :param boolean skip_nib_generation: Whether the step of generating a native image bundle should be skipped.
         :param boolean get_jar: Whether to just print the path of the built jar without building anything.
         :param boolean get_nib: Whether to just print the path of the built nib (Native Image Bundle) file without building anything.
         :param str maven_options: Additional options to pass to mvn when building maven projects.
-        :return: Whether the build was successful.
-        :rtype: boolean
+        :rtype: list
         """
         build_script = os.path.join(self._benchmark_registry.benchmarks_dir, bench_name, "build.sh")
         cmd = [build_script]
@@ -54,6 +259,20 @@ class Builder:
             cmd.append("--get-nib")
         if maven_options:
             cmd.append(f"--maven-options={maven_options}")
+        return cmd
+
+    def _build_benchmark(self, bench_name, skip_nib_generation, get_jar, get_nib, maven_options):
+        """Builds a Barista benchmark, by invoking its "build.sh" script.
+
+        :param string bench_name: Name of the Barista benchmark that should be built.
+        :param boolean skip_nib_generation: Whether the step of generating a native image bundle should be skipped.
+        :param boolean get_jar: Whether to just print the path of the built jar without building anything.
+        :param boolean get_nib: Whether to just print the path of the built nib (Native Image Bundle) file without building anything.
+        :param str maven_options: Additional options to pass to mvn when building maven projects.
+        :return: Whether the build was successful.
+        :rtype: boolean
+        """
+        cmd = self._build_command(bench_name, skip_nib_generation, get_jar, get_nib, maven_options)
         log.info(f"Building benchmark {bench_name} by running \"{' '.join(cmd)}\"")
         try:
             subprocess_runner.run(cmd, capture_output=False)
@@ -64,6 +283,55 @@ class Builder:
         log.info(f"Build of benchmark {bench_name} succeeded!")
         return True
 
+    def _artifacts_exist(self, bench_name, skip_nib_generation):
+        """Verifies that the jar, and unless nib generation is skipped the nib, of a Barista benchmark exist.
+
+        :param string bench_name: Name of the Barista benchmark.
+        :param boolean skip_nib_generation: Whether the step of generating a native image bundle was skipped.
+        :rtype: boolean
+        """
+        queries = [("--get-jar", "application jar file path is: ([^\n]+)\n")]
+        if not skip_nib_generation:
+            queries.append(("--get-nib", "application nib file path is: ([^\n]+)\n"))
+        for option, output_pattern in queries:
+            cmd = [os.path.join(self._benchmark_registry.benchmarks_dir, bench_name, "build.sh"), option]
+            proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            output_match = re.search(output_pattern, proc.stdout.decode("utf-8"))
+            if proc.returncode != 0 or not output_match or not os.path.isfile(output_match.group(1)):
+                return False
+        return True
+
+    def _load_build_state(self):
+        state_file = os.path.join(self._benchmark_registry.benchmarks_dir, BUILD_STATE_FILE)
+        if not os.path.isfile(state_file):
+            return {}
+        try:
+            with open(state_file, "r") as file:
+                return json.load(file)
+        except (OSError, json.decoder.JSONDecodeError) as e:
+            log.warning(f"Ignoring unreadable build state '{state_file}': {e}")
+            return {}
+
+    def _save_build_state(self, state):
+        state_file = os.path.join(self._benchmark_registry.benchmarks_dir, BUILD_STATE_FILE)
+        temporary_file = f"{state_file}.tmp"
+        with open(temporary_file, "w") as file:
+            json.dump(state, file, indent=4)
+        os.replace(temporary_file, state_file)
+
+    def _log_summary(self, selection, summary):
+        """Logs the status, duration and log file of the build of each benchmark of the selection.
+
+        :param list selection: Names of the benchmarks of the selection.
+        :param dict summary: The status, duration and log file of the build of each benchmark.
+        """
+        log.info("Build summary:")
+        log.info(f"\t{'benchmark':>28} {'status':>8} {'duration':>10}  log")
+        for bench_name in selection:
+            result = summary[bench_name]
+            duration = f"{result['duration']:.1f}s" if result['duration'] is not None else "-"
+            log.info(f"\t{bench_name:>28} {result['status']:>8} {duration:>10}  {result['log'] or '-'}")
+
 def parse_arguments(benchmark_names):
     """Parses arguments needed for building Barista benchmarks.
 
@@ -78,6 +346,11 @@ def parse_arguments(benchmark_names):
     parser.add_argument("-j", "--get-jar", action="store_true", help="prints the path of the built jar without building anything. The path will be printed in the pattern of 'application jar file path is: <path>\n'")
     parser.add_argument("-n", "--get-nib", action="store_true", help="prints the path of the built nib (Native Image Bundle) file without building anything. The path will be printed in the pattern of 'application nib file path is: <path>\n'")
     parser.add_argument("-m", "--maven-options", help="additional options to pass to mvn when building maven projects")
+    parser.add_argument("--parallel-builds", type=int, default=1, help="maximum number of benchmarks built at the same time, defaults to 1. Builds whose build tool does not lock its dependency cache (Maven before 3.9, sbt) are not run at the same time as other builds of the same tool")
+    parser.add_argument("--memory-budget", type=float, help="memory in GB the concurrent builds may reserve, defaults to the memory available when the builds start")
+    parser.add_argument("--memory-per-build", type=float, default=4, help="memory in GB reserved for each build, a build is only started if the memory reserved for all the running builds fits into the memory budget, defaults to 4")
+    parser.add_argument("--log-dir", help="directory the output of each build is written to, in a '<bench-name>.log' file, defaults to the 'build-logs' directory of the Barista repo")
+    parser.add_argument("-f", "--force", action="store_true", help="build the benchmarks even if their sources and build inputs did not change since their last successful build")
     parser.add_argument("-d", "--debug", action="store_true", help="show debug logs")
     args = parser.parse_args()
 
@@ -101,8 +374,11 @@ def main():
         if not args.skip_nib_generation and not vm.contains_executable("native-image"):
             raise ValueError("'native-image' not found in your JAVA_HOME! Either change your JAVA_HOME so it points to a GraalVM distribution or add '--skip-nib-generation' so native image bundles aren't generated.")
 
-    builder = Builder(benchmark_registry)
-    builder.build(args.bench_list, args.skip_nib_generation, args.get_jar, args.get_nib, args.maven_options)
+    if args.parallel_builds < 1:
+        raise ValueError(f"The number of parallel builds must be at least 1, got {args.parallel_builds}!")
+
+    builder = Builder(benchmark_registry, vm.version if not args.get_nib and not args.get_jar else None)
+    builder.build(args.bench_list, args.skip_nib_generation, args.get_jar, args.get_nib, args.maven_options, args.parallel_builds, args.memory_budget, args.memory_per_build, args.log_dir, args.force)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
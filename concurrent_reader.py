@@ -1,5 +1,6 @@
 from threading  import Thread
 import process_info
+from load_generator_monitor import available_cpus
 import time
 import logging as log
 import re
@@ -91,6 +92,11 @@ class ConcurrentReader(Thread):
     def resources(self):
        return self._resources
 
+    @property
+    def app_cpu_count(self):
+        """Number of CPUs the application is allowed to run on, the CPU usage of the application is relative to one CPU."""
+        return available_cpus(self._app_process.pid)
+
     def join(self):
         self._resource_reader_thread.join()
         super().join()
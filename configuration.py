@@ -18,23 +18,49 @@ P_VALUES_MAP = {
     'p75': 75.0,
     'p90': 90.0,
     'p99': 99.0,
+    'p999': 99.9,
     'p9999': 99.99,
     'p99999': 99.999,
     'p100': 100
 }
 
+# Resource limits an SLA can include besides the latency percentiles: the mean CPU usage of the application as a
+# percentage of the CPUs available to it, and its maximum RSS in MB
+RESOURCE_LIMITS = ['cpu_percent', 'rss_mb']
+
+# Load generators that can be used in each of the load-testing phases
+THROUGHPUT_LOAD_GENERATORS = ["wrk", "h2load", "oha", "asyncio"]
+LATENCY_LOAD_GENERATORS = ["wrk2", "oha", "asyncio"]
+LUA_LOAD_GENERATORS = ["wrk", "wrk2"]
+FAN_OUT_LOAD_GENERATORS = ["wrk", "wrk2"]
+# Latency percentiles reported by the load generators that do not report all the percentiles of P_VALUES_MAP (see OHA_PERCENTILES, the maximum latency is reported as well)
+LOAD_GENERATOR_PERCENTILES = {"oha": [50.0, 75.0, 90.0, 99.0, 99.9, 99.99, 100.0]}
+# Load generators that leave a calibration period at the start of each run (about 10 seconds for wrk2) out of the latency they report
+CALIBRATING_LOAD_GENERATORS = ["wrk2"]
+ARRIVAL_DISTRIBUTIONS = ["constant", "poisson"]
+
 class ServiceMode(Enum):
     JVM = 1
     NATIVE = 2
 
+class JvmArchive(Enum):
+    APPCDS = 1
+    AOT_CACHE = 2
+
 class LatencyMode(Enum):
     FIXED = 1
     BINARY_SEARCH = 2
     AIMD = 3
+    RATE_SWEEP = 4
+    ROBUST_BINARY_SEARCH = 5
+
+# Latency strategies searching for the maximum rate that meets the SLA
+SLA_SEARCH_STRATEGIES = [LatencyMode.BINARY_SEARCH, LatencyMode.AIMD, LatencyMode.ROBUST_BINARY_SEARCH]
 
 class Configuration:
     def __init__(self, benchmark_registry):
         self._benchmark_registry = benchmark_registry
+        self._vm_version = None
         self._args = self.parse_arguments()
         self.set_bench_name()
         self.load_and_set_config()
@@ -42,7 +68,14 @@ class Configuration:
         self.check_and_set_all()
 
     def describe(self):
-        description = f"Benchmarking of {self._endpoint} with {self.mode._name_} mode\n"
+        description = f"Benchmarking of {self._endpoint} with {self.mode._name_} mode"
+        if self.jvm_archive is not None:
+            description += f" ({self.jvm_archive.name} archive)"
+        elif self.native_pgo:
+            description += " (profile-guided optimization)"
+        elif self.native_layered:
+            description += " (layered image)"
+        description += "\n"
         description += f"Redirecting output to: {self._output_folder}\n"
 
         description += self.startup.describe()
@@ -50,7 +83,7 @@ class Configuration:
         description += self._throughput.describe()
         description += self._latency.describe()
 
-        total_runtime = self._warmup.get_total_runtime() + self._throughput.get_total_runtime() + self._latency.get_total_runtime()
+        total_runtime = self.startup.under_load.get_total_runtime() + self._warmup.get_total_runtime() + self._throughput.get_total_runtime() + self._latency.get_total_runtime()
         total_runtime_formatted = str(timedelta(seconds=total_runtime))
 
         end_time_formatted = datetime.now() + timedelta(0,total_runtime)
@@ -69,6 +102,12 @@ class Configuration:
         # General options
         parser.add_argument("-j", "--java-home", help="Path to the JVM distribution to be used. If not provided, the JAVA_HOME environment variable is used")
         parser.add_argument("-m", "--mode", choices=["jvm", "native"], help="Execution mode of the app")
+        parser.add_argument("--jvm-archive", choices=["appcds", "aot-cache"], help="JVM sub-mode in which the app is benchmarked with a class-data sharing archive ('appcds', written with -XX:ArchiveClassesAtExit) or an AOT cache ('aot-cache', written with -XX:AOTCacheOutput, JDK 25+) created by a training run of the workload. The startup and warmup of the app are also measured without the archive and reported side by side. Disabled by default")
+        parser.add_argument("--jvm-archive-cache-dir", help="Directory in which the archives of the '--jvm-archive' sub-mode are cached, keyed by the hash of the app jar and the JDK version. Defaults to the 'barista-jvm-archives' directory next to the app jar")
+        parser.add_argument("--native-pgo", action="store_true", default=None, help="Native sub-mode in which the app is benchmarked as an image optimized with profile-guided optimization. The profile is collected by driving an instrumented image ('--pgo-instrument') with the startup requests and the warmup workload, and the image is then rebuilt with '--pgo'. The image built without the profile is also benchmarked and its results are reported side by side. Disabled by default")
+        parser.add_argument("--native-pgo-cache-dir", help="Directory in which the profiles of the '--native-pgo' sub-mode are cached, keyed by the hash of the app nib and the GraalVM version. Defaults to the 'barista-pgo-profiles' directory next to the app nib")
+        parser.add_argument("--native-layered", action="store_true", default=None, help="Native sub-mode in which the app is benchmarked as an app layer built on top of a shared base layer, for benchmarks providing layer nibs. The base layer is built once and cached, keyed by the GraalVM version, the base layer configuration and the native-image build options. The monolithic image is also measured and its build time, image size, startup and RSS are reported side by side. Disabled by default")
+        parser.add_argument("--native-layer-cache-dir", help="Directory in which the base layers of the '--native-layered' sub-mode are cached. Defaults to the 'barista-base-layers' directory next to the base layer nib")
         parser.add_argument("-c", "--config", default="default.barista.json", help="Path to the configuration JSON file to be used for load testing, can be either absolute or relative to the <bench-dir>/workloads directory. Defaults to 'default.barista.json'")
         parser.add_argument("-x", "--app-executable", help="Path to the application executable. If this is not set, the application executable is retrieved (built, in the case of native execution) from the benchmark directory")
         parser.add_argument("-e", "--endpoint", help="Endpoint of the application which will be loaded")
@@ -77,6 +116,11 @@ class Configuration:
         parser.add_argument("-k", "--connections", help="Connections to keep open during the warmup, throughput and latency load-testing phases. This option can be overwritten for each of the mentioned phases. During each phase, the number of connections is propagated to wrk/wrk2.")
         parser.add_argument("-s", "--lua-script", help="Lua script to be executed by wrk/wrk2 for general benchmarking purposes")
         parser.add_argument("--resource-usage-polling-interval", help="Time interval in seconds between two subsequent resource usage polls. Determines how often resource usage metrics, such as rss (Resident Set Size), vms (Virtual Memory Size), and CPU utilization, are collected. If set to 0 resource usage polling is disabled. Defaults to 0.02s (20ms)")
+        parser.add_argument("--load-sampling-interval", help="Time interval in seconds between two subsequent samples of the throughput and latency within a single warmup, throughput or latency iteration. The samples are recorded as a time series next to the results of each iteration. The requests of wrk/wrk2 are timed by a Lua script the harness wraps around the benchmark script. If set to 0 load sampling is disabled. Defaults to 0")
+        parser.add_argument("--load-generator-processes", help="Number of wrk/wrk2 processes to run side by side during the warmup, throughput and latency load-testing phases, each with its share of the threads, connections and request rate. Their throughput is summed up and their latency histograms are merged. Overrides the 'load_generator_processes' field of the configuration file. Defaults to 1")
+        parser.add_argument("--load-generator-cpus", help="CPUs to pin the wrk/wrk2 processes to, as a list of CPUs and CPU ranges, e.g. '8-15' or '0,2,4-7'. The CPUs are split into disjoint sets, one for each wrk/wrk2 process. Overrides the 'load_generator_cpus' field of the configuration file. Defaults to the CPUs the harness is allowed to run on if multiple processes are used, otherwise the processes are not pinned")
+        parser.add_argument("--max-error-rate", help="Maximum fraction (0-1) of the requests of a warmup, throughput or latency iteration that may fail with a non-2xx or 3xx response or a socket error. Iterations exceeding it are marked in the results and excluded from the average throughput, and rates exceeding it are rejected when searching for the optimal rate. Disabled by default")
+        parser.add_argument("--fail-on-error-rate", action="store_true", default=None, help="Fail the benchmark if an iteration exceeds the maximum error rate set with '--max-error-rate', instead of only marking the iteration")
         parser.add_argument("--memory-refresh", action="store_true", help="Refresh the memory before running the application, ensuring cold system state. Flushes file system buffers, drops caches, and cycles swap space. Supported only on Linux. Requires sudo (root). Disabled by default.")
         parser.add_argument("--ignore-deps-bin", action="store_true", help="By default, Barista prepends its 'deps/bin' directory to PATH when executing subprocesses to facilitate access to its dependencies. By setting this option, the behaviour will be disabled.")
         parser.add_argument("--skip-prepare", action="store_true", help="Explicitly skip the prepare step of the benchmark, even if a prepare script is present in the benchmark directory")
@@ -89,6 +133,9 @@ class Configuration:
         parser.add_argument("-v", "--vm-options", help="Options to be propagated to the virtual machine (JVM in jvm execution mode, native-image in native execution mode)")
         parser.add_argument("-a", "--app-args", help="Arguments to be propagated to the application")
         parser.add_argument("-b", "--native-image-build-options", help="Options to be propagated to the native-image build command (used only in native execution mode when no '--app-executable' option is provided)")
+        parser.add_argument("--native-image-cache", help="Directory in which the native images built from nibs are cached, keyed by the hash of the nib, the image name, the native-image build options and the 'native-image --version' output. A cached image is reused instead of being built again. Defaults to the 'barista-native-images' directory next to the nib")
+        parser.add_argument("--native-image-cache-size", help="Number of native image builds cached for each image name. When a new build is cached, the least recently used builds of the image beyond this number are removed from the cache. Defaults to 3")
+        parser.add_argument("--native-image-no-cache", action="store_true", default=None, help="Disable the cache of the native images built from nibs, building the image in every run")
         # Startup options
         parser.add_argument("--startup-iteration-count", help="Number of startup iterations to execute. The data collected in the startup iterations is then aggregated. Defaults to 10")
         parser.add_argument("--startup-request-count", help="Number of requests to make and record the response time of, immediately after starting the application, in each startup iteration. Defaults to 10")
@@ -96,18 +143,27 @@ class Configuration:
         parser.add_argument("--startup-cmd-app-prefix", help="Command to be prefixed to the application command, specifically just for the startup phase")
         parser.add_argument("--startup-cmd-app-prefix-init-sleep", help="Sleep time, in seconds, for the initialization purposes of the command that is prefixed to the application command specifically just for the startup phase. The harness will sleep for this time duration and only then will it start attempting to detect the application process. Defaults to 0")
         parser.add_argument("--startup-dummy-run-after-memory-refresh", action="store_true", help="Run a dummy startup prefix command after memory refresh to prevent side effects caused by the command prefix to be measured during startup benchmark execution. This option is specific to just the startup phase. Disabled by default.")
+        parser.add_argument("--startup-parallelism", help="Number of startup iterations to run concurrently, each pinned to its own CPU set and serving on its own port. Defaults to 1")
+        parser.add_argument("--startup-cpu-sets", help="Space-separated CPU sets, in the format accepted by 'taskset -c', to pin the concurrent startup iterations to, one per concurrent iteration. By default the available CPUs are split among the concurrent iterations, in sets as large as the one of a 'taskset -c' startup command prefix")
+        parser.add_argument("--startup-port-base", help="Port of the first concurrent startup iteration. The i-th concurrent iteration serves on the port base + i, which is passed to the app as ${BARISTA_APP_PORT}. Defaults to the endpoint port")
+        parser.add_argument("--startup-sampling-interval", help="Interval, in milliseconds, at which the RSS, CPU time, page faults and number of threads of the app process are sampled during each startup iteration. Sampling adds the overhead of reading the app process statistics to the measured startup, so a coarse interval such as 10 is recommended. If set to 0 the app process is not sampled. Defaults to 0")
+        parser.add_argument("--startup-load-iteration-count", help="Number of startup iterations under load. In each of them, the load generator sends requests to the app at a fixed rate as soon as its port opens. Defaults to 0")
+        parser.add_argument("--startup-load-rate", help="Request rate, in requests per second, of the startup iterations under load")
+        parser.add_argument("--startup-load-duration", help="Duration in seconds of the load in each startup iteration under load. Defaults to 30")
         # Warmup options
         parser.add_argument("--warmup-iteration-count", help="Number of iterations that should be performed before testing the application")
         parser.add_argument("--warmup-duration", help="Single iteration warmup time duration in seconds. How long should the application be stressed before testing")
         parser.add_argument("--warmup-threads", help="Number of threads to use for warmup, overrides the '--threads' option specifically for warmup iterations")
         parser.add_argument("--warmup-connections", help="Connections to keep open during warmup, overrides the '--connections' option specifically for warmup iterations")
         parser.add_argument("--warmup-lua-script", help="Lua script to be executed by wrk during warmup, overrides the '--lua-script' option specifically for warmup iterations")
+        parser.add_argument("--warmup-load-generator", choices=THROUGHPUT_LOAD_GENERATORS, help="Load generator to use for warmup. Defaults to 'wrk'")
         # Throughput options
         parser.add_argument("--throughput-iteration-count", help="Number of iterations that will be performed to measure throughput")
         parser.add_argument("--throughput-duration", help="Duration in seconds of a single iteration of throughput measurement")
         parser.add_argument("--throughput-threads", help="Number of threads to use for throughput measurements, overrides the '--threads' option specifically for throughput iterations")
         parser.add_argument("--throughput-connections", help="Connections to keep open during throughput measurements, overrides the '--connections' option specifically for throughput iterations")
         parser.add_argument("--throughput-lua-script", help="Lua script to be executed by wrk during throughput measurements, overrides the '--lua-script' option specifically for throughput iterations")
+        parser.add_argument("--throughput-load-generator", choices=THROUGHPUT_LOAD_GENERATORS, help="Load generator to use for throughput measurements. Defaults to 'wrk'")
         # Latency options
         parser.add_argument("--latency-iteration-count", help="Number of iterations that will be performed to measure latency")
         parser.add_argument("--latency-duration", help="Time in seconds of how long should single iteration of latency measurment take")
@@ -117,8 +173,21 @@ class Configuration:
         parser.add_argument("--latency-rate", help="Constant throughput (in ops/sec) applied to measure latency")
         parser.add_argument("--latency-percentages", help="Fraction of throughput recorded in throughput measurements to be used in latency measurements")
         parser.add_argument("--latency-min-step-percent", help="Accuracy with which to perform the latency search")
+        parser.add_argument("--latency-probe-duration", help="Maximum time in seconds of a single measurement (probe) of the 'BINARY_SEARCH', 'AIMD' and 'ROBUST_BINARY_SEARCH' latency strategies. Defaults to 30")
+        parser.add_argument("--latency-probe-window", help="Length in seconds of the windows a probe of the 'BINARY_SEARCH', 'AIMD' and 'ROBUST_BINARY_SEARCH' latency strategies is run in. The SLA is evaluated after each window and the probe stops early as soon as the SLA is statistically violated or met. Defaults to the probe duration, which disables early stopping")
+        parser.add_argument("--latency-upper-bound-discovery", action="store_true", default=None, help="Before searching for the optimal rate of the 'BINARY_SEARCH', 'AIMD' and 'ROBUST_BINARY_SEARCH' latency strategies, double the upper bound of the search as long as it meets the SLA, up to 16 times the average throughput recorded in throughput measurements. By default, the search is limited to the range below the average throughput")
+        parser.add_argument("--latency-search-confidence", help="Confidence (0.5-1) with which the 'ROBUST_BINARY_SEARCH' latency strategy decides whether a rate meets the SLA, and of the confidence interval of the optimal rate it reports. Defaults to 0.8")
+        parser.add_argument("--latency-max-probes-per-rate", help="Maximum number of times the 'ROBUST_BINARY_SEARCH' latency strategy probes a single rate before deciding whether it meets the SLA. Defaults to 6")
+        parser.add_argument("--latency-search-cache", help="File in which the optimal rates found by the 'BINARY_SEARCH', 'AIMD' and 'ROBUST_BINARY_SEARCH' latency strategies are cached, keyed by a fingerprint of the host, benchmark, execution mode, VM version and configuration. Subsequent searches with the same fingerprint start from a narrow range around the cached rate. By default, searches are not cached")
+        parser.add_argument("--latency-no-search-cache", action="store_true", default=None, help="Disable the cache of the optimal rates found by the 'BINARY_SEARCH', 'AIMD' and 'ROBUST_BINARY_SEARCH' latency strategies, if enabled in the configuration file")
+        parser.add_argument("--latency-sweep-start", help="Fraction of the average throughput recorded in throughput measurements at which the 'RATE_SWEEP' latency strategy starts. Defaults to 0.1")
+        parser.add_argument("--latency-sweep-end", help="Fraction of the average throughput recorded in throughput measurements at which the 'RATE_SWEEP' latency strategy ends. Values above 1 measure past saturation. Defaults to 1.5")
+        parser.add_argument("--latency-sweep-steps", help="Number of evenly spaced rates measured by the 'RATE_SWEEP' latency strategy, including the start and end rates. Defaults to 15")
+        parser.add_argument("--latency-knee-refinement-steps", help="Number of additional rates the 'RATE_SWEEP' latency strategy measures around the knee of the p99 latency curve found by the sweep, to locate the maximum sustainable throughput more precisely. 0 disables the refinement. Defaults to 4")
         parser.add_argument("--latency-sla", help="Latency Service Level Agreement entry")
         parser.add_argument("--latency-lua-script", help="Lua script to be executed by wrk2 during latency measurements, overrides the '--lua-script' option specifically for latency iterations")
+        parser.add_argument("--latency-load-generator", choices=LATENCY_LOAD_GENERATORS, help="Load generator to use for latency measurements. Defaults to 'wrk2'")
+        parser.add_argument("--latency-arrival-distribution", choices=ARRIVAL_DISTRIBUTIONS, help="Distribution of the request arrivals during latency measurements, used only by the 'asyncio' load generator. Defaults to 'constant'")
 
         if len(sys.argv) == 1:
             raise ValueError(f"benchmark is required, please choose from: [`{'`, `'.join(self.benchmark_registry.benchmark_names)}`]")
@@ -224,6 +293,24 @@ class Configuration:
         else:
             self._native_image_build_options = []
 
+        self._native_image_cache_enabled = not self._args.native_image_no_cache and self._config.get('native_image_cache') is not False
+        if self._args.native_image_cache is not None:
+            self._native_image_cache_dir = self._args.native_image_cache
+        elif isinstance(self._config.get('native_image_cache'), str):
+            self._native_image_cache_dir = self._config['native_image_cache']
+        else:
+            self._native_image_cache_dir = None
+        if self._args.native_image_cache_size is not None:
+            # CLI overwrites config file
+            self._native_image_cache_size = int(self._args.native_image_cache_size)
+        elif 'native_image_cache_size' in self._config:
+            self._native_image_cache_size = int(self._config['native_image_cache_size'])
+        else:
+            self._native_image_cache_size = 3
+        if self._native_image_cache_size < 1:
+            raise ValueError(f"The native image cache size should be at least 1. Got {self._native_image_cache_size}. Use '--native-image-no-cache' to disable the cache")
+        self._native_image_builds = []
+
         if self._args.mode is not None:
             # CLI overwrites config file
             mode = self._args.mode.upper()
@@ -234,6 +321,46 @@ class Configuration:
             log.debug(f"No execution mode set. Defaulting to '{mode}' execution mode")
         self._mode = ServiceMode[mode]
 
+        if self._args.jvm_archive is not None:
+            jvm_archive = self._args.jvm_archive
+        else:
+            jvm_archive = self._config.get('jvm_archive')
+        self._jvm_archive = JvmArchive[jvm_archive.upper().replace("-", "_")] if jvm_archive is not None else None
+        if self._jvm_archive is not None and self._mode != ServiceMode.JVM:
+            raise ValueError(f"The '{jvm_archive}' JVM archive is only supported in the 'jvm' execution mode")
+        if self._args.jvm_archive_cache_dir is not None:
+            self._jvm_archive_cache_dir = self._args.jvm_archive_cache_dir
+        else:
+            self._jvm_archive_cache_dir = self._config.get('jvm_archive_cache_dir')
+
+        if self._args.native_pgo is not None:
+            self._native_pgo = self._args.native_pgo
+        else:
+            self._native_pgo = bool(self._config.get('native_pgo', False))
+        if self._native_pgo and self._mode != ServiceMode.NATIVE:
+            raise ValueError("Profile-guided optimization is only supported in the 'native' execution mode")
+        if self._native_pgo and self._app_executable is not None:
+            raise ValueError("Profile-guided optimization requires building the app image, please omit the '--app-executable' option")
+        if self._args.native_pgo_cache_dir is not None:
+            self._native_pgo_cache_dir = self._args.native_pgo_cache_dir
+        else:
+            self._native_pgo_cache_dir = self._config.get('native_pgo_cache_dir')
+
+        if self._args.native_layered is not None:
+            self._native_layered = self._args.native_layered
+        else:
+            self._native_layered = bool(self._config.get('native_layered', False))
+        if self._native_layered and self._mode != ServiceMode.NATIVE:
+            raise ValueError("Layered native images are only supported in the 'native' execution mode")
+        if self._native_layered and self._app_executable is not None:
+            raise ValueError("Layered native images require building the app image, please omit the '--app-executable' option")
+        if self._native_layered and self._native_pgo:
+            raise ValueError("Layered native images cannot be combined with profile-guided optimization")
+        if self._args.native_layer_cache_dir is not None:
+            self._native_layer_cache_dir = self._args.native_layer_cache_dir
+        else:
+            self._native_layer_cache_dir = self._config.get('native_layer_cache_dir')
+
         if self._args.vm_options is not None:
             # CLI overwrites config file
             self._vm_options = self._args.vm_options.split()
@@ -285,6 +412,33 @@ class Configuration:
             log.debug(f"No resource usage polling interval set. Defaulting to {polling_interval} seconds ({polling_interval * 1000}ms)")
         self._resource_usage_polling_interval = polling_interval
 
+        if self._args.load_sampling_interval is not None:
+            # CLI overwrites config file
+            load_sampling_interval = float(self._args.load_sampling_interval)
+        elif 'load_sampling_interval' in self._config:
+            load_sampling_interval = float(self._config['load_sampling_interval'])
+        else:
+            load_sampling_interval = 0
+            log.debug("No load sampling interval set. Load sampling is disabled")
+        self._load_sampling_interval = load_sampling_interval
+
+        if self._args.max_error_rate is not None:
+            # CLI overwrites config file
+            max_error_rate = float(self._args.max_error_rate)
+        elif 'max_error_rate' in self._config:
+            max_error_rate = float(self._config['max_error_rate'])
+        else:
+            max_error_rate = None
+            log.debug("No maximum error rate set. Iterations are not checked for errors")
+        if max_error_rate is not None and not 0 <= max_error_rate <= 1:
+            raise ValueError(f"The maximum error rate should be between 0 and 1. Got {max_error_rate}")
+        self._max_error_rate = max_error_rate
+
+        if self._args.fail_on_error_rate is not None:
+            self._fail_on_error_rate = self._args.fail_on_error_rate
+        else:
+            self._fail_on_error_rate = bool(self._config.get('fail_on_error_rate', False))
+
         env = os.environ.copy()
         ignore_deps_bin = self._args.ignore_deps_bin
         if not ignore_deps_bin:
@@ -360,7 +514,122 @@ class Configuration:
         
         dummy_run_after_memory_refresh = self._args.startup_dummy_run_after_memory_refresh
 
-        self._startup = self.StartupConfig(iteration_count, request_count, timeout, cmd_app_prefix, prefix_init_sleep, dummy_run_after_memory_refresh)
+        if self._args.startup_sampling_interval is not None:
+            sampling_interval = float(self._args.startup_sampling_interval)
+        elif "sampling_interval_ms" in startup_config:
+            sampling_interval = float(startup_config["sampling_interval_ms"])
+        else:
+            # Sampling is opt-in, since the sampling thread adds its overhead to the measured startup
+            sampling_interval = 0
+        if sampling_interval < 0:
+            raise ValueError("The startup sampling interval must not be negative")
+
+        if self._args.startup_parallelism is not None:
+            parallelism = int(self._args.startup_parallelism)
+        elif "parallelism" in startup_config:
+            parallelism = int(startup_config["parallelism"])
+        else:
+            parallelism = 1
+        if parallelism < 1:
+            raise ValueError(f"The startup parallelism should be at least 1. Got {parallelism}")
+        if parallelism > 1 and self.memory_refresh:
+            raise ValueError("Concurrent startup iterations cannot be combined with '--memory-refresh', as refreshing the memory for one iteration would disturb the others")
+
+        if self._args.startup_port_base is not None:
+            port_base = int(self._args.startup_port_base)
+        elif "port_base" in startup_config:
+            port_base = int(startup_config["port_base"])
+        else:
+            port_base = int(self.endpoint_port)
+
+        guard_iterations = int(startup_config.get("parallel_guard_iterations", 2))
+        guard_tolerance = float(startup_config.get("parallel_guard_tolerance_percent", 10))
+        cpu_sets = self.check_startup_cpu_sets(parallelism, cmd_app_prefix, startup_config)
+        under_load = self.check_startup_load_arguments(startup_config.get("under_load", {}))
+
+        self._startup = self.StartupConfig(iteration_count, request_count, timeout, cmd_app_prefix, prefix_init_sleep, dummy_run_after_memory_refresh, sampling_interval,
+                                           parallelism, cpu_sets, port_base, guard_iterations, guard_tolerance, under_load)
+
+    def check_startup_load_arguments(self, load_config):
+        """Returns the configuration of the startup iterations under load.
+
+        :param dict load_config: The "under_load" section of the startup configuration.
+        :rtype: StartupLoadConfig
+        """
+        if self._args.startup_load_iteration_count is not None:
+            iteration_count = int(self._args.startup_load_iteration_count)
+        else:
+            iteration_count = int(load_config.get("iterations", 0))
+
+        if self._args.startup_load_rate is not None:
+            rate = int(self._args.startup_load_rate)
+        elif "rate" in load_config:
+            rate = int(load_config["rate"])
+        elif iteration_count > 0:
+            raise ValueError("The startup iterations under load must have a 'rate'")
+        else:
+            rate = None
+
+        if self._args.startup_load_duration is not None:
+            iteration_duration = int(self._args.startup_load_duration)
+        else:
+            iteration_duration = int(load_config.get("iteration_time_seconds", 30))
+
+        if "threads" in load_config:
+            threads = load_config["threads"]
+        else:
+            threads = self._config["load_testing"].get("threads", 1)
+        if "connections" in load_config:
+            connections = load_config["connections"]
+        else:
+            connections = self._config["load_testing"].get("connections", 1)
+
+        script = None
+        if "lua_script" in load_config:
+            script = self.ensure_script_file_exists(load_config["lua_script"])
+        elif "lua_script" in self._config["load_testing"] and iteration_count > 0:
+            script = self.ensure_script_file_exists(self._config["load_testing"]["lua_script"])
+
+        load_generator = self.check_load_generator("startup under load", None, load_config, LATENCY_LOAD_GENERATORS, script)
+        processes, cpus = self.check_load_generator_fan_out("startup under load", load_generator, load_config, connections)
+        return self.StartupLoadConfig(iteration_duration, iteration_count, rate, script, threads, connections, load_generator, processes, cpus)
+
+    def check_startup_cpu_sets(self, parallelism, cmd_app_prefix, startup_config):
+        """Returns the disjoint CPU sets to pin the concurrent startup iterations to.
+
+        Unless they are set explicitly, the CPU sets are taken in order from the available CPUs. Each of them is as large as the CPU set
+        of a 'taskset -c <cpus>' startup command prefix, which generalises the pinning of a single iteration to concurrent iterations.
+
+        :param int parallelism: Number of startup iterations to run concurrently.
+        :param list cmd_app_prefix: The startup command prefix.
+        :param dict startup_config: The startup section of the configuration file.
+        :return: One list of CPUs per concurrent iteration, None if the iterations are not pinned by the harness.
+        :rtype: list
+        """
+        uses_placeholder = any("BARISTA_CPUS" in item for item in (cmd_app_prefix or []))
+        if parallelism == 1 and not uses_placeholder:
+            return None
+        if self._args.startup_cpu_sets is not None:
+            cpu_sets = [self.parse_cpu_list(cpu_set) for cpu_set in self._args.startup_cpu_sets.split()]
+        elif "cpu_sets" in startup_config:
+            cpu_sets = [self.parse_cpu_list(cpu_set) for cpu_set in startup_config["cpu_sets"]]
+        else:
+            if not hasattr(os, "sched_getaffinity"):
+                raise ValueError(f"Cannot split the available CPUs among the concurrent startup iterations on the '{sys.platform}' platform. Please set the CPU sets explicitly with '--startup-cpu-sets'")
+            available_cpus = sorted(os.sched_getaffinity(0))
+            if cmd_app_prefix is not None and cmd_app_prefix[:2] == ["taskset", "-c"] and not uses_placeholder:
+                set_size = len(self.parse_cpu_list(cmd_app_prefix[2]))
+            else:
+                set_size = len(available_cpus) // parallelism
+            if set_size == 0 or set_size * parallelism > len(available_cpus):
+                raise ValueError(f"Cannot split the {len(available_cpus)} available CPUs into {parallelism} disjoint CPU sets of {max(set_size, 1)} CPUs for the concurrent startup iterations")
+            cpu_sets = [available_cpus[slot * set_size:(slot + 1) * set_size] for slot in range(parallelism)]
+        if len(cpu_sets) != parallelism:
+            raise ValueError(f"Expected one CPU set for each of the {parallelism} concurrent startup iterations. Got {len(cpu_sets)} CPU sets")
+        pinned_cpus = [cpu for cpu_set in cpu_sets for cpu in cpu_set]
+        if len(pinned_cpus) != len(set(pinned_cpus)) or any(not cpu_set for cpu_set in cpu_sets):
+            raise ValueError(f"The CPU sets of the concurrent startup iterations should be non-empty and disjoint. Got {cpu_sets}")
+        return cpu_sets
 
     def check_and_set_warmup_arguments(self):
         script = None
@@ -415,7 +684,10 @@ class Configuration:
         elif 'lua_script' in self._config['load_testing']:
             script = self.ensure_script_file_exists(self._config['load_testing']['lua_script'])
 
-        self._warmup = self.WarmupConfig(iteration_duration, iteration_count, script, threads, connections)
+        load_generator = self.check_load_generator("warmup", self._args.warmup_load_generator, warmup_config, THROUGHPUT_LOAD_GENERATORS, script)
+        processes, cpus = self.check_load_generator_fan_out("warmup", load_generator, warmup_config, connections)
+
+        self._warmup = self.WarmupConfig(iteration_duration, iteration_count, script, threads, connections, load_generator, processes, cpus)
 
     def check_and_set_throughput_arguments(self):
         script = None
@@ -469,7 +741,11 @@ class Configuration:
             script = self.ensure_script_file_exists(throughput_config['lua_script'])
         elif 'lua_script' in self._config['load_testing']:
             script = self.ensure_script_file_exists(self._config['load_testing']['lua_script'])
-        self._throughput = self.ThroughputConfig(iteration_duration, iteration_count, script, threads, connections)
+
+        load_generator = self.check_load_generator("throughput", self._args.throughput_load_generator, throughput_config, THROUGHPUT_LOAD_GENERATORS, script)
+        processes, cpus = self.check_load_generator_fan_out("throughput", load_generator, throughput_config, connections)
+
+        self._throughput = self.ThroughputConfig(iteration_duration, iteration_count, script, threads, connections, load_generator, processes, cpus)
 
     def check_and_set_latency_arguments(self):
         log.debug("Checking Latency management options")
@@ -481,8 +757,16 @@ class Configuration:
         percentages = None
         rates=None
         base_step = None
+        sweep = None
+        knee_refinement_steps = 0
+        probe_duration = 30
+        probe_window = None
+        search_confidence = 0.8
+        max_probes_per_rate = 6
+        upper_bound_discovery = False
         defined_slas = None
         sla_requirement= None
+        sla_tiers = None
 
         latency_config = self._config['load_testing']['latency_measurement']
         if self._args.latency_duration is not None:
@@ -533,6 +817,32 @@ class Configuration:
         elif 'lua_script' in self._config['load_testing']:
             script = self.ensure_script_file_exists(self._config['load_testing']['lua_script'])
 
+        if self._args.latency_sla is not None:
+            defined_slas = self._args.latency_sla
+        elif 'SLA' in latency_config:
+            defined_slas = latency_config['SLA']
+        if defined_slas is not None:
+            if isinstance(defined_slas, dict):
+                if not defined_slas:
+                    raise ValueError("SLA tiers must not be empty")
+                sla_tiers = {name: self.parse_sla(tier) for name, tier in defined_slas.items()}
+            else:
+                sla_requirement = self.parse_sla(defined_slas)
+
+        slas = list(sla_tiers.values()) if sla_tiers is not None else [sla_requirement] if sla_requirement is not None else []
+        sla_percentiles = [percentile for sla in slas for percentile in sla if percentile not in RESOURCE_LIMITS]
+        load_generator = self.check_load_generator("latency_measurement", self._args.latency_load_generator, latency_config, LATENCY_LOAD_GENERATORS, script, sla_percentiles)
+        processes, cpus = self.check_load_generator_fan_out("latency_measurement", load_generator, latency_config, connections)
+
+        if self._args.latency_arrival_distribution is not None:
+            arrival_distribution = self._args.latency_arrival_distribution
+        elif 'arrival_distribution' in latency_config:
+            arrival_distribution = latency_config['arrival_distribution']
+        else:
+            arrival_distribution = "constant"
+        if arrival_distribution not in ARRIVAL_DISTRIBUTIONS:
+            raise ValueError(f"Unrecognized value {arrival_distribution} for latency arrival distribution. Supported distributions: {ARRIVAL_DISTRIBUTIONS}")
+
         # Set search strategy
         if self._args.latency_search_strategy is not None:
             search_strategy_name = self._args.latency_search_strategy
@@ -546,6 +856,10 @@ class Configuration:
             strategy = LatencyMode.BINARY_SEARCH
         elif search_strategy_name == 'AIMD':
             strategy = LatencyMode.AIMD
+        elif search_strategy_name == 'ROBUST_BINARY_SEARCH':
+            strategy = LatencyMode.ROBUST_BINARY_SEARCH
+        elif search_strategy_name == 'RATE_SWEEP':
+            strategy = LatencyMode.RATE_SWEEP
         else:
             raise ValueError(f"Unrecognized value {search_strategy_name} for latency search strategy. Supported modes: {[enum.name for enum in LatencyMode]}")
 
@@ -563,7 +877,7 @@ class Configuration:
                 raise ValueError(f"'percentages' field provided for latency measurements, must have at least 1 preceding 'throughput' iteration({self.throughput.iteration_count}<=0)")
             if percentages is None and rates is None and iteration_count>0:
                 raise ValueError("'FIXED' strategy must have at least 'rates' or 'percentages' field in 'latency_measurement'")
-        if strategy == LatencyMode.BINARY_SEARCH or strategy == LatencyMode.AIMD:
+        if strategy in SLA_SEARCH_STRATEGIES:
             if self._args.latency_min_step_percent is not None:
                 base_step = int(self._args.latency_min_step_percent)
             elif 'min_step_percent' in latency_config:
@@ -572,28 +886,197 @@ class Configuration:
                 raise ValueError(f"'{strategy.name}' latency search strategy must have at least 'min_step_percent' defined")
             if self._throughput.iteration_count <= 0:
                 raise ValueError(f"'{strategy.name}' latency search strategy must have at least 1 preceding 'throughput' iteration({self.throughput.iteration_count}<=0)")
+            if self._args.latency_probe_duration is not None:
+                probe_duration = int(self._args.latency_probe_duration)
+            elif 'probe_duration_seconds' in latency_config:
+                probe_duration = latency_config['probe_duration_seconds']
+            if self._args.latency_probe_window is not None:
+                probe_window = int(self._args.latency_probe_window)
+            elif 'probe_window_seconds' in latency_config:
+                probe_window = latency_config['probe_window_seconds']
+            if probe_window is None:
+                # Early stopping is opt-in, by default each probe is a single window
+                probe_window = probe_duration
+            if probe_duration <= 0 or probe_window <= 0:
+                raise ValueError(f"'{strategy.name}' latency search strategy must have positive 'probe_duration_seconds' and 'probe_window_seconds', got {probe_duration} and {probe_window}")
+            probe_window = min(probe_window, probe_duration)
+            if self._args.latency_upper_bound_discovery:
+                upper_bound_discovery = True
+            else:
+                upper_bound_discovery = bool(latency_config.get('upper_bound_discovery', False))
+        if strategy == LatencyMode.ROBUST_BINARY_SEARCH:
+            if self._args.latency_search_confidence is not None:
+                search_confidence = float(self._args.latency_search_confidence)
+            else:
+                search_confidence = latency_config.get('search_confidence', 0.8)
+            if self._args.latency_max_probes_per_rate is not None:
+                max_probes_per_rate = int(self._args.latency_max_probes_per_rate)
+            else:
+                max_probes_per_rate = latency_config.get('max_probes_per_rate', 6)
+            if not 0.5 <= search_confidence < 1:
+                raise ValueError(f"'search_confidence' of the '{strategy.name}' latency strategy must be in [0.5, 1), got {search_confidence}")
+            if max_probes_per_rate < 1:
+                raise ValueError(f"'max_probes_per_rate' of the '{strategy.name}' latency strategy must be at least 1, got {max_probes_per_rate}")
+
+        # The search cache is opt-in, since it makes the search results depend on the previous runs
+        if self._args.latency_no_search_cache or (self._args.latency_search_cache is None and latency_config.get('search_cache') in (None, False)):
+            self._latency_search_cache = None
+        elif self._args.latency_search_cache is not None:
+            self._latency_search_cache = self._args.latency_search_cache
+        elif latency_config['search_cache'] is True:
+            self._latency_search_cache = os.path.join(os.path.dirname(self._output_folder), "barista-search-cache.json")
+        else:
+            self._latency_search_cache = latency_config['search_cache']
+        if strategy == LatencyMode.RATE_SWEEP:
+            sweep = self.check_rate_sweep(latency_config)
+            if self._args.latency_knee_refinement_steps is not None:
+                knee_refinement_steps = int(self._args.latency_knee_refinement_steps)
+            else:
+                knee_refinement_steps = latency_config.get('knee_refinement_steps', 4)
+            if knee_refinement_steps < 0:
+                raise ValueError(f"'knee_refinement_steps' of the 'RATE_SWEEP' latency strategy must not be negative, got {knee_refinement_steps}")
 
-        if self._args.latency_sla is not None:
-            defined_slas = self._args.latency_sla
-        elif 'SLA' in latency_config:
-            defined_slas = latency_config['SLA']
-        if defined_slas is not None:
-            supported_values = ','.join(P_VALUES_MAP.keys())
-            p_requirements = dict()
-            for p_value_pair in defined_slas:
-                p_string = p_value_pair[0]
-                latency_value = p_value_pair[1]
-                if p_string in P_VALUES_MAP:
-                    p_requirements[P_VALUES_MAP[p_string]] = latency_value
-                else:
-                    raise ValueError(f"The p value {p_string} is not supported. Supported p values are: <{supported_values}>")
+        if sla_requirement is None and sla_tiers is None and strategy in SLA_SEARCH_STRATEGIES:
+            raise ValueError(f"SLA field must be present with {strategy.name} strategy")
+        if sla_tiers is not None and strategy not in SLA_SEARCH_STRATEGIES:
+            raise ValueError(f"SLA tiers are only supported by the {', '.join(mode.name for mode in SLA_SEARCH_STRATEGIES)} strategies, got {strategy.name}")
 
-            sla_requirement = p_requirements
+        self._latency = self.LatencyConfig(iteration_duration, iteration_count, strategy, percentages, rates, base_step, sla_requirement, script, threads, connections, load_generator, arrival_distribution, processes, cpus, sweep, knee_refinement_steps, probe_duration, probe_window, search_confidence, max_probes_per_rate, upper_bound_discovery, sla_tiers)
 
-        if sla_requirement is None and (strategy == LatencyMode.BINARY_SEARCH or strategy == LatencyMode.AIMD):
-            raise ValueError(f"SLA field must be present with {strategy.name} strategy")
+    def parse_sla(self, defined_sla):
+        """Returns the requirements of an SLA, given as [percentile, latency_in_milliseconds] and [resource, limit] pairs.
+
+        The latency requirements are keyed by percentile and the resource limits by their name in RESOURCE_LIMITS.
+
+        :param list defined_sla: The [percentile, latency_in_milliseconds] and [resource, limit] pairs of the SLA.
+        :rtype: dict
+        """
+        supported_values = ','.join(list(P_VALUES_MAP.keys()) + RESOURCE_LIMITS)
+        p_requirements = dict()
+        for p_value_pair in defined_sla:
+            p_string = p_value_pair[0]
+            latency_value = p_value_pair[1]
+            if p_string in P_VALUES_MAP:
+                p_requirements[P_VALUES_MAP[p_string]] = latency_value
+            elif p_string in RESOURCE_LIMITS:
+                if self.resource_usage_polling_interval <= 0:
+                    raise ValueError(f"The '{p_string}' SLA limit requires the resource usage polling to be enabled, got a polling interval of {self.resource_usage_polling_interval}")
+                p_requirements[p_string] = latency_value
+            else:
+                raise ValueError(f"The p value {p_string} is not supported. Supported p values are: <{supported_values}>")
+        return p_requirements
 
-        self._latency = self.LatencyConfig(iteration_duration, iteration_count, strategy, percentages, rates, base_step, sla_requirement, script, threads, connections)
+    def check_rate_sweep(self, latency_config):
+        """Returns the fractions of the average throughput measured by the 'RATE_SWEEP' latency strategy, from the lowest to the highest.
+
+        :param dict latency_config: Configuration of the latency phase from the configuration file.
+        :rtype: list
+        """
+        if self._args.latency_sweep_start is not None:
+            start = float(self._args.latency_sweep_start)
+        else:
+            start = latency_config.get('sweep_start', 0.1)
+        if self._args.latency_sweep_end is not None:
+            end = float(self._args.latency_sweep_end)
+        else:
+            end = latency_config.get('sweep_end', 1.5)
+        if self._args.latency_sweep_steps is not None:
+            steps = int(self._args.latency_sweep_steps)
+        else:
+            steps = latency_config.get('sweep_steps', 15)
+        if start <= 0 or end < start:
+            raise ValueError(f"'RATE_SWEEP' latency strategy must have 0 < 'sweep_start' <= 'sweep_end', got {start} and {end}")
+        if steps < 1:
+            raise ValueError(f"'RATE_SWEEP' latency strategy must have at least 1 'sweep_steps', got {steps}")
+        if self._throughput.iteration_count <= 0:
+            raise ValueError(f"'RATE_SWEEP' latency search strategy must have at least 1 preceding 'throughput' iteration({self.throughput.iteration_count}<=0)")
+        if steps == 1:
+            return [start]
+        return [round(start + i * (end - start) / (steps - 1), 6) for i in range(steps)]
+
+    def check_load_generator(self, phase, cli_value, phase_config, supported_load_generators, script, sla_percentiles=()):
+        """Returns the load generator to use in a load-testing phase, verifying it is supported in the phase.
+
+        :param str phase: Name of the load-testing phase in the configuration file.
+        :param str cli_value: Load generator set for the phase from the command line, if any.
+        :param dict phase_config: Configuration of the load-testing phase from the configuration file.
+        :param list supported_load_generators: Load generators supported in the phase, the first one being the default.
+        :param list script: Lua scripts to be executed in the phase, if any.
+        :param list sla_percentiles: Latency percentiles required by the SLAs of the phase, which the load generator must report.
+        :rtype: str
+        """
+        if cli_value is not None:
+            load_generator = cli_value
+        elif 'load_generator' in phase_config:
+            load_generator = phase_config['load_generator']
+        else:
+            load_generator = supported_load_generators[0]
+        if load_generator not in supported_load_generators:
+            raise ValueError(f"Unsupported load generator '{load_generator}' for '{phase}'. Supported load generators: {supported_load_generators}")
+        if load_generator not in LUA_LOAD_GENERATORS and script is not None:
+            raise ValueError(f"The '{load_generator}' load generator set for '{phase}' does not support Lua scripts. Please remove the lua script options for '{phase}'")
+        reported_percentiles = LOAD_GENERATOR_PERCENTILES.get(load_generator)
+        unreported_percentiles = sorted({percentile for percentile in sla_percentiles if reported_percentiles is not None and percentile not in reported_percentiles})
+        if unreported_percentiles:
+            raise ValueError(f"The '{load_generator}' load generator set for '{phase}' does not report the {', '.join(f'p{percentile:g}' for percentile in unreported_percentiles)} latency required by the SLA. It reports {', '.join(f'p{percentile:g}' for percentile in reported_percentiles)}")
+        return load_generator
+
+    def check_load_generator_fan_out(self, phase, load_generator, phase_config, connections):
+        """Returns the number of load generator processes to run side by side in a load-testing phase, and the CPUs to pin them to.
+
+        :param str phase: Name of the load-testing phase in the configuration file.
+        :param str load_generator: Load generator used in the phase.
+        :param dict phase_config: Configuration of the load-testing phase from the configuration file.
+        :param number connections: Connections kept open in the phase, split among the processes.
+        :return: The number of processes and the list of CPUs (None if the processes should not be pinned).
+        :rtype: (int, list)
+        """
+        if self._args.load_generator_processes is not None:
+            processes = int(self._args.load_generator_processes)
+        elif 'load_generator_processes' in phase_config:
+            processes = int(phase_config['load_generator_processes'])
+        elif 'load_generator_processes' in self._config['load_testing']:
+            processes = int(self._config['load_testing']['load_generator_processes'])
+        else:
+            processes = 1
+
+        if self._args.load_generator_cpus is not None:
+            cpus = self.parse_cpu_list(self._args.load_generator_cpus)
+        elif 'load_generator_cpus' in phase_config:
+            cpus = self.parse_cpu_list(phase_config['load_generator_cpus'])
+        elif 'load_generator_cpus' in self._config['load_testing']:
+            cpus = self.parse_cpu_list(self._config['load_testing']['load_generator_cpus'])
+        elif processes > 1 and hasattr(os, "sched_getaffinity"):
+            cpus = sorted(os.sched_getaffinity(0))
+        else:
+            cpus = None
+
+        if processes < 1:
+            raise ValueError(f"The number of load generator processes for '{phase}' should be at least 1. Got {processes}")
+        if (processes > 1 or cpus is not None) and load_generator not in FAN_OUT_LOAD_GENERATORS:
+            raise ValueError(f"Multiple load generator processes and CPU pinning set for '{phase}' are only supported by the {FAN_OUT_LOAD_GENERATORS} load generators. Got '{load_generator}'")
+        if processes > int(connections):
+            raise ValueError(f"Each of the {processes} load generator processes set for '{phase}' needs at least one connection. Got {connections} connections")
+        if cpus is not None and len(cpus) < processes:
+            raise ValueError(f"Each of the {processes} load generator processes set for '{phase}' needs at least one CPU. Got CPUs {cpus}")
+        return processes, cpus
+
+    @staticmethod
+    def parse_cpu_list(cpu_list):
+        """Parses a list of CPUs in the format accepted by 'taskset -c', e.g. '0,2,4-7', or a JSON list of CPU numbers.
+
+        :rtype: list
+        """
+        if isinstance(cpu_list, list):
+            return sorted(set(int(cpu) for cpu in cpu_list))
+        cpus = set()
+        for cpu_range in str(cpu_list).split(","):
+            match = re.fullmatch(r"\s*(\d+)\s*(?:-\s*(\d+)\s*)?", cpu_range)
+            if match is None:
+                raise ValueError(f"Invalid CPU list '{cpu_list}'. Expected a list of CPUs and CPU ranges, e.g. '0,2,4-7'")
+            first, last = int(match.group(1)), int(match.group(2) or match.group(1))
+            cpus.update(range(first, last + 1))
+        return sorted(cpus)
 
     def read_from_execution_context_file(self, field_name, default=None):
         # tomllib was included in python standard library with version 3.11
@@ -649,6 +1132,14 @@ class Configuration:
     def app_executable(self, value):
         self._app_executable = value
 
+    @property
+    def vm_version(self):
+        return self._vm_version
+
+    @vm_version.setter
+    def vm_version(self, value):
+        self._vm_version = value
+
     @property
     def cmd_app_prefix(self):
         return self._cmd_app_prefix
@@ -665,10 +1156,58 @@ class Configuration:
     def mode(self):
         return self._mode
 
+    @property
+    def jvm_archive(self):
+        return self._jvm_archive
+
+    @property
+    def jvm_archive_cache_dir(self):
+        return self._jvm_archive_cache_dir
+
+    @property
+    def native_image_cache_enabled(self):
+        return self._native_image_cache_enabled
+
+    @property
+    def native_image_cache_dir(self):
+        return self._native_image_cache_dir
+
+    @property
+    def native_image_cache_size(self):
+        return self._native_image_cache_size
+
+    @property
+    def native_image_builds(self):
+        return self._native_image_builds
+
+    @native_image_builds.setter
+    def native_image_builds(self, value):
+        self._native_image_builds = value
+
+    @property
+    def native_pgo(self):
+        return self._native_pgo
+
+    @property
+    def native_pgo_cache_dir(self):
+        return self._native_pgo_cache_dir
+
+    @property
+    def native_layered(self):
+        return self._native_layered
+
+    @property
+    def native_layer_cache_dir(self):
+        return self._native_layer_cache_dir
+
     @property
     def vm_options(self):
         return self._vm_options
 
+    @vm_options.setter
+    def vm_options(self, value):
+        self._vm_options = value
+
     @property
     def app_args(self):
         return self._app_args
@@ -701,6 +1240,22 @@ class Configuration:
     def resource_usage_polling_interval(self):
         return self._resource_usage_polling_interval
 
+    @property
+    def load_sampling_interval(self):
+        return self._load_sampling_interval
+
+    @property
+    def max_error_rate(self):
+        return self._max_error_rate
+
+    @property
+    def fail_on_error_rate(self):
+        return self._fail_on_error_rate
+
+    @property
+    def latency_search_cache(self):
+        return self._latency_search_cache
+
     @property
     def env(self):
         return self._env
@@ -738,16 +1293,34 @@ class Configuration:
         return self._execution_context_file_path
 
     class StartupConfig:
-        def __init__(self, iteration_count, request_count, timeout, cmd_app_prefix, cmd_app_prefix_init_sleep, dummy_run_after_memory_refresh):
+        def __init__(self, iteration_count, request_count, timeout, cmd_app_prefix, cmd_app_prefix_init_sleep, dummy_run_after_memory_refresh, sampling_interval=0,
+                     parallelism=1, cpu_sets=None, port_base=None, parallel_guard_iterations=2, parallel_guard_tolerance=10, under_load=None):
             self._iteration_count = iteration_count
             self._request_count = request_count
             self._timeout = timeout
             self._cmd_app_prefix = cmd_app_prefix
             self._cmd_app_prefix_init_sleep = cmd_app_prefix_init_sleep
             self._dummy_run_after_memory_refresh = dummy_run_after_memory_refresh
+            self._sampling_interval = sampling_interval
+            self._parallelism = parallelism
+            self._cpu_sets = cpu_sets
+            self._port_base = port_base
+            self._parallel_guard_iterations = parallel_guard_iterations
+            self._parallel_guard_tolerance = parallel_guard_tolerance
+            self._under_load = under_load
 
         def describe(self):
-            return f"\t - Startup: Repeat {self.iteration_count} iterations: recording first {self.request_count} requests, timeout after {self.timeout} seconds of no response\n"
+            description = f"\t - Startup: Repeat {self.iteration_count} iterations: recording first {self.request_count} requests, timeout after {self.timeout} seconds of no response"
+            if self.sampling_interval > 0:
+                description += f", sampling the app process every {self.sampling_interval} ms"
+            if self.parallelism > 1:
+                description += f", {self.parallelism} iterations at a time on ports {self.port_base}-{self.port_base + self.parallelism - 1}"
+                if self.cpu_sets is not None:
+                    description += f" pinned to CPUs {' '.join(','.join(str(cpu) for cpu in cpu_set) for cpu_set in self.cpu_sets)}"
+            description += "\n"
+            if self.under_load is not None and self.under_load.iteration_count > 0:
+                description += self.under_load.describe()
+            return description
 
         @property
         def iteration_count(self):
@@ -773,14 +1346,99 @@ class Configuration:
         def dummy_run_after_memory_refresh(self):
             return self._dummy_run_after_memory_refresh
 
+        @property
+        def sampling_interval(self):
+            return self._sampling_interval
+
+        @property
+        def parallelism(self):
+            return self._parallelism
+
+        @property
+        def cpu_sets(self):
+            return self._cpu_sets
+
+        @property
+        def port_base(self):
+            return self._port_base
+
+        @property
+        def parallel_guard_iterations(self):
+            return self._parallel_guard_iterations
+
+        @property
+        def parallel_guard_tolerance(self):
+            return self._parallel_guard_tolerance
+
+        @property
+        def under_load(self):
+            return self._under_load
+
+    class StartupLoadConfig:
+        def __init__(self, it_duration, it_count, rate, script, threads, connections, load_generator, load_generator_processes=1, load_generator_cpus=None):
+            self._iteration_duration = it_duration
+            self._iteration_count = it_count
+            self._rate = rate
+            self._script = script
+            self._threads = threads
+            self._connections = connections
+            self._load_generator = load_generator
+            self._load_generator_processes = load_generator_processes
+            self._load_generator_cpus = load_generator_cpus
+
+        def describe(self):
+            return f"\t - Startup under load: Repeat {self.iteration_count} iterations: {self.load_generator} at {self.rate} op/s for {self.iteration_duration} seconds from the moment the port opens\n"
+
+        def get_total_runtime(self):
+            return self._iteration_count * self._iteration_duration
+
+        @property
+        def iteration_duration(self):
+            return self._iteration_duration
+
+        @property
+        def iteration_count(self):
+            return self._iteration_count
+
+        @property
+        def rate(self):
+            return self._rate
+
+        @property
+        def script(self):
+            return self._script
+
+        @property
+        def threads(self):
+            return self._threads
+
+        @property
+        def connections(self):
+            return self._connections
+
+        @property
+        def load_generator(self):
+            return self._load_generator
+
+        @property
+        def load_generator_processes(self):
+            return self._load_generator_processes
+
+        @property
+        def load_generator_cpus(self):
+            return self._load_generator_cpus
+
     class WarmupConfig:
-        def __init__(self, it_duration, it_count, script, threads, connections):
+        def __init__(self, it_duration, it_count, script, threads, connections, load_generator, load_generator_processes=1, load_generator_cpus=None):
             # init defaults
             self._iteration_duration = it_duration
             self._iteration_count = it_count
             self._threads = threads
             self._connections = connections
             self._script = script
+            self._load_generator = load_generator
+            self._load_generator_processes = load_generator_processes
+            self._load_generator_cpus = load_generator_cpus
 
         def describe(self):
             description = f"\t - Warmup: {self.iteration_count} iterations of {self.iteration_duration} seconds with {self.threads} threads and {self.connections} connections"
@@ -812,20 +1470,44 @@ class Configuration:
         def script(self):
             return self._script
 
+        @property
+        def load_generator(self):
+            return self._load_generator
+
+        @property
+        def load_generator_processes(self):
+            return self._load_generator_processes
+
+        @property
+        def load_generator_cpus(self):
+            return self._load_generator_cpus
+
     class LatencyConfig:
-        def __init__(self, it_duration, it_count, strategy, percentages, rates ,base_step, sla_requirement, script, threads, connections):
+        def __init__(self, it_duration, it_count, strategy, percentages, rates ,base_step, sla_requirement, script, threads, connections, load_generator, arrival_distribution, load_generator_processes=1, load_generator_cpus=None, sweep=None, knee_refinement_steps=0, probe_duration=30, probe_window=None, search_confidence=0.8, max_probes_per_rate=6, upper_bound_discovery=False, sla_tiers=None):
             # init defaults
             self._iteration_duration = it_duration
             self._iteration_count = it_count
             self._threads = threads
             self._connections = connections
             self._script = script
+            self._load_generator = load_generator
+            self._load_generator_processes = load_generator_processes
+            self._load_generator_cpus = load_generator_cpus
+            self._arrival_distribution = arrival_distribution
             self._search_strategy = strategy
             self._base_step = base_step
             self._bounds = 0.03
             self._percentages = percentages
             self._rates = rates
             self._sla_requirement = sla_requirement
+            self._sla_tiers = sla_tiers
+            self._sweep = sweep
+            self._knee_refinement_steps = knee_refinement_steps
+            self._probe_duration = probe_duration
+            self._probe_window = probe_window if probe_window is not None else probe_duration
+            self._search_confidence = search_confidence
+            self._max_probes_per_rate = max_probes_per_rate
+            self._upper_bound_discovery = upper_bound_discovery
 
         def describe(self):
             if self.search_strategy == LatencyMode.FIXED:
@@ -836,8 +1518,17 @@ class Configuration:
                         description += "and "
                 if self.percentages is not None:
                     description += f"max average throughput percentages: {self.percentages}"
+            elif self.search_strategy == LatencyMode.RATE_SWEEP:
+                description = f"\t - Latency: {self.iteration_count} iterations of {self.iteration_duration} seconds with {self.threads} threads and {self.connections} connections at each of "
+                description += f"{len(self.sweep)} rates from {self.sweep[0]} to {self.sweep[-1]} times the max average throughput"
+                if self.knee_refinement_steps > 0:
+                    description += f", and at {self.knee_refinement_steps} more rates around the knee of the latency curve"
             else:
-                description = f"\t - Latency: will determine optimal rate that meets the SLA : {self.sla_requirement} with {self.search_strategy.name} strategy.\n"
+                if self.sla_tiers is not None:
+                    description = f"\t - Latency: will determine optimal rates that meet each of the SLA tiers : {self.sla_tiers} with {self.search_strategy.name} strategy, sharing the probes between the tiers.\n"
+                else:
+                    description = f"\t - Latency: will determine optimal rate that meets the SLA : {self.sla_requirement} with {self.search_strategy.name} strategy.\n"
+                description += f" \t\t Each probe of the search lasts up to {self.probe_duration} seconds, evaluated every {self.probe_window} seconds.\n"
                 description += f" \t\t And then will perform {self.iteration_count} iterations of {self.iteration_duration} seconds at the determined rate"
 
             if self.script is not None:
@@ -847,10 +1538,10 @@ class Configuration:
             return description
 
         def get_aimd_runtime(self):
-            return 3 * (int(math.log(1 / self.base_step, 2)) + 1) * 30
+            return 3 * (int(math.log(1 / self.base_step, 2)) + 1) * self.probe_duration
 
         def get_binary_search_runtime(self):
-            return int(math.log(1/self.base_step, 2)) * 30
+            return int(math.log(1/self.base_step, 2)) * self.probe_duration
 
         def get_total_runtime(self):
             if self.search_strategy == LatencyMode.FIXED:
@@ -862,12 +1553,22 @@ class Configuration:
                     r_it = len(self.rates)
                 return self.iteration_count * self.iteration_duration * (r_it + p_it)
             elif self.search_strategy == LatencyMode.BINARY_SEARCH:
-                return self.iteration_count * self.iteration_duration + self.get_binary_search_runtime()
+                return self.get_final_iterations_runtime() + self.get_binary_search_runtime()
             elif self.search_strategy == LatencyMode.AIMD:
-                return self.iteration_count * self.iteration_duration + self.get_aimd_runtime()
+                return self.get_final_iterations_runtime() + self.get_aimd_runtime()
+            elif self.search_strategy == LatencyMode.ROBUST_BINARY_SEARCH:
+                # Rates close to the optimal rate are probed repeatedly, on average about twice
+                return self.get_final_iterations_runtime() + 2 * self.get_binary_search_runtime()
+            elif self.search_strategy == LatencyMode.RATE_SWEEP:
+                return self.iteration_count * self.iteration_duration * (len(self.sweep) + self.knee_refinement_steps)
             else:
                 raise ValueError("Latency Configuration must have search strategy.")
 
+        def get_final_iterations_runtime(self):
+            # The optimal rate of each SLA tier is measured, while the probes of the search are shared between the tiers
+            tier_count = len(self.sla_tiers) if self.sla_tiers is not None else 1
+            return tier_count * self.iteration_count * self.iteration_duration
+
         @property
         def iteration_duration(self):
             return self._iteration_duration
@@ -888,6 +1589,18 @@ class Configuration:
         def script(self):
             return self._script
 
+        @property
+        def load_generator(self):
+            return self._load_generator
+
+        @property
+        def load_generator_processes(self):
+            return self._load_generator_processes
+
+        @property
+        def load_generator_cpus(self):
+            return self._load_generator_cpus
+
         @property
         def base_step(self):
             return self._base_step
@@ -912,14 +1625,53 @@ class Configuration:
         def sla_requirement(self):
             return self._sla_requirement
 
+        @property
+        def sla_tiers(self):
+            return self._sla_tiers
+
+        @property
+        def arrival_distribution(self):
+            return self._arrival_distribution
+
+        @property
+        def sweep(self):
+            return self._sweep
+
+        @property
+        def knee_refinement_steps(self):
+            return self._knee_refinement_steps
+
+        @property
+        def probe_duration(self):
+            return self._probe_duration
+
+        @property
+        def probe_window(self):
+            return self._probe_window
+
+        @property
+        def search_confidence(self):
+            return self._search_confidence
+
+        @property
+        def max_probes_per_rate(self):
+            return self._max_probes_per_rate
+
+        @property
+        def upper_bound_discovery(self):
+            return self._upper_bound_discovery
+
     class ThroughputConfig:
-        def __init__(self, it_duration, it_count, script, threads, connections):
+        def __init__(self, it_duration, it_count, script, threads, connections, load_generator, load_generator_processes=1, load_generator_cpus=None):
             # init defaults
             self._iteration_count = it_count
             self._iteration_duration = it_duration
             self._threads = threads
             self._connections = connections
             self._script = script
+            self._load_generator = load_generator
+            self._load_generator_processes = load_generator_processes
+            self._load_generator_cpus = load_generator_cpus
 
         def describe(self):
             description = f"\t - Throughput: {self.iteration_count} iterations of {self.iteration_duration} seconds with {self.threads} threads and {self.connections} connections"
@@ -950,4 +1702,16 @@ class Configuration:
 
         @property
         def script(self):
-            return self._script
\ No newline at end of file
+            return self._script
+
+        @property
+        def load_generator(self):
+            return self._load_generator
+
+        @property
+        def load_generator_processes(self):
+            return self._load_generator_processes
+
+        @property
+        def load_generator_cpus(self):
+            return self._load_generator_cpus
\ No newline at end of file
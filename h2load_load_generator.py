@@ -0,0 +1,93 @@
+import subprocess
+import re
+import logging as log
+from abstract_load_generator import AbstractLoadGenerator, run_probe_command, error_rate
+from load_generator_monitor import LoadGeneratorMonitor
+
+class H2loadLoadGenerator(AbstractLoadGenerator):
+    """Measures throughput with h2load, the HTTP/2 benchmarking tool of nghttp2.
+
+    h2load sends requests as fast as the application responds (its '--rate' option sets the rate at which connections
+    are created, not requests), so it can only be used in the warmup and throughput phases. Requests are sent over
+    HTTP/2, using prior knowledge (h2c) for 'http://' endpoints.
+    """
+    def __init__(self, config, output_dir, endpoint, env, sampling_interval=0, capabilities=None):
+        self._endpoint = endpoint
+        self._duration = config.iteration_duration
+        self._output_dir = output_dir
+        self._threads = config.threads
+        self._connections = config.connections
+        self._env = env
+
+    @classmethod
+    def probe(cls, env):
+        version = run_probe_command(["h2load", "--version"], env)
+        usage = run_probe_command(["h2load", "--help"], env)
+        if '--duration' not in usage:
+            raise ValueError(f"h2load does not support the --duration option. Please install nghttp2 1.40 or newer. Got '{version.strip()}'")
+        capabilities = {"rate_control": False, "closed_loop": True, "http2": True, "lua": False, "histogram": False}
+        return version.strip().splitlines()[0], capabilities
+
+    def measure(self, script=None):
+        if script is not None:
+            raise ValueError(f"The h2load load generator does not support Lua scripts! Got script '{script}'.")
+        command = ["h2load", "-D", f"{self._duration}", "-t", f"{self._threads}", "-c", f"{self._connections}", self._endpoint]
+        log.info(f"Measuring throughput with :\n{' '.join(command)}")
+        self._h2load_process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=False, env=self._env)
+        monitor = LoadGeneratorMonitor(self._h2load_process, command[0])
+        monitor.start()
+        output = self._h2load_process.stdout.read().decode("utf-8")
+        monitor.join()
+        self._h2load_process.wait()
+        exit_code = self._h2load_process.returncode
+
+        if exit_code == 0:
+            errors = self.parse_errors(output)
+            return {
+                "throughput": self.parse_measurements(output),
+                "command": ' '.join(command),
+                "stdout": output,
+                "exit_code": exit_code,
+                "errors": errors,
+                "error_rate": error_rate(errors),
+                "load_generator_cpu": monitor.cpu_usage(),
+            }
+
+        self.crash_dump(self._output_dir, output)
+        raise ValueError(f"Throughput command failed and exited with: {exit_code}")
+
+    def parse_measurements(self, measurement):
+        log.info("Parsing received measurements for throughput")
+        reqs = re.findall(r"^finished in [0-9.]+\w+, (\d+\.?\d*) req/s", measurement, re.MULTILINE)
+        if len(reqs) != 1:
+            raise ValueError("Measurements not found")
+        return {"throughput": float(reqs[0])}
+
+    def parse_errors(self, measurement):
+        """Parses the number of completed requests, of responses with a 4xx or 5xx status and of failed requests.
+
+        Requests that failed without a response (stream errors) are counted as read errors.
+        """
+        errors = {"requests": 0, "non_2xx_3xx": 0, "connect": 0, "read": 0, "write": 0, "timeout": 0}
+        requests = re.findall(r"^requests: \d+ total, \d+ started, (\d+) done, \d+ succeeded, \d+ failed, (\d+) errored, (\d+) timeout", measurement, re.MULTILINE)
+        if len(requests) == 1:
+            errors["requests"], errors["read"], errors["timeout"] = [int(count) for count in requests[0]]
+        status_codes = re.findall(r"^status codes: \d+ 2xx, \d+ 3xx, (\d+) 4xx, (\d+) 5xx", measurement, re.MULTILINE)
+        if len(status_codes) == 1:
+            errors["non_2xx_3xx"] = sum(int(count) for count in status_codes[0])
+        return errors
+
+    def cleanup(self):
+        log.debug("no cleanup needed for h2load load generator")
+
+    def dump_stdout(self, output_folder, output, name):
+        output_file = f"{output_folder}/{name}-dump.txt"
+        log.info(f"Dumping h2load outputs to file '{output_file}' and to stdout:\n{output}")
+        with open(output_file, "w") as file:
+            file.write(output)
+
+    def crash_dump(self, output_folder, output):
+        output_file = f"{output_folder}/crash-dump.txt"
+        log.error(f"{self.__class__.__name__} crashed! Dumping crashed h2load outputs to {output_file} and also logging them:\n{output}")
+        with open(output_file, "w") as file:
+            file.write(output)
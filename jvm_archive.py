@@ -0,0 +1,97 @@
+"""Supplies the class-data sharing archive or AOT cache the app is benchmarked with in the JVM archive sub-mode.
+
+An archive is only valid for the exact app jar and JDK it was created with, and the VM options it was trained with (e.g.
+the garbage collector) must match the options it is used with, so archives are cached under a key derived from the hash of
+the jar, the JDK version, the VM options and the kind of archive. If no archive is cached under the key, it is created
+by a training run: the app is started with the option that writes the archive at exit, the startup requests and one
+warmup iteration of the configured workload are sent to it, and the app is then terminated, which writes the archive.
+"""
+from configuration import JvmArchive
+from load_tester import run_training_workload
+from vm import file_sha256
+import hashlib
+import json
+import logging as log
+import os
+import time
+
+# Option writing the archive at exit, option benchmarking the app with the archive and extension of the archive file
+ARCHIVE_OPTIONS = {
+    JvmArchive.APPCDS: ("-XX:ArchiveClassesAtExit", "-XX:SharedArchiveFile", "jsa"),
+    JvmArchive.AOT_CACHE: ("-XX:AOTCacheOutput", "-XX:AOTCache", "aot"),
+}
+
+class JvmArchiveSupplier:
+    """Supplies the archive of the JVM archive sub-mode, training it if it is not cached yet."""
+    def __init__(self, config, vm):
+        self._config = config
+        self._vm = vm
+
+    def supply_archive(self, jar):
+        """Returns the archive of the app jar, training and caching it if it is not cached yet.
+
+        Must be invoked before the options benchmarking the app with the archive are added to the VM options.
+
+        :param os.path jar: Path to the app jar.
+        :return: The kind, path and cache key of the archive, whether it was cached, the duration of the training run
+            (None if it was cached) and the VM options benchmarking the app with the archive.
+        :rtype: dict
+        """
+        training_option, benchmark_option, extension = ARCHIVE_OPTIONS[self._config.jvm_archive]
+        key = self.archive_key(jar)
+        cache_dir = self._config.jvm_archive_cache_dir or os.path.join(os.path.dirname(os.path.abspath(jar)), "barista-jvm-archives")
+        archive_path = os.path.abspath(os.path.join(cache_dir, f"{os.path.splitext(os.path.basename(jar))[0]}-{key[:16]}.{extension}"))
+        cache_hit = os.path.isfile(archive_path)
+        training_time = None
+        if cache_hit:
+            log.info(f"Using the {self._config.jvm_archive.name} archive cached at \"{archive_path}\"")
+        else:
+            os.makedirs(cache_dir, exist_ok=True)
+            training_time = self._train(training_option, archive_path)
+        return {
+            "kind": self._config.jvm_archive.name,
+            "path": archive_path,
+            "key": key,
+            "cache_hit": cache_hit,
+            "training_time": training_time,
+            "vm_options": [f"{benchmark_option}={archive_path}"],
+        }
+
+    def archive_key(self, jar):
+        """Returns the key the archive of the app jar is cached under.
+
+        :param os.path jar: Path to the app jar.
+        :rtype: str
+        """
+        # The JVM rejects an archive trained with incompatible options, e.g. another garbage collector or heap size
+        fingerprint = json.dumps([self._config.jvm_archive.name, file_sha256(jar), self._vm.version, self._config.vm_options])
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+    def _train(self, training_option, archive_path):
+        """Writes the archive in a training run of the app.
+
+        The archive is first written to a temporary file, which replaces the cached archive only once the training run succeeded.
+
+        :param str training_option: The option writing the archive at exit.
+        :param os.path archive_path: Path the archive is cached at.
+        :return: Duration of the training run, in seconds.
+        :rtype: float
+        """
+        temporary_path = f"{archive_path}.tmp"
+        if os.path.isfile(temporary_path):
+            os.remove(temporary_path)
+        vm_options = self._config.vm_options
+        self._config.vm_options = vm_options + [f"{training_option}={temporary_path}"]
+        log.info(f"Training the {self._config.jvm_archive.name} archive of the app")
+        ts_start = time.perf_counter()
+        try:
+            # The JVM writes the archive when it exits
+            run_training_workload(self._config, iterations_per_script=1)
+        finally:
+            self._config.vm_options = vm_options
+        if not os.path.isfile(temporary_path):
+            raise FileNotFoundError(f"The training run did not write the {self._config.jvm_archive.name} archive to \"{temporary_path}\"! Make sure the JDK supports the '{training_option}' option.")
+        os.replace(temporary_path, archive_path)
+        training_time = time.perf_counter() - ts_start
+        log.info(f"Cached the {self._config.jvm_archive.name} archive written in a training run of {training_time:.1f} seconds at \"{archive_path}\"")
+        return training_time
@@ -0,0 +1,133 @@
+"""Monitors the CPU utilization of the load generator process during a single load-testing iteration.
+
+If the load generator cannot send requests faster than the application responds to them, the measured throughput is a
+property of the load generator rather than of the application. wrk and wrk2 run an event loop in each of their threads,
+so the load generator is considered saturated if:
+ * its busiest thread keeps a CPU busy for (almost) the whole iteration, or
+ * the process uses (almost) all the CPUs it is allowed to run on, e.g. when it runs with more threads than CPUs
+"""
+from threading import Thread, Event
+from load_sampler import is_load_process_running
+import logging as log
+import process_info
+import time
+import os
+
+# Time between two subsequent polls of the CPU times of the load generator threads, in seconds
+MONITOR_INTERVAL = 0.25
+# CPU utilization (percentage of a single CPU) above which a load generator thread is considered saturated
+SATURATION_THRESHOLD = 90
+
+def summarize_cpu_usage(cpu_percent, busiest_thread_cpu_percent, threads, available_cpus, description):
+    """Returns the CPU usage of the load generator during an iteration, warning if the load generator was saturated.
+
+    :param float cpu_percent: CPU utilization of the load generator process, as a percentage of a single CPU.
+    :param float busiest_thread_cpu_percent: CPU utilization of the busiest load generator thread, as a percentage of a single CPU.
+    :param int threads: Number of threads of the load generator process.
+    :param int available_cpus: Number of CPUs the load generator process is allowed to run on.
+    :param str description: Description of the load generator, used in the warning.
+    :rtype: dict
+    """
+    saturated = busiest_thread_cpu_percent >= SATURATION_THRESHOLD or cpu_percent >= SATURATION_THRESHOLD * available_cpus
+    if saturated:
+        log.warning(f"The load generator {description} appears to be saturated: its busiest thread used {busiest_thread_cpu_percent:.1f}% of a CPU, "
+                    f"and the process used {cpu_percent:.1f}% out of the {available_cpus * 100}% available to it. "
+                    f"The measured throughput may be limited by the load generator rather than by the application!")
+    return {
+        "cpu_percent": cpu_percent,
+        "busiest_thread_cpu_percent": busiest_thread_cpu_percent,
+        "threads": threads,
+        "available_cpus": available_cpus,
+        "saturated": saturated,
+    }
+
+def merge_cpu_usage(cpu_usages):
+    """Merges the CPU usage of multiple load generator processes running side by side, or returns None if none was monitored.
+
+    The load generator is saturated if any of its processes is saturated.
+
+    :param list cpu_usages: CPU usage of each of the load generator processes.
+    :rtype: dict
+    """
+    cpu_usages = [cpu_usage for cpu_usage in cpu_usages if cpu_usage is not None]
+    if not cpu_usages:
+        return None
+    return {
+        "cpu_percent": sum(cpu_usage["cpu_percent"] for cpu_usage in cpu_usages),
+        "busiest_thread_cpu_percent": max(cpu_usage["busiest_thread_cpu_percent"] for cpu_usage in cpu_usages),
+        "threads": sum(cpu_usage["threads"] for cpu_usage in cpu_usages),
+        "available_cpus": sum(cpu_usage["available_cpus"] for cpu_usage in cpu_usages),
+        "saturated": any(cpu_usage["saturated"] for cpu_usage in cpu_usages),
+    }
+
+def available_cpus(pid=0):
+    """Returns the number of CPUs the process is allowed to run on."""
+    if hasattr(os, "sched_getaffinity"):
+        try:
+            return len(os.sched_getaffinity(pid))
+        except OSError:
+            pass
+    return os.cpu_count()
+
+class LoadGeneratorMonitor(Thread):
+    """
+    Load Generator Monitor extends Thread from threading.
+    Used for polling the CPU times of each thread of the load generator process during a load-testing iteration.
+    The monitoring stops once the load generator process finishes or `stop` is invoked.
+    """
+
+    def __init__(self, load_process, description):
+        super(LoadGeneratorMonitor, self).__init__()
+        self._load_process = load_process
+        self._description = description
+        self._stop_event = Event()
+        self._first_poll = None
+        self._last_poll = None
+        self._available_cpus = None
+        self.daemon = True
+
+    def run(self):
+        try:
+            process = process_info.get_process(self._load_process.pid)
+        except FileNotFoundError:
+            return
+        self._available_cpus = available_cpus(self._load_process.pid)
+        self._first_poll = self._poll(process)
+        self._last_poll = self._first_poll
+        while self._first_poll is not None and not self._stop_event.wait(MONITOR_INTERVAL) and is_load_process_running(self._load_process):
+            current_poll = self._poll(process)
+            if current_poll is None:
+                break
+            # Threads that finished before the last poll keep the CPU time they used before finishing
+            self._last_poll = (current_poll[0], {**self._last_poll[1], **current_poll[1]})
+
+    def stop(self):
+        """Stops the monitoring and waits for the monitoring thread to finish."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+
+    def cpu_usage(self):
+        """Returns the CPU usage of the load generator between the first and the last poll, or None if it was not polled long enough.
+
+        :rtype: dict
+        """
+        if self._first_poll is None or self._last_poll is self._first_poll:
+            log.debug(f"The load generator {self._description} finished too quickly for its CPU usage to be monitored")
+            return None
+        first_timestamp, first_thread_times = self._first_poll
+        last_timestamp, last_thread_times = self._last_poll
+        duration = last_timestamp - first_timestamp
+        # Threads started after the first poll had not used any CPU time before it
+        thread_cpu_percent = [100.0 * (cpu_time - first_thread_times.get(thread_id, 0)) / duration for thread_id, cpu_time in last_thread_times.items()]
+        return summarize_cpu_usage(sum(thread_cpu_percent), max(thread_cpu_percent), len(thread_cpu_percent), self._available_cpus, self._description)
+
+    def _poll(self, process):
+        """Returns the current time and the CPU time used by each thread of the process so far, or None if the process finished."""
+        try:
+            threads = process.threads()
+        except Exception as e:
+            # Either FileNotFoundError or psutil.NoSuchProcess, depending on the platform
+            log.debug(f"Stopped monitoring the load generator process {self._load_process.pid}: {e}")
+            return None
+        return time.time(), {thread.id: thread.user_time + thread.system_time for thread in threads}
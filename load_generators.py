@@ -0,0 +1,138 @@
+"""Registry of the load generators used in the warmup, throughput and latency load-testing phases.
+
+The installed load generators are probed only once per harness run, recording their versions and capabilities, so
+that no additional processes are spawned each time a load generator is created or a measurement is performed.
+"""
+from abstract_load_generator import LOAD_GENERATOR_CAPABILITIES
+from wrk1_load_generator import Wrk1LoadGenerator
+from wrk2_load_generator import Wrk2LoadGenerator
+from h2load_load_generator import H2loadLoadGenerator
+from oha_load_generator import OhaLoadGenerator
+from asyncio_load_generator import AsyncioLoadGenerator
+import logging as log
+
+LOAD_GENERATORS = {
+    "wrk": Wrk1LoadGenerator,
+    "wrk2": Wrk2LoadGenerator,
+    "h2load": H2loadLoadGenerator,
+    "oha": OhaLoadGenerator,
+    "asyncio": AsyncioLoadGenerator,
+}
+
+class LoadGeneratorBackend:
+    """A load generator and the outcome of probing its installation."""
+    def __init__(self, name, generator_class, env):
+        self._name = name
+        self._generator_class = generator_class
+        self._version = None
+        self._capabilities = {}
+        self._error = None
+        try:
+            self._version, self._capabilities = generator_class.probe(env)
+        except (FileNotFoundError, ValueError) as e:
+            self._error = str(e)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def generator_class(self):
+        return self._generator_class
+
+    @property
+    def available(self):
+        return self._error is None
+
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def capabilities(self):
+        return self._capabilities
+
+    @property
+    def error(self):
+        return self._error
+
+    def supports(self, capability):
+        return self._capabilities.get(capability, False)
+
+    def describe(self):
+        if not self.available:
+            return f"{self._name}: not available ({self._error})"
+        supported = [capability for capability in LOAD_GENERATOR_CAPABILITIES if self.supports(capability)]
+        return f"{self._name}: {self._version} [{', '.join(supported)}]"
+
+class LoadGeneratorRegistry:
+    """Registry of the load generator backends, probed once for each environment the load generators are run in."""
+    def __init__(self):
+        self._backends = {}
+
+    def probe(self, env):
+        """Probes all the load generators, if not already probed in the given environment.
+
+        :param dict env: Environment of the load generator subprocesses.
+        :return: The probed load generator backends by name.
+        :rtype: dict
+        """
+        key = env.get("PATH", "")
+        if key not in self._backends:
+            self._backends[key] = {name: LoadGeneratorBackend(name, generator_class, env) for name, generator_class in LOAD_GENERATORS.items()}
+            log.info("Probed load generators:\n" + "\n".join(f"  {backend.describe()}" for backend in self._backends[key].values()))
+        return self._backends[key]
+
+    def get_backend(self, name, env, required_capabilities=()):
+        """Returns the probed backend of a load generator, verifying it is installed and has the required capabilities.
+
+        :param str name: Name of the load generator, one of the keys of LOAD_GENERATORS.
+        :param dict env: Environment of the load generator subprocesses.
+        :param list required_capabilities: Capabilities the load generator must support.
+        :rtype: LoadGeneratorBackend
+        """
+        if name not in LOAD_GENERATORS:
+            raise ValueError(f"Unknown load generator '{name}'! Supported load generators: [`{'`, `'.join(LOAD_GENERATORS)}`]")
+        backend = self.probe(env)[name]
+        if not backend.available:
+            raise FileNotFoundError(f"Load generator '{name}' is not available: {backend.error}")
+        for capability in required_capabilities:
+            if not backend.supports(capability):
+                raise ValueError(f"Load generator '{name}' does not support '{capability}'. {backend.describe()}")
+        return backend
+
+load_generator_registry = LoadGeneratorRegistry()
+
+def create_load_generator(name, config, output_dir, endpoint, env, sampling_interval=0):
+    """Creates the load generator with the given name, using the capabilities probed at the start of the harness run.
+
+    :param str name: Name of the load generator, one of the keys of LOAD_GENERATORS.
+    :param config: Configuration of the load-testing phase the load generator is used in.
+    :param str output_dir: Directory the load generator dumps its outputs to.
+    :param str endpoint: Endpoint of the application to be loaded.
+    :param dict env: Environment of the load generator subprocess.
+    :param number sampling_interval: Interval of the throughput and latency sampling within iterations, 0 disables sampling.
+    :rtype: AbstractLoadGenerator
+    """
+    backend = load_generator_registry.get_backend(name, env)
+    return backend.generator_class(config, output_dir, endpoint, env, sampling_interval=sampling_interval, capabilities=backend.capabilities)
+
+def verify_load_generators(config):
+    """Probes the installed load generators and verifies the ones used in the load-testing phases.
+
+    :param Configuration config: The harness configuration.
+    """
+    phases = [
+        ("startup under load", config.startup.under_load, "rate_control"),
+        ("warmup", config.warmup, "closed_loop"),
+        ("throughput", config.throughput, "closed_loop"),
+        ("latency", config.latency, "rate_control"),
+    ]
+    for phase, phase_config, phase_capability in phases:
+        if phase_config.iteration_count == 0:
+            continue
+        required_capabilities = [phase_capability]
+        if phase_config.script is not None:
+            required_capabilities.append("lua")
+        backend = load_generator_registry.get_backend(phase_config.load_generator, config.env, required_capabilities)
+        log.info(f"Using load generator {backend.describe()} for the {phase} phase")
@@ -0,0 +1,162 @@
+"""Records a time series of the throughput and latency observed during a single load-testing iteration.
+
+The load generators (wrk and wrk2) only report their results once an iteration is finished. In order to observe the
+behaviour of the application within an iteration (e.g. JIT compilation tiers kicking in, GC pauses, throughput collapse),
+the harness injects a Lua script into wrk/wrk2 that wraps the benchmark script, if any. The script times the requests of
+the load generator itself with its 'request' and 'response' hooks, and every thread writes a line with the number of
+responses and their latencies to stdout for every sampling interval. The lines of all the threads and processes are
+summed up into the time series once the iteration is finished.
+
+wrk does not tell on which connection a response arrived, so each response is matched with the oldest request of its
+thread that is still outstanding. The average latency of an interval does not depend on the order in which the
+connections of a thread respond, while the maximum latency is only approximate if they respond out of order.
+"""
+from string import Template
+import json
+import logging as log
+import math
+import os
+import re
+import tempfile
+
+# Prefix of the lines written by the sampling script
+SAMPLE_PREFIX = "barista-sample"
+
+SAMPLING_SCRIPT = Template("""-- Generated by the Barista harness: samples the requests of wrk/wrk2 every ${interval} seconds
+local user_script = ${user_script}
+if user_script then
+   dofile(user_script)
+end
+
+local ffi = require("ffi")
+ffi.cdef[[
+typedef struct { long tv_sec; long tv_nsec; } barista_timespec;
+int clock_gettime(int clock_id, barista_timespec *tp);
+]]
+local timespec = ffi.new("barista_timespec")
+local function now()
+   ffi.C.clock_gettime(0, timespec) -- CLOCK_REALTIME
+   return tonumber(timespec.tv_sec) + tonumber(timespec.tv_nsec) / 1e9
+end
+
+local interval = ${interval}
+local max_outstanding = ${max_outstanding}
+local user_request = request
+local user_response = response
+local sent = {}
+local first, last = 1, 0
+local window, count, timed, latency_sum, latency_max = nil, 0, 0, 0, 0
+
+request = function()
+   last = last + 1
+   sent[last] = now()
+   if last - first >= max_outstanding then
+      -- The request of a connection that failed is never responded to
+      sent[first] = nil
+      first = first + 1
+   end
+   if user_request then
+      return user_request()
+   end
+   return wrk.request()
+end
+
+response = function(status, headers, body)
+   local ts = now()
+   local current = math.floor(ts / interval)
+   if window ~= current then
+      if window then
+         io.write(string.format("${prefix} %d %d %d %.3f %.3f\\n", window, count, timed, latency_sum, latency_max))
+         io.flush()
+      end
+      window, count, timed, latency_sum, latency_max = current, 0, 0, 0, 0
+   end
+   count = count + 1
+   if first <= last then
+      local latency = (ts - sent[first]) * 1000
+      sent[first] = nil
+      first = first + 1
+      timed = timed + 1
+      latency_sum = latency_sum + latency
+      latency_max = math.max(latency_max, latency)
+   end
+   if user_response then
+      return user_response(status, headers, body)
+   end
+end
+""")
+
+def is_load_process_running(load_process):
+    """Checks whether the load generator process is still running, without reaping it if it finished.
+
+    :param subprocess.Popen load_process: The load generator process.
+    :rtype: bool
+    """
+    if not hasattr(os, "waitid"):
+        return load_process.poll() is None
+    try:
+        return os.waitid(os.P_PID, load_process.pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is None
+    except ChildProcessError:
+        # The process has already been reaped
+        return False
+
+def write_sampling_script(output_dir, interval, max_outstanding, script=None):
+    """Writes the Lua script sampling the requests of wrk/wrk2, wrapping the benchmark script.
+
+    The script defines the 'request' and 'response' hooks, so wrk/wrk2 call into Lua for every request, which adds some
+    overhead to the load generator.
+
+    :param os.path output_dir: Directory the script is written to.
+    :param number interval: Sampling interval, in seconds.
+    :param int max_outstanding: Maximum number of outstanding requests of a thread, i.e. its number of connections.
+    :param os.path script: The benchmark script, None if the benchmark has no script.
+    :return: Path to the sampling script, to be removed once the iteration is finished.
+    :rtype: os.path
+    """
+    user_script = "nil" if script is None else json.dumps(os.path.abspath(script))
+    fd, path = tempfile.mkstemp(prefix="barista-sampling-", suffix=".lua", dir=output_dir)
+    with os.fdopen(fd, "w") as file:
+        file.write(SAMPLING_SCRIPT.substitute(interval=interval, max_outstanding=max_outstanding, user_script=user_script, prefix=SAMPLE_PREFIX))
+    return path
+
+def parse_time_series(outputs, interval, ts_start, ts_end):
+    """Sums the samples written by the sampling script in the outputs of the wrk/wrk2 processes up into a time series.
+
+    Only the intervals that lie within the iteration are reported. A thread only writes the sample of an interval once it
+    receives a response in a later interval, so an interval in which no thread received a response has no requests.
+
+    :param list outputs: The outputs of the wrk/wrk2 processes.
+    :param number interval: Sampling interval, in seconds.
+    :param number ts_start: Start of the iteration, in seconds since the epoch.
+    :param number ts_end: End of the iteration, in seconds since the epoch.
+    :return: List of samples, one per interval, ordered by time. The 'time' of a sample is the epoch time in milliseconds at the end of its interval.
+    :rtype: list
+    """
+    windows = {}
+    for output in outputs:
+        for window, count, timed, latency_sum, latency_max in re.findall(rf"^{SAMPLE_PREFIX} (\d+) (\d+) (\d+) (\d+\.\d+) (\d+\.\d+)$", output, re.MULTILINE):
+            sample = windows.setdefault(int(window), [0, 0, 0, None])
+            sample[0] += int(count)
+            sample[1] += int(timed)
+            sample[2] += float(latency_sum)
+            if int(timed) > 0:
+                sample[3] = max(float(latency_max), sample[3] or 0)
+    if not windows:
+        log.warning("No samples found in the load generator outputs. Sampling requires wrk/wrk2 to be built with LuaJIT")
+        return []
+    time_series = []
+    for window in range(math.ceil(ts_start / interval), min(math.floor(ts_end / interval), max(windows) + 1)):
+        count, timed, latency_sum, latency_max = windows.get(window, [0, 0, 0, None])
+        time_series.append({
+            "time": (window + 1) * interval * 1000,
+            "duration": interval,
+            "requests": count,
+            "requests_per_second": count / interval,
+            "latency_avg": latency_sum / timed if timed else None,
+            "latency_max": latency_max,
+        })
+    return time_series
+
+def strip_samples(output):
+    """Removes the samples written by the sampling script from the output of a wrk/wrk2 process."""
+    return re.sub(rf"^{SAMPLE_PREFIX} .*\n", "", output, flags=re.MULTILINE)
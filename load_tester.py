@@ -5,8 +5,8 @@ The load-testing is performed using the Barista harness, which carries out 3 dis
 Each one of these periods is highly configurable.
 """
 
-from wrk2_load_generator import Wrk2LoadGenerator
-from wrk1_load_generator import Wrk1LoadGenerator
+from load_generators import create_load_generator
+from abstract_load_generator import exceeds_error_rate
 import os
 import logging as log
 import traceback
@@ -17,22 +17,50 @@ import datetime
 from app_manager import AppProcessFinishedUnexpectedly
 from startup_manager import StartupManager
 from concurrent_reader import ConcurrentReader
-from configuration import ServiceMode
-from results import results_to_csv, compile_usage_p_values, dump_result_json
-from logging_formatting import log_throughput, log_latency, log_startup, log_memory_usage, log_cpu_percent
+from configuration import ServiceMode, LatencyMode
+from results import results_to_csv, compile_usage_p_values, compile_latency_curve, dump_result_json
+from logging_formatting import log_throughput, log_latency, log_latency_curve, log_knee, log_search_result, log_capacity, log_sla_tiers, log_startup, log_startup_phases, log_startup_parallel_guard, log_startup_under_load, log_native_image_builds, log_memory_usage, log_cpu_percent
 from throughput_explorer import ThroughputExplorer
+from search_cache import SearchCache, search_fingerprint
+
+
+def run_training_workload(config, iterations_per_script=None):
+    """Starts the app, sends it the startup requests and the warmup workload, and terminates it.
+
+    Used by training runs that record the behaviour of the app (e.g. a JVM archive or a native image profile),
+    which is written when the app exits.
+
+    :param Configuration config: The harness configuration.
+    :param number iterations_per_script: Number of warmup iterations to run for each script. Defaults to the warmup iteration count.
+    """
+    warmup = config.warmup
+    iterations_per_script = warmup.iteration_count if iterations_per_script is None else min(iterations_per_script, warmup.iteration_count)
+    startup_manager = StartupManager(config)
+    startup_manager.start_app_until_responsive()
+    if iterations_per_script > 0:
+        load_generator = create_load_generator(warmup.load_generator, warmup, config.output_folder, config.endpoint, config.env)
+        for script, _ in itertools.product(warmup.script if warmup.script is not None else [None], range(iterations_per_script)):
+            log.info(f"Running a training iteration of {warmup.iteration_duration} seconds")
+            load_generator.measure(script=script)
+    startup_manager.kill_app()
 
 
 class Benchmark:
-    """Implements the full pipeline of the benchmark."""
-    def __init__(self, config):
+    """Implements the full pipeline of the benchmark.
+
+    :param Configuration config: The harness configuration.
+    :param os.path output_folder: Directory the results are saved to. Defaults to the output directory of the configuration.
+    :param boolean load_phases: Whether to run the throughput and latency phases, otherwise only the startup and warmup phases are run.
+    """
+    def __init__(self, config, output_folder=None, load_phases=True):
         self._config = config
         #Change this for throughput measures
-        self._output_folder = self._config.output_folder
+        self._output_folder = output_folder if output_folder is not None else self._config.output_folder
+        self._load_phases = load_phases
         self._startup_manager = StartupManager(self._config)
-        self._warmup = Wrk1LoadGenerator(self._config._warmup, self._output_folder, self._config.endpoint, self._config.env)
-        self._latency_benchmark = Wrk2LoadGenerator(self._config.latency, self._output_folder, self._config.endpoint, self._config.env)
-        self._throughput_benchmark = Wrk1LoadGenerator(self._config.throughput, self._output_folder, self._config.endpoint, self._config.env)
+        # The load generators are only created for the phases that run, so that no tool of a skipped phase has to be installed
+        self._warmup = None
+        self._throughput_benchmark = None
         self._app_output = ""
         self._concurrent_reader = None
         self._results = None
@@ -56,10 +84,13 @@ class Benchmark:
             # Run all the benchmark phases
             startup_data = self._run_startup()
             warmup_data = self._run_warmup()
-            throughput_data = self._run_throughput()
-            latency_data = self._run_latency(throughput_data)
+            if self._load_phases:
+                throughput_data = self._run_throughput()
+                latency_data, latency_aggregated, latency_summary = self._run_latency(throughput_data)
+            else:
+                throughput_data, latency_data, latency_aggregated, latency_summary = [], {}, {}, {}
 
-            result = self._compile_results(startup_data, warmup_data, throughput_data, latency_data, self._concurrent_reader)
+            result = self._compile_results(startup_data, warmup_data, throughput_data, latency_data, latency_aggregated, latency_summary, self._concurrent_reader)
             self._save_results(result)
         except AppProcessFinishedUnexpectedly as e:
             app_terminated_early = True
@@ -91,31 +122,50 @@ class Benchmark:
                     log.error(line)
             raise
 
+    def _create_load_generator(self, phase_config):
+        """Creates the load generator of a load-testing phase.
+
+        :param phase_config: Configuration of the load-testing phase.
+        :rtype: AbstractLoadGenerator
+        """
+        return create_load_generator(phase_config.load_generator, phase_config, self._output_folder, self._config.endpoint, self._config.env, self._config.load_sampling_interval)
+
     def _run_warmup(self):
         """Runs the warmup phase of the benchmark process."""
         results = []
+        if self.config.warmup.iteration_count > 0 and self._warmup is None:
+            self._warmup = self._create_load_generator(self.config.warmup)
         for script, i in self._get_iterations(self.config.warmup.script, self.config.warmup.iteration_count):
             log.info(f"Running warmup iteration {i+1}/{self.config.warmup.iteration_count}")
-            warmup_measurement = self._warmup.measure(script)
-            results.append(self._format_throughput_measurement(warmup_measurement, i, script))
+            warmup_measurement = self._warmup.measure(script=script)
+            results.append(self._format_throughput_measurement(warmup_measurement, i, script, "warmup"))
             self._warmup.dump_stdout(self._output_folder, warmup_measurement['stdout'], f"warmup-{i+1}")
         return results
 
     def _run_throughput(self):
         """Execute the throughput phase of the benchmark."""
         results = []
+        if self.config.throughput.iteration_count > 0 and self._throughput_benchmark is None:
+            self._throughput_benchmark = self._create_load_generator(self.config.throughput)
         for script, i in self._get_iterations(self.config.throughput.script, self.config.throughput.iteration_count):
             log.info(f"Running throughput iteration {i+1}/{self.config.throughput.iteration_count}")
-            throughput_result_map = self._throughput_benchmark.measure(script)
-            results.append(self._format_throughput_measurement(throughput_result_map, i, script))
+            throughput_result_map = self._throughput_benchmark.measure(script=script)
+            results.append(self._format_throughput_measurement(throughput_result_map, i, script, "throughput"))
             self._throughput_benchmark.dump_stdout(self._output_folder, throughput_result_map['stdout'], f"throughput-{i+1}")
         return results
 
     def _run_latency(self, throughput_data):
-        """Execute the latency phase of the benchmark."""
-        latency_manager = ThroughputExplorer(self.config.latency, self._output_folder, self.config.endpoint, throughput_data, self.config.env)
+        """Execute the latency phase of the benchmark.
+
+        :return: Results of the latency iterations, the latency results aggregated over all the iterations at the same rate, and the summary of the latency phase (e.g. the knee of the latency curve of a rate sweep).
+        :rtype: (dict, dict, dict)
+        """
+        search_cache = None
+        if self.config.latency_search_cache is not None:
+            search_cache = SearchCache(self.config.latency_search_cache, search_fingerprint(self.config))
+        latency_manager = ThroughputExplorer(self.config.latency, self._output_folder, self.config.endpoint, throughput_data, self.config.env, self.config.load_sampling_interval, self.config.max_error_rate, self.config.fail_on_error_rate, search_cache, self._concurrent_reader)
         results = latency_manager.explore()
-        return results
+        return results, latency_manager.aggregated_measurements, latency_manager.summary
 
     def _dump_stdout(self):
         """Dumps the application standard output to a file."""
@@ -141,12 +191,13 @@ class Benchmark:
         iterations = range(iterations_per_script)
         return list(itertools.product(scripts, iterations))
 
-    def _format_throughput_measurement(self, result, iteration_num, script):
-        """Appends the information on iteration index, script name, and load-testing command to the iteration results.
+    def _format_throughput_measurement(self, result, iteration_num, script, phase):
+        """Appends the information on iteration index, script name, load-testing command and request errors to the iteration results.
 
         :param dict result: Dictionary containing information about the load-testing iteration. Contains the command used and the obtained results.
         :param number iteration_num: Measurement iteration index.
         :param string script: Name of the script that was executed in the iteration.
+        :param string phase: Name of the load-testing phase the iteration belongs to.
         :return: Iteration result dictionary updated to contain script, iteration index, and command information.
         :rtype: dict
         """
@@ -155,19 +206,24 @@ class Benchmark:
         datapoint['iteration'] = iteration_num
         if script is not None:
             datapoint['script'] = os.path.basename(script)
+        for key in ['errors', 'error_rate', 'transfer_per_second', 'requests_per_thread', 'load_generator_cpu', 'time_series']:
+            if key in result:
+                datapoint[key] = result[key]
+        if exceeds_error_rate(result, self.config.max_error_rate, self.config.fail_on_error_rate, f"{phase} iteration {iteration_num+1}"):
+            datapoint['exceeds_error_rate'] = True
         return datapoint
 
     def _cleanup(self):
         """Cleans up the acquired resources: terminates the app process, which should terminate all other spawned processes."""
-        if self._latency_benchmark is not None:
-            self._latency_benchmark.cleanup()
+        if self._warmup is not None:
+            self._warmup.cleanup()
         if self._throughput_benchmark is not None:
             self._throughput_benchmark.cleanup()
         self._startup_manager.kill_app()
         if self._concurrent_reader is not None:
             self._concurrent_reader.join()
 
-    def _compile_results(self, startup_data, warmup_data, throughput_data, latency_data, concurrent_reader):
+    def _compile_results(self, startup_data, warmup_data, throughput_data, latency_data, latency_aggregated, latency_summary, concurrent_reader):
         """Constructs a dictionary containing all of the data gathered by the Barista harness.
 
         Constructs a dictionary containing the results of all the benchmark phases,
@@ -178,6 +234,8 @@ class Benchmark:
         :param list warmup_data: Results of the warmup phase of the benchmark.
         :param list throughput_data: Results of the throughput phase of the benchmark.
         :param dict latency_data: Results of the latency phase of the benchmark.
+        :param dict latency_aggregated: Latency results of the latency phase aggregated over all the iterations at the same rate.
+        :param dict latency_summary: Summary of the latency phase, e.g. the knee of the latency curve of a rate sweep.
         :param ConcurrentReader concurrent_reader: The thread that recorded resource usage during the benchmark.
         :return: All of the data gathered by the Barista harness.
         :rtype: dict
@@ -186,6 +244,16 @@ class Benchmark:
         usage_data = list(concurrent_reader.resources)
         if usage_data:
             rss_p_values, vms_p_values, cpu_p_values = compile_usage_p_values(usage_data)
+        latency_curve = []
+        if self.config.latency.search_strategy == LatencyMode.RATE_SWEEP and latency_data:
+            latency_curve = compile_latency_curve(latency_data['final_measurements'], latency_aggregated['final_measurements'], usage_data, latency_summary.get('knee'))
+        latency = {
+            "id": self._create_unique_id(),
+            "measurements": latency_data,
+            "aggregated": latency_aggregated,
+            "curve": latency_curve,
+        }
+        latency.update(latency_summary)
         return {
             "benchmark": self.config.bench_name,
             "command": sys.argv,
@@ -193,6 +261,10 @@ class Benchmark:
             "startup": {
                 "id": self._create_unique_id(),
                 "measurements": startup_data,
+                "phases": self._startup_manager.phases,
+                "timeline": self._startup_manager.timeline,
+                "parallel_guard": self._startup_manager.parallel_guard,
+                "under_load": self._startup_manager.under_load,
                 "self_reported": concurrent_reader.startup_times,
             },
             "warmup": {
@@ -203,10 +275,8 @@ class Benchmark:
                 "id": self._create_unique_id(),
                 "measurements": throughput_data,
             },
-            "latency": {
-                "id": self._create_unique_id(),
-                "measurements": latency_data,
-            },
+            "latency": latency,
+            "native_image_builds": self.config.native_image_builds,
             "resource_usage": {
                 "rss": rss_p_values,
                 "vms": vms_p_values,
@@ -218,6 +288,11 @@ class Benchmark:
     def _create_unique_id(self):
         return str(uuid.uuid4())[:8]
 
+    @property
+    def results(self):
+        """All of the data gathered by the benchmark, None if the benchmark did not finish."""
+        return self._results
+
     def print_final_report_to_stdout(self):
         if self._results is None:
             raise ValueError("No result data to include in the final report!")
@@ -238,9 +313,20 @@ class Benchmark:
                 log.info("\tSystem-wide CPU utilization:")
                 log_cpu_percent(self._results['resource_usage']['cpu'])
 
+        if self._results.get('native_image_builds'):
+            log.info("Native image build results:")
+            log_native_image_builds(self._results['native_image_builds'])
         if self._results['startup'] and self._results['startup']['measurements']:
             log.info("Startup results:")
             log_startup(self._results['startup']['measurements'])
+        if self._results['startup'] and self._results['startup'].get('phases'):
+            log.info("Startup phases per iteration:")
+            log_startup_phases(self._results['startup']['phases'])
+        if self._results['startup'] and self._results['startup'].get('parallel_guard'):
+            log_startup_parallel_guard(self._results['startup']['parallel_guard'])
+        if self._results['startup'] and self._results['startup'].get('under_load'):
+            log.info("Startup under load results:")
+            log_startup_under_load(self._results['startup']['under_load'])
 
         if self._results['warmup'] and self._results['warmup']['measurements']:
             log.info("Warmup results:")
@@ -258,6 +344,25 @@ class Benchmark:
                 log.info(f"Results of {name} latency measurement")
                 for i in range(self.config.latency.iteration_count):
                     log_latency(measurements[i], i+1)
+            for name, aggregated_measurements in self._results['latency'].get('aggregated', {}).items():
+                for aggregated in aggregated_measurements:
+                    log.info(f"Aggregated results of {name} latency measurement over {aggregated['iterations']} iteration(s) ({aggregated['total_count']} requests):")
+                    log_latency(aggregated)
+            if self._results['latency'].get('curve'):
+                log.info("Latency-vs-throughput curve:")
+                log_latency_curve(self._results['latency']['curve'])
+            if self._results['latency'].get('knee'):
+                log.info("Maximum sustainable throughput (knee of the latency curve):")
+                log_knee(self._results['latency']['knee'])
+            if self._results['latency'].get('search'):
+                log.info(f"Optimal rate found by the {self._results['latency']['search']['strategy']} strategy:")
+                log_search_result(self._results['latency']['search'])
+            if self._results['latency'].get('capacity'):
+                log.info("Optimal rate compared to the throughput phase:")
+                log_capacity(self._results['latency']['capacity'])
+            if self._results['latency'].get('tiers'):
+                log.info("Optimal rate of each SLA tier:")
+                log_sla_tiers(self._results['latency']['tiers'])
         log.info("================================================================================")
 
     def _save_results(self, result):
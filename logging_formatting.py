@@ -12,6 +12,77 @@ def log_startup(results):
         response_time = datapoint["response_time"]
         log_aligned_datapoint(f"response #{iteration + 1:02}", f"{response_time:.2f}", "ms")
 
+def log_startup_phases(phases):
+    """Logs the time to exec, time to listen and time to first response of each startup iteration as a table,
+    along with the RSS at the first response and the peak RSS if the app process was sampled.
+
+    :param list phases: The startup phases of each iteration, in milliseconds since the app was started.
+    """
+    def format_value(value, unit="ms"):
+        return "-" if value is None else f"{value:.2f}{unit}"
+
+    log.info(f"\t\t{'iteration':>10} {'exec':>12} {'listen':>12} {'first response':>16} {'rss':>12} {'peak rss':>12}")
+    for datapoint in phases:
+        rss = datapoint.get('at_first_response', {}).get('rss_mb')
+        peak_rss = datapoint.get('peak', {}).get('rss_mb')
+        log.info(f"\t\t{datapoint['iteration'] + 1:>10} {format_value(datapoint['time_to_exec']):>12} {format_value(datapoint['time_to_listen']):>12} {format_value(datapoint['time_to_first_response']):>16} {format_value(rss, 'MB'):>12} {format_value(peak_rss, 'MB'):>12}")
+
+def log_startup_parallel_guard(guard):
+    """Logs the comparison of the concurrent startup iterations to the ones run alone.
+
+    :param dict guard: The medians of the time to first response with and without concurrency, and whether their difference was flagged.
+    """
+    log.info(f"\tConcurrent startup iterations, compared to {guard['sequential_iterations']} iteration(s) run alone:")
+    log_aligned_datapoint("alone", f"{guard['sequential_median']:.2f}", "ms")
+    log_aligned_datapoint("concurrent", f"{guard['parallel_median']:.2f}", "ms")
+    status = "FLAGGED" if guard['flagged'] else "ok"
+    log_aligned_datapoint("difference", f"{guard['difference_percent']:+.1f}", f"% ({status}, tolerance {guard['tolerance_percent']}%)")
+
+def log_startup_under_load(iterations):
+    """Logs the throughput and latency of every second of the startup iterations under load as a table.
+
+    :param list iterations: Results of the startup iterations under load, with their time series in seconds since the app was started.
+    """
+    def format_value(value, unit):
+        return "-" if value is None else f"{value:.2f}{unit}"
+
+    for iteration in iterations:
+        time_to_rate = format_value(iteration['time_to_rate'], 's') if iteration['time_to_rate'] is not None else "never"
+        log.info(f"\tIteration {iteration['iteration'] + 1} at {iteration['rate']} op/s: port opened after {format_value(iteration['time_to_listen'], 'ms')}, at the rate after {time_to_rate}, latency {format_value(iteration['latency_avg'], 'ms')} avg / {format_value(iteration['latency_max'], 'ms')} max")
+        log.info(f"\t\t{'time':>10} {'throughput':>16} {'latency avg':>14} {'latency max':>14}")
+        for sample in iteration['time_series']:
+            log.info(f"\t\t{format_value(sample['time'], 's'):>10} {format_value(sample['requests_per_second'], 'op/s'):>16} {format_value(sample['latency_avg'], 'ms'):>14} {format_value(sample['latency_max'], 'ms'):>14}")
+
+def log_native_image_builds(builds):
+    """Logs the native image builds of the run and their statistics as a table.
+
+    :param list builds: The native image builds, with their statistics read from the build output.
+    """
+    def format_value(value, unit="", precision=2):
+        return "-" if value is None else f"{value:.{precision}f}{unit}"
+
+    log.info(f"\t\t{'image':>24} {'cached':>7} {'build time':>12} {'peak rss':>12} {'image size':>12} {'types':>8} {'methods':>9} {'fields':>8}")
+    for build in builds:
+        stats = build.get('stats') or {}
+        wall_time = stats.get('wall_time') if stats.get('wall_time') is not None else build['build_duration']
+        log.info(f"\t\t{build['image']:>24} {'yes' if build['cache_hit'] else 'no':>7} {format_value(wall_time, 's'):>12} {format_value(stats.get('peak_rss_mb'), 'MB'):>12} {format_value(stats.get('image_size_mb'), 'MB'):>12} "
+                 f"{format_value(stats.get('reachable_types'), precision=0):>8} {format_value(stats.get('reachable_methods'), precision=0):>9} {format_value(stats.get('reachable_fields'), precision=0):>8}")
+
+def log_comparison(comparison, baseline_name, variant_name):
+    """Logs the results of two runs of the app side by side as a table.
+
+    :param list comparison: List of (metric, unit, baseline value, variant value) rows.
+    :param str baseline_name: Name of the baseline run.
+    :param str variant_name: Name of the variant run.
+    """
+    def format_value(value, unit):
+        return "-" if value is None else f"{value:.2f}{unit}"
+
+    log.info(f"\t\t{'metric':>24} {baseline_name:>16} {variant_name:>16} {'change':>10}")
+    for metric, unit, baseline, variant in comparison:
+        change = f"{(variant / baseline - 1) * 100:+.1f}%" if baseline and variant is not None else "-"
+        log.info(f"\t\t{metric:>24} {format_value(baseline, unit):>16} {format_value(variant, unit):>16} {change:>10}")
+
 def log_throughput(measurement_map, iteration_number=None):
     """Logs the results of measured throughput.
 
@@ -24,9 +95,10 @@ def log_throughput(measurement_map, iteration_number=None):
         log.info("\tMeasures for throughput:")
     for metric, value in measurement_map.items():
         # Omit all fields but the recorded metric to make the stdout more readable
-        if metric in ["command", "iteration", "script"]:
+        if metric in ["command", "iteration", "script", "time_series", "errors", "error_rate", "exceeds_error_rate", "transfer_per_second", "requests_per_thread", "load_generator_cpu"]:
             continue
         log_aligned_datapoint(metric, f"{value:.2f}", "ops/s")
+    log_request_stats(measurement_map)
 
 def log_latency(latency_result, iteration_number=None):
     """Logs the results of measured latencies.
@@ -41,6 +113,87 @@ def log_latency(latency_result, iteration_number=None):
         log_aligned_datapoint("Met SLA", latency_result['meets_sla'], "")
     for percentile, score in latency_result['p_values'].items():
         log_aligned_datapoint(f"{percentile:.3f}", f"{score:.2f}", "ms")
+    log_request_stats(latency_result)
+
+def log_latency_curve(curve):
+    """Logs the latency-vs-throughput curve of a rate sweep as a table, with one row per offered rate and the knee marked with '*'.
+
+    :param list curve: Points of the latency-vs-throughput curve.
+    """
+    def format_value(value, unit=""):
+        return "-" if value is None else f"{value:.2f}{unit}"
+
+    log.info(f"\t\t{'offered':>12} {'achieved':>12} {'p50':>10} {'p99':>10} {'p99.9':>10} {'max':>10} {'errors':>8} {'client':>8} {'app cpu':>8} {'app rss':>10}")
+    for point in curve:
+        p_values = point['p_values']
+        offered_rate = f"{point['offered_rate']}{'*' if point.get('knee') else ''}"
+        row = f"\t\t{offered_rate:>12} {format_value(point['achieved_rate']):>12}"
+        for percentile in [50.0, 99.0, 99.9, 100.0]:
+            row += f" {format_value(p_values.get(percentile), 'ms'):>10}"
+        error_rate = point['error_rate'] * 100 if point['error_rate'] is not None else None
+        client = "sat." if point['client_saturated'] else format_value(point['client_cpu_percent'], '%')
+        row += f" {format_value(error_rate, '%'):>8} {client:>8} {format_value(point['app_cpu_percent'], '%'):>8} {format_value(point['app_rss_mb'], 'MB'):>10}"
+        log.info(row)
+
+def log_knee(knee):
+    """Logs the knee of the latency curve of a rate sweep.
+
+    :param dict knee: The knee rate and its latency.
+    """
+    log_aligned_datapoint("rate", knee['rate'], "ops/s")
+    if knee['achieved_rate'] is not None:
+        log_aligned_datapoint("achieved rate", f"{knee['achieved_rate']:.2f}", "ops/s")
+    log_aligned_datapoint(f"{knee['percentile']:.3f}", f"{knee['latency']:.2f}", "ms")
+
+def log_search_result(search):
+    """Logs the optimal rate found by a search strategy, with its confidence interval.
+
+    :param dict search: The optimal rate and its confidence interval.
+    """
+    log_aligned_datapoint("rate", search['rate'], "ops/s")
+    low, high = search['confidence_interval']
+    log_aligned_datapoint(f"{search['confidence'] * 100:.0f}% interval", f"[{low}, {high}]", "ops/s")
+    log_aligned_datapoint("probes", sum(decision['probes'] for decision in search['decisions']), "")
+
+def log_capacity(capacity):
+    """Logs how far the optimal rate found by a search is from the average throughput of the throughput phase.
+
+    :param dict capacity: The optimal rate and the throughput estimate.
+    """
+    log_aligned_datapoint("optimal rate", capacity['rate'], "ops/s")
+    log_aligned_datapoint("throughput estimate", f"{capacity['throughput_estimate']:.2f}", "ops/s")
+    log_aligned_datapoint("difference", f"{capacity['difference_percent']:+.2f}", "%")
+    if capacity.get('binding_constraint'):
+        log_aligned_datapoint("binding constraint", ", ".join(capacity['binding_constraint']), "")
+
+def log_sla_tiers(tiers):
+    """Logs the optimal rate found for each SLA tier as a table, with the number of its probes that were not shared with earlier tiers and the constraint binding its optimal rate.
+
+    :param dict tiers: The optimal rate of each SLA tier.
+    """
+    log.info(f"\t\t{'tier':>16} {'optimal rate':>14} {'vs estimate':>12} {'probes':>8} {'new':>6} {'binding':>20}  SLA")
+    for name, tier in tiers.items():
+        sla = ", ".join(f"{requirement}<{limit}" if isinstance(requirement, str) else f"p{requirement:g}<{limit}ms" for requirement, limit in tier['sla'].items())
+        binding_constraint = ", ".join(tier['binding_constraint']) if tier.get('binding_constraint') else "-"
+        log.info(f"\t\t{name:>16} {tier['rate']:>14} {tier['capacity']['difference_percent']:>+11.2f}% {tier['probes']:>8} {tier['new_probes']:>6} {binding_constraint:>20}  {sla}")
+
+def log_request_stats(measurement_map):
+    """Logs the error rate, transfer rate, per-thread throughput and load generator CPU usage of an iteration, if they were recorded.
+
+    :param dict measurement_map: Dictionary containing the measurement information of an iteration.
+    """
+    if measurement_map.get('error_rate') is not None:
+        log_aligned_datapoint("error rate", f"{measurement_map['error_rate'] * 100:.2f}", "%")
+    if measurement_map.get('exceeds_error_rate'):
+        log_aligned_datapoint("error rate limit", "exceeded", "")
+    if measurement_map.get('transfer_per_second') is not None:
+        log_aligned_datapoint("transfer", f"{measurement_map['transfer_per_second'] / (1024 * 1024):.2f}", "MB/s")
+    if measurement_map.get('requests_per_thread') is not None:
+        log_aligned_datapoint("thread avg", f"{measurement_map['requests_per_thread']['avg']:.2f}", "ops/s")
+    if measurement_map.get('load_generator_cpu') is not None:
+        log_aligned_datapoint("client cpu", f"{measurement_map['load_generator_cpu']['cpu_percent']:.2f}", "%")
+        if measurement_map['load_generator_cpu']['saturated']:
+            log_aligned_datapoint("client", "saturated", "")
 
 def log_memory_usage(p_values):
     """Logs the app process' memory usage.
@@ -0,0 +1,140 @@
+"""Supplies the layered app image of the native layered sub-mode.
+
+A layered image consists of a base layer, a shared library holding the code shared between apps (the JDK and the
+frameworks), and an app layer built on top of it. The base layer only changes with the GraalVM version, its layer
+configuration and the build options, so it is cached under a key derived from those, and only the app layer is built
+if a base layer is cached under the key. The classpath of a cached base layer is checked for compatibility by
+native-image when the app layer is built on top of it.
+"""
+import hashlib
+import json
+import logging as log
+import os
+import shutil
+import time
+import zipfile
+
+# Entry of a Native Image Bundle holding the arguments of the build
+NIB_BUILD_ARGS_ENTRY = "input/stage/build.json"
+LAYER_CREATE_ARGS_FILE = "layer-create.args"
+
+def layer_config_digest(nib_file):
+    """Returns the SHA-256 hash of the layer configuration of a base layer Native Image Bundle.
+
+    The layer configuration consists of the build arguments and the 'layer-create.args' files bundled in the nib.
+
+    :param os.path nib_file: Path to the base layer Native Image Bundle.
+    :rtype: str
+    """
+    digest = hashlib.sha256()
+    with zipfile.ZipFile(nib_file) as nib:
+        for name in sorted(nib.namelist()):
+            if name == NIB_BUILD_ARGS_ENTRY or os.path.basename(name) == LAYER_CREATE_ARGS_FILE:
+                digest.update(name.encode("utf-8"))
+                digest.update(nib.read(name))
+    return digest.hexdigest()
+
+class NativeLayerSupplier:
+    """Supplies the layered app image, building the base layer if it is not cached yet."""
+    def __init__(self, config, vm, executable_supplier):
+        self._config = config
+        self._vm = vm
+        self._executable_supplier = executable_supplier
+
+    def supply_image(self):
+        """Returns the app layer image built on top of the base layer, building and caching the base layer if it is not cached yet.
+
+        The base layer shared library is copied next to the app layer image, where the image loads it from at run time.
+        Must be invoked while the configured app executable is the monolithic image.
+
+        :return: The cache key and directory of the base layer, whether it was cached, the durations of the base layer
+            build (None if it was cached) and of the app layer build, the path to the app layer image, the sizes of
+            the app layer image and the base layer shared library, in bytes, and the build time and size of the monolithic image.
+        :rtype: dict
+        """
+        layer_dict = self._executable_supplier.fetch_layer_nibs()
+        base_nib, library_name, app_nib = layer_dict["base_layer"], layer_dict["base_layer_library"], layer_dict["app_layer"]
+        key = self.base_layer_key(base_nib)
+        cache_dir = self._config.native_layer_cache_dir or os.path.join(os.path.dirname(os.path.abspath(base_nib)), "barista-base-layers")
+        layer_dir = os.path.abspath(os.path.join(cache_dir, f"{self._config.bench_name}-{key[:16]}"))
+        library_file = os.path.join(layer_dir, f"{library_name}.so")
+        layer_file = self._cached_layer_file(layer_dir, library_file)
+        cache_hit = layer_file is not None
+        base_layer_build_time = None
+        if cache_hit:
+            log.info(f"Using the base layer cached at \"{layer_dir}\"")
+        else:
+            if os.path.isdir(layer_dir):
+                log.warning(f"Rebuilding the incomplete base layer cached at \"{layer_dir}\"")
+            base_layer_build_time = self._build_base_layer(base_nib, library_name, layer_dir)
+            layer_file = self._cached_layer_file(layer_dir, library_file)
+
+        log.info("Building the app layer on top of the base layer")
+        build_options = self._config.build_options + ["-H:+UnlockExperimentalVMOptions", f"-H:LayerUse={layer_file}", "-H:-UnlockExperimentalVMOptions"]
+        image_path = self._vm.native_image_build(app_nib, f"{self._config.bench_name}-layered", build_options)
+        app_layer_build_time = self._vm.builds[-1]["build_duration"]
+        shutil.copy2(library_file, os.path.dirname(image_path))
+        return {
+            "key": key,
+            "base_layer": layer_dir,
+            "cache_hit": cache_hit,
+            "base_layer_build_time": base_layer_build_time,
+            "app_layer_build_time": app_layer_build_time,
+            "image": image_path,
+            "app_layer_size": os.path.getsize(image_path),
+            "base_layer_size": os.path.getsize(library_file),
+            "monolithic_build_time": self._executable_supplier.build_times.get(self._config.bench_name),
+            "monolithic_size": os.path.getsize(self._config.app_executable),
+        }
+
+    def base_layer_key(self, base_nib):
+        """Returns the key the base layer is cached under.
+
+        :param os.path base_nib: Path to the base layer Native Image Bundle.
+        :rtype: str
+        """
+        fingerprint = json.dumps([self._vm.version, layer_config_digest(base_nib), self._config.build_options])
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+    def _cached_layer_file(self, layer_dir, library_file):
+        """Returns the layer archive of the base layer cached in a directory, if the directory holds a complete base layer.
+
+        :param os.path layer_dir: Directory the base layer is cached in.
+        :param os.path library_file: Path to the base layer shared library in the directory.
+        :return: Path to the layer archive, None if the shared library or the layer archive is missing.
+        :rtype: os.path
+        """
+        if not os.path.isdir(layer_dir) or not os.path.isfile(library_file):
+            return None
+        layer_files = sorted(name for name in os.listdir(layer_dir) if name.endswith(".nil"))
+        return os.path.join(layer_dir, layer_files[0]) if layer_files else None
+
+    def _build_base_layer(self, base_nib, library_name, layer_dir):
+        """Builds the base layer and caches its shared library and layer archive.
+
+        The base layer is first copied to a temporary directory, which replaces the cached base layer only once the build succeeded.
+
+        :param os.path base_nib: Path to the base layer Native Image Bundle.
+        :param str library_name: Name of the base layer shared library.
+        :param os.path layer_dir: Directory the base layer is cached in.
+        :return: Duration of the base layer build, in seconds.
+        :rtype: float
+        """
+        log.info("Building the base layer")
+        ts_build = time.time()
+        library_path = self._vm.native_image_build(base_nib, library_name, self._config.build_options, verify_app_image_existance=False)
+        base_layer_build_time = self._vm.builds[-1]["build_duration"]
+        output_dir = os.path.dirname(library_path)
+        # Files of previous builds are left in the output directory, so only the files written by this build are considered
+        layer_files = [name for name in os.listdir(output_dir) if name.endswith(".nil") and os.path.getmtime(os.path.join(output_dir, name)) >= ts_build]
+        if not os.path.isfile(f"{library_path}.so") or os.path.getmtime(f"{library_path}.so") < ts_build or not layer_files:
+            raise FileNotFoundError(f"The base layer build did not write the '{library_name}.so' shared library and the layer archive to \"{output_dir}\"!")
+        temporary_dir = f"{layer_dir}.tmp"
+        shutil.rmtree(temporary_dir, ignore_errors=True)
+        os.makedirs(temporary_dir)
+        for name in [f"{library_name}.so"] + layer_files:
+            shutil.copy2(os.path.join(output_dir, name), temporary_dir)
+        shutil.rmtree(layer_dir, ignore_errors=True)
+        os.replace(temporary_dir, layer_dir)
+        log.info(f"Cached the base layer built in {base_layer_build_time:.1f} seconds at \"{layer_dir}\"")
+        return base_layer_build_time
@@ -0,0 +1,95 @@
+"""Supplies the app image optimized with profile-guided optimization in the native PGO sub-mode.
+
+The optimized image is built in three steps: an instrumented image is built with '--pgo-instrument', it is driven with
+the startup requests and the warmup workload of the benchmark, writing the collected profile when it exits, and the image
+is rebuilt with '--pgo=<profile>'. A profile is only valid for the exact nib and GraalVM version it was collected with,
+so profiles are cached under a key derived from the hash of the nib and the GraalVM version, and the instrumented build
+and the training run are skipped if a profile is cached under the key.
+"""
+from load_tester import run_training_workload
+from vm import file_sha256
+import hashlib
+import logging as log
+import os
+import time
+
+class NativePgoSupplier:
+    """Supplies the app image optimized with profile-guided optimization, collecting the profile if it is not cached yet."""
+    def __init__(self, config, vm, executable_supplier):
+        self._config = config
+        self._vm = vm
+        self._executable_supplier = executable_supplier
+
+    def supply_image(self):
+        """Returns the app image optimized with the profile of the app, collecting and caching the profile if it is not cached yet.
+
+        :return: The path and cache key of the profile, whether it was cached, the durations of the instrumented build and
+            the training run (None if the profile was cached), the duration of the optimized build and the path to the optimized image.
+        :rtype: dict
+        """
+        nib_file = self._executable_supplier.nib_file
+        key = self.profile_key(nib_file)
+        cache_dir = self._config.native_pgo_cache_dir or os.path.join(os.path.dirname(os.path.abspath(nib_file)), "barista-pgo-profiles")
+        profile_path = os.path.abspath(os.path.join(cache_dir, f"{self._config.bench_name}-{key[:16]}.iprof"))
+        cache_hit = os.path.isfile(profile_path)
+        instrumented_build_time, training_time = None, None
+        if cache_hit:
+            log.info(f"Using the profile cached at \"{profile_path}\"")
+        else:
+            os.makedirs(cache_dir, exist_ok=True)
+            instrumented_build_time, training_time = self._collect_profile(profile_path)
+        log.info("Building the app image optimized with the profile")
+        ts_start = time.perf_counter()
+        image_path = self._executable_supplier.build_image(f"{self._config.bench_name}-pgo", self._config.build_options + [f"--pgo={profile_path}"])
+        return {
+            "profile": profile_path,
+            "key": key,
+            "cache_hit": cache_hit,
+            "instrumented_build_time": instrumented_build_time,
+            "training_time": training_time,
+            "optimized_build_time": time.perf_counter() - ts_start,
+            "image": image_path,
+        }
+
+    def profile_key(self, nib_file):
+        """Returns the key the profile of the app nib is cached under.
+
+        :param os.path nib_file: Path to the app Native Image Bundle.
+        :rtype: str
+        """
+        fingerprint = f"{file_sha256(nib_file)}\n{self._vm.version}"
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+    def _collect_profile(self, profile_path):
+        """Builds the instrumented image and writes the profile in a training run of it.
+
+        The profile is first written to a temporary file, which replaces the cached profile only once the training run succeeded.
+
+        :param os.path profile_path: Path the profile is cached at.
+        :return: Durations of the instrumented build and of the training run, in seconds.
+        :rtype: (float, float)
+        """
+        log.info("Building the instrumented app image")
+        ts_start = time.perf_counter()
+        instrumented_image = self._executable_supplier.build_image(f"{self._config.bench_name}-pgo-instrumented", self._config.build_options + ["--pgo-instrument"])
+        instrumented_build_time = time.perf_counter() - ts_start
+
+        temporary_path = f"{profile_path}.tmp"
+        if os.path.isfile(temporary_path):
+            os.remove(temporary_path)
+        app_executable, vm_options = self._config.app_executable, self._config.vm_options
+        self._config.app_executable = instrumented_image
+        self._config.vm_options = vm_options + [f"-XX:ProfilesDumpFile={temporary_path}"]
+        log.info("Collecting the profile of the app")
+        ts_start = time.perf_counter()
+        try:
+            # The instrumented image writes the profile when it exits
+            run_training_workload(self._config)
+        finally:
+            self._config.app_executable, self._config.vm_options = app_executable, vm_options
+        if not os.path.isfile(temporary_path):
+            raise FileNotFoundError(f"The training run did not write the profile to \"{temporary_path}\"!")
+        os.replace(temporary_path, profile_path)
+        training_time = time.perf_counter() - ts_start
+        log.info(f"Cached the profile collected in a training run of {training_time:.1f} seconds at \"{profile_path}\"")
+        return instrumented_build_time, training_time
@@ -0,0 +1,140 @@
+import subprocess
+import json
+import logging as log
+from abstract_load_generator import AbstractLoadGenerator, run_probe_command, error_rate
+from load_generator_monitor import LoadGeneratorMonitor
+
+# Percentiles reported by oha in the "latencyPercentiles" section of its JSON output
+OHA_PERCENTILES = {"p50": 50.0, "p75": 75.0, "p90": 90.0, "p99": 99.0, "p99.9": 99.9, "p99.99": 99.99}
+
+class OhaLoadGenerator(AbstractLoadGenerator):
+    """Measures throughput and latency with oha.
+
+    Without a rate, oha sends requests as fast as the application responds (warmup and throughput phases). With a rate,
+    requests are sent at the given rate (latency phase), with the coordinated omission correction enabled if the
+    installed version of oha supports it. oha only reports a fixed set of latency percentiles, not a full histogram.
+    """
+    def __init__(self, config, output_dir, endpoint, env, sampling_interval=0, capabilities=None):
+        self._config = config
+        self._endpoint = endpoint
+        self._output_dir = output_dir
+        self._connections = config.connections
+        self._env = env
+        self._capabilities = capabilities if capabilities is not None else self.probe(env)[1]
+
+    @classmethod
+    def probe(cls, env):
+        version = run_probe_command(["oha", "--version"], env)
+        usage = run_probe_command(["oha", "--help"], env)
+        if '--output-format' in usage:
+            json_output = ["--output-format", "json"]
+        elif '--json' in usage:
+            json_output = ["--json"]
+        else:
+            raise ValueError(f"oha does not support JSON output. Please install a newer version of oha. Got '{version.strip()}'")
+        capabilities = {
+            "rate_control": True,
+            "closed_loop": True,
+            "http2": '--http2' in usage,
+            "lua": False,
+            "histogram": False,
+            "json_output": json_output,
+            "latency_correction": '--latency-correction' in usage,
+        }
+        return version.strip().splitlines()[0], capabilities
+
+    def measure(self, rate=None, duration=None, script=None):
+        if script is not None:
+            raise ValueError(f"The oha load generator does not support Lua scripts! Got script '{script}'.")
+        if duration is None:
+            duration = self._config.iteration_duration
+
+        command = ["oha", "--no-tui", "-z", f"{duration}s", "-c", f"{self._connections}"] + self._capabilities["json_output"]
+        if rate is not None:
+            command += ["-q", f"{rate}"]
+            if self._capabilities["latency_correction"]:
+                command += ["--latency-correction"]
+        command += [self._endpoint]
+        log.info(f"Running oha command:\n{' '.join(command)}")
+        self._oha_process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=False, env=self._env)
+        monitor = LoadGeneratorMonitor(self._oha_process, command[0])
+        monitor.start()
+        output = self._oha_process.stdout.read().decode("utf-8")
+        monitor.join()
+        self._oha_process.wait()
+        exit_code = self._oha_process.returncode
+
+        if exit_code == 0:
+            summary = self.parse_summary(output)
+            errors = self.parse_errors(summary)
+            return {
+                "throughput": self.parse_measurements(summary),
+                "p_values": self.parse_latencies(summary),
+                "command": ' '.join(command),
+                "stdout": output,
+                "exit_code": exit_code,
+                "errors": errors,
+                "error_rate": error_rate(errors),
+                "load_generator_cpu": monitor.cpu_usage(),
+            }
+
+        self.crash_dump(self._output_dir, output)
+        raise ValueError(f"oha command failed and exited with: {exit_code}")
+
+    def parse_summary(self, output):
+        try:
+            return json.loads(output[output.index("{"):])
+        except ValueError as ex:
+            raise ValueError("Measurements not found") from ex
+
+    def parse_measurements(self, summary):
+        log.info("Parsing received measurements for throughput")
+        return {"throughput": float(summary["summary"]["requestsPerSec"])}
+
+    def parse_latencies(self, summary):
+        """Returns the latency percentiles reported by oha, converted from seconds to milliseconds."""
+        parsed = {}
+        for name, percentile in OHA_PERCENTILES.items():
+            latency = summary.get("latencyPercentiles", {}).get(name)
+            if latency is not None:
+                parsed[percentile] = round(latency * 1000, 9)
+        if summary["summary"].get("slowest") is not None:
+            parsed[100.0] = round(summary["summary"]["slowest"] * 1000, 9)
+        return parsed
+
+    def parse_errors(self, summary):
+        """Parses the number of responses, of responses with a non-2xx or 3xx status and of failed requests.
+
+        The requests that were still in flight when the iteration ended are not counted as errors.
+        """
+        errors = {"requests": 0, "non_2xx_3xx": 0, "connect": 0, "read": 0, "write": 0, "timeout": 0}
+        for status, count in summary.get("statusCodeDistribution", {}).items():
+            errors["requests"] += count
+            if not 200 <= int(status) < 400:
+                errors["non_2xx_3xx"] += count
+        for message, count in summary.get("errorDistribution", {}).items():
+            message = message.lower()
+            if "aborted due to deadline" in message:
+                continue
+            elif "timeout" in message or "timed out" in message:
+                errors["timeout"] += count
+            elif "connect" in message:
+                errors["connect"] += count
+            else:
+                errors["read"] += count
+        return errors
+
+    def cleanup(self):
+        log.debug("no cleanup needed for oha load generator")
+
+    def dump_stdout(self, output_folder, output, name):
+        output_file = f"{output_folder}/{name}-dump.txt"
+        log.info(f"Dumping oha outputs to file '{output_file}' and to stdout:\n{output}")
+        with open(output_file, "w") as file:
+            file.write(output)
+
+    def crash_dump(self, output_folder, output):
+        output_file = f"{output_folder}/crash-dump.txt"
+        log.error(f"{self.__class__.__name__} crashed! Dumping crashed oha outputs to {output_file} and also logging them:\n{output}")
+        with open(output_file, "w") as file:
+            file.write(output)
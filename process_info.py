@@ -3,7 +3,9 @@
 Returns a custom implementation for Linux and the psutil package for other platforms.
 """
 import sys
+import logging as log
 import psutil_replacement_linux
+from psutil_replacement_interface import ResourceSnapshot
 
 def get_process(pid):
     """Returns an OS corresponding object representing the OS process.
@@ -17,4 +19,39 @@ def get_process(pid):
         return psutil.Process(pid)
     except ImportError:
         log.error("Please install the 'psutil' package. You can do so by running:\n\tpip install psutil")
-        raise
\ No newline at end of file
+        raise
+
+def is_listening(pid, port):
+    """Returns whether a TCP socket is listening on the port in the network namespace of the process.
+
+    :param number pid: Process identifier of a process in the network namespace.
+    :param number port: The TCP port.
+    :return: Whether a socket is listening on the port, None if the sockets of the system cannot be inspected.
+    :rtype: bool
+    """
+    if sys.platform.startswith("linux"):
+        return psutil_replacement_linux.is_listening(pid, int(port))
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        return any(connection.status == psutil.CONN_LISTEN and connection.laddr.port == int(port) for connection in psutil.net_connections("tcp"))
+    except psutil.AccessDenied:
+        # Listing the sockets of other processes requires root privileges on some platforms
+        return None
+
+def resource_snapshot(process):
+    """Returns the current resource usage of the process.
+
+    Page faults are only reported by psutil on some platforms, they are None where they are not.
+
+    :param process: The process, as returned by `get_process`.
+    :rtype: ResourceSnapshot
+    """
+    if sys.platform.startswith("linux"):
+        return process.resource_snapshot()
+    cpu_times = process.cpu_times()
+    memory_info = process.memory_info()
+    # On macOS, 'pfaults' counts all the page faults and 'pageins' the ones that required reading from disk
+    return ResourceSnapshot(memory_info.rss, cpu_times.user + cpu_times.system, getattr(memory_info, "pfaults", None), getattr(memory_info, "pageins", None), process.num_threads())
@@ -26,6 +26,15 @@ class ProcessInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def threads(self):
+        """Get the threads of the process and the CPU times accumulated by each of them.
+
+        :return: The threads of the process.
+        :rtype: list[ThreadTimes]
+        """
+        pass
+
     @abstractmethod
     def children(self, recursive):
         """Return the children or all descendants of this process.
@@ -61,4 +70,52 @@ class MemoryInfo():
 
     @property
     def vms(self):
-        return self._vms
\ No newline at end of file
+        return self._vms
+
+class ThreadTimes():
+    """Structure containing the CPU times accumulated by a single thread of a process, in seconds."""
+    def __init__(self, id, user_time, system_time):
+        self._id = id
+        self._user_time = user_time
+        self._system_time = system_time
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def user_time(self):
+        return self._user_time
+
+    @property
+    def system_time(self):
+        return self._system_time
+
+class ResourceSnapshot():
+    """Structure containing the resource usage of a process at a point in time: its rss (Resident Set Size), accumulated CPU time in seconds, accumulated minor and major page faults and number of threads."""
+    def __init__(self, rss, cpu_time, minor_faults, major_faults, num_threads):
+        self._rss = rss
+        self._cpu_time = cpu_time
+        self._minor_faults = minor_faults
+        self._major_faults = major_faults
+        self._num_threads = num_threads
+
+    @property
+    def rss(self):
+        return self._rss
+
+    @property
+    def cpu_time(self):
+        return self._cpu_time
+
+    @property
+    def minor_faults(self):
+        return self._minor_faults
+
+    @property
+    def major_faults(self):
+        return self._major_faults
+
+    @property
+    def num_threads(self):
+        return self._num_threads
@@ -1,11 +1,37 @@
 """Implements process management and resource utilization methods for the Linux platform."""
-from psutil_replacement_interface import ProcessInterface, MemoryInfo
+from psutil_replacement_interface import ProcessInterface, MemoryInfo, ThreadTimes, ResourceSnapshot
 import logging as log
 import mmap
 import time
 import os
 import signal
 
+# State of a listening socket in the /proc/<pid>/net/tcp and /proc/<pid>/net/tcp6 tables
+TCP_LISTEN = "0A"
+
+def is_listening(pid, port):
+    """Returns whether a TCP socket is listening on the port in the network namespace of the process with the given pid.
+
+    Reads the /proc/<pid>/net/tcp and /proc/<pid>/net/tcp6 tables, in which the local address of each socket is given as
+    '<hex address>:<hex port>' and its state as a hex number.
+
+    :param number pid: Process identifier of a process in the network namespace.
+    :param number port: The TCP port.
+    :rtype: bool
+    """
+    for table in ["tcp", "tcp6"]:
+        try:
+            with open(f"/proc/{pid}/net/{table}", "r") as f:
+                next(f, None) # header
+                for line in f:
+                    fields = line.split()
+                    if len(fields) > 3 and fields[3] == TCP_LISTEN and int(fields[1].rsplit(":", 1)[1], 16) == port:
+                        return True
+        except FileNotFoundError:
+            # IPv6 disabled, or the process already terminated
+            continue
+    return False
+
 class Process(ProcessInterface):
     """Represents a Linux process with the given pid."""
     def __init__(self, pid):
@@ -40,6 +66,24 @@ class Process(ProcessInterface):
             log.debug(f"process PID not found (pid={self.pid}) as proc file '{file_not_found.filename}' does not exist")
             raise
 
+    def threads(self):
+        try:
+            threads = []
+            clock_frequency = CPUTimes.clock_frequency()
+            for thread in os.listdir(f"/proc/{self.pid}/task"):
+                try:
+                    with open(f"/proc/{self.pid}/task/{thread}/stat", "r") as f:
+                        stat = f.read()  # thread information as a string, bits of information separated by spaces
+                except FileNotFoundError:
+                    # The thread exited after the task directory was listed
+                    continue
+                stat = stat.split(" ")   # thread information as an array
+                threads.append(ThreadTimes(int(thread), int(stat[13]) / clock_frequency, int(stat[14]) / clock_frequency))
+            return threads
+        except FileNotFoundError as file_not_found:
+            log.debug(f"process PID not found (pid={self.pid}) as proc file '{file_not_found.filename}' does not exist")
+            raise
+
     def children(self, recursive):
         try:
             proc_tree_search_lst = [self]
@@ -75,6 +119,17 @@ class Process(ProcessInterface):
     def terminate(self):
         os.kill(self.pid, signal.SIGTERM)
 
+    def resource_snapshot(self):
+        """Returns the current resource usage of the process, read from a single /proc/<pid>/stat file so it is cheap enough to be sampled every millisecond.
+
+        :rtype: ResourceSnapshot
+        """
+        with open(f"/proc/{self.pid}/stat", "r") as f:
+            stat = f.read()
+        stat = stat.split(" ")
+        cpu_time = (int(stat[13]) + int(stat[14])) / CPUTimes.clock_frequency()
+        return ResourceSnapshot(int(stat[23]) * mmap.PAGESIZE, cpu_time, int(stat[9]), int(stat[11]), int(stat[19]))
+
     def _poll_previous_and_current_cpu_times(self):
         """Collects current CPU utilization and returns it alongside the previous CPU utilization information.
 
@@ -1,20 +1,199 @@
+import base64
 import csv
 import json
 import logging as log
 import re
 import os
+import struct
+import time
+import zlib
 from configuration import P_VALUES_MAP
 
 STARTUP_RESULTS_FILE = "barista_startup_results.csv"
+STARTUP_TIMELINE_FILE = "barista_startup_timeline.csv"
+STARTUP_LOAD_RESULTS_FILE = "barista_startup_load_results.csv"
 WARMUP_RESULTS_FILE = "barista_warmup_results.csv"
 THROUGHPUT_RESULTS_FILE = "barista_throughput_results.csv"
 LATENCY_RESULTS_FILE = "barista_latency_results.csv"
 RESOURCE_MEASUREMENTS_FILE = "barista_resource_usage.csv"
+LOAD_TIME_SERIES_FILE = "barista_load_time_series.csv"
+LATENCY_CURVE_FILE = "barista_latency_curve.csv"
 GENERAL_RESULTS_JSON_FILE = "barista-results.json"
+JVM_ARCHIVE_COMPARISON_FILE = "barista_jvm_archive_comparison.csv"
+NATIVE_PGO_COMPARISON_FILE = "barista_native_pgo_comparison.csv"
+NATIVE_LAYER_COMPARISON_FILE = "barista_native_layer_comparison.csv"
 
 RSS_PERCENTILES = [100, 99, 98, 97, 96, 95, 90, 75, 50, 25]
 VMS_PERCENTILES = [100, 99, 98, 97, 96, 95, 90, 75, 50, 25]
 CPU_PERCENTILES = [100, 99, 98, 97, 96, 95, 90, 75, 50, 25]
+# Percentiles reported by wrk2 in its "Latency Distribution" section
+LATENCY_PERCENTILES = [50.0, 75.0, 90.0, 99.0, 99.9, 99.99, 99.999, 100.0]
+AGGREGATED_ITERATION = "aggregated"
+
+# Parameters of the histogram wrk2 records latencies into (values are in microseconds)
+HDR_LOWEST_DISCERNIBLE_VALUE = 1
+HDR_HIGHEST_TRACKABLE_VALUE = 24 * 60 * 60 * 1000 * 1000
+HDR_SIGNIFICANT_DIGITS = 3
+HDR_V2_COMPRESSED_ENCODING_COOKIE = 0x1c849304 | 0x10
+HDR_V2_ENCODING_COOKIE = 0x1c849303 | 0x10
+
+class LatencyHistogram:
+    """Latency histogram with microsecond resolution, reconstructed from the percentile spectrum reported by wrk2.
+
+    Counts are kept per distinct latency value, and merging histograms (across iterations, scripts or processes) adds up
+    their counts. The precision is limited by the spectrum the histogram is reconstructed from: wrk2 only prints a sparse
+    series of percentile ticks, with values rounded to the microsecond, so all the requests between two ticks are
+    counted at the latency of the upper tick. A percentile of the histogram is therefore an upper bound of the recorded
+    percentile, up to the distance to the next tick of the spectrum, which grows towards the tail of the distribution.
+    The histogram can be exported in the HdrHistogram V2 compressed encoding, as used in HdrHistogram log files.
+    """
+    def __init__(self, counts=None):
+        self._counts = dict(counts) if counts else {}
+
+    def record(self, value, count=1):
+        """Records a latency value.
+
+        :param number value: Latency in microseconds.
+        :param number count: Number of times the value was observed.
+        """
+        if count <= 0:
+            return
+        value = int(value)
+        self._counts[value] = self._counts.get(value, 0) + count
+
+    def merge(self, other):
+        """Adds all of the counts of another histogram to this histogram.
+
+        :param LatencyHistogram other: The histogram to merge into this one.
+        :return: This histogram, updated to contain the counts of both histograms.
+        :rtype: LatencyHistogram
+        """
+        for value, count in other._counts.items():
+            self.record(value, count)
+        return self
+
+    @property
+    def counts(self):
+        return self._counts
+
+    @property
+    def total_count(self):
+        return sum(self._counts.values())
+
+    @property
+    def max_value(self):
+        return max(self._counts) if self._counts else 0
+
+    def count_above(self, value):
+        """Returns the number of recorded latency values greater than the given value.
+
+        :param number value: Latency in microseconds.
+        :rtype: int
+        """
+        return sum(count for recorded_value, count in self._counts.items() if recorded_value > value)
+
+    def value_at_percentile(self, percentile):
+        """Returns the latency value, in microseconds, at the given percentile.
+
+        Follows the HdrHistogram definition: the smallest recorded value such that the given percentage of all the recorded values are less than or equal to it.
+
+        :param number percentile: Percentile in the range [0, 100].
+        :rtype: number
+        """
+        total_count = self.total_count
+        if total_count == 0:
+            return 0
+        count_at_percentile = max(1, int(min(percentile, 100.0) / 100 * total_count + 0.5))
+        cumulative_count = 0
+        for value in sorted(self._counts):
+            cumulative_count += self._counts[value]
+            if cumulative_count >= count_at_percentile:
+                return value
+        return self.max_value
+
+    def p_values(self, percentiles=LATENCY_PERCENTILES):
+        """Returns latency percentile values in milliseconds, in the same format as the wrk2 percentile parser.
+
+        :param list percentiles: Percentiles for which to compute latency values.
+        :return: Dictionary mapping each percentile to the corresponding latency in milliseconds.
+        :rtype: dict
+        """
+        if not self._counts:
+            return {}
+        return {float(percentile): round(self.value_at_percentile(percentile) / 1000, 9) for percentile in percentiles}
+
+    def encode(self):
+        """Encodes the histogram in the compressed HdrHistogram V2 format, as a base64 string.
+
+        :rtype: str
+        """
+        counts = [0] * (self._counts_index(self.max_value) + 1) if self._counts else []
+        for value, count in self._counts.items():
+            counts[self._counts_index(value)] += count
+
+        payload = bytearray()
+        idx = 0
+        while idx < len(counts):
+            count = counts[idx]
+            idx += 1
+            zeros_count = 0
+            if count == 0:
+                zeros_count = 1
+                while idx < len(counts) and counts[idx] == 0:
+                    zeros_count += 1
+                    idx += 1
+            payload += _zig_zag_encode(-zeros_count if zeros_count > 1 else count)
+
+        header = struct.pack(">iiiiqqd", HDR_V2_ENCODING_COOKIE, len(payload), 0, HDR_SIGNIFICANT_DIGITS, HDR_LOWEST_DISCERNIBLE_VALUE, HDR_HIGHEST_TRACKABLE_VALUE, 1.0)
+        compressed = zlib.compress(header + bytes(payload))
+        return base64.b64encode(struct.pack(">ii", HDR_V2_COMPRESSED_ENCODING_COOKIE, len(compressed)) + compressed).decode("ascii")
+
+    @staticmethod
+    def _counts_index(value):
+        """Returns the index of the value in the counts array of an HdrHistogram with the parameters used by wrk2."""
+        sub_bucket_count_magnitude = (2 * 10**HDR_SIGNIFICANT_DIGITS - 1).bit_length()
+        sub_bucket_half_count_magnitude = max(sub_bucket_count_magnitude, 1) - 1
+        unit_magnitude = HDR_LOWEST_DISCERNIBLE_VALUE.bit_length() - 1
+        sub_bucket_mask = ((1 << sub_bucket_count_magnitude) - 1) << unit_magnitude
+        bucket_index = (value | sub_bucket_mask).bit_length() - unit_magnitude - sub_bucket_half_count_magnitude - 1
+        sub_bucket_index = value >> (bucket_index + unit_magnitude)
+        bucket_base_index = (bucket_index + 1) << sub_bucket_half_count_magnitude
+        return bucket_base_index + sub_bucket_index - (1 << sub_bucket_half_count_magnitude)
+
+def _zig_zag_encode(value):
+    """Encodes an integer using ZigZag LEB128 encoding, as used by the HdrHistogram V2 encoding."""
+    value = (value << 1) ^ (value >> 63)
+    encoded = bytearray()
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            encoded.append(byte | 0x80)
+        else:
+            encoded.append(byte)
+            return encoded
+
+def histograms_to_hdr_log(directory, file_name, intervals):
+    """Writes latency histograms into a file in the HdrHistogram log format (version 1.3).
+
+    The values in the log are in microseconds. The maximum value of each interval is reported in milliseconds.
+
+    :param list intervals: List of (start timestamp, end timestamp, tag, LatencyHistogram) tuples, where the timestamps are seconds since epoch and the tag can be None.
+    :return: Absolute path to the log file.
+    :rtype: os.path
+    """
+    log_file_path = os.path.abspath(os.path.join(directory, file_name))
+    log.info(f"Producing {file_name}")
+    start_time = min(interval[0] for interval in intervals) if intervals else time.time()
+    with open(log_file_path, "w") as file:
+        file.write("#[Histogram log format version 1.3]\n")
+        file.write(f"#[StartTime: {start_time:.3f} (seconds since epoch), {time.ctime(start_time)}]\n")
+        file.write(f"#[BaseTime: {start_time:.3f} (seconds since epoch)]\n")
+        file.write('"StartTimestamp","Interval_Length","Interval_Max","Interval_Compressed_Histogram"\n')
+        for interval_start, interval_end, tag, histogram in intervals:
+            tag_prefix = f"Tag={tag}," if tag else ""
+            file.write(f"{tag_prefix}{interval_start - start_time:.3f},{interval_end - interval_start:.3f},{histogram.max_value / 1000:.3f},{histogram.encode()}\n")
+    return log_file_path
 
 def compile_usage_p_values(usage_data):
     """Compiles percentile values for the resource usage metrics recorded during the benchmark.
@@ -43,6 +222,52 @@ def compile_usage_p_values(usage_data):
 
     return rss_p_values, vms_p_values, cpu_p_values
 
+def compile_latency_curve(measurements, aggregated, usage_data, knee=None):
+    """Compiles the latency-vs-throughput curve from the latency iterations measured at each rate of a rate sweep.
+
+    Each point of the curve holds the offered and achieved rates, the latency percentiles (from the merged latency histogram
+    of all the iterations at the rate, if recorded, otherwise averaged over the iterations), the error rate, the load
+    generator CPU usage and the resource usage of the application recorded while the rate was applied.
+
+    :param list measurements: Latency iterations of the rate sweep.
+    :param list aggregated: Latency results aggregated over all the iterations at the same rate.
+    :param list usage_data: Raw resource usage recorded during the benchmark.
+    :param dict knee: Knee of the latency curve, if found. The point at the knee rate is marked.
+    :return: The points of the curve, ordered by offered rate.
+    :rtype: list
+    """
+    def mean(values):
+        values = [value for value in values if value is not None]
+        return sum(values) / len(values) if values else None
+
+    aggregated_p_values = {point["rate"]: point["p_values"] for point in aggregated}
+    curve = []
+    for rate in sorted(set(measurement["rate"] for measurement in measurements)):
+        iterations = [measurement for measurement in measurements if measurement["rate"] == rate]
+        if rate in aggregated_p_values:
+            p_values = aggregated_p_values[rate]
+        else:
+            p_values = {percentile: mean([iteration["p_values"].get(percentile) for iteration in iterations]) for percentile in iterations[0]["p_values"]}
+        client_cpu = [iteration["load_generator_cpu"] for iteration in iterations if iteration.get("load_generator_cpu") is not None]
+        usage = [datapoint for datapoint in usage_data if any(iteration["start_time"] <= datapoint[0] <= iteration["end_time"] for iteration in iterations)]
+        point = {
+            "offered_rate": rate,
+            "percentage": iterations[0].get("percentage"),
+            "iterations": len(iterations),
+            "achieved_rate": mean([iteration.get("achieved_rate") for iteration in iterations]),
+            "p_values": p_values,
+            "error_rate": mean([iteration.get("error_rate") for iteration in iterations]),
+            "client_cpu_percent": mean([cpu["cpu_percent"] for cpu in client_cpu]),
+            "client_saturated": any(cpu["saturated"] for cpu in client_cpu),
+            "app_cpu_percent": mean([datapoint[3] for datapoint in usage]),
+            "app_rss_mb": max(datapoint[1] for datapoint in usage) / (1024 * 1024) if usage else None,
+        }
+        point["knee"] = knee is not None and knee["rate"] == rate
+        if "meets_sla" in iterations[0]:
+            point["meets_sla"] = all(iteration["meets_sla"] for iteration in iterations)
+        curve.append(point)
+    return curve
+
 def compile_p_values(values, percentiles):
     """Compiles percentile values from raw values.
 
@@ -85,8 +310,12 @@ def results_to_csv(directory, results):
     log.info("Writing to csv files")
     if results['startup'] and results['startup']['measurements']:
         startup_to_csv(directory, results['startup']['measurements'])
+        if results['startup'].get('timeline'):
+            startup_timeline_to_csv(directory, results['startup']['timeline'])
     else:
         log.debug(f"No startup data - not producing a startup results file")
+    if results['startup'] and results['startup'].get('under_load'):
+        startup_load_to_csv(directory, results['startup']['under_load'])
     if results['warmup'] and results['warmup']['measurements']:
         warmup_to_csv(directory, results['warmup'])
     else:
@@ -99,8 +328,40 @@ def results_to_csv(directory, results):
         latency_to_csv(directory, results['latency'])
     else:
         log.debug(f"No latency data - not producing a latency results file")
+    if results['latency'] and results['latency'].get('curve'):
+        latency_curve_to_csv(directory, results['latency']['curve'])
     if results['resource_usage'] and results['resource_usage']['raw']:
         usage_to_csv(directory, results['resource_usage']['raw'])
+    time_series_to_csv(directory, results)
+
+def time_series_to_csv(directory, results):
+    """Writes the throughput and latency time series recorded within the load-testing iterations into a csv file.
+
+    The 'time' column holds the epoch time in milliseconds at the end of each sampling interval, as in the resource usage csv file.
+    No file is produced if load sampling was disabled.
+
+    :param dict results: All of the data gathered by the Barista harness.
+    """
+    iterations = []
+    for phase in ["warmup", "throughput"]:
+        if results[phase] and results[phase]['measurements']:
+            iterations += [(phase, measurement) for measurement in results[phase]['measurements']]
+    if results['latency'] and results['latency']['measurements']:
+        iterations += [("latency", measurement) for measurement in results['latency']['measurements'].get('final_measurements', [])]
+    iterations = [(phase, measurement) for phase, measurement in iterations if measurement.get('time_series')]
+    if not iterations:
+        log.debug(f"No load time series data - not producing a load time series file")
+        return
+
+    log.info(f"Producing {LOAD_TIME_SERIES_FILE}")
+    csv_file_path = os.path.abspath(os.path.join(directory, LOAD_TIME_SERIES_FILE))
+    with open(csv_file_path, 'w', newline='\n') as file:
+        writer = csv.writer(file)
+
+        writer.writerow(['phase', 'script', 'iteration', 'request_rate', 'time', 'duration', 'requests', 'requests_per_second', 'latency_avg', 'latency_max'])
+        for phase, measurement in iterations:
+            for sample in measurement['time_series']:
+                writer.writerow([phase, measurement.get('script'), measurement['iteration'], measurement.get('rate'), sample['time'], sample['duration'], sample['requests'], sample['requests_per_second'], sample['latency_avg'], sample['latency_max']])
 
 def startup_to_csv(directory, startup_result):
     """Writes the results of the startup phase of the benchmark into a csv file.
@@ -115,9 +376,163 @@ def startup_to_csv(directory, startup_result):
     with open(csv_file_path, "w", newline="\n") as file:
         writer = csv.writer(file)
 
-        writer.writerow(["iteration", "response_time"])
+        usage_keys = ["rss_mb", "peak_rss_mb", "cpu_time_ms", "minor_faults", "major_faults", "threads", "peak_threads"]
+        writer.writerow(["iteration", "response_time"] + usage_keys)
         for startup_record in startup_result:
-            writer.writerow([startup_record["iteration"], startup_record["response_time"]])
+            writer.writerow([startup_record["iteration"], startup_record["response_time"]] + [startup_record.get(key) for key in usage_keys])
+
+def startup_timeline_to_csv(directory, timeline):
+    """Writes the resource usage samples of the app process recorded during the startup iterations into a csv file.
+
+    The 'time' column holds the milliseconds since the app was started in the respective iteration.
+
+    :param list timeline: Resource usage samples of the startup iterations.
+    """
+    log.info(f"Producing {STARTUP_TIMELINE_FILE}")
+    csv_file_path = os.path.abspath(os.path.join(directory, STARTUP_TIMELINE_FILE))
+    with open(csv_file_path, "w", newline="\n") as file:
+        writer = csv.writer(file)
+
+        columns = ["iteration", "time", "rss_mb", "cpu_time_ms", "minor_faults", "major_faults", "threads"]
+        writer.writerow(columns)
+        for sample in timeline:
+            writer.writerow([sample[column] for column in columns])
+
+def startup_load_to_csv(directory, iterations):
+    """Writes the throughput and latency of every second of the startup iterations under load into a csv file.
+
+    The 'time' column holds the seconds since the app was started at the end of each sampling interval.
+
+    :param list iterations: Results of the startup iterations under load.
+    """
+    log.info(f"Producing {STARTUP_LOAD_RESULTS_FILE}")
+    csv_file_path = os.path.abspath(os.path.join(directory, STARTUP_LOAD_RESULTS_FILE))
+    with open(csv_file_path, "w", newline="\n") as file:
+        writer = csv.writer(file)
+
+        writer.writerow(["script", "iteration", "request_rate", "time", "duration", "requests", "requests_per_second", "latency_avg", "latency_max"])
+        for iteration in iterations:
+            for sample in iteration["time_series"]:
+                writer.writerow([iteration["script"], iteration["iteration"], iteration["rate"], sample["time"], sample["duration"], sample["requests"], sample["requests_per_second"], sample["latency_avg"], sample["latency_max"]])
+
+def _startup_comparison_rows(baseline, variant):
+    """Compiles the startup and startup RSS results of two runs of the app side by side.
+
+    :param dict baseline: Results of the baseline run.
+    :param dict variant: Results of the variant run.
+    :return: List of (metric, unit, baseline value, variant value) rows, a value is None if it was not measured.
+    :rtype: list
+    """
+    def startup_value(results, idx, key):
+        measurements = results['startup']['measurements'] if results['startup'] else None
+        return measurements[idx].get(key) if measurements else None
+
+    def median_phase(results, key):
+        values = [phases[key] for phases in (results['startup'] or {}).get('phases') or [] if phases[key] is not None]
+        return compile_p_values(values, [50])["p50.0"] if values else None
+
+    return [
+        ("first response", "ms", startup_value(baseline, 0, "response_time"), startup_value(variant, 0, "response_time")),
+        ("last startup response", "ms", startup_value(baseline, -1, "response_time"), startup_value(variant, -1, "response_time")),
+        ("time to listen", "ms", median_phase(baseline, "time_to_listen"), median_phase(variant, "time_to_listen")),
+        ("rss at first response", "MB", startup_value(baseline, 0, "rss_mb"), startup_value(variant, 0, "rss_mb")),
+        ("startup peak rss", "MB", startup_value(baseline, -1, "peak_rss_mb"), startup_value(variant, -1, "peak_rss_mb")),
+    ]
+
+def _rss_comparison_rows(baseline, variant):
+    """Compiles the RSS recorded by the resource usage polling of two runs of the app side by side.
+
+    :param dict baseline: Results of the baseline run.
+    :param dict variant: Results of the variant run.
+    :return: List of (metric, unit, baseline value, variant value) rows, a value is None if it was not measured.
+    :rtype: list
+    """
+    def rss(results, percentile):
+        return (results['resource_usage'] or {}).get('rss', {}).get(f"p{float(percentile)}")
+
+    return [
+        ("median rss", "MB", rss(baseline, 50), rss(variant, 50)),
+        ("peak rss", "MB", rss(baseline, 100), rss(variant, 100)),
+    ]
+
+def compile_jvm_archive_comparison(baseline, archived):
+    """Compiles the startup, startup RSS and warmup results of the app run without and with the JVM archive side by side.
+
+    :param dict baseline: Results of the startup and warmup phases of the app run without the archive.
+    :param dict archived: Results of the benchmark of the app run with the archive.
+    :return: List of (metric, unit, baseline value, archived value) rows, a value is None if it was not measured.
+    :rtype: list
+    """
+    rows = _startup_comparison_rows(baseline, archived)
+    baseline_warmup = (baseline['warmup'] or {}).get('measurements') or []
+    archived_warmup = (archived['warmup'] or {}).get('measurements') or []
+    for i in range(max(len(baseline_warmup), len(archived_warmup))):
+        rows.append((f"warmup iteration {i + 1}", "ops/s",
+                     baseline_warmup[i]['throughput'] if i < len(baseline_warmup) else None,
+                     archived_warmup[i]['throughput'] if i < len(archived_warmup) else None))
+    return rows
+
+def compile_native_pgo_comparison(baseline, optimized):
+    """Compiles the throughput, latency and RSS results of the image built without and with the profile side by side.
+
+    Latency is compared for each latency mode measured in both runs, at the rate each run measured it at.
+
+    :param dict baseline: Results of the benchmark of the image built without the profile.
+    :param dict optimized: Results of the benchmark of the image optimized with the profile.
+    :return: List of (metric, unit, baseline value, optimized value) rows, a value is None if it was not measured.
+    :rtype: list
+    """
+    def median_throughput(results):
+        values = [measurement['throughput'] for measurement in (results['throughput'] or {}).get('measurements') or [] if not measurement.get('exceeds_error_rate')]
+        return compile_p_values(values, [50])["p50.0"] if values else None
+
+    def aggregated_latency(results):
+        aggregated = ((results['latency'] or {}).get('aggregated') or {}).get('final_measurements') or []
+        return {measurement['mode']: measurement for measurement in aggregated}
+
+    rows = [
+        _startup_comparison_rows(baseline, optimized)[0],
+        ("median throughput", "ops/s", median_throughput(baseline), median_throughput(optimized)),
+    ]
+    baseline_latency, optimized_latency = aggregated_latency(baseline), aggregated_latency(optimized)
+    for mode in [mode for mode in baseline_latency if mode in optimized_latency]:
+        rows.append((f"rate ({mode} mode)", "ops/s", baseline_latency[mode]['rate'], optimized_latency[mode]['rate']))
+        for percentile in [50.0, 99.0, 99.9]:
+            rows.append((f"p{percentile:g} latency ({mode} mode)", "ms", baseline_latency[mode]['p_values'].get(percentile), optimized_latency[mode]['p_values'].get(percentile)))
+    return rows + _rss_comparison_rows(baseline, optimized)
+
+def compile_native_layer_comparison(monolithic, layered, layers):
+    """Compiles the build time, image size, startup and RSS of the monolithic and the layered image side by side.
+
+    :param dict monolithic: Results of the startup and warmup phases of the monolithic image.
+    :param dict layered: Results of the benchmark of the layered image.
+    :param dict layers: The layered image, as supplied by the NativeLayerSupplier.
+    :return: List of (metric, unit, monolithic value, layered value) rows, a value is None if it was not measured.
+    :rtype: list
+    """
+    rows = [
+        ("build time", "s", layers['monolithic_build_time'], layers['app_layer_build_time']),
+        ("image size", "MB", layers['monolithic_size'] / (1024 * 1024), (layers['app_layer_size'] + layers['base_layer_size']) / (1024 * 1024)),
+        ("app layer size", "MB", None, layers['app_layer_size'] / (1024 * 1024)),
+    ]
+    return rows + _startup_comparison_rows(monolithic, layered) + _rss_comparison_rows(monolithic, layered)
+
+def comparison_to_csv(directory, file_name, comparison, baseline_name, variant_name):
+    """Writes the results of two runs of the app side by side into a csv file.
+
+    :param str file_name: Name of the csv file.
+    :param list comparison: List of (metric, unit, baseline value, variant value) rows.
+    :param str baseline_name: Name of the column of the baseline values.
+    :param str variant_name: Name of the column of the variant values.
+    """
+    log.info(f"Producing {file_name}")
+    csv_file_path = os.path.abspath(os.path.join(directory, file_name))
+    with open(csv_file_path, "w", newline="\n") as file:
+        writer = csv.writer(file)
+
+        writer.writerow(["metric", "unit", baseline_name, variant_name])
+        for row in comparison:
+            writer.writerow(row)
 
 def warmup_to_csv(directory, warmup_result):
     """Writes the results of the warmup phase of the benchmark into a csv file.
@@ -132,10 +547,12 @@ def warmup_to_csv(directory, warmup_result):
     with open(csv_file_path, 'w', newline='\n') as file:
         writer = csv.writer(file)
 
-        writer.writerow(['iteration', 'throughput'])
+        writer.writerow(['iteration', 'throughput', 'error_rate', 'exceeds_error_rate', 'client_cpu_percent', 'client_saturated'])
         for i in range(len(warmup_result['measurements'])):
             name = str(i)
-            writer.writerow([name, warmup_result['measurements'][i]['throughput']])
+            measurement = warmup_result['measurements'][i]
+            client_cpu = measurement.get('load_generator_cpu') or {}
+            writer.writerow([name, measurement['throughput'], measurement.get('error_rate'), measurement.get('exceeds_error_rate', False), client_cpu.get('cpu_percent'), client_cpu.get('saturated')])
 
 def throughput_to_csv(directory, throughput_result):
     """Writes the results of the throughput phase of the benchmark into a csv file.
@@ -150,10 +567,12 @@ def throughput_to_csv(directory, throughput_result):
     with open(csv_file_path, 'w', newline='\n') as file:
         writer = csv.writer(file)
 
-        writer.writerow(['iteration', 'throughput'])
+        writer.writerow(['iteration', 'throughput', 'error_rate', 'exceeds_error_rate', 'client_cpu_percent', 'client_saturated'])
         for i in range(len(throughput_result['measurements'])):
             name = str(i)
-            writer.writerow([name, throughput_result['measurements'][i]['throughput']])
+            measurement = throughput_result['measurements'][i]
+            client_cpu = measurement.get('load_generator_cpu') or {}
+            writer.writerow([name, measurement['throughput'], measurement.get('error_rate'), measurement.get('exceeds_error_rate', False), client_cpu.get('cpu_percent'), client_cpu.get('saturated')])
 
 def latency_to_csv(directory, latency_result):
     """Writes the results of the latency phase of the benchmark into a csv file.
@@ -177,6 +596,24 @@ def latency_to_csv(directory, latency_result):
                 p_values = measurement["p_values"]
                 for percentile, latency in p_values.items():
                     writer.writerow([script, iteration, request_rate, percentile, latency])
+            for aggregated in latency_result.get('aggregated', {}).get(name, []):
+                for percentile, latency in aggregated["p_values"].items():
+                    writer.writerow([None, AGGREGATED_ITERATION, aggregated["rate"], percentile, latency])
+
+def latency_curve_to_csv(directory, curve):
+    """Writes the latency-vs-throughput curve of a rate sweep into a csv file, with one row per offered rate.
+
+    :param list curve: Points of the latency-vs-throughput curve.
+    """
+    log.info(f"Producing {LATENCY_CURVE_FILE}")
+    percentiles = sorted(set(percentile for point in curve for percentile in point["p_values"]))
+    csv_file_path = os.path.abspath(os.path.join(directory, LATENCY_CURVE_FILE))
+    with open(csv_file_path, 'w', newline='\n') as file:
+        writer = csv.writer(file)
+
+        writer.writerow(['offered_rate', 'throughput_percentage', 'achieved_rate'] + [f"p{percentile}" for percentile in percentiles] + ['error_rate', 'client_cpu_percent', 'client_saturated', 'app_cpu_percent', 'app_rss_mb', 'knee', 'meets_sla'])
+        for point in curve:
+            writer.writerow([point['offered_rate'], point['percentage'], point['achieved_rate']] + [point['p_values'].get(percentile) for percentile in percentiles] + [point['error_rate'], point['client_cpu_percent'], point['client_saturated'], point['app_cpu_percent'], point['app_rss_mb'], point['knee'], point.get('meets_sla')])
 
 def dump_result_json(directory, result):
     """Saves the benchmark results to a JSON file.
@@ -0,0 +1,107 @@
+"""Persistent cache of the optimal rates found by the latency search strategies.
+
+The optimal rate found by a search is stored under a fingerprint of everything that affects it: the host, the benchmark,
+the execution mode, the VM version and the application, warmup and latency configuration. A later search with the same fingerprint
+starts from a narrow range around the cached rate instead of the whole range of rates.
+"""
+import hashlib
+import json
+import logging as log
+import os
+import socket
+import time
+
+def search_fingerprint(config):
+    """Returns the fingerprint under which the search results of a benchmark run are cached.
+
+    :param Configuration config: The harness configuration.
+    :rtype: str
+    """
+    latency = config.latency
+    warmup = config.warmup
+    fingerprint = {
+        "host": socket.gethostname(),
+        "benchmark": config.bench_name,
+        "mode": config.mode.name,
+        "vm_version": config.vm_version,
+        "vm_options": config.vm_options,
+        "app_args": config.app_args,
+        "endpoint": config.endpoint,
+        "load_generator": latency.load_generator,
+        "load_generator_processes": latency.load_generator_processes,
+        "threads": latency.threads,
+        "connections": latency.connections,
+        "script": latency.script,
+        "sla": {str(percentile): value for percentile, value in (latency.sla_requirement or {}).items()},
+        "sla_tiers": {name: {str(percentile): value for percentile, value in tier.items()} for name, tier in (latency.sla_tiers or {}).items()},
+        "min_step_percent": latency.base_step,
+        "probe_duration": latency.probe_duration,
+        "probe_window": latency.probe_window,
+        "upper_bound_discovery": latency.upper_bound_discovery,
+        "search_confidence": latency.search_confidence,
+        "max_probes_per_rate": latency.max_probes_per_rate,
+        "arrival_distribution": latency.arrival_distribution,
+        "warmup": {
+            "iteration_duration": warmup.iteration_duration,
+            "iteration_count": warmup.iteration_count,
+            "script": warmup.script,
+            "threads": warmup.threads,
+            "connections": warmup.connections,
+            "load_generator": warmup.load_generator,
+        },
+    }
+    return hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode("utf-8")).hexdigest()
+
+class SearchCache:
+    """Search results of previous benchmark runs, stored in a JSON file shared by all the fingerprints."""
+    def __init__(self, path, fingerprint):
+        self._path = path
+        self._fingerprint = fingerprint
+
+    @property
+    def fingerprint(self):
+        return self._fingerprint
+
+    def _load(self):
+        if not os.path.isfile(self._path):
+            return {}
+        try:
+            with open(self._path, "r") as file:
+                return json.load(file)
+        except (OSError, json.decoder.JSONDecodeError) as e:
+            log.warning(f"Ignoring unreadable search cache '{self._path}': {e}")
+            return {}
+
+    def get(self, strategy):
+        """Returns the cached result of a search strategy, or None if it was not cached under the fingerprint.
+
+        :param str strategy: Name of the search strategy.
+        :rtype: dict
+        """
+        result = self._load().get(self._fingerprint, {}).get(strategy)
+        if result is not None:
+            log.info(f"Found cached {strategy} result for fingerprint {self._fingerprint[:12]} from {result['timestamp']}: {result['rate']} op/s")
+        return result
+
+    def put(self, strategy, rate, average_throughput, measurements):
+        """Caches the result of a search strategy under the fingerprint.
+
+        :param str strategy: Name of the search strategy.
+        :param number rate: The optimal rate found by the search.
+        :param number average_throughput: The average throughput the search was relative to.
+        :param list measurements: The probes performed by the search.
+        """
+        cache = self._load()
+        cache.setdefault(self._fingerprint, {})[strategy] = {
+            "rate": rate,
+            "average_throughput": average_throughput,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "measurements": measurements,
+        }
+        directory = os.path.dirname(os.path.abspath(self._path))
+        os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self._path}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(cache, file, indent=4)
+        os.replace(temporary_path, self._path)
+        log.info(f"Cached {strategy} result of {rate} op/s in '{self._path}'")
@@ -1,10 +1,24 @@
-from app_manager import AppManager
+from app_manager import AppManager, replace_env_vars
+from concurrent.futures import ThreadPoolExecutor
+from load_generators import create_load_generator
 import logging as log
+import process_info
+import itertools
+import socket
 import time
 from http.client import HTTPConnection, HTTPSConnection
 import math
 from results import compile_p_values
 from app_manager import AppProcessFinishedUnexpectedly
+from startup_sampler import StartupSampler
+from configuration import CALIBRATING_LOAD_GENERATORS
+
+# Resource usage of the app process at each startup response, aggregated over the iterations like the response times
+STARTUP_USAGE_KEYS = ["rss_mb", "peak_rss_mb", "cpu_time_ms", "minor_faults", "major_faults", "threads", "peak_threads"]
+# Interval of the throughput and latency samples of the startup iterations under load, in seconds
+STARTUP_LOAD_SAMPLING_INTERVAL = 1
+# Fraction of the request rate the app must sustain for the rest of a startup iteration under load to be deemed at the rate
+STARTUP_LOAD_RATE_FRACTION = 0.9
 
 class StartupManager:
     """Manages the startup phase of the benchmark.
@@ -20,6 +34,20 @@ class StartupManager:
         [M1, M2, ..., Mx]
     Where Mi is the median of the i-th request after app cold start across all the iterations.
 
+    While waiting for the first response of each iteration, the harness also records when the app process
+    was executed (time-to-exec) and when a socket started listening on the endpoint port (time-to-listen),
+    which are reported per iteration along with the time to the first response. The resource usage of the
+    app process is sampled every --startup-sampling-interval milliseconds during each iteration, and the
+    resource usage at each response is aggregated like the response times.
+
+    With --startup-parallelism K, the iterations run K at a time, each pinned to its own CPU set and serving
+    on its own port (see `_run_parallel_iterations`). A few iterations are also run alone beforehand, to flag
+    results that were measurably changed by the concurrency.
+
+    Before starting the final instance of the app, the startup iterations under load start the load generator
+    at a fixed rate as soon as the app port opens (see `_run_under_load_iteration`), recording the throughput
+    and latency of every second of the early life of the app.
+
     The application is started one last time, this time with the non-startup-specific prefix
     specified with --cmd-app-prefix. This instance of the application will be used for all of
     the other load-testing phases (warmup, throughput, latency). The startup requests are also
@@ -33,61 +61,372 @@ class StartupManager:
         self._app_manager = AppManager(config)
         self._iterations = []
         self._startup_data = []
+        self._phases = []
+        self._usage = []
+        self._timeline = []
+        self._parallel_guard = None
+        self._under_load = []
 
     def run(self):
         """Runs the startup phase of the benchmark process."""
-        for iteration_idx in range(self.config.startup.iteration_count):
-            log.info(f"Running startup phase iteration #{iteration_idx + 1}")
-            self.app_manager.start_app(self.config.startup.cmd_app_prefix, self.config.startup.cmd_app_prefix_init_sleep, self.config.startup.dummy_run_after_memory_refresh, True)
-            iteration_data = self._run_single_startup_iteration()
-            self.kill_app()
+        if self.config.startup.parallelism > 1:
+            records = self._run_parallel_iterations()
+        else:
+            records = []
+            for iteration_idx in range(self.config.startup.iteration_count):
+                log.info(f"Running startup phase iteration #{iteration_idx + 1}")
+                records.append(self._run_startup_iteration(iteration_idx, self.app_manager))
+        for iteration_data, phases, usage, timeline in records:
             self._iterations.append(iteration_data)
+            self._phases.append(phases)
+            self._usage.append(usage)
+            self._timeline += timeline
         self._aggregate_iteration_data()
+        if self.config.startup.under_load is not None and self.config.startup.under_load.iteration_count > 0:
+            self._run_under_load_iterations()
 
+        self.start_app_until_responsive()
+        return self._startup_data
+
+    def start_app_until_responsive(self):
+        """Starts the app with the non-startup-specific prefix and sends it the startup requests, without recording them."""
         self.app_manager.start_app(self.config.cmd_app_prefix, self.config.cmd_app_prefix_init_sleep, self.config.dummy_run_after_memory_refresh)
         app_process = self.app_manager.app_process
         log.info(f"Detected app process (pid={app_process.pid}) with command-line:\n{' '.join(app_process.cmdline())}")
-        self._run_single_startup_iteration()
-
-        return self._startup_data
+        # The app process was already found before the first request, so the startup milestones are not measured
+        self._run_single_startup_iteration(measure_phases=False)
 
     def kill_app(self):
         self.app_manager.kill_app()
 
-    def _run_single_startup_iteration(self):
+    def _run_startup_iteration(self, iteration_idx, app_manager, slot=0):
+        """Starts the app, measures its startup and kills it.
+
+        :param int iteration_idx: Index of the startup iteration.
+        :param AppManager app_manager: The app manager starting the app.
+        :param int slot: Index of the concurrent iteration, which selects the CPU set and port of the app.
+        :return: The response times, startup phases, resource usage at each response and resource usage samples of the iteration.
+        :rtype: (list, dict, list, list)
+        """
+        cpus = self.config.startup.cpu_sets[slot] if self.config.startup.cpu_sets is not None else None
+        port = self.config.startup.port_base + slot
+        app_manager.start_app(self._cmd_app_prefix(cpus), self.config.startup.cmd_app_prefix_init_sleep, self.config.startup.dummy_run_after_memory_refresh, True, port)
+        try:
+            iteration_data, phases, usage, samples = self._run_single_startup_iteration(app_manager=app_manager, port=port)
+        except Exception:
+            if app_manager is not self.app_manager and app_manager.root_process.poll() is None:
+                # The harness only cleans up the app of the app manager of the startup manager
+                app_manager.kill_app()
+            raise
+        app_manager.kill_app()
+        phases = dict(phases, iteration=iteration_idx)
+        if self.config.startup.parallelism > 1:
+            phases.update(slot=slot, port=port, cpus=cpus)
+        return iteration_data, phases, usage, [self._timeline_entry(iteration_idx, sample_ts, snapshot) for sample_ts, snapshot in samples]
+
+    def _run_under_load_iterations(self):
+        """Runs the startup iterations under load, for each of the Lua scripts of the startup under load."""
+        under_load = self.config.startup.under_load
+        load_generator = create_load_generator(under_load.load_generator, under_load, self.config.output_folder, self.config.endpoint, self.config.env, STARTUP_LOAD_SAMPLING_INTERVAL)
+        scripts = under_load.script if under_load.script is not None else [None]
+        for script, iteration_idx in itertools.product(scripts, range(under_load.iteration_count)):
+            log.info(f"Running startup iteration under load #{iteration_idx + 1}")
+            self._under_load.append(self._run_under_load_iteration(iteration_idx, load_generator, script))
+
+    def _run_under_load_iteration(self, iteration_idx, load_generator, script):
+        """Starts the app, runs the load generator at a fixed rate as soon as the app port opens and kills the app.
+
+        The load generator runs for the duration of the startup under load, sampling the throughput and latency every
+        STARTUP_LOAD_SAMPLING_INTERVAL seconds. The samples are timed in seconds since the app was started.
+
+        The latency percentiles reported by a load generator that calibrates at the start of its run (wrk2) leave out
+        exactly the early life of the app, so they are not reported. The average and maximum latency of the whole run are
+        computed from the samples instead.
+
+        :param int iteration_idx: Index of the startup iteration under load.
+        :param AbstractLoadGenerator load_generator: The load generator.
+        :param str script: The Lua script executed by the load generator, if any.
+        :return: The startup milestones, the results of the load generator and its time series.
+        :rtype: dict
+        """
+        under_load = self.config.startup.under_load
+        cpus = self.config.startup.cpu_sets[0] if self.config.startup.cpu_sets is not None else None
+        port = self.config.endpoint_port
+        self.app_manager.start_app(self._cmd_app_prefix(cpus), self.config.startup.cmd_app_prefix_init_sleep, self.config.startup.dummy_run_after_memory_refresh, True, port)
+        milestones = self._wait_until_listening(self.app_manager, port, self.config.startup.timeout)
+        ts_load_start = time.perf_counter()
+        epoch_start = time.time() - (ts_load_start - self.app_manager.start_ts)
+        result = load_generator.measure(rate=under_load.rate, duration=under_load.iteration_duration, script=script)
+        self.kill_app()
+        load_generator.dump_stdout(self.config.output_folder, result["stdout"], f"startup-under-load-{iteration_idx + 1}")
+
+        time_series = [dict(sample, time=sample["time"] / 1000 - epoch_start) for sample in result.get("time_series") or []]
+        iteration = {
+            "iteration": iteration_idx,
+            "script": script,
+            "rate": under_load.rate,
+            "time_to_exec": self._time_since_start(self.app_manager, milestones.get('exec')),
+            "time_to_listen": self._time_since_start(self.app_manager, milestones['listen']),
+            "time_to_rate": self._time_to_rate(time_series, under_load.rate),
+            "throughput": result["throughput"]["throughput"],
+            "p_values": result["p_values"] if under_load.load_generator not in CALIBRATING_LOAD_GENERATORS else None,
+            "error_rate": result.get("error_rate"),
+            "time_series": time_series,
+        }
+        iteration.update(self._run_latency(time_series))
+        time_to_rate = f"{iteration['time_to_rate']:.0f} s" if iteration['time_to_rate'] is not None else "never"
+        log.info(f"Port opened after {self._format_phase(iteration['time_to_listen'])}, reached {under_load.rate} op/s after {time_to_rate}, {iteration['throughput']:.2f} op/s on average")
+        return iteration
+
+    def _run_latency(self, time_series):
+        """Returns the average and maximum latency, in milliseconds, over all the samples of a startup iteration under load.
+
+        :param list time_series: The throughput and latency samples of the startup iteration under load.
+        :return: The average latency ('latency_avg'), weighted by the requests of each sample, and the maximum latency
+            ('latency_max'), None if no latency was sampled.
+        :rtype: dict
+        """
+        samples = [sample for sample in time_series if sample["latency_avg"] is not None]
+        requests = sum(sample["requests"] for sample in samples)
+        return {
+            "latency_avg": sum(sample["latency_avg"] * sample["requests"] for sample in samples) / requests if requests > 0 else None,
+            "latency_max": max((sample["latency_max"] for sample in samples if sample["latency_max"] is not None), default=None),
+        }
+
+    def _wait_until_listening(self, app_manager, port, timeout):
+        """Waits until a socket is listening on the app port, without sending any request to the app.
+
+        If listening sockets cannot be detected on the platform, the port is deemed open once it accepts a connection.
+
+        :param AppManager app_manager: The app manager that started the app.
+        :param number port: The port the app serves on.
+        :param number timeout: The timeout period in seconds. A 0 value means the method should never timeout.
+        :return: The startup milestones, with the performance counter timestamp at which the port opened under 'listen'.
+        :rtype: dict
+        """
+        milestones = {}
+        ts_start = time.perf_counter()
+        while True:
+            self._record_startup_milestones(milestones, app_manager, port)
+            if 'listen' in milestones and milestones['listen'] is None:
+                try:
+                    socket.create_connection((self.config.endpoint_domain, port), timeout=1).close()
+                    milestones['listen'] = time.perf_counter()
+                except OSError:
+                    pass
+            if milestones.get('listen') is not None:
+                return milestones
+            return_code = app_manager.root_process.poll()
+            if return_code is not None:
+                raise AppProcessFinishedUnexpectedly(f"Root process exited unexpectedly with return code {return_code}!")
+            if timeout != 0 and time.perf_counter() - ts_start >= timeout:
+                raise TimeoutError(f"App '{self.config.bench_name}' unresponsive! Its port did not open after waiting for {timeout} seconds!")
+            time.sleep(0.001)
+
+    def _time_to_rate(self, time_series, rate):
+        """Returns the time, in seconds since the app was started, from which on the app sustained STARTUP_LOAD_RATE_FRACTION of the request rate.
+
+        The last sample is ignored, as the load generator stops within it.
+
+        :param list time_series: The throughput samples of the startup iteration under load.
+        :param number rate: The request rate of the load generator.
+        :return: The end of the last sample below the rate, None if the rate was not sustained or the throughput was not sampled.
+        :rtype: float
+        """
+        samples = time_series[:-1]
+        if not samples or any(sample["requests_per_second"] is None for sample in samples):
+            return None
+        time_to_rate = samples[0]["time"] - samples[0]["duration"]
+        for sample in samples:
+            if sample["requests_per_second"] < STARTUP_LOAD_RATE_FRACTION * rate:
+                time_to_rate = sample["time"]
+        return time_to_rate if time_to_rate < samples[-1]["time"] else None
+
+    def _run_parallel_iterations(self):
+        """Runs the startup iterations --startup-parallelism at a time, each on its own CPU set and port.
+
+        The iterations are started in waves, so that each of them runs alongside the same number of other iterations. Before the
+        waves, the "parallel_guard_iterations" of the startup configuration are run alone on the first CPU set and port, and the time to first response of
+        the concurrent iterations is compared to theirs (see `parallel_guard`). Only the concurrent iterations are reported.
+
+        :return: The records of the concurrent iterations, as returned by `_run_startup_iteration`.
+        :rtype: list
+        """
+        parallelism = self.config.startup.parallelism
+        # Without the placeholder all the concurrent apps would serve on the endpoint port, and all but one would time out
+        if not any("$BARISTA_APP_PORT" in arg or "${BARISTA_APP_PORT}" in arg for arg in self.config.vm_options + self.config.app_args):
+            raise ValueError(f"Concurrent startup iterations require the app to serve on the port passed to it as ${{BARISTA_APP_PORT}}, but neither the VM options nor the app arguments contain it. "
+                             f"Add it to the port option of the app (e.g. '-Dmicronaut.server.port=${{BARISTA_APP_PORT}}') or set --startup-parallelism to 1")
+        guard_records = []
+        for guard_idx in range(self.config.startup.parallel_guard_iterations):
+            log.info(f"Running sequential startup guard iteration #{guard_idx + 1}")
+            guard_records.append(self._run_startup_iteration(guard_idx, self.app_manager))
+
+        app_managers = [self.app_manager] + [AppManager(self.config) for _ in range(parallelism - 1)]
+        records = []
+        with ThreadPoolExecutor(max_workers=parallelism) as executor:
+            for wave_start in range(0, self.config.startup.iteration_count, parallelism):
+                wave = range(wave_start, min(wave_start + parallelism, self.config.startup.iteration_count))
+                log.info(f"Running startup phase iterations #{wave.start + 1}-#{wave.stop} concurrently")
+                futures = [executor.submit(self._run_startup_iteration, iteration_idx, app_managers[slot], slot) for slot, iteration_idx in enumerate(wave)]
+                records += [future.result() for future in futures]
+
+        if guard_records and records:
+            self._parallel_guard = self._compare_with_sequential([phases for _, phases, _, _ in guard_records], [phases for _, phases, _, _ in records])
+        return records
+
+    def _compare_with_sequential(self, sequential_phases, parallel_phases):
+        """Compares the median time to first response of the concurrent iterations to the one of the iterations run alone.
+
+        :param list sequential_phases: Startup phases of the iterations run alone.
+        :param list parallel_phases: Startup phases of the concurrent iterations.
+        :return: The medians, their difference in percent and whether it exceeds the "parallel_guard_tolerance_percent".
+        :rtype: dict
+        """
+        sequential = compile_p_values([phases["time_to_first_response"] for phases in sequential_phases], [50])["p50.0"]
+        parallel = compile_p_values([phases["time_to_first_response"] for phases in parallel_phases], [50])["p50.0"]
+        difference = (parallel / sequential - 1) * 100
+        guard = {
+            "sequential_iterations": len(sequential_phases),
+            "sequential_median": sequential,
+            "parallel_median": parallel,
+            "difference_percent": difference,
+            "tolerance_percent": self.config.startup.parallel_guard_tolerance,
+            "flagged": abs(difference) > self.config.startup.parallel_guard_tolerance,
+        }
+        if guard["flagged"]:
+            log.warning(f"Concurrency changed the startup results: the median time to first response is {parallel:.2f} ms with {self.config.startup.parallelism} concurrent iterations and {sequential:.2f} ms alone ({difference:+.1f}%)")
+        return guard
+
+    def _cmd_app_prefix(self, cpus):
+        """Returns the startup command prefix pinning the app to a CPU set.
+
+        A ${BARISTA_CPUS} placeholder in the prefix is replaced with the CPU set, otherwise the CPU set of a 'taskset -c' prefix is
+        replaced with it, or a 'taskset -c' command is prepended to the prefix.
+
+        :param list cpus: The CPUs to pin the app to, None if the prefix should be used as is.
+        :rtype: list
+        """
+        cmd_app_prefix = self.config.startup.cmd_app_prefix
+        if cpus is None:
+            return cmd_app_prefix
+        cpu_list = ",".join(str(cpu) for cpu in cpus)
+        cmd_app_prefix = cmd_app_prefix or []
+        if any("BARISTA_CPUS" in item for item in cmd_app_prefix):
+            return replace_env_vars(cmd_app_prefix, {"BARISTA_CPUS": cpu_list})
+        if cmd_app_prefix[:2] == ["taskset", "-c"]:
+            return cmd_app_prefix[:2] + [cpu_list] + cmd_app_prefix[3:]
+        return ["taskset", "-c", cpu_list] + cmd_app_prefix
+
+    def _run_single_startup_iteration(self, measure_phases=True, app_manager=None, port=None):
         if self.config.startup.request_count <= 0:
             raise ValueError(f"Invalid request count for startup phase. Got '{self.config.startup.request_count}' but expected a positive integer!")
 
+        app_manager = app_manager or self.app_manager
+        port = port or self.config.endpoint_port
         iteration_data = []
-        log.info(f"Running startup measurements: sending {self.config.startup.request_count} GET request(s) to {self.config.endpoint_protocol}://{self.config.endpoint_domain}:{self.config.endpoint_port}{self.config.endpoint_path}")
-        for request_idx in range(self.config.startup.request_count):
-            if request_idx == 0:
-                ts_before_request = self.app_manager.start_ts
-            else:
-                ts_before_request = time.perf_counter()
-            self._request_until_response(self.config.startup.timeout)
-            response_time = (time.perf_counter() - ts_before_request) * 1000
-            log.info(f"Received response #{request_idx + 1} in {response_time:6.2f} ms")
-            iteration_data.append(response_time)
-        return iteration_data
-
-    def _request_until_response(self, timeout):
+        response_timestamps = []
+        milestones = {} if measure_phases else None
+        sampler = None
+        if measure_phases and self.config.startup.sampling_interval > 0:
+            sampler = StartupSampler(app_manager, self.config.startup.sampling_interval)
+            sampler.start()
+        log.info(f"Running startup measurements: sending {self.config.startup.request_count} GET request(s) to {self.config.endpoint_protocol}://{self.config.endpoint_domain}:{port}{self.config.endpoint_path}")
+        try:
+            for request_idx in range(self.config.startup.request_count):
+                if request_idx == 0:
+                    ts_before_request = app_manager.start_ts
+                else:
+                    ts_before_request = time.perf_counter()
+                self._request_until_response(self.config.startup.timeout, milestones if request_idx == 0 else None, app_manager, port)
+                ts_response = time.perf_counter()
+                response_time = (ts_response - ts_before_request) * 1000
+                log.info(f"Received response #{request_idx + 1} in {response_time:6.2f} ms")
+                iteration_data.append(response_time)
+                response_timestamps.append(self._time_since_start(app_manager, ts_response))
+        finally:
+            if sampler is not None:
+                sampler.stop()
+        if not measure_phases:
+            return iteration_data, None, None, None
+        # Resource usage at each response, with the peaks until then
+        usage = [sampler.usage_until(ts) if sampler is not None else None for ts in response_timestamps]
+        phases = {
+            "time_to_exec": self._time_since_start(app_manager, milestones.get('exec')),
+            "time_to_listen": self._time_since_start(app_manager, milestones.get('listen')),
+            "time_to_first_response": iteration_data[0],
+        }
+        log.info(f"Time to exec: {self._format_phase(phases['time_to_exec'])}, time to listen: {self._format_phase(phases['time_to_listen'])}, time to first response: {self._format_phase(phases['time_to_first_response'])}")
+        if usage[0] is not None:
+            phases["at_first_response"] = {key: usage[0][key] for key in ["rss_mb", "cpu_time_ms", "minor_faults", "major_faults", "threads"]}
+            phases["peak"] = {"rss_mb": usage[-1]["peak_rss_mb"], "threads": usage[-1]["peak_threads"]}
+            log.info(f"RSS at first response: {usage[0]['rss_mb']:.2f} MB, peak RSS: {usage[-1]['peak_rss_mb']:.2f} MB ({len(sampler.samples)} samples)")
+        return iteration_data, phases, usage, sampler.samples if sampler is not None else []
+
+    def _timeline_entry(self, iteration_idx, sample_ts, snapshot):
+        return {
+            "iteration": iteration_idx,
+            "time": sample_ts,
+            "rss_mb": snapshot.rss / (1024 * 1024),
+            "cpu_time_ms": snapshot.cpu_time * 1000,
+            "minor_faults": snapshot.minor_faults,
+            "major_faults": snapshot.major_faults,
+            "threads": snapshot.num_threads,
+        }
+
+    def _record_startup_milestones(self, milestones, app_manager, port):
+        """Records the time at which the app process was executed and a socket started listening on the endpoint port, if they happened since the last check.
+
+        The sockets are looked up in the network namespace of the root process, as the app process may not be executed yet.
+        A milestone that cannot be detected on the platform is recorded as None.
+
+        :param dict milestones: The milestones recorded so far, as performance counter timestamps.
+        :param AppManager app_manager: The app manager that started the app.
+        :param number port: The port the app serves on.
+        """
+        if 'exec' not in milestones and app_manager.poll_app_process() is not None:
+            milestones['exec'] = time.perf_counter()
+        if 'listen' not in milestones:
+            listening = process_info.is_listening(app_manager.root_process.pid, port)
+            if listening is None:
+                milestones['listen'] = None
+            elif listening:
+                milestones['listen'] = time.perf_counter()
+
+    def _time_since_start(self, app_manager, ts):
+        return (ts - app_manager.start_ts) * 1000 if ts is not None else None
+
+    def _format_phase(self, duration):
+        return f"{duration:.2f} ms" if duration is not None else "n/a"
+
+    def _request_until_response(self, timeout, milestones=None, app_manager=None, port=None):
         """Repeatedly pings the app endpoint until there is a response.
 
         Periodically checks whether the application process is still running, raising an exception if the process terminated
         or if the timeout period passes before a response is received.
 
         :param number timeout: The timeout period in seconds. A 0 value means the method should never timeout.
+        :param dict milestones: If given, the startup milestones (see `_record_startup_milestones`) are recorded in it before each ping.
+        :param AppManager app_manager: The app manager that started the app. Defaults to the app manager of the startup manager.
+        :param number port: The port the app serves on. Defaults to the endpoint port.
         """
+        app_manager = app_manager or self.app_manager
+        port = port or self.config.endpoint_port
         poll_interval = 1
         ts_start = time.perf_counter()
         ts_last_poll = ts_start
         while (True):
+            if milestones is not None:
+                self._record_startup_milestones(milestones, app_manager, port)
             try:
                 if self.config.endpoint_protocol == "http":
-                    conn = HTTPConnection(self.config.endpoint_domain, self.config.endpoint_port)
+                    conn = HTTPConnection(self.config.endpoint_domain, port)
                 else:
-                    conn = HTTPSConnection(self.config.endpoint_domain, self.config.endpoint_port)
+                    conn = HTTPSConnection(self.config.endpoint_domain, port)
+                conn.connect()
+                if milestones is not None:
+                    # The app may accept connections long before it responds, the socket is listening by the time it connects
+                    self._record_startup_milestones(milestones, app_manager, port)
                 conn.request("GET", self.config.endpoint_path)
                 res = conn.getresponse()
                 if res.status < 500:
@@ -95,12 +434,12 @@ class StartupManager:
                     break
                 else:
                     log.warning(f"App responded {res.status}. Stopping and cleaning up")
-                    self.kill_app()
+                    app_manager.kill_app()
             except ConnectionRefusedError:
                 ts_current = time.perf_counter()
                 if ts_current - ts_last_poll >= poll_interval:
                     # Time for a periodic check of the app process status
-                    return_code = self.app_manager.root_process.poll()
+                    return_code = app_manager.root_process.poll()
                     if return_code is not None:
                         raise AppProcessFinishedUnexpectedly(f"Root process exited unexpectedly with return code {return_code}!")
                 if timeout != 0 and ts_current - ts_start >= timeout:
@@ -116,10 +455,35 @@ class StartupManager:
             "response_time": self._nth_request_median(idx),
             "iteration": idx
         } for idx in range(self.config.startup.request_count)]
+        for idx, startup_record in enumerate(self._startup_data):
+            for key in STARTUP_USAGE_KEYS:
+                values = [usage[idx][key] for usage in self._usage if usage[idx] is not None and usage[idx][key] is not None]
+                if values:
+                    startup_record[key] = compile_p_values(values, [50])["p50.0"]
 
     def _nth_request_median(self, idx):
         return compile_p_values([x[idx] for x in self._iterations], [50])["p50.0"]
 
+    @property
+    def under_load(self):
+        """Results of the startup iterations under load, with the throughput and latency of every second since the app port opened."""
+        return self._under_load
+
+    @property
+    def parallel_guard(self):
+        """Comparison of the concurrent startup iterations to the ones run alone, None if the iterations were not run concurrently."""
+        return self._parallel_guard
+
+    @property
+    def timeline(self):
+        """Resource usage samples of the app process recorded during all the startup iterations."""
+        return self._timeline
+
+    @property
+    def phases(self):
+        """Time to exec, time to listen and time to first response of each startup iteration, in milliseconds since the app was started."""
+        return self._phases
+
     @property
     def config(self):
         return self._config
@@ -0,0 +1,69 @@
+"""Samples the resource usage of the application process at a high frequency during a single startup iteration.
+
+The resource monitor of the load-testing phases only starts once the application is up, so it cannot tell how much memory
+the application used to start or how much it used by the time it first responded. The samples record the RSS, the CPU
+time, the page faults and the number of threads of the application process, from the moment it is executed.
+"""
+from threading import Thread, Event
+import logging as log
+import process_info
+import time
+
+class StartupSampler(Thread):
+    """
+    Startup Sampler extends Thread from threading.
+    Used for sampling the resource usage of the app process every `interval` milliseconds during a startup iteration,
+    until `stop` is invoked. The app process is sampled as soon as the `AppManager` has found it.
+    """
+
+    def __init__(self, app_manager, interval):
+        super(StartupSampler, self).__init__()
+        self._app_manager = app_manager
+        self._interval = interval / 1000
+        self._stop_event = Event()
+        self._samples = []
+        self.daemon = True
+
+    def run(self):
+        while not self._stop_event.is_set():
+            app_process = self._app_manager.app_process
+            if app_process is not None:
+                try:
+                    snapshot = process_info.resource_snapshot(app_process)
+                except Exception as e:
+                    # Either FileNotFoundError or psutil.NoSuchProcess, depending on the platform
+                    log.debug(f"Stopped sampling the app process {app_process.pid}: {e}")
+                    return
+                self._samples.append(((time.perf_counter() - self._app_manager.start_ts) * 1000, snapshot))
+            self._stop_event.wait(self._interval)
+
+    def stop(self):
+        """Stops the sampling and waits for the sampling thread to finish."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+
+    @property
+    def samples(self):
+        """The (milliseconds since the app was started, ResourceSnapshot) samples recorded so far."""
+        return self._samples
+
+    def usage_until(self, ts):
+        """Returns the resource usage of the app process at a point in time, and the peak RSS and number of threads until then.
+
+        :param number ts: Milliseconds since the app was started.
+        :return: The latest sample before the point in time, None if there is none.
+        :rtype: dict
+        """
+        samples = [snapshot for sample_ts, snapshot in self._samples if sample_ts <= ts]
+        if not samples:
+            return None
+        return {
+            "rss_mb": samples[-1].rss / (1024 * 1024),
+            "peak_rss_mb": max(snapshot.rss for snapshot in samples) / (1024 * 1024),
+            "cpu_time_ms": samples[-1].cpu_time * 1000,
+            "minor_faults": samples[-1].minor_faults,
+            "major_faults": samples[-1].major_faults,
+            "threads": samples[-1].num_threads,
+            "peak_threads": max(snapshot.num_threads for snapshot in samples),
+        }
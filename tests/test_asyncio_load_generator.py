@@ -0,0 +1,69 @@
+"""Tests the asyncio load generator against a local stub HTTP server.
+
+The tests do not require wrk/wrk2, a JVM or any of the Barista apps to be built.
+"""
+import asyncio
+import logging as log
+import re
+from urllib.parse import urlparse
+
+import pytest
+
+from asyncio_load_generator import AsyncioLoadGenerator, _LoadRun
+from configuration import Configuration, LatencyMode
+
+
+def _latency_config(arrival_distribution, duration=2, connections=4):
+    return Configuration.LatencyConfig(duration, 1, LatencyMode.FIXED, None, [100], None, None, None, 1, connections, "asyncio", arrival_distribution)
+
+
+@pytest.mark.parametrize("arrival_distribution", ["constant", "poisson"])
+def test_open_loop_latency(stub_endpoint, tmp_path, arrival_distribution):
+    """Tests that an open-loop latency measurement reports the offered rate and the wrk2 result format."""
+    load_generator = AsyncioLoadGenerator(_latency_config(arrival_distribution), str(tmp_path), stub_endpoint, {})
+    result = load_generator.measure(rate=100, duration=2)
+    log.info(f"Asyncio load generator output:\n{result['stdout']}")
+
+    assert result["exit_code"] == 0
+    assert set(result["p_values"]) == {50.0, 75.0, 90.0, 99.0, 99.9, 99.99, 99.999, 100.0}
+    assert 0 < result["p_values"][50.0] <= result["p_values"][100.0]
+    assert result["histogram"].total_count > 0
+    # the achieved rate is parsed from the output, in the wrk2 format, when searching for the optimal rate
+    measured_throughput = re.findall(r"^Requests/sec:\s*(\d*[.,]?\d*)\s*$", result["stdout"], re.MULTILINE)
+    assert len(measured_throughput) == 1
+    assert float(measured_throughput[0]) == pytest.approx(100, rel=0.25)
+
+
+def test_closed_loop_throughput(stub_endpoint, tmp_path):
+    """Tests that a closed-loop measurement reports the throughput in the wrk result format."""
+    config = Configuration.ThroughputConfig(1, 1, None, 1, 2, "asyncio")
+    load_generator = AsyncioLoadGenerator(config, str(tmp_path), stub_endpoint, {})
+    result = load_generator.measure()
+
+    assert result["exit_code"] == 0
+    assert result["throughput"]["throughput"] > 0
+
+
+def test_lua_scripts_are_rejected(stub_endpoint, tmp_path):
+    load_generator = AsyncioLoadGenerator(_latency_config("constant"), str(tmp_path), stub_endpoint, {})
+    with pytest.raises(ValueError):
+        load_generator.measure(rate=10, duration=1, script="script.lua")
+
+
+def test_unsent_requests_are_recorded():
+    """Tests that the requests still waiting for a connection at the end of the test are recorded with the time they waited."""
+    load_run = _LoadRun(urlparse("http://127.0.0.1:1/hello"), 1, 100, 1, "constant", 0)
+
+    async def drain_queue():
+        end = asyncio.get_running_loop().time() - 0.5
+        queue = asyncio.Queue()
+        for intended in [end - 2, end - 1, None]:
+            queue.put_nowait(intended)
+        await load_run._open_loop_worker(queue, end)
+
+    asyncio.run(drain_queue())
+
+    assert load_run.histogram.total_count == 2
+    assert load_run.histogram.p_values([50.0, 100.0]) == pytest.approx({50.0: 1000, 100.0: 2000}, rel=0.01)
+    assert load_run.errors["requests"] == 0
+    assert "2 scheduled requests could not be sent" in load_run.report("asyncio")
@@ -0,0 +1,224 @@
+"""Tests the scheduling of the benchmark builds.
+
+The tests do not require wrk/wrk2, a JVM or any of the Barista apps to be built.
+"""
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+import build
+from benchmark_registry import BenchmarkRegistry
+
+
+def test_available_memory_includes_page_cache(tmp_path):
+    """Tests that the available memory is the 'MemAvailable' estimate of the kernel, not only the free memory."""
+    meminfo = tmp_path / "meminfo"
+    meminfo.write_text("MemTotal:       16777216 kB\nMemFree:         1048576 kB\nMemAvailable:    8388608 kB\nCached:          7340032 kB\n")
+
+    assert build.available_memory_gb(str(meminfo)) == 8
+    assert build.available_memory_gb(str(tmp_path / "missing")) > 0
+
+
+BUILD_SCRIPT = """#!/bin/sh
+bench_dir=$(cd "$(dirname "$0")" && pwd)
+bench_name=$(basename "$bench_dir")
+case "$1" in
+    --get-jar) [ -f "$bench_dir/target/app.jar" ] && echo "application jar file path is: $bench_dir/target/app.jar"; exit 0;;
+esac
+echo "start $bench_name $(date +%s.%N)" >> "{events}"
+echo "building $bench_name"
+sleep 0.3
+mkdir -p "$bench_dir/target"
+touch "$bench_dir/target/app.jar"
+echo "end $bench_name $(date +%s.%N)" >> "{events}"
+exit {exit_code}
+"""
+
+
+class _TmpBenchmarkRegistry(BenchmarkRegistry):
+    """A registry of the benchmarks in a temporary directory."""
+
+    def __init__(self, benchmarks_dir):
+        super().__init__()
+        self._tmp_benchmarks_dir = str(benchmarks_dir)
+
+    def _get_benchmarks_dir(self):
+        return self._tmp_benchmarks_dir
+
+
+@pytest.fixture
+def benchmarks(tmp_path, monkeypatch):
+    """Returns a function creating a benchmark with a fake build.sh, the registry of the benchmarks and the file the builds record their start and end in."""
+    monkeypatch.setattr(build, "POLL_INTERVAL", 0.01)
+    benchmarks_dir = tmp_path / "benchmarks"
+    benchmarks_dir.mkdir()
+    events = tmp_path / "events"
+
+    def create(bench_name, build_files=("gradlew",), exit_code=0):
+        bench_dir = benchmarks_dir / bench_name
+        (bench_dir / "src").mkdir(parents=True)
+        (bench_dir / "src" / "Main.java").write_text("class Main {}\n")
+        for name in build_files:
+            (bench_dir / name).write_text("")
+        build_script = bench_dir / "build.sh"
+        build_script.write_text(BUILD_SCRIPT.format(events=events, exit_code=exit_code))
+        build_script.chmod(0o755)
+        return bench_dir
+
+    return create, _TmpBenchmarkRegistry(benchmarks_dir), events
+
+
+def _max_concurrent_builds(events):
+    """Returns the maximum number of builds that ran at the same time, from the recorded starts and ends of the builds."""
+    changes = sorted((float(ts), 1 if kind == "start" else -1) for kind, _, ts in (line.split() for line in events.read_text().splitlines()))
+    running, max_running = 0, 0
+    for _, change in changes:
+        running += change
+        max_running = max(max_running, running)
+    return max_running
+
+
+def _build(registry, tmp_path, selection, jobs=1, memory_budget=64, memory_per_build=4, force=False):
+    build.Builder(registry, "jdk-25").build(selection, True, False, False, None, jobs, memory_budget, memory_per_build, str(tmp_path / "logs"), force)
+
+
+@pytest.mark.parametrize("files, cache", [
+    ({"gradlew": ""}, ("gradle", True)),
+    ({"app/build.sbt": ""}, ("sbt", False)),
+    ({"mvnw": "", ".mvn/wrapper/maven-wrapper.properties": "distributionUrl=https://repo/apache-maven-3.9.6-bin.zip"}, ("maven", True)),
+    ({"mvnw": "", ".mvn/wrapper/maven-wrapper.properties": "distributionUrl=https://repo/apache-maven-3.8.8-bin.zip"}, ("maven", False)),
+    ({"mvnw": ""}, ("maven", False)),
+    ({"Makefile": ""}, (None, True)),
+])
+def test_dependency_cache(tmp_path, files, cache):
+    """Tests that the dependency cache is detected from the build tool of the benchmark, or of one of its subprojects."""
+    for name, content in files.items():
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text(content)
+
+    assert build.dependency_cache(str(tmp_path)) == cache
+
+
+@pytest.mark.parametrize("cache, running_caches, can_share", [
+    (("gradle", True), [("gradle", True), ("maven", False)], True),
+    (("maven", False), [("gradle", True)], True),
+    (("maven", False), [("maven", True)], False),
+    (("maven", True), [("maven", False)], False),
+    (("sbt", False), [("sbt", False)], False),
+    ((None, True), [("sbt", False)], True),
+])
+def test_can_share_cache(cache, running_caches, can_share):
+    """Tests that builds of the same tool only run at the same time if all of them lock its dependency cache."""
+    assert build.Builder(None)._can_share_cache(cache, running_caches) == can_share
+
+
+def test_sources_fingerprint(tmp_path):
+    """Tests that the fingerprint changes with the sources and the build inputs, but not with the build outputs and tool caches."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "Main.java").write_text("class Main {}\n")
+    for ignored in ["target", "build", ".gradle", ".kotlin", "app-target"]:
+        (tmp_path / ignored).mkdir()
+        (tmp_path / ignored / "output").write_text("1")
+    fingerprint = build.sources_fingerprint(str(tmp_path), {"vm_version": "25"})
+
+    assert build.source_files(str(tmp_path)) == [os.path.join("src", "Main.java")]
+    for ignored in ["target", "build", ".gradle", ".kotlin", "app-target"]:
+        (tmp_path / ignored / "output").write_text("2")
+    assert build.sources_fingerprint(str(tmp_path), {"vm_version": "25"}) == fingerprint
+    assert build.sources_fingerprint(str(tmp_path), {"vm_version": "26"}) != fingerprint
+    (tmp_path / "src" / "Main.java").write_text("class Main { }\n")
+    assert build.sources_fingerprint(str(tmp_path), {"vm_version": "25"}) != fingerprint
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="Requires git")
+def test_source_files_ignored_by_git(tmp_path):
+    """Tests that the files ignored by git are left out of the sources, while untracked files are not."""
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    (tmp_path / ".gitignore").write_text("*.log\nout/\n")
+    (tmp_path / "pom.xml").write_text("<project/>\n")
+    (tmp_path / "build.log").write_text("log\n")
+    (tmp_path / "out").mkdir()
+    (tmp_path / "out" / "classes").write_text("1")
+
+    assert build.source_files(str(tmp_path)) == [".gitignore", "pom.xml"]
+
+
+def test_build_skips_unchanged_benchmarks(benchmarks, tmp_path):
+    """Tests that a benchmark is only built again if its sources changed, its artifacts are missing or the build is forced."""
+    create, registry, events = benchmarks
+    bench_dir = create("app")
+
+    def builds():
+        return len(events.read_text().splitlines()) // 2
+
+    _build(registry, tmp_path, ["app"])
+    assert builds() == 1
+    assert os.path.isfile(tmp_path / "benchmarks" / build.BUILD_STATE_FILE)
+    _build(registry, tmp_path, ["app"])
+    assert builds() == 1
+    (bench_dir / "src" / "Main.java").write_text("class Main { }\n")
+    _build(registry, tmp_path, ["app"])
+    assert builds() == 2
+    (bench_dir / "target" / "app.jar").unlink()
+    _build(registry, tmp_path, ["app"])
+    assert builds() == 3
+    _build(registry, tmp_path, ["app"], force=True)
+    assert builds() == 4
+
+
+@pytest.mark.parametrize("build_files, jobs, memory_budget, max_concurrent_builds", [
+    (["gradlew"], 2, 64, 2),
+    (["gradlew"], 4, 64, 3),
+    # the memory budget only fits a single build, one build always runs
+    (["gradlew"], 3, 4, 1),
+    (["build.sbt"], 3, 64, 1),
+])
+def test_build_admission(benchmarks, tmp_path, build_files, jobs, memory_budget, max_concurrent_builds):
+    """Tests that builds run concurrently up to the number of jobs and the memory budget, and never share an unlocked dependency cache."""
+    create, registry, events = benchmarks
+    for bench_name in ["a", "b", "c"]:
+        create(bench_name, build_files)
+
+    _build(registry, tmp_path, [], jobs=jobs, memory_budget=memory_budget)
+
+    assert _max_concurrent_builds(events) == max_concurrent_builds
+    assert sorted(os.listdir(tmp_path / "logs")) == ["a.log", "b.log", "c.log"]
+
+
+def test_build_of_different_tools_shares_no_cache(benchmarks, tmp_path):
+    """Tests that a build with an unlocked dependency cache runs next to the builds of other tools."""
+    create, registry, events = benchmarks
+    create("a", ["build.sbt"])
+    create("b", ["gradlew"])
+
+    _build(registry, tmp_path, [], jobs=2)
+
+    assert _max_concurrent_builds(events) == 2
+
+
+def test_single_build_streams_output(benchmarks, tmp_path, capfd):
+    """Tests that the output of a build is streamed to the console and written to its log if the builds run one at a time."""
+    create, registry, _ = benchmarks
+    create("app")
+
+    _build(registry, tmp_path, ["app"])
+
+    assert "building app" in capfd.readouterr().out
+    assert (tmp_path / "logs" / "app.log").read_text() == "building app\n"
+
+
+def test_failed_build(benchmarks, tmp_path, capfd):
+    """Tests that a failed build fails the run without being recorded, and that concurrent builds only write their output to the logs."""
+    create, registry, _ = benchmarks
+    create("broken", exit_code=1)
+    create("app")
+
+    with pytest.raises(ChildProcessError, match="broken"):
+        _build(registry, tmp_path, [], jobs=2)
+    assert "building" not in capfd.readouterr().out
+    assert (tmp_path / "logs" / "broken.log").read_text() == "building broken\n"
+    with open(tmp_path / "benchmarks" / build.BUILD_STATE_FILE) as file:
+        assert list(json.load(file)) == ["app"]
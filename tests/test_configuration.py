@@ -0,0 +1,45 @@
+"""Tests the parsing of the harness configuration.
+
+The tests do not require wrk/wrk2, a JVM or any of the Barista apps to be built.
+"""
+import pytest
+
+from configuration import Configuration, LATENCY_LOAD_GENERATORS
+
+
+@pytest.mark.parametrize("cpu_list, cpus", [
+    ("0", [0]),
+    ("0,2,4-7", [0, 2, 4, 5, 6, 7]),
+    (" 3 - 4 , 1", [1, 3, 4]),
+    ([2, 0, 2], [0, 2]),
+])
+def test_parse_cpu_list(cpu_list, cpus):
+    """Tests the parsing of CPU lists in the 'taskset -c' format."""
+    assert Configuration.parse_cpu_list(cpu_list) == cpus
+
+
+@pytest.mark.parametrize("cpu_list", ["", "a", "1-", "0,,1"])
+def test_parse_invalid_cpu_list(cpu_list):
+    """Tests that CPU lists not in the 'taskset -c' format are rejected."""
+    with pytest.raises(ValueError):
+        Configuration.parse_cpu_list(cpu_list)
+
+
+@pytest.mark.parametrize("load_generator, sla_percentiles, supported", [
+    ("oha", [50.0, 99.99], True),
+    ("oha", [99.0, 99.999], False),
+    ("oha", [99.999], False),
+    ("oha", [100], True),
+    ("wrk2", [99.999, 100], True),
+    ("asyncio", [100], True),
+])
+def test_check_load_generator_reports_sla_percentiles(load_generator, sla_percentiles, supported):
+    """Tests that a load generator is rejected if it does not report a latency percentile required by the SLA."""
+    configuration = Configuration.__new__(Configuration)
+    phase_config = {"load_generator": load_generator}
+
+    if supported:
+        assert configuration.check_load_generator("latency_measurement", None, phase_config, LATENCY_LOAD_GENERATORS, None, sla_percentiles) == load_generator
+    else:
+        with pytest.raises(ValueError, match="does not report the"):
+            configuration.check_load_generator("latency_measurement", None, phase_config, LATENCY_LOAD_GENERATORS, None, sla_percentiles)
@@ -0,0 +1,78 @@
+"""Tests the class-data sharing archives and AOT caches of the JVM archive sub-mode.
+
+The training runs are simulated, the tests do not require wrk/wrk2, a JVM or any of the Barista apps to be built.
+"""
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import jvm_archive
+from configuration import JvmArchive
+from jvm_archive import JvmArchiveSupplier
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """Returns a supplier of the archives of a fake jar, with its config and the jar."""
+    jar = tmp_path / "app.jar"
+    jar.write_bytes(b"jar")
+    config = SimpleNamespace(jvm_archive=JvmArchive.APPCDS, jvm_archive_cache_dir=str(tmp_path / "archives"), vm_options=["-Xmx1g"])
+    return JvmArchiveSupplier(config, SimpleNamespace(version="25.0.1")), config, str(jar)
+
+
+def test_archive_key(archive, tmp_path):
+    """Tests that the archive key changes with the content of the jar, the JDK version, the VM options and the kind of archive."""
+    supplier, config, jar = archive
+    key = supplier.archive_key(jar)
+
+    assert supplier.archive_key(jar) == key
+    assert JvmArchiveSupplier(config, SimpleNamespace(version="25.0.2")).archive_key(jar) != key
+    config.vm_options = ["-Xmx1g", "-XX:+UseParallelGC"]
+    assert supplier.archive_key(jar) != key
+    config.vm_options = ["-Xmx1g"]
+    config.jvm_archive = JvmArchive.AOT_CACHE
+    assert supplier.archive_key(jar) != key
+    config.jvm_archive = JvmArchive.APPCDS
+    (tmp_path / "app.jar").write_bytes(b"rebuilt jar")
+    assert supplier.archive_key(jar) != key
+
+
+@pytest.mark.parametrize("kind, training_option, benchmark_option, extension", [
+    (JvmArchive.APPCDS, "-XX:ArchiveClassesAtExit", "-XX:SharedArchiveFile", "jsa"),
+    (JvmArchive.AOT_CACHE, "-XX:AOTCacheOutput", "-XX:AOTCache", "aot"),
+])
+def test_supply_archive_trains_and_caches_the_archive(archive, monkeypatch, kind, training_option, benchmark_option, extension):
+    """Tests that the archive is written in a training run once, and reused from the cache afterwards."""
+    supplier, config, jar = archive
+    config.jvm_archive = kind
+    training_runs = []
+
+    def run_training_workload(training_config, iterations_per_script=None):
+        training_runs.append(list(training_config.vm_options))
+        with open(training_config.vm_options[-1].split("=", 1)[1], "w") as archive_file:
+            archive_file.write("archive")
+    monkeypatch.setattr(jvm_archive, "run_training_workload", run_training_workload)
+
+    first = supplier.supply_archive(jar)
+    second = supplier.supply_archive(jar)
+
+    assert not first["cache_hit"] and second["cache_hit"]
+    assert first["path"] == second["path"] and os.path.isfile(first["path"])
+    assert first["path"].endswith(f".{extension}")
+    assert first["kind"] == kind.name
+    assert first["training_time"] is not None and second["training_time"] is None
+    assert training_runs == [["-Xmx1g", f"{training_option}={first['path']}.tmp"]]
+    assert second["vm_options"] == [f"{benchmark_option}={first['path']}"]
+    # the config of the app is restored after the training run
+    assert config.vm_options == ["-Xmx1g"]
+
+
+def test_supply_archive_without_archive(archive, monkeypatch):
+    """Tests that a training run that does not write the archive fails without caching an archive."""
+    supplier, config, jar = archive
+    monkeypatch.setattr(jvm_archive, "run_training_workload", lambda training_config, iterations_per_script=None: None)
+
+    with pytest.raises(FileNotFoundError):
+        supplier.supply_archive(jar)
+    assert os.listdir(config.jvm_archive_cache_dir) == []
@@ -0,0 +1,93 @@
+"""Tests the sampling of the throughput and latency within load-testing iterations.
+
+The tests do not require wrk/wrk2, a JVM or any of the Barista apps to be built.
+"""
+import subprocess
+import sys
+
+from configuration import Configuration
+from load_sampler import SAMPLE_PREFIX, is_load_process_running, parse_time_series, strip_samples, write_sampling_script
+from wrk1_load_generator import Wrk1LoadGenerator
+
+OUTPUTS = [
+    f"""Running 10s test @ http://127.0.0.1:8080/hello
+{SAMPLE_PREFIX} 100 50 50 100.000 4.000
+{SAMPLE_PREFIX} 101 60 59 120.000 3.000
+{SAMPLE_PREFIX} 101 40 40 40.000 9.000
+{SAMPLE_PREFIX} 104 10 10 10.000 1.000
+  20000 requests in 10.00s, 2.50MB read
+""",
+    f"""Running 10s test @ http://127.0.0.1:8080/hello
+{SAMPLE_PREFIX} 101 100 100 100.000 2.000
+{SAMPLE_PREFIX} 102 30 0 0.000 0.000
+  10000 requests in 10.00s, 1.25MB read
+""",
+]
+
+
+def test_parse_time_series():
+    """Tests that the samples of all the threads and processes are summed up per interval within the iteration."""
+    time_series = parse_time_series(OUTPUTS, 1, 100.5, 110)
+
+    assert [sample["time"] for sample in time_series] == [102000, 103000, 104000, 105000]
+    assert [sample["requests_per_second"] for sample in time_series] == [200, 30, 0, 10]
+    assert time_series[0] == {"time": 102000, "duration": 1, "requests": 200, "requests_per_second": 200, "latency_avg": 260 / 199, "latency_max": 9.0}
+    # no response of the interval was matched with its request
+    assert time_series[1]["latency_avg"] is None and time_series[1]["latency_max"] is None
+    assert time_series[2]["latency_avg"] is None
+    assert parse_time_series(["no samples"], 1, 100, 110) == []
+
+
+def test_parse_time_series_of_fractional_intervals():
+    """Tests that intervals not fully within the iteration are left out, also for sampling intervals below a second."""
+    time_series = parse_time_series([f"{SAMPLE_PREFIX} 201 5 5 5.000 1.000\n{SAMPLE_PREFIX} 202 5 5 5.000 1.000\n{SAMPLE_PREFIX} 203 5 5 5.000 1.000\n"], 0.5, 100.6, 102.1)
+
+    assert [sample["time"] for sample in time_series] == [101500, 102000]
+    assert [sample["requests_per_second"] for sample in time_series] == [10, 10]
+
+
+def test_strip_samples():
+    """Tests that the samples are removed from the outputs, leaving the results of wrk/wrk2 untouched."""
+    output = strip_samples(OUTPUTS[1])
+
+    assert SAMPLE_PREFIX not in output
+    assert output == "Running 10s test @ http://127.0.0.1:8080/hello\n  10000 requests in 10.00s, 1.25MB read\n"
+
+
+def test_write_sampling_script(tmp_path):
+    """Tests that the sampling script wraps the benchmark script and times the requests with the 'request' and 'response' hooks."""
+    benchmark_script = tmp_path / "post.lua"
+    benchmark_script.write_text('wrk.method = "POST"\n')
+
+    path = write_sampling_script(str(tmp_path), 0.5, 4, str(benchmark_script))
+    with open(path) as file:
+        script = file.read()
+
+    assert path.startswith(str(tmp_path)) and path.endswith(".lua")
+    assert f'local user_script = "{benchmark_script}"' in script
+    assert "local interval = 0.5\n" in script
+    assert "local max_outstanding = 4\n" in script
+    assert "request = function()" in script and "response = function(status, headers, body)" in script
+    assert f'"{SAMPLE_PREFIX} %d %d %d %.3f %.3f\\n"' in script
+    assert "$" not in script
+
+    with open(write_sampling_script(str(tmp_path), 1, 1)) as file:
+        assert "local user_script = nil\n" in file.read()
+
+
+def test_is_load_process_running():
+    """Tests that a finished load process is not running, without it being reaped."""
+    load_process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(0.5)"])
+
+    assert is_load_process_running(load_process)
+    load_process.wait()
+    assert not is_load_process_running(load_process)
+
+
+def test_parse_total_requests():
+    """Tests that the total number of requests is parsed from the wrk summary line."""
+    config = Configuration.WarmupConfig(10, 1, None, 1, 1, "wrk")
+    load_generator = Wrk1LoadGenerator(config, "/tmp", "http://127.0.0.1:8080/hello", {})
+
+    assert load_generator.parse_total_requests("  20000 requests in 10.00s, 2.50MB read\n") == 20000
+    assert load_generator.parse_total_requests("no summary") is None
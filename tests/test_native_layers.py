@@ -0,0 +1,139 @@
+"""Tests the layered app images of the native layered sub-mode.
+
+The builds are simulated, the tests do not require wrk/wrk2, a JVM or any of the Barista apps to be built.
+"""
+import os
+import zipfile
+from types import SimpleNamespace
+
+import pytest
+
+from native_layers import NIB_BUILD_ARGS_ENTRY, NativeLayerSupplier, layer_config_digest
+
+
+def _write_nib(path, build_args="[]", layer_create_args="-H:LayerCreate=base.nil", other="resource"):
+    """Writes a Native Image Bundle holding build arguments, a layer configuration and another file."""
+    with zipfile.ZipFile(path, "w") as nib:
+        nib.writestr(NIB_BUILD_ARGS_ENTRY, build_args)
+        nib.writestr("META-INF/native-image/app/layer-create.args", layer_create_args)
+        nib.writestr("input/classes/resource.txt", other)
+    return str(path)
+
+
+class _FakeVM:
+    """Builds fake images in the output directories of the nibs, recording the name and options of each build."""
+
+    def __init__(self, version="25.0.1", write_layer_archive=True):
+        self.version = version
+        self.builds = []
+        self._write_layer_archive = write_layer_archive
+
+    def native_image_build(self, nib_file, image_name, build_options, verify_app_image_existance=True):
+        output_dir = os.path.join(nib_file[:-4] + ".output", "default")
+        os.makedirs(output_dir, exist_ok=True)
+        image_path = os.path.join(output_dir, image_name)
+        if verify_app_image_existance:
+            files = [image_name]
+        else:
+            # the base layer is a shared library along with its layer archive
+            files = [f"{image_name}.so"] + ([f"{image_name}.nil"] if self._write_layer_archive else [])
+        for name in files:
+            with open(os.path.join(output_dir, name), "w") as file:
+                file.write(f"{image_name} {' '.join(build_options)}")
+        self.builds.append({"image": image_name, "build_options": build_options, "build_duration": 60.0})
+        return image_path
+
+
+@pytest.fixture
+def layers(tmp_path):
+    """Returns a supplier of layered images built from fake nibs, with its config and VM."""
+    monolithic_image = tmp_path / "app"
+    monolithic_image.write_text("monolithic image")
+    nibs = {
+        "base_layer": _write_nib(tmp_path / "base-layer.nib"),
+        "base_layer_library": "libbase",
+        "app_layer": _write_nib(tmp_path / "app-layer.nib"),
+    }
+    executable_supplier = SimpleNamespace(fetch_layer_nibs=lambda: nibs, build_times={"app": 120.0})
+    config = SimpleNamespace(bench_name="app", native_layer_cache_dir=str(tmp_path / "layers"), build_options=["-O2"], app_executable=str(monolithic_image))
+    vm = _FakeVM()
+    return NativeLayerSupplier(config, vm, executable_supplier), config, vm
+
+
+def test_layer_config_digest(tmp_path):
+    """Tests that the digest only changes with the build arguments and the layer configuration of the nib."""
+    digest = layer_config_digest(_write_nib(tmp_path / "base.nib"))
+
+    assert layer_config_digest(_write_nib(tmp_path / "other-resource.nib", other="changed")) == digest
+    assert layer_config_digest(_write_nib(tmp_path / "build-args.nib", build_args='["-O3"]')) != digest
+    assert layer_config_digest(_write_nib(tmp_path / "layer-create.nib", layer_create_args="-H:LayerCreate=base.nil,module=java.base")) != digest
+
+
+def test_base_layer_key(layers):
+    """Tests that the base layer key changes with the GraalVM version and the build options."""
+    supplier, config, vm = layers
+    base_nib = supplier._executable_supplier.fetch_layer_nibs()["base_layer"]
+    key = supplier.base_layer_key(base_nib)
+
+    assert NativeLayerSupplier(config, _FakeVM(version="25.0.2"), None).base_layer_key(base_nib) != key
+    config.build_options = ["-O3"]
+    assert supplier.base_layer_key(base_nib) != key
+
+
+def test_cached_layer_file(layers, tmp_path):
+    """Tests that a cached base layer is only complete with both its shared library and its layer archive."""
+    supplier, _, _ = layers
+    layer_dir = tmp_path / "layer"
+    library_file = str(layer_dir / "libbase.so")
+
+    assert supplier._cached_layer_file(str(layer_dir), library_file) is None
+    layer_dir.mkdir()
+    (layer_dir / "libbase.nil").write_text("layer")
+    assert supplier._cached_layer_file(str(layer_dir), library_file) is None
+    (layer_dir / "libbase.so").write_text("library")
+    assert supplier._cached_layer_file(str(layer_dir), library_file) == str(layer_dir / "libbase.nil")
+    (layer_dir / "libbase.nil").unlink()
+    assert supplier._cached_layer_file(str(layer_dir), library_file) is None
+
+
+def test_supply_image_reuses_the_cached_base_layer(layers):
+    """Tests that the base layer is built and cached once, and that the app layer is built on top of the cached base layer."""
+    supplier, _, vm = layers
+
+    first = supplier.supply_image()
+    second = supplier.supply_image()
+
+    assert not first["cache_hit"] and second["cache_hit"]
+    assert first["base_layer"] == second["base_layer"] and first["key"] == second["key"]
+    assert first["base_layer_build_time"] == 60.0 and second["base_layer_build_time"] is None
+    assert first["app_layer_build_time"] == 60.0
+    assert [build["image"] for build in vm.builds] == ["libbase", "app-layered", "app-layered"]
+    layer_file = os.path.join(first["base_layer"], "libbase.nil")
+    assert vm.builds[2]["build_options"] == ["-O2", "-H:+UnlockExperimentalVMOptions", f"-H:LayerUse={layer_file}", "-H:-UnlockExperimentalVMOptions"]
+    # the image loads the shared library from its own directory
+    assert os.path.isfile(os.path.join(os.path.dirname(second["image"]), "libbase.so"))
+    assert second["monolithic_build_time"] == 120.0
+    assert second["monolithic_size"] == len("monolithic image")
+
+
+def test_supply_image_rebuilds_an_incomplete_base_layer(layers):
+    """Tests that a cached base layer missing its layer archive is built again."""
+    supplier, _, vm = layers
+    first = supplier.supply_image()
+    os.remove(os.path.join(first["base_layer"], "libbase.nil"))
+
+    second = supplier.supply_image()
+
+    assert not second["cache_hit"]
+    assert [build["image"] for build in vm.builds] == ["libbase", "app-layered", "libbase", "app-layered"]
+    assert os.path.isfile(os.path.join(second["base_layer"], "libbase.nil"))
+
+
+def test_failed_base_layer_build(layers):
+    """Tests that a base layer build without a layer archive fails without caching the base layer."""
+    supplier, config, _ = layers
+    supplier = NativeLayerSupplier(config, _FakeVM(write_layer_archive=False), supplier._executable_supplier)
+
+    with pytest.raises(FileNotFoundError):
+        supplier.supply_image()
+    assert not os.path.exists(config.native_layer_cache_dir)
@@ -0,0 +1,81 @@
+"""Tests the profile-guided optimization of app images in the native PGO sub-mode.
+
+The builds and the training run are simulated, the tests do not require wrk/wrk2, a JVM or any of the Barista apps to be built.
+"""
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import native_pgo
+from native_pgo import NativePgoSupplier
+
+
+class _FakeExecutableSupplier:
+    """Builds fake app images next to the nib, recording the options of each build."""
+
+    def __init__(self, nib_file):
+        self.nib_file = nib_file
+        self.builds = []
+
+    def build_image(self, name, build_options):
+        self.builds.append((name, build_options))
+        return os.path.join(os.path.dirname(self.nib_file), name)
+
+
+@pytest.fixture
+def pgo(tmp_path):
+    """Returns a supplier of images built from a fake nib, with its config and executable supplier."""
+    nib_file = tmp_path / "app.nib"
+    nib_file.write_bytes(b"nib")
+    config = SimpleNamespace(bench_name="app", native_pgo_cache_dir=str(tmp_path / "profiles"), build_options=["-O2"], app_executable="app", vm_options=["-Xmx1g"])
+    executable_supplier = _FakeExecutableSupplier(str(nib_file))
+    return NativePgoSupplier(config, SimpleNamespace(version="25.0.1"), executable_supplier), config, executable_supplier
+
+
+def test_profile_key(pgo, tmp_path):
+    """Tests that the profile key changes with the content of the nib and with the GraalVM version."""
+    supplier, config, executable_supplier = pgo
+    key = supplier.profile_key(executable_supplier.nib_file)
+
+    assert supplier.profile_key(executable_supplier.nib_file) == key
+    assert NativePgoSupplier(config, SimpleNamespace(version="25.0.2"), executable_supplier).profile_key(executable_supplier.nib_file) != key
+    (tmp_path / "app.nib").write_bytes(b"rebuilt nib")
+    assert supplier.profile_key(executable_supplier.nib_file) != key
+
+
+def test_supply_image_collects_and_caches_the_profile(pgo, monkeypatch):
+    """Tests that the profile is collected in a training run of the instrumented image once, and reused from the cache afterwards."""
+    supplier, config, executable_supplier = pgo
+    training_runs = []
+
+    def run_training_workload(training_config):
+        training_runs.append((training_config.app_executable, list(training_config.vm_options)))
+        with open(training_config.vm_options[-1].split("=", 1)[1], "w") as profile:
+            profile.write("profile")
+    monkeypatch.setattr(native_pgo, "run_training_workload", run_training_workload)
+
+    first = supplier.supply_image()
+    second = supplier.supply_image()
+
+    assert not first["cache_hit"] and second["cache_hit"]
+    assert first["profile"] == second["profile"] and os.path.isfile(first["profile"])
+    assert first["training_time"] is not None and second["training_time"] is None
+    instrumented_image = os.path.join(os.path.dirname(executable_supplier.nib_file), "app-pgo-instrumented")
+    assert training_runs == [(instrumented_image, ["-Xmx1g", f"-XX:ProfilesDumpFile={first['profile']}.tmp"])]
+    assert [name for name, _ in executable_supplier.builds] == ["app-pgo-instrumented", "app-pgo", "app-pgo"]
+    assert executable_supplier.builds[0][1] == ["-O2", "--pgo-instrument"]
+    assert executable_supplier.builds[2][1] == ["-O2", f"--pgo={first['profile']}"]
+    # the config of the app is restored after the training run
+    assert (config.app_executable, config.vm_options) == ("app", ["-Xmx1g"])
+
+
+def test_supply_image_without_profile(pgo, monkeypatch):
+    """Tests that a training run that does not write the profile fails without caching a profile."""
+    supplier, config, _ = pgo
+    monkeypatch.setattr(native_pgo, "run_training_workload", lambda training_config: None)
+
+    with pytest.raises(FileNotFoundError):
+        supplier.supply_image()
+    assert os.listdir(config.native_pgo_cache_dir) == []
+    assert (config.app_executable, config.vm_options) == ("app", ["-Xmx1g"])
@@ -0,0 +1,55 @@
+"""Tests the process management helpers on sockets and processes of the test itself.
+
+The tests do not require wrk/wrk2, a JVM or any of the Barista apps to be built.
+"""
+import os
+import socket
+import sys
+
+import pytest
+
+import process_info
+import psutil_replacement_linux
+
+
+@pytest.fixture
+def listening_socket():
+    """Opens a TCP socket listening on a free port of the loopback interface."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        yield server
+
+
+def test_is_listening(listening_socket):
+    """Tests that a port is only listening while a socket listens on it."""
+    port = listening_socket.getsockname()[1]
+
+    assert process_info.is_listening(os.getpid(), port) in [True, None]
+    listening_socket.close()
+    assert not process_info.is_listening(os.getpid(), port)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="The /proc/<pid>/net tables only exist on Linux")
+def test_is_listening_reads_proc_tables(listening_socket):
+    """Tests that the /proc/<pid>/net tables are parsed: bound or connected sockets do not listen, IPv6 sockets do."""
+    port = listening_socket.getsockname()[1]
+    assert psutil_replacement_linux.is_listening(os.getpid(), port)
+
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as bound, socket.create_connection(("127.0.0.1", port)) as client:
+        bound.bind(("127.0.0.1", 0))
+        assert not psutil_replacement_linux.is_listening(os.getpid(), bound.getsockname()[1])
+        assert not psutil_replacement_linux.is_listening(os.getpid(), client.getsockname()[1])
+    # a terminated process has no tables
+    assert not psutil_replacement_linux.is_listening(2 ** 22 + 1, port)
+
+    if not socket.has_ipv6:
+        return
+    try:
+        server6 = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+        server6.bind(("::1", 0))
+    except OSError:
+        pytest.skip("IPv6 is disabled")
+    with server6:
+        server6.listen()
+        assert psutil_replacement_linux.is_listening(os.getpid(), server6.getsockname()[1])
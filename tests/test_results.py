@@ -0,0 +1,114 @@
+"""Tests the latency histograms and the result compilation helpers.
+
+The tests do not require wrk/wrk2, a JVM or any of the Barista apps to be built.
+"""
+import base64
+import struct
+import zlib
+
+import pytest
+
+from results import LatencyHistogram, histograms_to_hdr_log, HDR_V2_COMPRESSED_ENCODING_COOKIE, HDR_V2_ENCODING_COOKIE
+
+
+def _decode(encoded):
+    """Decodes a histogram in the compressed HdrHistogram V2 format into its header and counts array."""
+    data = base64.b64decode(encoded)
+    cookie, length = struct.unpack(">ii", data[:8])
+    assert cookie == HDR_V2_COMPRESSED_ENCODING_COOKIE
+    assert length == len(data) - 8
+    decompressed = zlib.decompress(data[8:])
+    header = struct.unpack(">iiiiqqd", decompressed[:40])
+    assert header[0] == HDR_V2_ENCODING_COOKIE
+    payload = decompressed[40:]
+    assert header[1] == len(payload)
+    counts = []
+    idx = 0
+    while idx < len(payload):
+        value, shift = 0, 0
+        while True:
+            byte = payload[idx]
+            idx += 1
+            value |= (byte & 0x7f) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        value = (value >> 1) ^ -(value & 1)
+        if value < 0:
+            counts += [0] * -value
+        else:
+            counts.append(value)
+    return header, counts
+
+
+def test_histogram_merge_adds_counts():
+    """Tests that merging histograms adds up the counts of each latency value."""
+    first = LatencyHistogram({1000: 2, 2000: 1})
+    second = LatencyHistogram({2000: 3, 5000: 1})
+    merged = LatencyHistogram().merge(first).merge(second)
+
+    assert merged.counts == {1000: 2, 2000: 4, 5000: 1}
+    assert merged.total_count == 7
+    assert merged.max_value == 5000
+    assert merged.count_above(2000) == 1
+    # the merged histograms are left untouched
+    assert first.counts == {1000: 2, 2000: 1}
+
+
+def test_histogram_percentiles():
+    """Tests the percentiles of a histogram, following the HdrHistogram definition."""
+    histogram = LatencyHistogram()
+    for value in range(1, 101):
+        histogram.record(value * 1000)
+    histogram.record(500, count=0)
+
+    assert histogram.total_count == 100
+    assert histogram.value_at_percentile(50) == 50000
+    assert histogram.value_at_percentile(99) == 99000
+    assert histogram.value_at_percentile(100) == 100000
+    assert histogram.value_at_percentile(0) == 1000
+    p_values = histogram.p_values([50, 90, 100])
+    assert p_values == {50.0: 50.0, 90.0: 90.0, 100.0: 100.0}
+    assert LatencyHistogram().p_values() == {}
+    assert LatencyHistogram().value_at_percentile(50) == 0
+
+
+def test_histogram_encoding_round_trip():
+    """Tests that the compressed V2 encoding holds the counts at the HdrHistogram indexes of their values."""
+    # Values below 2048us have an index of their own, larger values share an index with their neighbours
+    histogram = LatencyHistogram({1: 3, 2047: 1, 2048: 2, 2049: 1, 4096: 5, 10**6: 1})
+    header, counts = _decode(histogram.encode())
+
+    assert header[3] == 3
+    assert counts[1] == 3
+    assert counts[2047] == 1
+    assert counts[2048] == 3
+    assert counts[3072] == 5
+    assert sum(counts) == histogram.total_count
+    assert counts[-1] == 1
+
+
+def test_empty_histogram_encoding():
+    """Tests that an empty histogram encodes to an empty counts array."""
+    header, counts = _decode(LatencyHistogram().encode())
+
+    assert header[1] == 0
+    assert counts == []
+
+
+def test_histograms_to_hdr_log(tmp_path):
+    """Tests that the HdrHistogram log holds one interval per histogram, relative to the first interval."""
+    intervals = [
+        (1000.0, 1010.0, None, LatencyHistogram({1500: 1})),
+        (1010.0, 1020.0, "script", LatencyHistogram({2500: 2})),
+    ]
+    log_file = histograms_to_hdr_log(str(tmp_path), "latency.hlog", intervals)
+
+    with open(log_file) as file:
+        lines = file.read().splitlines()
+    assert lines[0] == "#[Histogram log format version 1.3]"
+    assert lines[3] == '"StartTimestamp","Interval_Length","Interval_Max","Interval_Compressed_Histogram"'
+    assert lines[4].startswith("0.000,10.000,1.500,")
+    assert lines[5].startswith("Tag=script,10.000,10.000,2.500,")
+    _, counts = _decode(lines[5].split(",")[-1])
+    assert sum(counts) == 2
@@ -0,0 +1,84 @@
+"""Tests the persistent cache of the optimal rates found by the latency search strategies.
+
+The tests do not require wrk/wrk2, a JVM or any of the Barista apps to be built.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from configuration import ServiceMode
+from search_cache import SearchCache, search_fingerprint
+
+
+def _config(**latency_options):
+    """Returns a harness configuration with the fields the search fingerprint is computed from."""
+    latency = dict(
+        load_generator="wrk2", load_generator_processes=1, threads=2, connections=10, script=None,
+        sla_requirement={99.0: 10}, sla_tiers=None, base_step=0.05, probe_duration=30, probe_window=30,
+        upper_bound_discovery=False, search_confidence=0.95, max_probes_per_rate=3, arrival_distribution="constant",
+    )
+    latency.update(latency_options)
+    warmup = SimpleNamespace(iteration_duration=30, iteration_count=5, script=None, threads=2, connections=10, load_generator="wrk")
+    return SimpleNamespace(
+        bench_name="micronaut-hello-world", mode=ServiceMode.JVM, vm_version="25", vm_options=["-Xmx1g"], app_args=None,
+        endpoint="http://localhost:8080/hello", latency=SimpleNamespace(**latency), warmup=warmup,
+    )
+
+
+def test_search_fingerprint_is_stable():
+    """Tests that the same configuration always has the same fingerprint."""
+    assert search_fingerprint(_config()) == search_fingerprint(_config())
+
+
+@pytest.mark.parametrize("latency_options", [
+    {"load_generator": "oha"},
+    {"connections": 20},
+    {"sla_requirement": {99.0: 20}},
+    {"sla_tiers": {"gold": {99.0: 10}}},
+    {"probe_duration": 60},
+    {"arrival_distribution": "poisson"},
+])
+def test_search_fingerprint_changes_with_latency_config(latency_options):
+    """Tests that changing a field of the latency configuration changes the fingerprint."""
+    assert search_fingerprint(_config(**latency_options)) != search_fingerprint(_config())
+
+
+def test_search_fingerprint_changes_with_app_config():
+    """Tests that changing the VM, the app or the warmup changes the fingerprint."""
+    fingerprint = search_fingerprint(_config())
+    for field, value in [("vm_version", "26"), ("vm_options", ["-Xmx2g"]), ("mode", ServiceMode.NATIVE)]:
+        config = _config()
+        setattr(config, field, value)
+        assert search_fingerprint(config) != fingerprint
+    config = _config()
+    config.warmup.iteration_count = 10
+    assert search_fingerprint(config) != fingerprint
+
+
+def test_search_cache_round_trip(tmp_path):
+    """Tests that a cached result is returned under its fingerprint and strategy only, and survives the other fingerprints being cached."""
+    path = str(tmp_path / "cache" / "search-cache.json")
+    cache = SearchCache(path, "fingerprint-a")
+    assert cache.get("BINARY_SEARCH") is None
+
+    cache.put("BINARY_SEARCH", 1500, 3000, [{"rate": 1500}])
+    SearchCache(path, "fingerprint-b").put("BINARY_SEARCH", 500, 1000, [])
+
+    result = SearchCache(path, "fingerprint-a").get("BINARY_SEARCH")
+    assert result["rate"] == 1500
+    assert result["average_throughput"] == 3000
+    assert result["measurements"] == [{"rate": 1500}]
+    assert SearchCache(path, "fingerprint-a").get("LINEAR") is None
+    assert SearchCache(path, "fingerprint-b").get("BINARY_SEARCH")["rate"] == 500
+    assert SearchCache(path, "fingerprint-c").get("BINARY_SEARCH") is None
+
+
+def test_unreadable_search_cache_is_ignored(tmp_path):
+    """Tests that an unreadable cache file is treated as empty, and replaced by the next result."""
+    path = tmp_path / "search-cache.json"
+    path.write_text("{not json")
+    cache = SearchCache(str(path), "fingerprint")
+
+    assert cache.get("BINARY_SEARCH") is None
+    cache.put("BINARY_SEARCH", 1500, 3000, [])
+    assert cache.get("BINARY_SEARCH")["rate"] == 1500
@@ -0,0 +1,40 @@
+"""Tests the evaluation of the startup iterations under load.
+
+The tests do not require wrk/wrk2, a JVM or any of the Barista apps to be built.
+"""
+import pytest
+
+from startup_manager import StartupManager
+
+
+def _time_series(*requests_per_second):
+    """Returns a time series of one-second samples, the first ending 1.5 seconds after the app was started."""
+    return [{"time": 1.5 + i, "duration": 1.0, "requests_per_second": rps} for i, rps in enumerate(requests_per_second)]
+
+
+@pytest.mark.parametrize("time_series, time_to_rate", [
+    (_time_series(10, 50, 95, 100, 20), 2.5),
+    (_time_series(95, 50, 100, 100, 20), 2.5),
+    # the rate was sustained from the first sample on
+    (_time_series(95, 100, 20), 0.5),
+    # the rate was not sustained until the end
+    (_time_series(95, 100, 10, 20), None),
+    (_time_series(95, None, 100, 20), None),
+    (_time_series(100), None),
+    ([], None),
+])
+def test_time_to_rate(time_series, time_to_rate):
+    """Tests that the time to rate is the end of the last sample below 90% of the rate, ignoring the last sample."""
+    assert StartupManager(None)._time_to_rate(time_series, 100) == time_to_rate
+
+
+def test_run_latency():
+    """Tests that the latency of the whole iteration is averaged over the requests of all the samples, including the first seconds."""
+    time_series = [
+        {"time": 1.5, "duration": 1.0, "requests": 10, "requests_per_second": 10, "latency_avg": 100.0, "latency_max": 400.0},
+        {"time": 2.5, "duration": 1.0, "requests": 0, "requests_per_second": 0, "latency_avg": None, "latency_max": None},
+        {"time": 3.5, "duration": 1.0, "requests": 90, "requests_per_second": 90, "latency_avg": 10.0, "latency_max": 20.0},
+    ]
+
+    assert StartupManager(None)._run_latency(time_series) == {"latency_avg": 19.0, "latency_max": 400.0}
+    assert StartupManager(None)._run_latency([]) == {"latency_avg": None, "latency_max": None}
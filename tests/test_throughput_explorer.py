@@ -0,0 +1,243 @@
+"""Tests the latency strategies of the throughput explorer.
+
+The probes of the searches are simulated, the tests do not require wrk/wrk2, a JVM or any of the Barista apps to be built.
+"""
+import math
+from types import SimpleNamespace
+
+import pytest
+
+from configuration import Configuration, LatencyMode
+from results import LatencyHistogram
+from throughput_explorer import ThroughputExplorer, find_knee
+
+
+def test_find_knee():
+    """Tests that the knee is the last point before the latency explodes."""
+    latencies = [1, 1, 1.1, 1.2, 1.3, 1.5, 2, 5, 50, 500]
+    points = [(100 * (i + 1), latency) for i, latency in enumerate(latencies)]
+
+    assert find_knee(points) == 6
+
+
+def test_find_knee_ignores_noise_at_low_rates():
+    """Tests that latencies are made non-decreasing, so a noisy first point is not mistaken for the knee."""
+    assert find_knee([(1, 5), (2, 1), (3, 1), (4, 100)]) == 2
+
+
+@pytest.mark.parametrize("points", [
+    [(1, 1), (2, 100)],
+    [(rate, 3) for rate in range(5)],
+    [(rate, math.exp(rate)) for rate in range(5)],
+])
+def test_find_knee_without_knee(points):
+    """Tests that too short, flat and exponential (straight on a log scale) curves have no knee."""
+    assert find_knee(points) is None
+
+
+def _explorer(tmp_path, strategy=LatencyMode.BINARY_SEARCH, sla=None, average_throughput=1000, **latency_options):
+    """Creates a throughput explorer searching relative to the given average throughput."""
+    options = {"probe_duration": 30, "probe_window": 30}
+    options.update(latency_options)
+    config = Configuration.LatencyConfig(60, 1, strategy, None, None, 0.05, sla, None, 1, 1, "wrk2", "constant", **options)
+    return ThroughputExplorer(config, str(tmp_path), "http://127.0.0.1:8080/hello", [{"throughput": average_throughput}], {})
+
+
+def _histogram(fast, slow, slow_latency=20000):
+    """Returns a histogram of `fast` requests at 1ms and `slow` requests at `slow_latency` microseconds."""
+    return LatencyHistogram({1000: fast, slow_latency: slow})
+
+
+@pytest.mark.parametrize("histogram, verdict", [
+    (_histogram(10000, 0), True),
+    (_histogram(9500, 500), False),
+    (_histogram(9890, 110), None),
+    (LatencyHistogram(), None),
+])
+def test_sla_verdict(tmp_path, histogram, verdict):
+    """Tests that the SLA is only decided once the count above the required latency is far off its expected count."""
+    explorer = _explorer(tmp_path)
+
+    assert explorer.sla_verdict(histogram, {99.0: 10}) is verdict
+
+
+def test_sla_verdict_of_maximum_latency(tmp_path):
+    """Tests that a p100 requirement is violated by a single request, but never met before the end of the probe."""
+    explorer = _explorer(tmp_path)
+
+    assert explorer.sla_verdict(_histogram(10000, 1), {100.0: 10}) is False
+    assert explorer.sla_verdict(_histogram(10000, 0), {100.0: 10}) is None
+    assert explorer.sla_verdict(_histogram(10000, 0), {99.0: 10, 100.0: 10}) is None
+    # resource limits are only checked at the end of the probe
+    assert explorer.sla_verdict(_histogram(10000, 0), {"cpu_percent": 50}) is None
+
+
+def _window(throughput, histogram, p_values, errors, cpu_percent, saturated, duration=5):
+    """Returns the results of a probe window of 1000 requests."""
+    return {
+        "command": "wrk2 -R 1000",
+        "stdout": f"window at {throughput}",
+        "exit_code": 0,
+        "throughput": {"throughput": throughput},
+        "histogram": histogram,
+        "p_values": p_values,
+        "errors": {"requests": 1000, "non_2xx_3xx": errors, "connect": 0, "read": 0, "write": 0, "timeout": 0},
+        "load_generator_cpu": {"cpu_percent": cpu_percent, "saturated": saturated},
+        "probe_duration": duration,
+    }
+
+
+def test_merge_probe_windows(tmp_path):
+    """Tests that the windows of a probe are merged into a single measurement, with percentiles of the merged histogram and a duration-weighted throughput."""
+    explorer = _explorer(tmp_path)
+    windows = [
+        _window(900, _histogram(100, 0), {99.0: 1.0}, 1, 80, False, 7.5),
+        _window(1300, _histogram(98, 2), {99.0: 20.0}, 3, 95, True, 2.5),
+    ]
+    histogram = LatencyHistogram().merge(windows[0]["histogram"]).merge(windows[1]["histogram"])
+
+    results = explorer.merge_probe_windows(windows, histogram, 10)
+
+    assert results["throughput"]["throughput"] == 1000
+    assert results["p_values"] == histogram.p_values()
+    assert results["histogram"] is histogram
+    assert results["errors"]["requests"] == 2000
+    assert results["errors"]["non_2xx_3xx"] == 4
+    assert results["load_generator_cpu"] == {"cpu_percent": 95, "saturated": True}
+    assert results["stdout"] == "window at 900\nwindow at 1300"
+    assert results["probe_duration"] == 10
+
+
+def test_merge_probe_windows_without_histograms(tmp_path):
+    """Tests that the worst percentiles of the windows are kept without histograms, and that a single window is kept as is."""
+    explorer = _explorer(tmp_path)
+    windows = [
+        _window(900, None, {50.0: 1.0, 99.0: 8.0}, 0, 80, False),
+        _window(1100, None, {50.0: 2.0, 99.0: 4.0}, 0, 80, False),
+    ]
+
+    assert explorer.merge_probe_windows(windows, LatencyHistogram(), 10)["p_values"] == {50.0: 2.0, 99.0: 8.0}
+    single = explorer.merge_probe_windows(windows[:1], LatencyHistogram(), 5)
+    assert single["p_values"] == windows[0]["p_values"]
+    assert single["probe_duration"] == 5
+
+
+class _ScriptedExplorer(ThroughputExplorer):
+    """A throughput explorer whose probes measure the scripted p99 latencies, always achieving the probed rate.
+
+    The latencies are either a list, consumed by the successive probes, or a function of the probed fraction of the average throughput.
+    """
+
+    def __init__(self, p99_latencies, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._p99_latencies = p99_latencies if callable(p99_latencies) else list(p99_latencies)
+
+    def measure_once(self, expected_rate_percentage):
+        p99_latency = self._p99_latencies(expected_rate_percentage) if callable(self._p99_latencies) else self._p99_latencies.pop(0)
+        results = {
+            "throughput": {"throughput": expected_rate_percentage * self._avg},
+            "p_values": {99.0: p99_latency},
+            "probe_duration": 30,
+        }
+        # Recorded like the probes of the load generator, for the searches of later SLA tiers to reuse
+        self._counter += 1
+        self._probes.setdefault(int(expected_rate_percentage * self._avg), []).append((0, 0, results))
+        return results
+
+
+@pytest.mark.parametrize("p99_latencies, probes, passes, meets_sla", [
+    # a first probe far below the SLA is accepted right away
+    ([5], 1, 1, True),
+    ([9, 9], 2, 2, True),
+    ([11, 11], 2, 0, False),
+    ([11, 9, 9, 9], 4, 3, True),
+    # undecided probes are decided by the more likely hypothesis once the probes are exhausted
+    ([9, 11, 9, 11, 9, 11], 6, 3, False),
+])
+def test_decide_rate(tmp_path, p99_latencies, probes, passes, meets_sla):
+    """Tests that a rate is probed until the sequential probability ratio test decides whether it meets the SLA."""
+    config = _explorer(tmp_path, sla={99.0: 10}, search_confidence=0.8, max_probes_per_rate=6)._latency_config
+    explorer = _ScriptedExplorer(p99_latencies, config, str(tmp_path), "http://127.0.0.1:8080/hello", [{"throughput": 1000}], {})
+    measurements = []
+
+    decision = explorer.decide_rate(0.5, measurements)
+
+    assert decision == {"rate": 500, "probes": probes, "passes": passes, "meets_sla": meets_sla}
+    assert len(measurements) == probes
+    assert [measurement["meets_sla"] for measurement in measurements] == [latency < 10 for latency in p99_latencies[:probes]]
+
+
+def test_get_sla_tier_rates(tmp_path):
+    """Tests that every SLA tier gets its own optimal rate in a single search, reusing the probes of the earlier tiers."""
+    tiers = {"gold": {99.0: 5}, "silver": {99.0: 10}}
+    config = _explorer(tmp_path, sla_tiers=tiers)._latency_config
+    # the p99 latency grows linearly with the rate, up to 20ms at the average throughput
+    explorer = _ScriptedExplorer(lambda rate_percentage: 20 * rate_percentage, config, str(tmp_path), "http://127.0.0.1:8080/hello", [{"throughput": 1000}], {})
+
+    measurements = explorer.get_sla_tier_rates()
+
+    summary = explorer._summary["tiers"]
+    assert list(summary) == ["gold", "silver"]
+    assert [summary[tier]["mode"] for tier in tiers] == ["BINARY_SEARCH-gold", "BINARY_SEARCH-silver"]
+    assert summary["gold"]["rate"] == pytest.approx(250, abs=50)
+    assert summary["silver"]["rate"] == pytest.approx(500, abs=50)
+    assert set(measurements["to_measure"]) == {"BINARY_SEARCH-gold", "BINARY_SEARCH-silver"}
+    assert measurements["to_measure"]["BINARY_SEARCH-silver"][0] == summary["silver"]["rate"]
+    # the first probe at half of the average throughput is shared by both tiers
+    assert summary["silver"]["new_probes"] < summary["silver"]["probes"]
+    for tier, sla in tiers.items():
+        assert all(step["meets_sla"] == (step["p_values"][99.0] < sla[99.0]) for step in measurements["performed_measurements"][f"BINARY_SEARCH-{tier}"])
+    assert explorer._sla_requirement is None
+
+
+def test_sla_breaches_with_resource_limits(tmp_path):
+    """Tests that resource limits of the SLA are breached by the resource usage of the application, and skipped without one."""
+    explorer = _explorer(tmp_path, sla={99.0: 10, "cpu_percent": 80, "rss_mb": 512})
+    within_limits = {"cpu_percent": 50.0, "rss_mb": 256.0}
+
+    assert explorer.sla_breaches({99.0: 5}, 500, app_resources=within_limits) == []
+    assert explorer.sla_breaches({99.0: 10}, 500, app_resources={"cpu_percent": 90.0, "rss_mb": 256.0}) == ["p99", "cpu_percent"]
+    assert explorer.sla_breaches({99.0: 5}, 500, app_resources={"cpu_percent": 50.0, "rss_mb": 1024.0}) == ["rss_mb"]
+    assert explorer.sla_breaches({99.0: 5}, 500) == []
+    assert explorer.sla_breaches({99.9: 20}, 500, sla_requirement={99.9: 10}) == ["p99.9"]
+
+
+def test_sla_breaches_of_unmeasured_percentiles(tmp_path):
+    """Tests that a percentile the load generator did not report, e.g. as no request completed, breaches the SLA."""
+    explorer = _explorer(tmp_path, sla={99.0: 10, 99.999: 20})
+
+    assert explorer.sla_breaches({}, 500) == ["p99", "p99.999"]
+    assert explorer.sla_breaches({99.0: 5, 99.99: 8}, 500) == ["p99.999"]
+    assert not explorer.clearly_meets_sla({99.0: 1})
+
+
+def test_find_binding_constraint(tmp_path):
+    """Tests that the binding constraints are the violations of the lowest rejected probe above the optimal rate."""
+    explorer = _explorer(tmp_path)
+    measurements = [
+        {"rate": 400, "meets_sla": False, "violations": ["error_rate"]},
+        {"rate": 500, "meets_sla": True},
+        {"rate": 800, "meets_sla": False, "violations": ["p99", "achieved_rate"]},
+        {"rate": 600, "meets_sla": False, "violations": ["cpu_percent"]},
+    ]
+
+    assert explorer.find_binding_constraint(measurements, 500) == ["cpu_percent"]
+    assert explorer.find_binding_constraint(measurements, 800) is None
+
+
+def test_app_resource_usage(tmp_path):
+    """Tests that the CPU usage is averaged per available CPU and the RSS is maximized over the samples within the measurements."""
+    megabyte = 1024 * 1024
+    # (time in ms, rss, vms, cpu percent of one CPU)
+    monitor = SimpleNamespace(app_cpu_count=2, resources=[
+        (1000, 100 * megabyte, 0, 300.0),
+        (2000, 200 * megabyte, 0, 100.0),
+        (3000, 150 * megabyte, 0, 60.0),
+        (9000, 900 * megabyte, 0, 200.0),
+    ])
+    config = _explorer(tmp_path)._latency_config
+    explorer = ThroughputExplorer(config, str(tmp_path), "http://127.0.0.1:8080/hello", [{"throughput": 1000}], {}, resource_monitor=monitor)
+
+    assert explorer.app_resource_usage([(1, 2), (3, 4)]) == {"cpu_percent": pytest.approx(460 / 3 / 2), "rss_mb": 200}
+    assert explorer.app_resource_usage([(5, 6)]) is None
+    assert _explorer(tmp_path).app_resource_usage([(1, 2)]) is None
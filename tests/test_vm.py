@@ -0,0 +1,162 @@
+"""Tests the helpers for the VM and the native image builds.
+
+The tests do not require wrk/wrk2, a JVM or any of the Barista apps to be built.
+"""
+import json
+import os
+import sys
+
+import pytest
+
+from vm import NativeImageVM, read_build_output_stats
+
+# An excerpt of the build output JSON written by native-image with '-H:BuildOutputJSONFile'
+BUILD_OUTPUT = {
+    "general_info": {"name": "app", "graalvm_version": "GraalVM CE 25.0.1"},
+    "analysis_results": {
+        "types": {"total": 12000, "reachable": 6500, "reflection": 300, "jni": 60},
+        "fields": {"total": 25000, "reachable": 9000, "reflection": 40, "jni": 70},
+        "methods": {"total": 90000, "reachable": 35000, "reflection": 900, "jni": 55},
+    },
+    "image_details": {"total_bytes": 48 * 1024 * 1024, "code_area": {"bytes": 20 * 1024 * 1024}},
+    "resource_usage": {"total_secs": 61.5, "memory": {"peak_rss_bytes": 3 * 1024 * 1024 * 1024, "system_total": 16 * 1024 * 1024 * 1024}},
+}
+
+# A native-image executable that writes the image named by '-o' and the build output, and counts its builds
+NATIVE_IMAGE = """#!{python}
+import json, os, sys
+if sys.argv[1] == "--version":
+    print("native-image 25.0.1")
+    sys.exit(0)
+nib_file = sys.argv[1].split("=", 1)[1]
+output_dir = os.path.join(nib_file[:-4] + ".output", "default")
+os.makedirs(output_dir, exist_ok=True)
+with open(os.path.join(output_dir, sys.argv[sys.argv.index("-o") + 1]), "w") as file:
+    file.write(" ".join(sys.argv[1:]))
+build_output_file = [arg for arg in sys.argv if arg.startswith("-H:BuildOutputJSONFile=")][0].split("=", 1)[1]
+with open(build_output_file, "w") as file:
+    json.dump({{"resource_usage": {{"total_secs": 60}}}}, file)
+with open("{builds}", "a") as file:
+    file.write("build\\n")
+"""
+
+
+def test_read_build_output_stats(tmp_path):
+    """Tests that the statistics of a build are read from the build output of native-image."""
+    build_output_file = tmp_path / "build-output.json"
+    build_output_file.write_text(json.dumps(BUILD_OUTPUT))
+
+    assert read_build_output_stats(str(build_output_file)) == {
+        "wall_time": 61.5,
+        "peak_rss_mb": 3072,
+        "image_size_mb": 48,
+        "reachable_types": 6500,
+        "reachable_methods": 35000,
+        "reachable_fields": 9000,
+    }
+
+
+def test_read_partial_build_output_stats(tmp_path):
+    """Tests that statistics missing from the build output, e.g. of older native-image versions, are None."""
+    build_output_file = tmp_path / "build-output.json"
+    build_output_file.write_text(json.dumps({"resource_usage": {"total_secs": 10.0}}))
+
+    stats = read_build_output_stats(str(build_output_file))
+
+    assert stats["wall_time"] == 10.0
+    assert all(stats[key] is None for key in ["peak_rss_mb", "image_size_mb", "reachable_types", "reachable_methods", "reachable_fields"])
+
+
+@pytest.mark.parametrize("content", [None, "{not json"])
+def test_read_unreadable_build_output_stats(tmp_path, content):
+    """Tests that missing or malformed build outputs yield no statistics."""
+    build_output_file = tmp_path / "build-output.json"
+    if content is not None:
+        build_output_file.write_text(content)
+
+    assert read_build_output_stats(str(build_output_file)) is None
+
+
+
+@pytest.fixture
+def native_image_vm(tmp_path):
+    """Returns a native image VM of a fake GraalVM distribution, a nib and a function returning the number of images built."""
+    bin_dir = tmp_path / "graalvm" / "bin"
+    bin_dir.mkdir(parents=True)
+    builds = tmp_path / "builds"
+    for name, content in [("java", "#!/bin/sh\necho 'java 25.0.1'\n"), ("native-image", NATIVE_IMAGE.format(python=sys.executable, builds=builds))]:
+        (bin_dir / name).write_text(content)
+        (bin_dir / name).chmod(0o755)
+    nib_file = tmp_path / "app.nib"
+    nib_file.write_bytes(b"nib")
+    profile = tmp_path / "default.iprof"
+    profile.write_text("profile")
+
+    def build_count():
+        return len(builds.read_text().splitlines()) if builds.exists() else 0
+
+    return NativeImageVM(str(tmp_path / "graalvm")), nib_file, profile, build_count
+
+
+def test_image_key(native_image_vm):
+    """Tests that the cache key changes with the contents of the nib and of the files passed to the build, the image name and the build options."""
+    vm, nib_file, profile, _ = native_image_vm
+    options = ["-O2", f"--pgo={profile}"]
+    key = vm.image_key(str(nib_file), "app", options)
+
+    assert vm.image_key(str(nib_file), "app", list(options)) == key
+    assert vm.image_key(str(nib_file), "app-pgo", options) != key
+    assert vm.image_key(str(nib_file), "app", ["-O3", f"--pgo={profile}"]) != key
+    profile.write_text("another profile")
+    assert vm.image_key(str(nib_file), "app", options) != key
+    profile.write_text("profile")
+    nib_file.write_bytes(b"another nib")
+    assert vm.image_key(str(nib_file), "app", options) != key
+
+
+def test_native_image_build_cache(native_image_vm, tmp_path):
+    """Tests that a build is cached on a miss, and that the cached image is restored instead of building it again."""
+    vm, nib_file, _, build_count = native_image_vm
+    vm.enable_image_cache(str(tmp_path / "cache"))
+
+    image_path = vm.native_image_build(str(nib_file), "app", ["-O2"])
+    assert build_count() == 1
+    assert [build["cache_hit"] for build in vm.builds] == [False]
+    assert vm.builds[0]["stats"]["wall_time"] == 60
+    cache_entries = os.listdir(tmp_path / "cache")
+    assert cache_entries == [f"app-{vm.builds[0]['key'][:16]}"]
+
+    os.remove(os.path.join(os.path.dirname(image_path), "app-build-output.json"))
+    assert vm.native_image_build(str(nib_file), "app", ["-O2"]) == image_path
+    assert build_count() == 1
+    assert [build["cache_hit"] for build in vm.builds] == [False, True]
+    assert vm.builds[1]["key"] == vm.builds[0]["key"]
+    assert vm.builds[1]["stats"] == vm.builds[0]["stats"]
+    assert os.path.isfile(image_path)
+    assert os.path.isfile(os.path.join(os.path.dirname(image_path), "app-build-output.json"))
+
+    vm.native_image_build(str(nib_file), "app", ["-O3"])
+    assert build_count() == 2
+    assert vm.builds[2]["cache_hit"] is False
+
+
+def test_native_image_build_cache_eviction(native_image_vm, tmp_path):
+    """Tests that only the most recently used builds of an image are kept in the cache, independently of the other images."""
+    vm, nib_file, _, build_count = native_image_vm
+    vm.enable_image_cache(str(tmp_path / "cache"), cache_size=2)
+
+    def cached_builds(image_name):
+        return sorted(name for name in os.listdir(tmp_path / "cache") if name.rsplit("-", 1)[0] == image_name)
+
+    vm.native_image_build(str(nib_file), "app-layered", ["-O2"])
+    for options in [["-O1"], ["-O2"]]:
+        vm.native_image_build(str(nib_file), "app", options)
+    # restoring a build marks it as used, making the other build the least recently used one
+    os.utime(tmp_path / "cache" / f"app-{vm.builds[1]['key'][:16]}", (0, 0))
+    vm.native_image_build(str(nib_file), "app", ["-O1"])
+    assert vm.builds[-1]["cache_hit"] is True
+    vm.native_image_build(str(nib_file), "app", ["-O3"])
+
+    assert build_count() == 4
+    assert cached_builds("app") == sorted(f"app-{vm.builds[i]['key'][:16]}" for i in [1, 4])
+    assert len(cached_builds("app-layered")) == 1
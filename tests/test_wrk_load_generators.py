@@ -0,0 +1,137 @@
+"""Tests the parsing of the wrk and wrk2 outputs.
+
+The tests do not require wrk/wrk2, a JVM or any of the Barista apps to be built.
+"""
+import pytest
+
+from abstract_load_generator import error_rate, exceeds_error_rate
+from configuration import Configuration, LatencyMode
+from wrk2_load_generator import Wrk2LoadGenerator
+
+WRK2_OUTPUT = """Running 10s test @ http://127.0.0.1:8080/hello
+  2 threads and 4 connections
+  Thread calibration: mean lat.: 1.234ms, rate sampling interval: 10ms
+  Thread Stats   Avg      Stdev     Max   +/- Stdev
+    Latency     1.10ms  450.00us   4.10ms   70.00%
+    Req/Sec     1.05k   100.00     1.50k    68.00%
+  Latency Distribution (HdrHistogram - Recorded Latency)
+ 50.000%    1.00ms
+ 75.000%    1.20ms
+ 90.000%    2.00ms
+ 99.000%    4.10ms
+ 99.900%    4.10ms
+ 99.990%    4.10ms
+ 99.999%    4.10ms
+100.000%    4.10ms
+
+  Detailed Percentile spectrum:
+       Value   Percentile   TotalCount 1/(1-Percentile)
+
+       0.500     0.000000            1         1.00
+       1.000     0.500000           10         2.00
+       1.200     0.750000           15         4.00
+       2.000     0.900000           18        10.00
+       4.100     1.000000           20          inf
+#[Mean    =        1.100, StdDeviation   =        0.450]
+#[Max     =        4.096, Total count    =           20]
+#[Buckets =           27, SubBuckets     =         2048]
+----------------------------------------------------------
+  20000 requests in 10.00s, 2.50MB read
+  Socket errors: connect 1, read 2, write 0, timeout 3
+  Non-2xx or 3xx responses: 14
+Requests/sec:   2000.00
+Transfer/sec:    256.00KB
+"""
+
+
+def _wrk2(processes=1, cpus=None):
+    config = Configuration.LatencyConfig(10, 1, LatencyMode.FIXED, None, [100], None, None, None, 2, 4, "wrk2", "constant", processes, cpus)
+    return Wrk2LoadGenerator(config, "/tmp", "http://127.0.0.1:8080/hello", {})
+
+
+def test_parse_histogram():
+    """Tests that the histogram is reconstructed from the differences of the total counts of the spectrum."""
+    histogram = _wrk2().parse_histogram(WRK2_OUTPUT)
+
+    assert histogram.counts == {500: 1, 1000: 9, 1200: 5, 2000: 3, 4100: 2}
+    assert histogram.total_count == 20
+    assert histogram.p_values([50, 90, 100]) == {50.0: 1.0, 90.0: 2.0, 100.0: 4.1}
+
+
+def test_parse_histogram_without_spectrum():
+    """Tests that an output without a percentile spectrum yields an empty histogram."""
+    output = WRK2_OUTPUT[:WRK2_OUTPUT.index("  Detailed Percentile spectrum:")]
+
+    assert _wrk2().parse_histogram(output).total_count == 0
+
+
+def test_parse_request_stats():
+    """Tests the parsing of the request errors, the transfer rate and the per-thread throughput."""
+    stats = _wrk2().parse_request_stats(WRK2_OUTPUT)
+
+    assert stats["errors"] == {"requests": 20000, "non_2xx_3xx": 14, "connect": 1, "read": 2, "write": 0, "timeout": 3}
+    assert stats["error_rate"] == pytest.approx(20 / 20006)
+    assert stats["transfer_per_second"] == 256 * 1024
+    assert stats["requests_per_thread"] == {"avg": 1050, "stdev": 100, "max": 1500, "+/- stdev": 68}
+
+
+def test_parse_request_stats_without_errors():
+    """Tests that the error lines, only printed by wrk if errors occurred, default to no errors."""
+    output = WRK2_OUTPUT.replace("  Socket errors: connect 1, read 2, write 0, timeout 3\n", "").replace("  Non-2xx or 3xx responses: 14\n", "")
+    stats = _wrk2().parse_request_stats(output)
+
+    assert stats["errors"] == {"requests": 20000, "non_2xx_3xx": 0, "connect": 0, "read": 0, "write": 0, "timeout": 0}
+    assert stats["error_rate"] == 0
+
+
+def test_exceeds_error_rate():
+    """Tests that iterations are marked, or fail, only above the maximum error rate."""
+    result = {"error_rate": 0.2, "errors": {}}
+
+    assert not exceeds_error_rate(result, None, False, "iteration")
+    assert not exceeds_error_rate(result, 0.5, False, "iteration")
+    assert exceeds_error_rate(result, 0.1, False, "iteration")
+    with pytest.raises(ValueError):
+        exceeds_error_rate(result, 0.1, True, "iteration")
+    assert error_rate({"requests": 0, "non_2xx_3xx": 0, "connect": 0, "read": 0, "write": 0, "timeout": 0}) == 0
+
+
+def test_fan_out():
+    """Tests that the threads, connections, rate and CPUs are split into (almost) equal shares among the processes."""
+    shares = _wrk2(processes=3, cpus=[0, 1, 2, 3, 4, 5]).fan_out(4, 10, 1000)
+
+    assert shares == [(2, 4, 334, [0, 1]), (1, 3, 333, [2, 3]), (1, 3, 333, [4, 5])]
+    assert _wrk2().fan_out(2, 4, 1000) == [(2, 4, 1000, None)]
+    # wrk requires at least one connection per thread
+    assert _wrk2(processes=2).fan_out(4, 2) == [(1, 1, None, None), (1, 1, None, None)]
+
+
+def test_merge_request_stats():
+    """Tests that the errors and transfer rates are summed up and the per-thread throughput is pooled over all the threads."""
+    def stats(requests, avg, stdev, max_throughput):
+        errors = {"requests": requests, "non_2xx_3xx": 1, "connect": 0, "read": 0, "write": 0, "timeout": 1}
+        return {"errors": errors, "transfer_per_second": 1024.0, "requests_per_thread": {"avg": avg, "stdev": stdev, "max": max_throughput, "+/- stdev": 70.0}}
+
+    merged = _wrk2().merge_request_stats([stats(100, 100, 10, 130), stats(300, 200, 20, 250)], [1, 3])
+
+    assert merged["errors"] == {"requests": 400, "non_2xx_3xx": 2, "connect": 0, "read": 0, "write": 0, "timeout": 2}
+    assert merged["error_rate"] == pytest.approx(4 / 402)
+    assert merged["transfer_per_second"] == 2048
+    assert merged["requests_per_thread"]["avg"] == pytest.approx(175)
+    assert merged["requests_per_thread"]["stdev"] == pytest.approx(2200 ** 0.5)
+    assert merged["requests_per_thread"]["max"] == 250
+    assert merged["requests_per_thread"]["+/- stdev"] is None
+
+
+def test_merge_latencies():
+    """Tests that the latencies of several processes are computed from the merged histogram, never averaged."""
+    load_generator = _wrk2(processes=2)
+    outputs = [WRK2_OUTPUT, WRK2_OUTPUT.replace("       4.100     1.000000           20          inf", "       8.000     1.000000           20          inf")]
+    histogram = load_generator.parse_histogram(outputs[0]).merge(load_generator.parse_histogram(outputs[1]))
+
+    p_values = load_generator.merge_latencies(outputs, histogram)
+
+    assert p_values[50.0] == 1.0
+    assert p_values[100.0] == 8.0
+    assert load_generator.merge_latencies(outputs[:1], histogram)[100.0] == 4.1
+
@@ -1,22 +1,79 @@
-from configuration import LatencyMode
-from wrk2_load_generator import Wrk2LoadGenerator
+from configuration import LatencyMode, SLA_SEARCH_STRATEGIES, RESOURCE_LIMITS
+from load_generators import create_load_generator
+from abstract_load_generator import exceeds_error_rate, error_rate
+from results import LatencyHistogram, histograms_to_hdr_log
 import re
 import copy
+import math
 import logging as log
 import os
+import time
 
 MEETS_SLA = 'meets_sla'
 FIXED_PERCENTAGE = 'FIXED_PERCENTAGE'
+RATE_SWEEP = 'RATE_SWEEP'
+# Percentile whose latency curve is searched for the knee
+KNEE_PERCENTILE = 99.0
+# Number of standard deviations the count of latencies above an SLA must be off its expected count for a probe to stop early
+SLA_CONFIDENCE_Z = 3.0
+# Probabilities of a single probe meeting the SLA at a rate that is sustainable, and at one that is not, tested against each other
+# by the sequential probability ratio test of the robust binary search
+SPRT_PASS_PROBABILITY = 0.9
+SPRT_FAIL_PROBABILITY = 0.2
+# A first probe with all its SLA percentiles below this fraction of the required latencies is accepted without repeating it
+SPRT_CLEAR_PASS_MARGIN = 0.8
+# Maximum multiple of the average throughput the upper bound discovery of the SLA searches raises the upper bound to
+MAX_UPPER_BOUND = 16
+
+def find_knee(points):
+    """Finds the knee of a latency curve, where the latency starts growing superlinearly with the rate, using the Kneedle algorithm.
+
+    The rates and the logarithm of the latencies are normalized to [0, 1] and the knee is the point furthest below the line
+    between the first and the last point of the curve. The logarithm keeps the latency explosion past saturation from
+    dominating the curve, so the knee is found where the latency starts to grow rather than where it is already high. The
+    latencies are made non-decreasing first, so measurement noise at low rates is not mistaken for the knee.
+
+    :param list points: (rate, latency) pairs ordered by rate.
+    :return: Index of the knee point, None if the curve has no knee.
+    :rtype: int
+    """
+    if len(points) < 3:
+        return None
+    rates = [rate for rate, _ in points]
+    latencies = []
+    for _, latency in points:
+        latency = math.log(max(latency, 0.001))
+        latencies.append(max(latency, latencies[-1]) if latencies else latency)
+    rate_range = rates[-1] - rates[0]
+    latency_range = latencies[-1] - latencies[0]
+    if rate_range <= 0 or latency_range <= 0:
+        return None
+    differences = [(rate - rates[0]) / rate_range - (latency - latencies[0]) / latency_range for rate, latency in zip(rates, latencies)]
+    knee = max(range(len(points)), key=lambda i: differences[i])
+    if differences[knee] <= 0:
+        return None
+    return knee
 
 class ThroughputExplorer():
 
-    def __init__(self, latency_config, output_dir, endpoint, throughput_result, env):
+    def __init__(self, latency_config, output_dir, endpoint, throughput_result, env, sampling_interval=0, max_error_rate=None, fail_on_error_rate=False, search_cache=None, resource_monitor=None):
         self._latency_config = latency_config
         self._throughput = throughput_result
         self._output_dir = output_dir
         self._endpoint = endpoint
         self._counter = 0
         self._env = env
+        self._sampling_interval = sampling_interval
+        self._max_error_rate = max_error_rate
+        self._fail_on_error_rate = fail_on_error_rate
+        self._histograms = {}
+        self._aggregated_measurements = {}
+        self._summary = {}
+        self._search_cache = search_cache
+        self._probes = {}
+        self._sla_requirement = latency_config.sla_requirement
+        self._mode_slas = {}
+        self._resource_monitor = resource_monitor
 
         self.find_avg_throughput()
 
@@ -26,10 +83,20 @@ class ThroughputExplorer():
             if self._latency_config.iteration_count <=0:
                 return {}
             measurements = self.get_fixed_rates()
-        elif self._latency_config.search_strategy == LatencyMode.BINARY_SEARCH:
-            measurements = self.get_binary_search_rate()
-        elif self._latency_config.search_strategy == LatencyMode.AIMD:
-            measurements = self.get_aimd_rate()
+        elif self._latency_config.search_strategy in SLA_SEARCH_STRATEGIES:
+            if self._latency_config.sla_tiers is not None:
+                measurements = self.get_sla_tier_rates()
+            else:
+                mode_name = self._latency_config.search_strategy.name
+                measurements = self.search_rate(mode_name)
+                self._summary['capacity'] = self.compare_to_throughput_estimate(measurements['to_measure'][mode_name][0])
+                self._summary['capacity']['binding_constraint'] = measurements['binding_constraint']
+                if 'search' in measurements:
+                    self._summary['search'] = measurements['search']
+        elif self._latency_config.search_strategy == LatencyMode.RATE_SWEEP:
+            if self._latency_config.iteration_count <=0:
+                return {}
+            measurements = self.get_rate_sweep_rates()
         else:
             raise ValueError(f"Could not determine search strategy {self._latency_config.search_strategy.name}")
 
@@ -40,40 +107,196 @@ class ThroughputExplorer():
                 for rate in identified_opt_rates:
                     latency_results += self.measure_and_dump(script, rate, search_strategy)
 
+        if self._latency_config.search_strategy == LatencyMode.RATE_SWEEP:
+            refinement_rates = self.get_knee_refinement_rates(latency_results)
+            for script in self._latency_config.script if self._latency_config.script is not None else [None]:
+                for rate in refinement_rates:
+                    latency_results += self.measure_and_dump(script, rate, RATE_SWEEP)
+            self._summary['knee'] = self.find_knee_point(latency_results)
+
         res = {}
         res['final_measurements'] = latency_results
+        self._aggregated_measurements = {'final_measurements': self.aggregate_histograms()}
         if 'performed_measurements' in measurements:
             res.update(measurements['performed_measurements'])
         return res
 
+    def aggregate_histograms(self):
+        """Merges the latency histograms of all the iterations (and scripts) measured at the same rate.
+
+        The histograms of each rate are also exported to an HdrHistogram log file, with one interval per iteration.
+
+        :return: List of aggregated latency results, one per measured rate.
+        :rtype: list
+        """
+        aggregated_results = []
+        for (mode_name, rate, name), intervals in self._histograms.items():
+            merged = LatencyHistogram()
+            for _, _, _, histogram in intervals:
+                merged.merge(histogram)
+            if merged.total_count == 0:
+                log.warning(f"No latency histogram data recorded for {mode_name} mode at {rate} op/s")
+                continue
+            log_file = histograms_to_hdr_log(self._output_dir, f"{mode_name}-{name}-latency.hlog", intervals)
+            aggregated = {
+                "rate": rate,
+                "mode": mode_name,
+                "iterations": len(intervals),
+                "total_count": merged.total_count,
+                "p_values": merged.p_values(),
+                "histogram_log": os.path.basename(log_file),
+            }
+            sla_requirement = self.mode_sla(mode_name)
+            if sla_requirement is not None:
+                app_resources = self.app_resource_usage([(ts_start, ts_end) for ts_start, ts_end, _, _ in intervals])
+                aggregated['meets_sla'] = self.meets_sla(aggregated['p_values'], rate, sla_requirement, app_resources)
+            aggregated_results.append(aggregated)
+        return aggregated_results
+
+    @property
+    def aggregated_measurements(self):
+        return self._aggregated_measurements
+
+    @property
+    def summary(self):
+        """Results of the latency phase beyond the latency measurements, e.g. the knee of the latency curve of a rate sweep."""
+        return self._summary
+
+    def mode_sla(self, mode_name):
+        """Returns the SLA the rates measured in a mode are checked against, i.e. the SLA of its tier if the mode searched an SLA tier."""
+        return self._mode_slas.get(mode_name, self._latency_config.sla_requirement)
+
+    def latency_curve(self, latency_results):
+        """Returns the latency at KNEE_PERCENTILE for each measured rate, from the merged histogram of the rate if recorded, otherwise averaged over its iterations.
+
+        :param list latency_results: The latency iterations measured so far.
+        :return: (rate, latency) pairs ordered by rate.
+        :rtype: list
+        """
+        points = []
+        for rate in sorted(set(result['rate'] for result in latency_results)):
+            merged = LatencyHistogram()
+            for (_, measured_rate, _), intervals in self._histograms.items():
+                if measured_rate == rate:
+                    for _, _, _, histogram in intervals:
+                        merged.merge(histogram)
+            if merged.total_count > 0:
+                latency = merged.p_values([KNEE_PERCENTILE])[KNEE_PERCENTILE]
+            else:
+                latencies = [result['p_values'][KNEE_PERCENTILE] for result in latency_results if result['rate'] == rate and KNEE_PERCENTILE in result['p_values']]
+                if not latencies:
+                    continue
+                latency = sum(latencies) / len(latencies)
+            points.append((rate, latency))
+        return points
+
+    def get_knee_refinement_rates(self, latency_results):
+        """
+        Returns the rates to measure around the knee of the latency curve found by the rate sweep, spread evenly between the neighbours of the knee
+        """
+        steps = self._latency_config.knee_refinement_steps
+        if steps <= 0:
+            return []
+        points = self.latency_curve(latency_results)
+        knee = find_knee(points)
+        if knee is None:
+            log.warning("No knee found in the latency curve of the rate sweep. Not refining the sweep")
+            return []
+        low = points[max(knee - 1, 0)][0]
+        high = points[min(knee + 1, len(points) - 1)][0]
+        log.info(f"Suspected knee of the latency curve at {points[knee][0]} op/s. Measuring {steps} more rates between {low} and {high} op/s")
+        measured = set(rate for rate, _ in points)
+        rates = []
+        for i in range(steps):
+            rate = int(low + (high - low) * (i + 1) / (steps + 1))
+            if rate not in measured:
+                measured.add(rate)
+                rates.append([rate, round(rate / self._avg * 100, 4)])
+        return rates
+
+    def find_knee_point(self, latency_results):
+        """Returns the knee of the latency curve of the rate sweep, i.e. the maximum sustainable throughput without an SLA.
+
+        :param list latency_results: All the latency iterations of the rate sweep.
+        :return: The knee rate and its latency, None if the curve has no knee.
+        :rtype: dict
+        """
+        points = self.latency_curve(latency_results)
+        knee = find_knee(points)
+        if knee is None:
+            log.warning(f"No knee found in the p{KNEE_PERCENTILE} latency curve of the rate sweep")
+            return None
+        rate, latency = points[knee]
+        iterations = [result for result in latency_results if result['rate'] == rate]
+        achieved_rates = [result['achieved_rate'] for result in iterations if 'achieved_rate' in result]
+        log.info(f"Knee of the p{KNEE_PERCENTILE} latency curve at {rate} op/s with {latency}ms")
+        return {
+            "rate": rate,
+            "percentage": iterations[0].get('percentage'),
+            "achieved_rate": sum(achieved_rates) / len(achieved_rates) if achieved_rates else None,
+            "percentile": KNEE_PERCENTILE,
+            "latency": latency,
+        }
+
     def measure_and_dump(self, script, rate, mode_name):
         measure_rate = rate
         name = rate
-        if mode_name == FIXED_PERCENTAGE:
+        if mode_name in (FIXED_PERCENTAGE, RATE_SWEEP):
             measure_rate = rate[0]
             name = rate[1]
-        latency_load_gen = Wrk2LoadGenerator(self._latency_config, self._output_dir, self._endpoint, self._env)
+        latency_load_gen = create_load_generator(self._latency_config.load_generator, self._latency_config, self._output_dir, self._endpoint, self._env, self._sampling_interval)
         log.info(f"Now measuring the latency for {mode_name} mode at {measure_rate} for {self._latency_config.iteration_count} iterations")
 
+        # The probe of the search at the final rate counts as its first iteration, if it was as long as an iteration
+        reused_probe = None
+        if script is None:
+            reused_probe = next((probe for probe in self._probes.get(measure_rate, []) if probe[2]['probe_duration'] >= self._latency_config.iteration_duration), None)
+        sla_requirement = self.mode_sla(mode_name)
+
         latency_results = []
         for i in range (self._latency_config.iteration_count):
             log.info(f"Running latency iteration {i+1}/{self._latency_config.iteration_count}")
-            latency_result_map = latency_load_gen.measure(measure_rate, self._latency_config.iteration_duration, script)
+            if i == 0 and reused_probe is not None:
+                log.info(f"Reusing the search probe at {measure_rate} op/s as latency iteration {i+1}")
+                ts_start, ts_end, latency_result_map = reused_probe
+            else:
+                ts_start = time.time()
+                latency_result_map = latency_load_gen.measure(measure_rate, self._latency_config.iteration_duration, script)
+                ts_end = time.time()
             measurement_dict = {
                     "rate": measure_rate,
                     "p_values": latency_result_map['p_values'],
                     "command": latency_result_map["command"]
                     }
             
-            if self._latency_config.sla_requirement is not None:
-                measurement_dict['meets_sla'] = self.meets_sla(latency_result_map['p_values'], measure_rate)
+            if sla_requirement is not None:
+                app_resources = self.app_resource_usage([(ts_start, ts_end)])
+                measurement_dict['meets_sla'] = self.meets_sla(latency_result_map['p_values'], measure_rate, sla_requirement, app_resources)
+                if app_resources is not None and any(key in RESOURCE_LIMITS for key in sla_requirement):
+                    measurement_dict['app_resources'] = app_resources
             
-            if mode_name == FIXED_PERCENTAGE:
+            if mode_name in (FIXED_PERCENTAGE, RATE_SWEEP):
                 measurement_dict['percentage'] = rate[1]
+            if 'throughput' in latency_result_map:
+                measurement_dict['achieved_rate'] = latency_result_map['throughput']['throughput']
+            measurement_dict['start_time'] = ts_start * 1000
+            measurement_dict['end_time'] = ts_end * 1000
+            for key in ['errors', 'error_rate', 'transfer_per_second', 'requests_per_thread', 'load_generator_cpu']:
+                if key in latency_result_map:
+                    measurement_dict[key] = latency_result_map[key]
+            if exceeds_error_rate(latency_result_map, self._max_error_rate, self._fail_on_error_rate, f"latency iteration {i+1} at {measure_rate} op/s"):
+                measurement_dict['exceeds_error_rate'] = True
+            if 'time_series' in latency_result_map:
+                measurement_dict['time_series'] = latency_result_map['time_series']
             measurement_dict['iteration'] = i
+            if i == 0 and reused_probe is not None:
+                measurement_dict['reused_probe'] = True
             if script is not None:
                 measurement_dict['script'] = os.path.basename(script)
             latency_results.append(measurement_dict)
+            tag = os.path.basename(script) if script is not None else None
+            if 'histogram' in latency_result_map:
+                self._histograms.setdefault((mode_name, measure_rate, name), []).append((ts_start, ts_end, tag, latency_result_map['histogram']))
             latency_load_gen.dump_stdout(self._output_dir, latency_result_map['stdout'], f"{mode_name}-{name}-latency-{i+1}")
         return latency_results
         
@@ -90,10 +313,16 @@ class ThroughputExplorer():
         """
         Finds maximum average throughput
         """
+        throughput = [measurements for measurements in self._throughput if not measurements.get('exceeds_error_rate', False)]
+        if len(throughput) < len(self._throughput):
+            log.warning(f"Excluding {len(self._throughput) - len(throughput)} throughput iterations exceeding the maximum error rate from the average throughput")
+        if not throughput:
+            log.warning("All the throughput iterations exceed the maximum error rate. Using them all for the average throughput")
+            throughput = self._throughput
         sum_of_throughputs = 0
-        for measurements in self._throughput:
+        for measurements in throughput:
             sum_of_throughputs += measurements['throughput']
-        self._avg = sum_of_throughputs/len(self._throughput) if len(self._throughput) > 0 else 0
+        self._avg = sum_of_throughputs/len(throughput) if len(throughput) > 0 else 0
         if (self._avg < 1):
             log.warning(f"Average throughput was: {self._avg} ops/s. Setting average throughput to 1")
             self._avg = 1
@@ -116,41 +345,328 @@ class ThroughputExplorer():
         
         return {"to_measure": res}
 
-    def get_binary_search_rate(self):
+    def get_rate_sweep_rates(self):
+        """
+        Returns the rates of the latency-vs-throughput curve, stepping from a low fraction of the average throughput up past saturation
+        """
+        log.info(f"Sweeping {len(self._latency_config.sweep)} rates from {self._latency_config.sweep[0]} to {self._latency_config.sweep[-1]} times the average throughput")
+        rates = [[max(1, int(fraction * self._avg)), round(fraction * 100, 4)] for fraction in self._latency_config.sweep]
+        return {"to_measure": {RATE_SWEEP: rates}}
+
+    def probe_rate(self, rate_percentage, measurements, repetition=0):
+        """Probes a fraction of the average throughput, recording the probe as a search step.
+
+        Probes are shared between the searches of the SLA tiers, so an earlier probe at the same rate is reused if there is one.
+
+        :param float rate_percentage: Fraction of the average throughput to probe.
+        :param list measurements: The search steps performed so far, the probe is appended to them.
+        :param int repetition: How many times the rate was already probed for the current decision. Only an earlier probe
+            beyond these is reused.
+        :return: Whether the rate meets the SLA and is within bounds.
+        :rtype: bool
+        """
+        request_rate = int(rate_percentage * self._avg)
+        if repetition < len(self._probes.get(request_rate, [])):
+            log.info(f"Reusing the probe at {request_rate} op/s")
+            single_measurement = self._probes[request_rate][repetition][2]
+        else:
+            single_measurement = self.measure_once(rate_percentage)
+        violations = self.sla_violations(single_measurement, rate_percentage)
+        is_in_bounds = not violations
+        result = {}
+        result['p_values'] = single_measurement['p_values']
+        result['meets_sla'] = is_in_bounds
+        if violations:
+            result['violations'] = violations
+        if single_measurement.get('app_resources') is not None:
+            result['app_resources'] = single_measurement['app_resources']
+        if 'error_rate' in single_measurement:
+            result['error_rate'] = single_measurement['error_rate']
+        if single_measurement.get('load_generator_cpu') is not None:
+            result['load_generator_saturated'] = single_measurement['load_generator_cpu']['saturated']
+        result['probe_duration'] = single_measurement['probe_duration']
+        result['rate'] = rate_percentage * self._avg
+        measurements.append(result)
+        return is_in_bounds
+
+    def get_search_bounds(self, mode_name, measurements, decide=None):
+        """Returns the range of fractions of the average throughput to search.
+
+        Without a cached optimal rate of a previous search, the range is [0, 1], narrowed by the rates already probed for
+        earlier SLA tiers. With upper bound discovery, the upper bound is probed and doubled as long as it meets the SLA (up
+        to MAX_UPPER_BOUND), since the closed-loop throughput phase can underestimate the rate an open-loop load generator
+        can sustain.
+
+        With a cached optimal rate, the range starts at 2 'min_step_percent' around the cached rate. Its lower bound must meet
+        the SLA and its upper bound must not, otherwise the range is widened, doubling its width, until they do.
+
+        The bounds 0 and the maximum upper bound (1 without upper bound discovery) are never probed.
+
+        :param str mode_name: Name of the search strategy.
+        :param list measurements: The search steps performed so far, the probes of the bounds are appended to them.
+        :param function decide: Decides whether a rate meets the SLA, probing it. Defaults to a single probe.
+        :rtype: (float, float)
+        """
+        decide = decide if decide is not None else self.probe_rate
+        upper_limit = MAX_UPPER_BOUND if self._latency_config.upper_bound_discovery else 1.0
+        cached = self._search_cache.get(mode_name) if self._search_cache is not None else None
+        if cached is not None:
+            optimum = min(cached['rate'] / self._avg, upper_limit)
+            width = 2 * self._latency_config.base_step
+            min_bound = max(0.0, optimum - width)
+            max_bound = min(upper_limit, optimum + width)
+            log.info(f"Starting {mode_name} from the cached rate of {cached['rate']} op/s, in the range [{min_bound * self._avg}, {max_bound * self._avg}] op/s")
+            max_bound_fails = False
+            while min_bound > 0 and not decide(min_bound, measurements):
+                max_bound = min_bound
+                max_bound_fails = True
+                width *= 2
+                min_bound = max(0.0, optimum - width)
+                log.info(f"Lower bound does not meet the SLA. Widening the range to [{min_bound * self._avg}, {max_bound * self._avg}] op/s")
+            while max_bound < upper_limit and not max_bound_fails and decide(max_bound, measurements):
+                min_bound = max_bound
+                width *= 2
+                max_bound = min(upper_limit, optimum + width)
+                log.info(f"Upper bound meets the SLA. Widening the range to [{min_bound * self._avg}, {max_bound * self._avg}] op/s")
+        else:
+            min_bound, max_bound = self.get_probed_bounds(upper_limit)
+            if max_bound is None:
+                max_bound = 1.0 if min_bound < 1.0 else min(upper_limit, 2 * min_bound)
+            else:
+                log.info(f"Starting {mode_name} from the probes of the earlier SLA tiers, in the range [{min_bound * self._avg}, {max_bound * self._avg}] op/s")
+            while max_bound < upper_limit and decide(max_bound, measurements):
+                min_bound = max_bound
+                max_bound = min(upper_limit, 2 * max_bound)
+                log.info(f"Rate of {min_bound} times the average throughput meets the SLA. Raising the upper bound to {max_bound * self._avg} op/s")
+        if upper_limit > 1.0 and max_bound >= upper_limit:
+            log.warning(f"Reached the maximum upper bound of {upper_limit} times the average throughput without breaching the SLA")
+        return min_bound, max_bound
+
+    def get_probed_bounds(self, upper_limit):
+        """Returns the range of fractions of the average throughput the rates probed so far bound the optimal rate of the current SLA to.
+
+        A probed rate meets the SLA if most of its probes do. The upper bound is the lowest probed rate not meeting the SLA,
+        and the lower bound the highest probed rate below it meeting the SLA.
+
+        :param float upper_limit: Highest fraction of the average throughput the search may reach.
+        :return: The lower bound, 0 if no rate met the SLA, and the upper bound, None if no rate failed it.
+        :rtype: (float, float)
+        """
+        passing = []
+        failing = []
+        for request_rate, probes in self._probes.items():
+            rate_percentage = request_rate / self._avg
+            if rate_percentage > upper_limit:
+                continue
+            passes = sum(not self.sla_violations(results, rate_percentage) for _, _, results in probes)
+            if 2 * passes > len(probes):
+                passing.append(rate_percentage)
+            elif 2 * passes < len(probes):
+                failing.append(rate_percentage)
+        max_bound = min(failing) if failing else None
+        min_bound = max((rate_percentage for rate_percentage in passing if max_bound is None or rate_percentage < max_bound), default=0.0)
+        return min_bound, max_bound
+
+    def compare_to_throughput_estimate(self, rate):
+        """Compares the optimal rate found by a search to the average throughput recorded in the throughput phase, which the search started from.
+
+        :param number rate: The optimal rate found by the search.
+        :rtype: dict
+        """
+        ratio = rate / self._avg
+        log.info(f"Optimal rate of {rate} op/s is {ratio:.2f} times the average throughput of {self._avg:.2f} op/s recorded in the throughput phase")
+        return {
+            "rate": rate,
+            "throughput_estimate": self._avg,
+            "ratio": ratio,
+            "difference_percent": (ratio - 1) * 100,
+        }
+
+    def cache_search_result(self, mode_name, rate, measurements):
+        if self._search_cache is not None:
+            self._search_cache.put(mode_name, rate, self._avg, measurements)
+
+    def search_rate(self, mode_name):
+        """Searches the optimal rate meeting the current SLA with the configured search strategy.
+
+        :param str mode_name: Name the search is recorded, cached and measured under.
+        :rtype: dict
+        """
+        if self._latency_config.search_strategy == LatencyMode.BINARY_SEARCH:
+            res = self.get_binary_search_rate(mode_name)
+        elif self._latency_config.search_strategy == LatencyMode.AIMD:
+            res = self.get_aimd_rate(mode_name)
+        elif self._latency_config.search_strategy == LatencyMode.ROBUST_BINARY_SEARCH:
+            res = self.get_robust_binary_search_rate(mode_name)
+        else:
+            raise ValueError(f"{self._latency_config.search_strategy.name} is not a search strategy")
+        res['binding_constraint'] = self.find_binding_constraint(res['performed_measurements'][mode_name], res['to_measure'][mode_name][0])
+        return res
+
+    def find_binding_constraint(self, measurements, rate):
+        """Returns the constraints that limit the optimal rate found by a search, i.e. the constraints violated by the lowest
+        rejected probe above the optimal rate: SLA percentiles (e.g. 'p99'), resource limits ('cpu_percent', 'rss_mb'),
+        'achieved_rate' if the load generator did not achieve the rate, or 'error_rate'.
+
+        :param list measurements: The search steps performed.
+        :param int rate: The optimal rate found by the search.
+        :return: The binding constraints, None if no probe above the optimal rate was rejected.
+        :rtype: list
+        """
+        rejected = [measurement for measurement in measurements if not measurement['meets_sla'] and measurement['rate'] > rate]
+        if not rejected:
+            return None
+        binding_constraint = min(rejected, key=lambda measurement: measurement['rate']).get('violations', [])
+        log.info(f"Optimal rate of {rate} op/s is bound by: {', '.join(binding_constraint)}")
+        return binding_constraint
+
+    def get_sla_tier_rates(self):
+        """Searches the optimal rate of each SLA tier with the configured search strategy.
+
+        The tiers are searched one after the other, each as its own mode named '<strategy>-<tier>'. Every probe is run until
+        all the tiers are decided and is reused by the searches of the later tiers probing the same rate, so mostly the
+        probes close to the optimal rates of the tiers differ.
+
+        :return: The optimal rates and search steps of all the tiers.
+        :rtype: dict
+        """
+        res = {"to_measure": {}, "performed_measurements": {}}
+        tiers = {}
+        for tier, sla_requirement in self._latency_config.sla_tiers.items():
+            mode_name = f"{self._latency_config.search_strategy.name}-{tier}"
+            log.info(f"Searching for the optimal rate of SLA tier '{tier}': {sla_requirement}")
+            self._sla_requirement = sla_requirement
+            self._mode_slas[mode_name] = sla_requirement
+            probe_count = self._counter
+            measurements = self.search_rate(mode_name)
+            rate = measurements['to_measure'][mode_name][0]
+            res['to_measure'].update(measurements['to_measure'])
+            res['performed_measurements'].update(measurements['performed_measurements'])
+            tiers[tier] = {
+                "mode": mode_name,
+                "sla": sla_requirement,
+                "rate": rate,
+                "probes": len(measurements['performed_measurements'][mode_name]),
+                "new_probes": self._counter - probe_count,
+                "capacity": self.compare_to_throughput_estimate(rate),
+                "binding_constraint": measurements['binding_constraint'],
+            }
+            if 'search' in measurements:
+                tiers[tier]['search'] = measurements['search']
+            log.info(f"Optimal rate of SLA tier '{tier}': {rate} op/s, {tiers[tier]['new_probes']} of its {tiers[tier]['probes']} probes were not shared with earlier tiers")
+        self._sla_requirement = self._latency_config.sla_requirement
+        self._summary['tiers'] = tiers
+        return res
+
+    def get_binary_search_rate(self, mode_name="BINARY_SEARCH"):
         log.info("Performing binary search for maximal throughput that doesn't breach the SLA")
-        min_bound = 0.0
-        max_bound = 1.0
         accuracy = self._latency_config.base_step
 
         measurements = []
+        min_bound, max_bound = self.get_search_bounds(mode_name, measurements)
 
         while (min_bound + accuracy) < max_bound:
             mid_rate_percentage = (min_bound + max_bound) / 2
-            single_measurement = self.measure_once(mid_rate_percentage)
-            is_in_bounds = self.check_bounds_and_sla(single_measurement, mid_rate_percentage)
-            result = {}
-            result['p_values'] = single_measurement['p_values']
-            result['meets_sla'] = is_in_bounds
-            result['rate'] = mid_rate_percentage * self._avg
-            measurements.append(result)
-
-            if is_in_bounds:
+            if self.probe_rate(mid_rate_percentage, measurements):
                 min_bound = mid_rate_percentage
             else :
                 max_bound = mid_rate_percentage
         log.info(f"Binary search found rate of {int(min_bound * self._avg)}")
-        return {"to_measure": {"BINARY_SEARCH": [int(min_bound * self._avg)]},
-                "performed_measurements": {"BINARY_SEARCH": measurements}}
+        self.cache_search_result(mode_name, int(min_bound * self._avg), measurements)
+        return {"to_measure": {mode_name: [int(min_bound * self._avg)]},
+                "performed_measurements": {mode_name: measurements}}
 
-    def get_aimd_rate(self):
+    def get_robust_binary_search_rate(self, mode_name="ROBUST_BINARY_SEARCH"):
+        """
+        Performs binary search for the maximum throughput not breaching the SLA, tolerating probes disturbed by noise (e.g. GC pauses).
+        Each rate is probed repeatedly until a sequential probability ratio test decides whether it meets the SLA, and the optimal
+        rate is reported with a confidence interval bounded by the highest rate accepted and the lowest rate rejected
+        """
+        log.info("Performing robust binary search for maximal throughput that doesn't breach the SLA")
+        accuracy = self._latency_config.base_step
+        decisions = []
+
+        def decide(rate_percentage, measurements):
+            decision = self.decide_rate(rate_percentage, measurements)
+            decisions.append(decision)
+            return decision['meets_sla']
+
+        measurements = []
+        min_bound, max_bound = self.get_search_bounds(mode_name, measurements, decide)
+
+        while (min_bound + accuracy) < max_bound:
+            mid_rate_percentage = (min_bound + max_bound) / 2
+            if decide(mid_rate_percentage, measurements):
+                min_bound = mid_rate_percentage
+            else :
+                max_bound = mid_rate_percentage
+        rate = int(min_bound * self._avg)
+        confidence_interval = [rate, int(max_bound * self._avg)]
+        log.info(f"Robust binary search found rate of {rate} op/s, {self._latency_config.search_confidence * 100:.0f}% confidence interval of the optimal rate: {confidence_interval} op/s")
+        self.cache_search_result(mode_name, rate, measurements)
+        return {"to_measure": {mode_name: [rate]},
+                "performed_measurements": {mode_name: measurements},
+                "search": {
+                    "strategy": "ROBUST_BINARY_SEARCH",
+                    "rate": rate,
+                    "confidence_interval": confidence_interval,
+                    "confidence": self._latency_config.search_confidence,
+                    "decisions": decisions,
+                }}
+
+    def decide_rate(self, rate_percentage, measurements):
+        """Decides whether a rate meets the SLA with a sequential probability ratio test (SPRT) over repeated probes of the rate.
+
+        The test weighs the hypothesis that a probe meets the SLA with probability SPRT_PASS_PROBABILITY (the rate is sustainable)
+        against the hypothesis that it does with probability SPRT_FAIL_PROBABILITY, until the log-likelihood ratio of the probes
+        decides for one of them with an error probability of half of the missing confidence, or 'max_probes_per_rate' is reached.
+        A first probe that meets the SLA by a wide margin is accepted right away, so only rates close to the optimal rate are repeated.
+
+        :param float rate_percentage: Fraction of the average throughput to decide for.
+        :param list measurements: The search steps performed so far, the probes are appended to them.
+        :return: The decision, with the number of probes and of probes that met the SLA.
+        :rtype: dict
+        """
+        error = (1 - self._latency_config.search_confidence) / 2
+        threshold = math.log((1 - error) / error)
+        pass_ratio = math.log(SPRT_PASS_PROBABILITY / SPRT_FAIL_PROBABILITY)
+        fail_ratio = math.log((1 - SPRT_PASS_PROBABILITY) / (1 - SPRT_FAIL_PROBABILITY))
+        log_likelihood_ratio = 0
+        probes = 0
+        passes = 0
+        meets_sla = None
+        while meets_sla is None and probes < self._latency_config.max_probes_per_rate:
+            passed = self.probe_rate(rate_percentage, measurements, repetition=probes)
+            probes += 1
+            passes += passed
+            if probes == 1 and passed and self.clearly_meets_sla(measurements[-1]['p_values']):
+                meets_sla = True
+                break
+            log_likelihood_ratio += pass_ratio if passed else fail_ratio
+            if log_likelihood_ratio >= threshold:
+                meets_sla = True
+            elif log_likelihood_ratio <= -threshold:
+                meets_sla = False
+        if meets_sla is None:
+            log.warning(f"Undecided after {probes} probes at {int(rate_percentage * self._avg)} op/s. Deciding by the more likely hypothesis")
+            meets_sla = log_likelihood_ratio > 0
+        log.info(f"Rate of {int(rate_percentage * self._avg)} op/s {'meets' if meets_sla else 'does not meet'} the SLA in {passes}/{probes} probes")
+        return {"rate": int(rate_percentage * self._avg), "probes": probes, "passes": passes, "meets_sla": meets_sla}
+
+    def clearly_meets_sla(self, measured_pvalues):
+        return all(measured_pvalues.get(percentile, math.inf) < SPRT_CLEAR_PASS_MARGIN * latency for percentile, latency in self._sla_requirement.items() if percentile not in RESOURCE_LIMITS)
+
+    def get_aimd_rate(self, mode_name="AIMD"):
         """
         Performs search on the microservice to find maximum throughput not breaching the SLA.
         Uses Additive Increase/ Multiplicative Decrease (AIMD) with exponential increase of multiplier 2
         """
         log.info("Performing exponential Additive Increase/ Multiplicative Decrease(exponential) to find peak throughput with optimal latency")
-        max_multiplier = 1
-        min_multiplier = 0.00
+        #Create a copy with smaller duration for performing tests
+        measurements = []
+
         #Range (0,1]
+        min_multiplier, max_multiplier = self.get_search_bounds(mode_name, measurements)
         base_step = self._latency_config.base_step
 
         current_step = base_step
@@ -159,20 +675,10 @@ class ThroughputExplorer():
         step_count = 0
         times_reset = 0
 
-        #Create a copy with smaller duration for performing tests
-        measurements = []
-
         while True:
             current_rate_multiplier = min_multiplier + current_step*(2**step_count)
             log.info(f"Current AIMD multiplier: {current_rate_multiplier} ")
-            current_rate = current_rate_multiplier
-            res = self.measure_once(current_rate)
-            is_in_bounds = self.check_bounds_and_sla(res, current_rate)
-            result = {}
-            result['p_values'] = res['p_values']
-            result['meets_sla'] = is_in_bounds
-            result['rate'] = current_rate * self._avg
-            measurements.append(result)
+            is_in_bounds = self.probe_rate(current_rate_multiplier, measurements)
 
             step_count += 1
             next_rate = min_multiplier + current_step * (2**step_count)
@@ -191,8 +697,9 @@ class ThroughputExplorer():
                 break
             current_step = base_step * (max_multiplier-min_multiplier)
         log.info(f"Performed adjustments {times_reset} times. Settled for {min_multiplier} multiplier. Optimal rate: {min_multiplier * self._avg} op/s")
-        return {"to_measure" : {"AIMD": [int(min_multiplier * self._avg)]},
-                "performed_measurements": {"AIMD": measurements}}
+        self.cache_search_result(mode_name, int(min_multiplier * self._avg), measurements)
+        return {"to_measure" : {mode_name: [int(min_multiplier * self._avg)]},
+                "performed_measurements": {mode_name: measurements}}
 
     def get_measured_throughput(self, output):
         matches = re.findall(r"^Requests/sec:\s*(?P<throughput>\d*[.,]?\d*)\s*$", output, re.MULTILINE)
@@ -201,38 +708,211 @@ class ThroughputExplorer():
         
         return float(matches[0])
 
-    def meets_sla(self, measured_pvalues, rate):
-        met_all_sla = True
-        for percentile, latency in self._latency_config.sla_requirement.items():
-            measured = measured_pvalues[percentile]
-            if latency <= measured:
+    def meets_sla(self, measured_pvalues, rate, sla_requirement=None, app_resources=None):
+        return not self.sla_breaches(measured_pvalues, rate, sla_requirement, app_resources)
+
+    def sla_breaches(self, measured_pvalues, rate, sla_requirement=None, app_resources=None):
+        """Returns the requirements of an SLA that a measurement breaches.
+
+        :param dict measured_pvalues: The measured latency percentiles. A percentile that was not measured breaches the SLA.
+        :param number rate: The measured rate.
+        :param dict sla_requirement: The SLA, defaults to the SLA currently searched for.
+        :param dict app_resources: The resource usage of the application during the measurement, required by the resource limits of the SLA.
+        :return: The breached percentiles (e.g. 'p99') and resource limits.
+        :rtype: list
+        """
+        if sla_requirement is None:
+            sla_requirement = self._sla_requirement
+        breaches = []
+        for percentile, latency in sla_requirement.items():
+            if percentile in RESOURCE_LIMITS:
+                continue
+            measured = measured_pvalues.get(percentile)
+            if measured is None:
+                # e.g. no request completed, or the load generator does not report the percentile
+                log.info(f"Percentile {percentile} has breached SLA. Required: {latency}ms, not measured at {rate} op/s")
+                breaches.append(f"p{percentile:g}")
+            elif latency <= measured:
                 log.info(f"Percentile {percentile} has breached SLA. Required: {latency}ms, measured: {measured}ms")
-                met_all_sla = False
+                breaches.append(f"p{percentile:g}")
             else:
                 log.info(f"Successfully met SLA for percentile {percentile}! Latency is < {latency}ms. Measured {measured}ms at {rate} op/s")
-        if met_all_sla:
+        for resource in RESOURCE_LIMITS:
+            if resource not in sla_requirement:
+                continue
+            if app_resources is None:
+                log.warning(f"No resource usage of the application recorded at {rate} op/s. Cannot check the {resource} limit of the SLA")
+                continue
+            limit = sla_requirement[resource]
+            measured = app_resources[resource]
+            if limit <= measured:
+                log.info(f"Resource usage {resource} has breached SLA. Limit: {limit}, measured: {measured:.2f}")
+                breaches.append(resource)
+            else:
+                log.info(f"Successfully met SLA for resource usage {resource}! Usage is < {limit}. Measured {measured:.2f} at {rate} op/s")
+        if not breaches:
             log.info("Met all SLA requirements")
-        return met_all_sla
+        return breaches
+
+    def app_resource_usage(self, intervals):
+        """Returns the resource usage of the application recorded by the resource monitor during measurements.
+
+        :param list intervals: The (start, end) times of the measurements, in seconds since the epoch.
+        :return: The mean CPU usage as a percentage of the CPUs available to the application ('cpu_percent') and the
+            maximum RSS in MB ('rss_mb'), None if no resource usage was recorded during the measurements.
+        :rtype: dict
+        """
+        if self._resource_monitor is None:
+            return None
+        samples = [datapoint for datapoint in list(self._resource_monitor.resources) if any(ts_start * 1000 <= datapoint[0] <= ts_end * 1000 for ts_start, ts_end in intervals)]
+        if not samples:
+            return None
+        return {
+            "cpu_percent": sum(datapoint[3] for datapoint in samples) / len(samples) / self._resource_monitor.app_cpu_count,
+            "rss_mb": max(datapoint[1] for datapoint in samples) / (1024 * 1024),
+        }
 
 
     def measure_once(self, expected_rate_percentage):
-        measurment_duration_s = 30
-        log.info(f"Performing short measurement of {measurment_duration_s}s for determining next optimal rate")
+        """Probes the latency at a fraction of the average throughput, for determining the next optimal rate.
+
+        The probe is run in windows of 'probe_window' seconds, up to 'probe_duration' seconds. After each window the SLA is
+        evaluated on all the latencies recorded so far, and the probe stops as soon as the SLA is statistically violated or met.
+
+        :param float expected_rate_percentage: Fraction of the average throughput to probe.
+        :return: The results of the probe, merged over its windows.
+        :rtype: dict
+        """
+        probe_duration = self._latency_config.probe_duration
+        probe_window = self._latency_config.probe_window
         request_rate = int(expected_rate_percentage * self._avg)
+        log.info(f"Performing short measurement of up to {probe_duration}s in {probe_window}s windows for determining next optimal rate")
 
-        latency_benchmark = Wrk2LoadGenerator(self._latency_config, self._output_dir, self._endpoint, self._env)
-        results = latency_benchmark.measure(request_rate, measurment_duration_s)
-        latency_benchmark.dump_stdout(self._output_dir, results['stdout'], f"latency-adjustment-{self._counter+1}")
+        latency_benchmark = create_load_generator(self._latency_config.load_generator, self._latency_config, self._output_dir, self._endpoint, self._env)
+        slas = list(self._latency_config.sla_tiers.values()) if self._latency_config.sla_tiers is not None else [self._sla_requirement]
+        windows = []
+        histogram = LatencyHistogram()
+        elapsed = 0
+        ts_start = time.time()
+        while elapsed < probe_duration:
+            duration = min(probe_window, probe_duration - elapsed)
+            results = latency_benchmark.measure(request_rate, duration)
+            results["probe_duration"] = duration
+            windows.append(results)
+            elapsed += duration
+            name = f"latency-adjustment-{self._counter+1}" if probe_window >= probe_duration else f"latency-adjustment-{self._counter+1}-{len(windows)}"
+            latency_benchmark.dump_stdout(self._output_dir, results['stdout'], name)
+            if 'histogram' in results:
+                histogram.merge(results['histogram'])
+            # The probe is shared by all the SLA tiers, so it only stops once every tier is decided
+            verdicts = [self.sla_verdict(histogram, sla_requirement) for sla_requirement in slas]
+            if None not in verdicts and elapsed < probe_duration:
+                log.info(f"SLA {', '.join('met' if verdict else 'violated' for verdict in verdicts)} with {histogram.total_count} requests after {elapsed}s. Stopping the probe at {request_rate} op/s early")
+                break
         self._counter += 1
+        results = self.merge_probe_windows(windows, histogram, elapsed)
+        ts_end = time.time()
+        results["app_resources"] = self.app_resource_usage([(ts_start, ts_end)])
+        self._probes.setdefault(request_rate, []).append((ts_start, ts_end, results))
         return results
 
-    def check_bounds_and_sla(self, results, expected_rate_percentage):
+    def sla_verdict(self, histogram, sla_requirement):
+        """Decides whether the latencies recorded so far in a probe statistically violate or meet an SLA.
+
+        For each percentile of the SLA, the count of latencies above the required latency is compared to its expected count
+        if the percentile was exactly at the required latency. The SLA is violated if the count is SLA_CONFIDENCE_Z standard
+        deviations above the expected count for any percentile, and met if it is SLA_CONFIDENCE_Z standard deviations below
+        it for all the percentiles. Without a latency histogram no decision is made before the end of the probe.
+
+        :param LatencyHistogram histogram: The latencies recorded so far in the probe.
+        :param dict sla_requirement: The required latency of each percentile of the SLA.
+        :return: True if the SLA is met, False if it is violated, None if undecided.
+        :rtype: bool
+        """
+        total_count = histogram.total_count
+        # Resource limits are only checked at the end of the probe
+        latency_requirement = {percentile: latency for percentile, latency in (sla_requirement or {}).items() if percentile not in RESOURCE_LIMITS}
+        if not latency_requirement or total_count == 0:
+            return None
+        met = True
+        for percentile, latency in latency_requirement.items():
+            count_above = histogram.count_above(latency * 1000)
+            tail = 1 - percentile / 100
+            if tail <= 0:
+                # The maximum latency is violated by a single request, but can never be statistically met
+                if count_above > 0:
+                    return False
+                met = False
+                continue
+            expected = total_count * tail
+            z = (count_above - expected) / math.sqrt(expected * (1 - tail))
+            if z > SLA_CONFIDENCE_Z:
+                return False
+            if z > -SLA_CONFIDENCE_Z:
+                met = False
+        return True if met else None
+
+    def merge_probe_windows(self, windows, histogram, duration):
+        """Merges the results of the windows of a probe into the results of a single measurement.
+
+        The throughput of the probe is the average throughput of its windows, weighted by their durations, as the last
+        window may be shorter than the others.
+
+        :param list windows: The results of each window of the probe, with the time in seconds each window ran for as 'probe_duration'.
+        :param LatencyHistogram histogram: The merged latency histogram of the windows.
+        :param number duration: The time in seconds the probe ran for.
+        :rtype: dict
+        """
+        if len(windows) == 1:
+            results = dict(windows[0])
+        else:
+            results = {
+                "command": windows[0]["command"],
+                "stdout": "\n".join(window["stdout"] for window in windows),
+                "exit_code": 0,
+                "throughput": {"throughput": sum(window["throughput"]["throughput"] * window["probe_duration"] for window in windows) / sum(window["probe_duration"] for window in windows)},
+            }
+            if histogram.total_count > 0:
+                results["histogram"] = histogram
+                results["p_values"] = histogram.p_values()
+            else:
+                # Without histograms the percentiles of the windows cannot be merged, the worst one is kept
+                results["p_values"] = {}
+                for window in windows:
+                    for percentile, latency in window["p_values"].items():
+                        results["p_values"][percentile] = max(latency, results["p_values"].get(percentile, latency))
+            window_errors = [window["errors"] for window in windows if "errors" in window]
+            if window_errors:
+                results["errors"] = {key: sum(errors[key] for errors in window_errors) for key in window_errors[0]}
+                results["error_rate"] = error_rate(results["errors"])
+            cpu_usages = [window["load_generator_cpu"] for window in windows if window.get("load_generator_cpu") is not None]
+            if cpu_usages:
+                results["load_generator_cpu"] = dict(max(cpu_usages, key=lambda cpu_usage: cpu_usage["cpu_percent"]), saturated=any(cpu_usage["saturated"] for cpu_usage in cpu_usages))
+        results["probe_duration"] = duration
+        return results
+
+    def sla_violations(self, results, expected_rate_percentage):
+        """Returns the constraints a probe violates: the requirements of the SLA currently searched for, 'achieved_rate' if
+        the load generator was far from achieving the rate and 'error_rate' if the probe exceeds the maximum error rate.
+
+        :param dict results: The results of the probe.
+        :param float expected_rate_percentage: Fraction of the average throughput probed.
+        :return: The violated constraints, empty if the rate meets the SLA and is within bounds.
+        :rtype: list
+        """
         rate = expected_rate_percentage * self._avg
-        actual_throughput = self.get_measured_throughput(results['stdout'])
+        if 'throughput' in results:
+            actual_throughput = results['throughput']['throughput']
+        else:
+            actual_throughput = self.get_measured_throughput(results['stdout'])
         log.info(f"Reported throughtput {actual_throughput}. Expected throughput {rate}")
-        meets_sla = True
-        if self._latency_config.sla_requirement is not None:
+        violations = []
+        if self._sla_requirement is not None:
             log.info(f"Checking if {rate} meets the SLA requirements")
-            meets_sla = self.meets_sla(results['p_values'], rate)
-
-        return (abs(rate - actual_throughput) <= (rate)) and meets_sla
\ No newline at end of file
+            violations += self.sla_breaches(results['p_values'], rate, app_resources=results.get('app_resources'))
+        if abs(rate - actual_throughput) > rate:
+            violations.append('achieved_rate')
+        # The throughput of a search step is not trusted if it mostly comes from errors, the step is never fatal
+        if exceeds_error_rate(results, self._max_error_rate, False, f"search step at {rate} op/s"):
+            violations.append('error_rate')
+        return violations
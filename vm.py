@@ -1,8 +1,12 @@
 import subprocess_runner
+import hashlib
+import json
 import logging as log
 import os
 import re
+import shutil
 import subprocess
+import time
 
 def get_vm(java_home):
     """Returns a VM object corresponding to the type of JVM distribution at java_home.
@@ -26,6 +30,44 @@ def _verify_java_home(java_home):
     if not os.path.isdir(java_home):
         raise NotADirectoryError("Java home does not point to an existing directory!")
 
+def file_sha256(path):
+    """Returns the SHA-256 hash of the contents of a file.
+
+    :param os.path path: Path to the file.
+    :rtype: str
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_build_output_stats(build_output_file):
+    """Reads the statistics of a native image build from its machine-readable build output.
+
+    :param os.path build_output_file: Path to the build output JSON file written by native-image.
+    :return: Build wall time, peak builder RSS, image size and numbers of reachable types, methods and fields, None if the build output could not be read.
+    :rtype: dict
+    """
+    try:
+        with open(build_output_file, "r") as file:
+            build_output = json.load(file)
+    except (OSError, json.decoder.JSONDecodeError) as e:
+        log.warning(f"Could not read the native image build output '{build_output_file}': {e}")
+        return None
+    analysis_results = build_output.get("analysis_results", {})
+    resource_usage = build_output.get("resource_usage", {})
+    peak_rss = resource_usage.get("memory", {}).get("peak_rss_bytes")
+    image_size = build_output.get("image_details", {}).get("total_bytes")
+    return {
+        "wall_time": resource_usage.get("total_secs"),
+        "peak_rss_mb": peak_rss / (1024 * 1024) if peak_rss is not None else None,
+        "image_size_mb": image_size / (1024 * 1024) if image_size is not None else None,
+        "reachable_types": analysis_results.get("types", {}).get("reachable"),
+        "reachable_methods": analysis_results.get("methods", {}).get("reachable"),
+        "reachable_fields": analysis_results.get("fields", {}).get("reachable"),
+    }
+
 class VM:
     def __init__(self, java_home, executable_names):
         self._java_home = java_home
@@ -99,12 +141,57 @@ class JVM(VM):
         super(JVM, self).__init__(java_home, ["java"])
 
 class NativeImageVM(VM):
+    # Name of the file recording the build of a cached image
+    build_record_file = "barista-build.json"
+
     def __init__(self, java_home):
         super(NativeImageVM, self).__init__(java_home, ["java", "native-image"])
+        self._native_image_version = None
+        self._image_cache_enabled = False
+        self._image_cache_dir = None
+        self._image_cache_size = None
+        self._builds = []
+
+    @property
+    def native_image_version(self):
+        if not self._native_image_version:
+            self._native_image_version = self._get_executable_version_info(self.executables["native-image"])
+        return self._native_image_version
+
+    @property
+    def builds(self):
+        """The native image builds performed so far, with their cache keys, whether they were cached and their durations."""
+        return self._builds
+
+    def enable_image_cache(self, cache_dir=None, cache_size=3):
+        """Enables caching the built images, keyed by the hash of the nib, the build options and the native-image version.
+
+        :param os.path cache_dir: Directory the images are cached in. Defaults to the 'barista-native-images' directory next to each nib.
+        :param int cache_size: Number of builds cached for each image name, the least recently used builds are evicted.
+        """
+        self._image_cache_enabled = True
+        self._image_cache_dir = cache_dir
+        self._image_cache_size = cache_size
+
+    def image_key(self, nib_file, image_name, build_options):
+        """Returns the key the image built from a nib is cached under.
+
+        :param os.path nib_file: Path of the Native Image Bundle to build.
+        :param string image_name: Name of the image to build.
+        :param list build_options: Additional options to be propagated to the native image build command.
+        :rtype: str
+        """
+        # Files passed to the build (e.g. a profile or a base layer) are identified by their contents
+        option_files = [file_sha256(option.split("=", 1)[1]) for option in build_options if "=" in option and os.path.isfile(option.split("=", 1)[1])]
+        fingerprint = json.dumps([file_sha256(nib_file), image_name, build_options, option_files, self.native_image_version])
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
 
     def native_image_build(self, nib_file, image_name, build_options, verify_app_image_existance=True):
         """Builds the app native image from the app Native Image Bundle file.
 
+        If the image cache is enabled, the files written by a build are cached, and restored instead of building the image
+        again when the same nib is built with the same name, build options and native-image version.
+
         :param os.path nib_file: Path of the Native Image Bundle to build.
         :param string image_name: Name of the image to build.
         :param list build_options: Additional options to be propagated to the native image build command.
@@ -112,15 +199,91 @@ class NativeImageVM(VM):
         :return: Absolute path to the newly built native image.
         :rtype: os.path
         """
-        output_dir = nib_file[:-4] + ".output"
-        image_path = os.path.join(output_dir, "default", image_name)
+        output_dir = os.path.join(nib_file[:-4] + ".output", "default")
+        image_path = os.path.join(output_dir, image_name)
         if os.path.isfile(image_path):
             log.info(f"Deleting previously built native image located at \"{image_path}\"")
             os.remove(image_path)
-        cmd = [self.executables["native-image"], f"--bundle-apply={nib_file}", "-g", "-o", image_name] + build_options
-        log.info(f"Building native image using command: \"{' '.join(cmd)}\"")
-        subprocess_runner.run(cmd, capture_output=False)
+        ts_start = time.perf_counter()
+        key, cache_entry = None, None
+        if self._image_cache_enabled:
+            key = self.image_key(nib_file, image_name, build_options)
+            cache_dir = self._image_cache_dir or os.path.join(os.path.dirname(os.path.abspath(nib_file)), "barista-native-images")
+            cache_entry = os.path.join(cache_dir, f"{image_name}-{key[:16]}")
+        if cache_entry is not None and os.path.isdir(cache_entry):
+            build = self._restore_cached_image(cache_entry, output_dir)
+            build.update(duration=time.perf_counter() - ts_start, cache_hit=True)
+        else:
+            ts_build = time.time()
+            build_output_file = os.path.join(output_dir, f"{image_name}-build-output.json")
+            cmd = [self.executables["native-image"], f"--bundle-apply={nib_file}", "-g", "-o", image_name, f"-H:BuildOutputJSONFile={build_output_file}"] + build_options
+            log.info(f"Building native image using command: \"{' '.join(cmd)}\"")
+            subprocess_runner.run(cmd, capture_output=False)
+            build = {"build_duration": time.perf_counter() - ts_start}
+            build["stats"] = read_build_output_stats(build_output_file)
+            if cache_entry is not None:
+                self._cache_image(cache_entry, output_dir, ts_build, build)
+                self._evict_cached_images(cache_dir, image_name)
+            build.update(duration=build["build_duration"], cache_hit=False)
+        build.update(image=image_name, key=key)
+        self._builds.append(build)
         if verify_app_image_existance and not os.path.isfile(image_path):
             raise FileNotFoundError(f"Native image not found at expected location: \"{image_path}\"!")
         log.info(f"Native image \"{image_path}\" was successfully built!")
-        return image_path
\ No newline at end of file
+        return image_path
+
+    def _cache_image(self, cache_entry, output_dir, ts_build, build):
+        """Caches the files written to the output directory by a build, along with the record of the build.
+
+        The files are first copied to a temporary directory, which replaces the cache entry once all of them were copied.
+
+        :param os.path cache_entry: Directory the files are cached in.
+        :param os.path output_dir: Output directory of the build.
+        :param float ts_build: Time the build started at, files modified before were written by previous builds.
+        :param dict build: Record of the build.
+        """
+        temporary_dir = f"{cache_entry}.tmp"
+        shutil.rmtree(temporary_dir, ignore_errors=True)
+        os.makedirs(temporary_dir)
+        for name in os.listdir(output_dir):
+            path = os.path.join(output_dir, name)
+            if os.path.isfile(path) and os.path.getmtime(path) >= ts_build:
+                shutil.copy2(path, temporary_dir)
+        with open(os.path.join(temporary_dir, NativeImageVM.build_record_file), "w") as file:
+            json.dump(build, file, indent=4)
+        os.replace(temporary_dir, cache_entry)
+        log.info(f"Cached the native image build in \"{cache_entry}\"")
+
+    def _restore_cached_image(self, cache_entry, output_dir):
+        """Restores the files of a cached build to the output directory.
+
+        :param os.path cache_entry: Directory the files are cached in.
+        :param os.path output_dir: Output directory of the build.
+        :return: Record of the cached build.
+        :rtype: dict
+        """
+        log.info(f"Using the native image build cached in \"{cache_entry}\"")
+        # The modification time of an entry records its last use, for evicting the least recently used builds
+        os.utime(cache_entry)
+        os.makedirs(output_dir, exist_ok=True)
+        for name in os.listdir(cache_entry):
+            if name != NativeImageVM.build_record_file:
+                # Restored files are written anew, like the files of a build
+                shutil.copy(os.path.join(cache_entry, name), output_dir)
+        with open(os.path.join(cache_entry, NativeImageVM.build_record_file), "r") as file:
+            return json.load(file)
+
+    def _evict_cached_images(self, cache_dir, image_name):
+        """Removes the least recently used builds of an image from the cache, keeping the 'cache_size' most recent ones.
+
+        A build is used when it is cached or restored. Builds of an image are only reused if nothing changed, so the builds
+        of previous versions of a nib or of other build options are evicted as new ones are cached.
+
+        :param os.path cache_dir: Directory the images are cached in.
+        :param string image_name: Name of the image.
+        """
+        entries = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if re.fullmatch(rf"{re.escape(image_name)}-[0-9a-f]{{16}}", name)]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for entry in entries[self._image_cache_size:]:
+            log.info(f"Evicting the least recently used native image build \"{entry}\" from the cache")
+            shutil.rmtree(entry, ignore_errors=True)
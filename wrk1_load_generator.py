@@ -1,57 +1,60 @@
-import subprocess
 import logging as log
 from abstract_wrk_load_generator import AbstractWrkLoadGenerator
-from abstract_load_generator import cmd_exists
+from abstract_load_generator import run_probe_command
 
 class Wrk1LoadGenerator(AbstractWrkLoadGenerator):
-    def __init__(self, config, output_dir, endpoint, env):
+    def __init__(self, config, output_dir, endpoint, env, sampling_interval=0, capabilities=None):
         self._endpoint = endpoint
+        self._sampling_interval = sampling_interval
+        self._config = config
         self._duration = config.iteration_duration
         self._output_dir = output_dir
         self._threads = config.threads
         self._connections = config.connections
         self._env = env
 
-    def measure(self, script=None):
-        if not cmd_exists("wrk", path=self._env.get("PATH", "")):
-            raise FileNotFoundError("wrk command not found in PATH.")
-        
-        if self.wrk_has_rate():
+    @classmethod
+    def probe(cls, env):
+        output = run_probe_command(["wrk", "--version"], env)
+        if '--rate' in output:
             raise FileNotFoundError("wrk should not have --rate flag. Please ensure you have wrk alias not for wrk2")
+        capabilities = {"rate_control": False, "closed_loop": True, "http2": False, "lua": True, "histogram": False}
+        return output.strip().splitlines()[0], capabilities
 
+    def measure(self, script=None):
         log.info("Begining to measure throughput")
-        command = ["wrk","-d", f"{self._duration}s", self._endpoint, "-t", f"{self._threads}", "-c", f"{self._connections}"]
-        if script is not None:
-            command += ['--script', script]
-            # Propagate the number of threads to the Lua script
-            # This enables the Lua script to e.g. split the workload into <thread_count> segments
-            command += ["--", f"{self._threads}"]
-        log.info(f"Measuring throughput with :\n{' '.join(command)}")
-        self._wrk_processs = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=False, env=self._env)
-        self._wrk_processs.wait()
-        output = self._wrk_processs.communicate()[0].decode("utf-8")
-        exit_code = self._wrk_processs.returncode
+        def build_command(threads, connections, rate, script):
+            command = ["wrk","-d", f"{self._duration}s", self._endpoint, "-t", f"{threads}", "-c", f"{connections}"]
+            if script is not None:
+                command += ['--script', script]
+                # Propagate the number of threads to the Lua script
+                # This enables the Lua script to e.g. split the workload into <thread_count> segments
+                command += ["--", f"{threads}"]
+            return command
+        commands, outputs, exit_codes, process_threads, time_series, cpu_usage = self.run_processes(build_command, self._threads, self._connections, script=script)
+        command = self.join_commands(commands)
+        output = self.join_outputs(commands, outputs)
+        exit_code = next((exit_code for exit_code in exit_codes if exit_code != 0), 0)
 
         if exit_code == 0:
-            return {
-                    "throughput":self.parse_measurements(output),
-                    "command": ' '.join(command),
+            result = {
+                    "throughput": {"throughput": sum(self.parse_measurements(process_output)["throughput"] for process_output in outputs)},
+                    "command": command,
                     "stdout": output,
                     "exit_code": exit_code,
                     }
-                    
+            result.update(self.merge_request_stats([self.parse_request_stats(process_output) for process_output in outputs], process_threads))
+            result["load_generator_cpu"] = cpu_usage
+            if time_series is not None:
+                result["time_series"] = time_series
+            return result
+
         self.crash_dump(self._output_dir, output)
         raise ValueError(f"Throughput command failed and exited with: {exit_code}")
 
     def cleanup(self):
         log.debug("no cleanup needed for wrk1 load generator")
 
-    def wrk_has_rate(self):
-        wrk = subprocess.Popen(['wrk', '--version'], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=False, env=self._env)
-        wrk.wait()
-        output = wrk.communicate()[0].decode("utf-8")
-        return '--rate' in output
-
     def parse_measurements(self, measurement):
         log.info("Parsing received measurements for throughput")
         return self.load_parser(measurement)['throughput']
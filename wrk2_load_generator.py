@@ -1,12 +1,13 @@
-import subprocess
 import re
 import logging as log
 from abstract_wrk_load_generator import AbstractWrkLoadGenerator
-from abstract_load_generator import cmd_exists
+from abstract_load_generator import run_probe_command
+from results import LatencyHistogram
 
 class Wrk2LoadGenerator(AbstractWrkLoadGenerator):
-    def __init__(self, config, output_dir, endpoint, env, request_rate=100000):
+    def __init__(self, config, output_dir, endpoint, env, request_rate=100000, sampling_interval=0, capabilities=None):
         self._endpoint = endpoint
+        self._sampling_interval = sampling_interval
         self._config = config
         self._output_dir = output_dir
         self._request_rate = request_rate
@@ -14,17 +15,18 @@ class Wrk2LoadGenerator(AbstractWrkLoadGenerator):
         self._connections = config.connections
         self._env = env
 
-    def measure(self, rate=None, duration=None, script=None):
-        if not cmd_exists("wrk2", path=self._env.get("PATH", "")):
-            raise FileNotFoundError("wrk2 command not found please set it in PATH.")
-
-        has_rate, version_output = self.wrk2_has_rate()
-        if not has_rate:
+    @classmethod
+    def probe(cls, env):
+        output = run_probe_command(["wrk2", "--version"], env)
+        if '--rate' not in output:
             raise FileNotFoundError(
                 "wrk2 should have --rate flag. Please ensure you have wrk2 alias not for wrk.\n"
-                f"Output of 'wrk2 --version':\n{version_output}"
+                f"Output of 'wrk2 --version':\n{output}"
             )
+        capabilities = {"rate_control": True, "closed_loop": False, "http2": False, "lua": True, "histogram": True}
+        return output.strip().splitlines()[0], capabilities
 
+    def measure(self, rate=None, duration=None, script=None):
         if duration is None:
             duration = self._config.iteration_duration
         
@@ -33,37 +35,41 @@ class Wrk2LoadGenerator(AbstractWrkLoadGenerator):
             log.warning(f"No rate was given. Setting rate to {rate} op/s")
 
         log.info("Begining to measure latency")
-        command = ["wrk2","-d", f"{duration}s", "-R", f"{rate}", "--latency", self._endpoint, "-t", f"{self._threads}", "-c", f"{self._connections}"]
-        if script is not None:
-            command += ['--script', script]
-            # Propagate the number of threads to the Lua script
-            # This enables the Lua script to e.g. split the workload into <thread_count> segments
-            command += ["--", f"{self._threads}"]
-        log.info(f"Running latency command:\n{' '.join(command)}")
-        self._wrk_process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=False, env=self._env)
-        self._wrk_process.wait()
+        def build_command(threads, connections, rate, script):
+            command = ["wrk2","-d", f"{duration}s", "-R", f"{rate}", "--latency", self._endpoint, "-t", f"{threads}", "-c", f"{connections}"]
+            if script is not None:
+                command += ['--script', script]
+                # Propagate the number of threads to the Lua script
+                # This enables the Lua script to e.g. split the workload into <thread_count> segments
+                command += ["--", f"{threads}"]
+            return command
+        commands, outputs, exit_codes, process_threads, time_series, cpu_usage = self.run_processes(build_command, self._threads, self._connections, rate, script)
         log.info("Finished measuring latency")
-        output = self._wrk_process.communicate()[0].decode("utf-8")
-        p_vals = self.parse_latencies(output)
+        command = self.join_commands(commands)
+        output = self.join_outputs(commands, outputs)
 
-        exit_code = self._wrk_process.returncode
+        exit_code = next((exit_code for exit_code in exit_codes if exit_code != 0), 0)
         if exit_code == 0:
-            return {"p_values": p_vals,
-                    "command": ' '.join(command),
+            histogram = LatencyHistogram()
+            for process_output in outputs:
+                histogram.merge(self.parse_histogram(process_output))
+            result = {"p_values": self.merge_latencies(outputs, histogram),
+                    "histogram": histogram,
+                    "throughput": {"throughput": sum(self.load_parser(process_output)["throughput"]["throughput"] for process_output in outputs)},
+                    "command": command,
                     "stdout": output,
                     "exit_code": exit_code}
+            result.update(self.merge_request_stats([self.parse_request_stats(process_output) for process_output in outputs], process_threads))
+            result["load_generator_cpu"] = cpu_usage
+            if time_series is not None:
+                result["time_series"] = time_series
+            return result
         self.crash_dump(self._output_dir, output)
         raise ValueError(f"Latency command failed and exited with: {exit_code}")
     
     def cleanup(self):
         log.debug("no cleanup needed for wrk2 load generator")
 
-    def wrk2_has_rate(self):
-        wrk = subprocess.Popen(['wrk2', '--version'], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=False, env=self._env)
-        wrk.wait()
-        output = wrk.communicate()[0].decode("utf-8")
-        return ('--rate' in output, output)
-
     def parse_latencies(self, output):
         latency = " *(\d+\.?\d*)% +(\d+\.?\d*)(\w+)"
         parsed = {}
@@ -72,6 +78,49 @@ class Wrk2LoadGenerator(AbstractWrkLoadGenerator):
             parsed[float(percentile)] = round(float(number) * self.time_unit_to_ms(unit), 9)
         return parsed
 
+    def merge_latencies(self, outputs, histogram):
+        """Returns the latency percentiles of the wrk2 processes run side by side.
+
+        The percentiles are computed from the merged latency histogram, as the percentiles of the individual processes
+        cannot be averaged. If the histogram is missing, the worst latency reported by any process is used instead.
+
+        :param list outputs: The outputs of the wrk2 processes.
+        :param LatencyHistogram histogram: The merged latency histogram of the wrk2 processes.
+        :rtype: dict
+        """
+        if len(outputs) == 1:
+            return self.parse_latencies(outputs[0])
+        if histogram.total_count > 0:
+            return histogram.p_values()
+        log.warning("No latency histograms found in the wrk2 outputs. Reporting the worst latency percentiles of all the wrk2 processes instead")
+        p_values = {}
+        for output in outputs:
+            for percentile, latency in self.parse_latencies(output).items():
+                p_values[percentile] = max(latency, p_values.get(percentile, latency))
+        return p_values
+
+    def parse_histogram(self, output):
+        """Reconstructs the latency histogram from the "Detailed Percentile spectrum" section of the wrk2 output.
+
+        Each row of the spectrum reports a latency value (in milliseconds, with microsecond precision) and the total count of
+        requests with a latency lower than or equal to it, so the count of a value is the difference to the previous row.
+
+        :param str output: The wrk2 output.
+        :return: The latency histogram, empty if the output contains no percentile spectrum.
+        :rtype: LatencyHistogram
+        """
+        histogram = LatencyHistogram()
+        spectrum = re.search(r"Detailed Percentile spectrum:(.*?)#\[Mean", output, re.DOTALL)
+        if spectrum is None:
+            log.warning("No detailed percentile spectrum found in the wrk2 output")
+            return histogram
+        previous_total_count = 0
+        for value, total_count in re.findall(r"^\s*(\d+\.\d+)\s+\d+\.\d+\s+(\d+)\s+(?:\d+\.\d+|inf)\s*$", spectrum.group(1), re.MULTILINE):
+            total_count = int(total_count)
+            histogram.record(round(float(value) * 1000), total_count - previous_total_count)
+            previous_total_count = total_count
+        return histogram
+
     def time_unit_to_ms(self, unit):
         if unit == 'ms':
             return 1